@@ -0,0 +1,47 @@
+"""add_article_view_rollups
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 按 view_date 范围分区的只追加流水表；月分区由 view_counter_service 提前创建，
+    # DEFAULT 分区兜底，保证分区缺失时写入不失败
+    op.execute("""
+        CREATE TABLE article_view_daily (
+            id BIGSERIAL NOT NULL,
+            view_date DATE NOT NULL,
+            article_id UUID NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+            views INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+            PRIMARY KEY (id, view_date)
+        ) PARTITION BY RANGE (view_date);
+    """)
+    op.execute("CREATE TABLE article_view_daily_default PARTITION OF article_view_daily DEFAULT;")
+    op.execute("CREATE INDEX idx_article_view_daily_date_article ON article_view_daily (view_date, article_id);")
+    op.execute("CREATE INDEX idx_article_view_daily_article_date ON article_view_daily (article_id, view_date);")
+
+    op.create_table(
+        'site_view_daily',
+        sa.Column('view_date', sa.Date(), nullable=False),
+        sa.Column('views', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('view_date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('site_view_daily')
+    op.execute("DROP TABLE IF EXISTS article_view_daily CASCADE;")
@@ -0,0 +1,48 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # keyset 分页按 (排序键, id) 做行值比较，索引列序与之一致；
+    # 倒序分页由索引反向扫描完成
+    op.create_index('idx_article_published_created_id', 'articles', ['is_published', 'created_at', 'id'], unique=False)
+    # 新索引覆盖旧索引的全部前缀
+    op.drop_index('idx_article_published_created', table_name='articles')
+
+    op.create_index('idx_comment_article_created_id', 'comments', ['article_id', 'created_at', 'id'], unique=False)
+    op.create_index('idx_message_created_id', 'messages', ['created_at', 'id'], unique=False)
+    op.create_index(
+        'idx_conv_msg_conversation_created_id',
+        'conversation_messages',
+        ['conversation_id', 'created_at', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'idx_conversation_user_activity',
+        'conversations',
+        ['user_id', sa.text('COALESCE(updated_at, created_at)'), 'id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_conversation_user_activity', table_name='conversations')
+    op.drop_index('idx_conv_msg_conversation_created_id', table_name='conversation_messages')
+    op.drop_index('idx_message_created_id', table_name='messages')
+    op.drop_index('idx_comment_article_created_id', table_name='comments')
+    op.create_index('idx_article_published_created', 'articles', ['is_published', 'created_at'], unique=False)
+    op.drop_index('idx_article_published_created_id', table_name='articles')
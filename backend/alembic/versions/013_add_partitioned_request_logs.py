@@ -0,0 +1,51 @@
+"""add_partitioned_request_logs
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 按 timestamp 日分区，日分区由 request_log_service 提前创建并按保留期整块删除；
+    # DEFAULT 分区兜底，保证分区缺失时写入不失败。
+    # 只保留实际用到的索引：按请求 ID 查询、按用户查看历史，时间范围扫描依赖分区裁剪 + BRIN
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS request_logs (
+            id UUID NOT NULL,
+            request_id VARCHAR(36) NOT NULL,
+            method VARCHAR(10) NOT NULL,
+            url VARCHAR(500) NOT NULL,
+            path VARCHAR(500) NOT NULL,
+            user_agent TEXT,
+            ip_address VARCHAR(45),
+            referer VARCHAR(500),
+            request_headers TEXT,
+            request_body TEXT,
+            response_status INTEGER NOT NULL,
+            response_body TEXT,
+            response_time INTEGER NOT NULL,
+            timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            duration INTEGER NOT NULL,
+            user_id UUID,
+            session_id VARCHAR(100),
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp);
+    """)
+    op.execute("CREATE TABLE IF NOT EXISTS request_logs_default PARTITION OF request_logs DEFAULT;")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_request_logs_request_id ON request_logs (request_id);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_request_logs_user_timestamp ON request_logs (user_id, timestamp);")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_request_logs_timestamp_brin ON request_logs USING brin (timestamp);")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS request_logs CASCADE;")
@@ -0,0 +1,30 @@
+"""add_context_history_checkpoints
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 滚动摘要检查点：摘要覆盖到的最后一条消息，对应消息表的 (created_at, id) keyset
+    op.add_column('context_history', sa.Column('covered_until', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('context_history', sa.Column('last_message_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_index('idx_ctx_conversation_created', 'context_history', ['conversation_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_ctx_conversation_created', table_name='context_history')
+    op.drop_column('context_history', 'last_message_id')
+    op.drop_column('context_history', 'covered_until')
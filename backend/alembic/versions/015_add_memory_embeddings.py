@@ -0,0 +1,97 @@
+"""add_memory_embeddings
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '015'
+down_revision = '014'
+branch_labels = None
+depends_on = None
+
+# 与 settings.EMBEDDING_DIM 一致；修改维度需要新的迁移并重新回填
+EMBEDDING_DIM = 512
+BACKFILL_BATCH_SIZE = 256
+
+
+def _reembed_missing(bind) -> int:
+    """按内容为没有有效向量的记忆重新计算向量（使用应用的向量化服务）"""
+    from app.services.embedding_service import embedding_service
+    from app.utils.vector_index import format_vector
+
+    if embedding_service.dim != EMBEDDING_DIM:
+        print(
+            f"EMBEDDING_DIM={embedding_service.dim} does not match the column dimension {EMBEDDING_DIM}; "
+            f"skipping re-embedding, run scripts/backfill_memory_embeddings.py after fixing the setting"
+        )
+        return 0
+
+    # 每批写入后这些行不再为 NULL，下一批自然从剩余的行开始
+    updated = 0
+    while True:
+        rows = bind.execute(
+            sa.text("SELECT id, content FROM memories WHERE embedding IS NULL ORDER BY id LIMIT :limit"),
+            {"limit": BACKFILL_BATCH_SIZE},
+        ).all()
+        if not rows:
+            return updated
+
+        vectors = embedding_service.embed([row.content for row in rows])
+        bind.execute(
+            sa.text(f"UPDATE memories SET embedding = CAST(:embedding AS vector({EMBEDDING_DIM})) WHERE id = :id"),
+            [{"id": row.id, "embedding": format_vector(vector)} for row, vector in zip(rows, vectors)],
+        )
+        updated += len(rows)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # pgvector 需要数据库服务器安装扩展（docker-compose 使用 pgvector/pgvector 镜像）
+    available = bind.execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'vector'")
+    ).scalar()
+    if not available:
+        raise RuntimeError(
+            "The pgvector extension is not available on this PostgreSQL server. "
+            "Use the pgvector/pgvector:pg15 image (see docker-compose.yml) or install pgvector, then rerun the migration."
+        )
+    op.execute('CREATE EXTENSION IF NOT EXISTS vector')
+
+    # 原 TEXT 列中维度一致的 "[x1,x2,...]" 文本直接转换为向量，无法解析或维度不符的置空后按内容重新计算
+    op.execute(f"""
+        CREATE FUNCTION pg_temp.try_vector(value text) RETURNS vector({EMBEDDING_DIM}) AS $$
+        BEGIN
+            RETURN value::vector({EMBEDDING_DIM});
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql IMMUTABLE
+    """)
+    op.execute(
+        f'ALTER TABLE memories ALTER COLUMN embedding TYPE vector({EMBEDDING_DIM}) '
+        f'USING pg_temp.try_vector(embedding)'
+    )
+    op.execute('DROP FUNCTION pg_temp.try_vector(text)')
+
+    reembedded = _reembed_missing(bind)
+    if reembedded:
+        print(f"Re-embedded {reembedded} memories")
+
+    # 检索在单个用户的记忆内精确排序（idx_memory_user），不建立全局近似索引：
+    # 全局 HNSW 先取近邻再按租户/用户过滤，结果会少于 top_k 甚至为空
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'memories',
+        'embedding',
+        type_=sa.Text(),
+        postgresql_using='embedding::text',
+    )
@@ -0,0 +1,77 @@
+"""add_article_search_index
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '016'
+down_revision = '015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 应用层维护的倒排索引（中文二元组/jieba 分词 + BM25），由 scripts/reindex_articles.py 回填
+    op.create_table(
+        'article_search_terms',
+        sa.Column('term', sa.String(length=64), nullable=False),
+        sa.Column('article_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('tf', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('term', 'article_id'),
+    )
+    op.create_index('idx_article_search_terms_article', 'article_search_terms', ['article_id'], unique=False)
+
+    op.create_table(
+        'article_search_docs',
+        sa.Column('article_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('length', sa.Float(), nullable=False),
+        sa.Column('indexed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('article_id'),
+    )
+
+    # 迁移 006 的 english tsvector 无法切分中文，且每次写文章都要经过触发器，已不再使用
+    op.execute("DROP TRIGGER IF EXISTS trig_articles_search_vector_update ON articles;")
+    op.execute("DROP FUNCTION IF EXISTS articles_search_vector_update();")
+    op.execute("DROP INDEX IF EXISTS idx_articles_search_vector;")
+    op.execute("ALTER TABLE articles DROP COLUMN IF EXISTS search_vector;")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE articles ADD COLUMN search_vector tsvector;")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION articles_search_vector_update()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            NEW.search_vector :=
+                SETWEIGHT(to_tsvector('english', COALESCE(NEW.title, '')), 'A') ||
+                SETWEIGHT(to_tsvector('english', COALESCE(NEW.content, '')), 'B') ||
+                SETWEIGHT(to_tsvector('english', COALESCE(NEW.excerpt, '')), 'C');
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER trig_articles_search_vector_update
+        BEFORE INSERT OR UPDATE ON articles
+        FOR EACH ROW EXECUTE PROCEDURE articles_search_vector_update();
+    """)
+    op.execute("""
+        UPDATE articles SET search_vector =
+            SETWEIGHT(to_tsvector('english', COALESCE(title, '')), 'A') ||
+            SETWEIGHT(to_tsvector('english', COALESCE(content, '')), 'B') ||
+            SETWEIGHT(to_tsvector('english', COALESCE(excerpt, '')), 'C');
+    """)
+    op.execute("CREATE INDEX idx_articles_search_vector ON articles USING GIN(search_vector);")
+
+    op.drop_table('article_search_docs')
+    op.drop_index('idx_article_search_terms_article', table_name='article_search_terms')
+    op.drop_table('article_search_terms')
@@ -0,0 +1,50 @@
+"""precreate_request_log_partitions
+
+Revision ID: 017
+Revises: 016
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '017'
+down_revision = '016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 迁移 013 只创建了 DEFAULT 分区，应用启动前写入的行都会落入 DEFAULT；
+    # 这里提前创建今天起 8 天的日分区，每个分区独立处理，单个失败只告警不中断迁移
+    op.execute("""
+        DO $$
+        DECLARE
+            day date;
+        BEGIN
+            FOR day IN
+                SELECT generate_series(
+                    (now() AT TIME ZONE 'UTC')::date,
+                    (now() AT TIME ZONE 'UTC')::date + 7,
+                    interval '1 day'
+                )::date
+            LOOP
+                BEGIN
+                    EXECUTE format(
+                        'CREATE TABLE IF NOT EXISTS %I PARTITION OF request_logs FOR VALUES FROM (%L) TO (%L)',
+                        'request_logs_' || to_char(day, 'YYYYMMDD'),
+                        day::text || ' 00:00:00+00',
+                        (day + 1)::text || ' 00:00:00+00'
+                    );
+                EXCEPTION WHEN others THEN
+                    RAISE WARNING 'Could not create request_logs partition for %: %', day, SQLERRM;
+                END;
+            END LOOP;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    # 日分区属于运行期数据，由 request_log_service 按保留期删除
+    pass
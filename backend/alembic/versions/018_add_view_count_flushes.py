@@ -0,0 +1,33 @@
+"""add_view_count_flushes
+
+Revision ID: 018
+Revises: 017
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '018'
+down_revision = '017'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 已应用的浏览量快照 ID，与 view_count 更新同事务写入，使快照重试幂等
+    op.create_table(
+        'view_count_flushes',
+        sa.Column('snapshot_id', sa.String(length=32), nullable=False),
+        sa.Column('article_count', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('flushed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('snapshot_id')
+    )
+    op.create_index('ix_view_count_flushes_flushed_at', 'view_count_flushes', ['flushed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_view_count_flushes_flushed_at', table_name='view_count_flushes')
+    op.drop_table('view_count_flushes')
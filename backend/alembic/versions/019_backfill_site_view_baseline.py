@@ -0,0 +1,38 @@
+"""backfill_site_view_baseline
+
+Revision ID: 019
+Revises: 018
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '019'
+down_revision = '018'
+branch_labels = None
+depends_on = None
+
+
+# 基线行日期：早于任何统计区间，只计入累计总量，不影响日/周/月统计
+BASELINE_DATE = '1970-01-01'
+
+
+def upgrade() -> None:
+    # 全站总浏览量改为汇总 site_view_daily；汇总表启用前已累计在 articles.view_count 中的
+    # 浏览量没有日汇总，这里把差额补为一行基线
+    op.execute(f"""
+        INSERT INTO site_view_daily (view_date, views)
+        SELECT DATE '{BASELINE_DATE}', legacy.views
+        FROM (
+            SELECT COALESCE((SELECT SUM(view_count) FROM articles), 0)
+                 - COALESCE((SELECT SUM(views) FROM site_view_daily), 0) AS views
+        ) AS legacy
+        WHERE legacy.views > 0
+        ON CONFLICT (view_date) DO UPDATE SET views = site_view_daily.views + EXCLUDED.views;
+    """)
+
+
+def downgrade() -> None:
+    op.execute(f"DELETE FROM site_view_daily WHERE view_date = DATE '{BASELINE_DATE}';")
@@ -1,25 +1,91 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.dependencies import get_current_active_user, get_current_superuser
 from app import crud
-from app.schemas.article import Article, ArticleCreate, ArticleUpdate, ArticleWithAuthor
+from app.crud import async_article
+from app.schemas.article import Article, ArticleCreate, ArticleUpdate, ArticleWithAuthor, ArticleSearchResult
 from app.models.user import User
 from uuid import UUID
-from app.services.cache_service import cache_service
-from app.utils.pagination import CursorPaginationParams
-from app.utils.db_utils import get_articles_by_multiple_filters, get_popular_articles_optimized
+from app.services.cache_service import cache_service, cache_get_or_set
+from app.services.search_service import article_search_service
+from app.services.view_counter_service import view_counter_service
+from app.utils.cache_keys import CacheKeys, CacheTags, CacheTTL
+from app.utils.pagination import CursorPaginationParams, NEXT_CURSOR_HEADER
+from app.utils.db_utils import (
+    get_articles_by_multiple_filters,
+    get_articles_page_by_multiple_filters,
+    get_popular_articles_optimized,
+)
 from app.utils.common_helpers import parse_uuid_list
 from app.utils.logger import app_logger
 
 router = APIRouter()
 
 
+async def _cached_article_page(
+    key: str,
+    load: Callable[[], Tuple[List[Any], Optional[str]]],
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> Tuple[List[ArticleWithAuthor], Optional[str]]:
+    """
+    读取文章列表缓存，未命中时在线程池中执行同步查询
+
+    结果登记在列表标签下，文章、作者、分类或标签变更时通过 invalidate_tags 失效
+
+    Args:
+        key: 列表缓存键
+        load: 返回 (已预加载关联数据的文章 ORM 列表, 下一页游标) 的同步函数
+        background_tasks: 传入时在响应后用本次加载的结果批量预热单篇文章缓存
+
+    Returns:
+        Tuple[List[ArticleWithAuthor], Optional[str]]: (文章 Schema 列表, 下一页游标)
+    """
+    def load_schemas() -> Dict[str, Any]:
+        articles, next_cursor = load()
+        return {
+            "items": [ArticleWithAuthor.model_validate(article) for article in articles],
+            "next_cursor": next_cursor,
+        }
+
+    async def fetch() -> Dict[str, Any]:
+        page = await run_in_threadpool(load_schemas)
+        if page["items"] and background_tasks is not None:
+            background_tasks.add_task(crud.prime_article_cache, page["items"])
+        return page
+
+    page = await cache_get_or_set(
+        key,
+        fetch,
+        CacheTTL.ARTICLE_LIST,
+        stale_ttl=CacheTTL.VERY_SHORT,
+        tags=CacheKeys.article_list_tags(),
+    )
+    return page["items"], page["next_cursor"]
+
+
+async def _cached_article_list(
+    key: str,
+    load: Callable[[], List[Any]],
+    background_tasks: Optional[BackgroundTasks] = None,
+) -> List[ArticleWithAuthor]:
+    """
+    读取不分页的文章列表缓存（精选、热门等），参数同 _cached_article_page
+    """
+    articles, _ = await _cached_article_page(key, lambda: (load(), None), background_tasks)
+    return articles
+
+
 @router.get("/", response_model=List[ArticleWithAuthor])
-def read_articles(
+async def read_articles(
+    response: Response,
+    background_tasks: BackgroundTasks,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor for keyset pagination (from X-Next-Cursor)"),
     published_only: bool = Query(True, description="Only return published articles"),
     author_id: Optional[str] = Query(None, description="Filter by author ID"),
     category_id: Optional[str] = Query(None, description="Filter by category ID"),
@@ -29,24 +95,60 @@ def read_articles(
 ) -> Any:
     """
     Retrieve articles
-    """
-    from uuid import UUID
-    from app.utils.db_utils import get_articles_by_multiple_filters
 
+    Keyset-paginated: the next page cursor is returned in the X-Next-Cursor
+    header. `skip` is still honoured for offset paging.
+    """
     # 使用优化的查询函数
     author_ids = [author_id] if author_id else None
     category_ids = [category_id] if category_id else None
     tag_ids = [tag_id] if tag_id else None
 
-    articles = get_articles_by_multiple_filters(
-        db,
-        author_ids=author_ids,
-        category_ids=category_ids,
-        tag_ids=tag_ids,
-        published_only=published_only,
-        limit=limit,
-        offset=skip
+    # 列表查询已预加载关联数据，未命中时响应发送后顺带批量预热单篇文章缓存
+    if skip and not cursor:
+        cache_key = CacheKeys.article_list(
+            skip=skip,
+            limit=limit,
+            published_only=published_only,
+            author_id=author_id,
+            category_id=category_id,
+            tag_id=tag_id,
+        )
+        return await _cached_article_list(
+            cache_key,
+            lambda: get_articles_by_multiple_filters(
+                db,
+                author_ids=author_ids,
+                category_ids=category_ids,
+                tag_ids=tag_ids,
+                published_only=published_only,
+                limit=limit,
+                offset=skip
+            ),
+            background_tasks,
+        )
+
+    cursor_params = CursorPaginationParams(cursor=cursor, limit=limit)
+
+    def load_page() -> Tuple[List[Any], Optional[str]]:
+        page = get_articles_page_by_multiple_filters(
+            db,
+            cursor_params,
+            author_ids=author_ids,
+            category_ids=category_ids,
+            tag_ids=tag_ids,
+            published_only=published_only,
+        )
+        return page.items, page.next_cursor
+
+    filters = f":published={published_only}:author={author_id}:category={category_id}:tag={tag_id}"
+    articles, next_cursor = await _cached_article_page(
+        CacheKeys.article_cursor(cursor, limit, filters),
+        load_page,
+        background_tasks,
     )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return articles
 
 
@@ -70,23 +172,26 @@ async def create_article(
     
     article = crud.create_article(db, article=article_in, author_id=current_user.id)  # type: ignore
     
-    # Clear related caches
-    from app.services.cache_service import cache_service
-    await cache_service.delete(f"article:slug:{article_in.slug}")
+    # 新文章会出现在列表中；详情只缓存存在的文章，无需清理 slug 键
+    from app.services.bloom_filter_service import bloom_filter_service
+    await cache_service.invalidate_tags(CacheTags.ARTICLE_LIST)
+    await bloom_filter_service.add_article(article.id, article.slug)
     
     return article
 
 
 @router.get("/featured", response_model=List[ArticleWithAuthor])
-def read_featured_articles(
+async def read_featured_articles(
     limit: int = Query(10, ge=1, le=50, description="Number of featured articles to return"),
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Get featured/pinned articles
     """
-    articles = crud.get_featured_articles(db, limit=limit)
-    return articles
+    return await _cached_article_list(
+        CacheKeys.article_featured(limit),
+        lambda: crud.get_featured_articles(db, limit=limit),
+    )
 
 
 @router.get("/test-public")
@@ -98,7 +203,7 @@ def test_public():
 
 
 @router.get("/popular", response_model=List[ArticleWithAuthor])
-def read_popular_articles(
+async def read_popular_articles(
     limit: int = Query(10, ge=1, le=50, description="Number of popular articles to return"),
     days: int = Query(30, ge=1, description="Number of days to consider for popularity calculation"),
     db: Session = Depends(get_db)
@@ -106,17 +211,13 @@ def read_popular_articles(
     """
     Get popular articles based on views in recent days
     """
-    from app.utils.db_utils import get_popular_articles_optimized
-    from app.utils.logger import app_logger
-
     try:
         app_logger.info(f"Fetching popular articles: limit={limit}, days={days}")
 
         # 使用优化的查询函数
-        articles = get_popular_articles_optimized(
-            db,
-            limit=limit,
-            days=days
+        articles = await _cached_article_list(
+            CacheKeys.article_popular(limit, days),
+            lambda: get_popular_articles_optimized(db, limit=limit, days=days),
         )
 
         app_logger.info(f"Successfully fetched {len(articles)} popular articles")
@@ -185,29 +286,31 @@ def search_articles(
 @router.get("/slug/{slug}", response_model=ArticleWithAuthor)
 async def read_article_by_slug(
     slug: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Get a specific article by slug
+
+    Served from the pre-serialized detail cache; view_count in the response
+    may lag behind by up to one view-count flush interval.
     """
-    article = await crud.get_article_by_slug_with_relationships_async(db, slug=slug)
-    if not article:
+    detail = await crud.get_article_detail_json_by_slug(db, slug=slug)
+    if not detail:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Article not found",
         )
 
-    # Increment view count
-    await crud.increment_view_count(db, article_id=article.id)  # type: ignore
-
-    return article
+    article_id, body = detail
+    view_counter_service.record_view_nowait(article_id)
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/related/{article_id}", response_model=List[ArticleWithAuthor])
 async def read_related_articles(
     article_id: str,
     limit: int = Query(5, ge=1, le=20, description="Number of related articles to return"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Get articles related to a specific article
@@ -220,29 +323,33 @@ async def read_related_articles(
             detail="Article not found",
         )
 
-    related_articles = crud.get_related_articles(db, article_id=article_uuid, limit=limit)
+    related_articles = await async_article.get_related_articles(db, article_id=article_uuid, limit=limit)
     return related_articles
 
 
 @router.get("/{article_id}", response_model=ArticleWithAuthor)
 async def read_article_by_id(
     article_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Get a specific article by id
+
+    Served from the pre-serialized detail cache; view_count in the response
+    may lag behind by up to one view-count flush interval.
     """
     article_uuid = UUID(article_id)
 
-    # Increment view count and get updated article with relationships
-    article = await crud.increment_view_count(db, article_id=article_uuid)
-    if not article:
+    detail = await crud.get_article_detail_json(db, article_id=article_uuid)
+    if not detail:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Article not found",
         )
 
-    return article
+    _, body = detail
+    view_counter_service.record_view_nowait(article_uuid)
+    return Response(content=body, media_type="application/json")
 
 
 @router.put("/{article_id}", response_model=Article)
@@ -256,18 +363,14 @@ async def update_article(
     Update an article
     """
     article_uuid = UUID(article_id)
+    # 详情（按 ID 与新旧 slug）与列表缓存由 crud.update_article 按依赖标签失效
     article = await crud.update_article(db, article_id=article_uuid, article_update=article_update)
     if not article:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Article not found",
         )
-    
-    # Clear related caches
-    await cache_service.delete(f"article:{article_id}")
-    if hasattr(article_update, 'slug') and article_update.slug:
-        await cache_service.delete(f"article:slug:{article_update.slug}")
-    
+
     return article
 
 
@@ -281,16 +384,14 @@ async def delete_article(
     Delete an article
     """
     article_uuid = UUID(article_id)
+    # 详情与列表缓存由 crud.delete_article 按依赖标签失效
     success = await crud.delete_article(db, article_id=article_uuid)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Article not found",
         )
-    
-    # Clear related caches
-    await cache_service.delete(f"article:{article_id}")
-    
+
     return {"message": "Article deleted successfully"}
 
 
@@ -328,7 +429,7 @@ async def read_articles_cursor_paginated(
     }
 
 
-@router.get("/search-fulltext", response_model=List[ArticleWithAuthor])
+@router.get("/search-fulltext", response_model=List[ArticleSearchResult])
 async def search_articles_fulltext(
     search_query: str = Query(..., min_length=1, max_length=100, description="Fulltext search query"),
     published_only: bool = Query(True, description="Only return published articles"),
@@ -337,7 +438,7 @@ async def search_articles_fulltext(
     db: Session = Depends(get_db)
 ) -> Any:
     """
-    Search articles using PostgreSQL fulltext search
+    Search articles with the BM25 inverted index (CJK-aware), returning highlighted snippets
     """
     articles = crud.search_articles_fulltext(
         db=db,
@@ -369,7 +470,7 @@ async def batch_delete_articles(
 
     app_logger.info(f"批量删除文章: {len(article_uuids)} 篇, 操作者: {current_user.username}")
 
-    # 查询要删除的文章以获取slug用于缓存清除
+    # 查询要删除的文章
     articles = db.query(Article).filter(
         Article.id.in_(article_uuids)
     ).all()
@@ -380,24 +481,22 @@ async def batch_delete_articles(
             detail="未找到任何文章"
         )
 
-    # 收集所有slug用于批量清除缓存
-    slugs = [article.slug for article in articles if article.slug]
     deleted_ids = [str(article.id) for article in articles]
 
-    # 批量删除文章
+    # 批量删除文章（连同倒排索引）
+    article_search_service.remove_articles(db, article_uuids)
     deleted_count = db.query(Article).filter(
         Article.id.in_(article_uuids)
     ).delete(synchronize_session=False)
 
     db.commit()
 
-    # 批量清除缓存
+    # 按依赖标签批量清除缓存（文章 ID / slug 缓存均登记在文章标签下）
     if deleted_ids:
-        # 批量删除文章ID缓存
-        await cache_service.delete_pattern("article:*")
-        # 批量删除slug缓存
-        for slug in slugs:
-            await cache_service.delete(f"article:slug:{slug}")
+        await cache_service.invalidate_tags(
+            *[CacheTags.article(article_id) for article_id in deleted_ids],
+            CacheTags.ARTICLE_LIST
+        )
 
     app_logger.info(f"批量删除完成: {deleted_count} 篇文章, IDs: {deleted_ids}")
 
@@ -450,7 +549,6 @@ async def batch_publish_articles(
     # 批量更新文章发布状态
     updated_count = 0
     updated_ids = []
-    slugs = []
     current_time = datetime.now(timezone.utc)
 
     for article in articles:
@@ -463,8 +561,6 @@ async def batch_publish_articles(
                 article.published_at = current_time  # type: ignore
                 updated_count += 1
                 updated_ids.append(str(article.id))
-                if article.slug:
-                    slugs.append(article.slug)
         else:
             # 取消发布
             if old_status:
@@ -472,16 +568,15 @@ async def batch_publish_articles(
                 article.published_at = None  # type: ignore
                 updated_count += 1
                 updated_ids.append(str(article.id))
-                if article.slug:
-                    slugs.append(article.slug)
 
     db.commit()
 
-    # 批量清除缓存
+    # 按依赖标签批量清除缓存
     if updated_ids:
-        await cache_service.delete_pattern("article:*")
-        for slug in slugs:
-            await cache_service.delete(f"article:slug:{slug}")
+        await cache_service.invalidate_tags(
+            *[CacheTags.article(article_id) for article_id in updated_ids],
+            CacheTags.ARTICLE_LIST
+        )
 
     app_logger.info(f"批量{'发布' if publish else '取消发布'}完成: {updated_count} 篇文章, IDs: {updated_ids}")
 
@@ -525,7 +620,6 @@ async def batch_set_featured_articles(
 
     # 批量更新精选状态
     updated_ids = [str(article.id) for article in articles]
-    slugs = [article.slug for article in articles if article.slug]
 
     # 使用批量更新
     db.query(Article).filter(
@@ -537,11 +631,12 @@ async def batch_set_featured_articles(
 
     db.commit()
 
-    # 批量清除缓存
+    # 按依赖标签批量清除缓存
     if updated_ids:
-        await cache_service.delete_pattern("article:*")
-        for slug in slugs:
-            await cache_service.delete(f"article:slug:{slug}")
+        await cache_service.invalidate_tags(
+            *[CacheTags.article(article_id) for article_id in updated_ids],
+            CacheTags.ARTICLE_LIST
+        )
 
     app_logger.info(f"批量{'设置精选' if featured else '取消精选'}完成: {len(updated_ids)} 篇文章, IDs: {updated_ids}")
 
@@ -12,7 +12,9 @@ from app.schemas.token import Token, LoginRequest
 from app.schemas.user import UserCreate, User as UserSchema
 from app.models.user import User
 # from app.utils.rate_limit import limiter, login_rate_limit, register_rate_limit
+from app.services.auth_cache_service import auth_cache_service
 from app.services.cache_service import cache_service
+from app.utils.cache_keys import CacheKeys
 from app.utils.logger import app_logger
 
 router = APIRouter()
@@ -29,7 +31,7 @@ async def login(
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud.authenticate_user(db, form_data.username, form_data.password)
+    user = await crud.authenticate_user(db, form_data.username, form_data.password)
     if not user:
         app_logger.warning(f"Failed login attempt for username: {form_data.username} from IP: {request.client.host if request.client else 'unknown'}")
         raise HTTPException(
@@ -64,7 +66,7 @@ async def login_json(
     """
     JSON login endpoint (alternative to OAuth2 form)
     """
-    user = crud.authenticate_user(db, login_data.username, login_data.password)
+    user = await crud.authenticate_user(db, login_data.username, login_data.password)
     if not user:
         app_logger.warning(f"Failed login attempt for username: {login_data.username} from IP: {request.client.host if request.client else 'unknown'}")
         raise HTTPException(
@@ -91,7 +93,7 @@ async def login_json(
 
 @router.post("/register", response_model=dict)
 # @register_rate_limit
-async def register(
+def register(
     request: Request,
     user_in: UserCreate,
     db: Session = Depends(get_db)
@@ -141,12 +143,16 @@ async def logout(
                 import time
                 remaining_time = int(exp - time.time())
                 if remaining_time > 0:
-                    # 将令牌添加到黑名单，TTL设置为剩余有效期
-                    await cache_service.set(
-                        f"blacklist:token:{token}",
-                        "1",
-                        expire=remaining_time
-                    )
+                    if payload.get("jti"):
+                        # 吊销记录保留到令牌过期，并广播到所有 worker
+                        await auth_cache_service.revoke(payload["jti"], exp)
+                    else:
+                        # 不带 jti 的旧令牌加入黑名单，TTL设置为剩余有效期
+                        await cache_service.set(
+                            CacheKeys.token_blacklist(token),
+                            "1",
+                            expire=remaining_time
+                        )
                     app_logger.info(f"User logged out: {current_user.username} (ID: {current_user.id})")
         
         return {"message": "Successfully logged out"}
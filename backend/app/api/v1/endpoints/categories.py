@@ -1,5 +1,5 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.dependencies import get_current_active_user, get_current_superuser
@@ -8,6 +8,8 @@ from app.schemas.category import Category, CategoryCreate, CategoryUpdate, Categ
 from app.schemas.article import ArticleWithAuthor
 from app.models.user import User
 from app.models.article import Article
+from app.services.cache_service import cache_service
+from app.utils.cache_keys import CacheTags
 from app.utils.common_helpers import parse_uuid
 from app.utils.logger import app_logger
 
@@ -91,6 +93,7 @@ def read_category_by_id(
 def update_category(
     *,
     db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     category_id: str,
     category_in: CategoryUpdate,
     current_user: User = Depends(get_current_superuser)
@@ -125,6 +128,10 @@ def update_category(
             )
 
     category = crud.update_category(db, category_id=category_uuid, category_update=category_in)
+    # 文章缓存内嵌分类信息，按依赖标签失效
+    background_tasks.add_task(
+        cache_service.invalidate_tags, CacheTags.category(category_uuid), CacheTags.ARTICLE_LIST
+    )
     app_logger.info(f"更新分类: {category.name} (ID: {category_id}), 操作者: {current_user.username}")
     return category
 
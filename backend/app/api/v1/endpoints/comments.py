@@ -1,11 +1,14 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
 from app.core.dependencies import get_current_active_user, get_current_superuser
 from app import crud
-from app.schemas.comment import Comment, CommentCreate, CommentUpdate, CommentWithAuthor
+from app.crud import async_comment
+from app.schemas.comment import Comment, CommentCreate, CommentUpdate, CommentWithAuthor, CommentTreePage
 from app.models.user import User
+from app.utils.pagination import CursorPaginationParams, NEXT_CURSOR_HEADER
 from app.utils.permission_helpers import check_edit_permission, check_comment_delete_permission
 
 router = APIRouter()
@@ -13,8 +16,10 @@ router = APIRouter()
 
 @router.get("/", response_model=List[CommentWithAuthor])
 def read_comments(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor for keyset pagination (from X-Next-Cursor)"),
     article_id: Optional[str] = Query(None, description="Filter by article ID"),
     author_id: Optional[str] = Query(None, description="Filter by author ID"),
     approved_only: bool = Query(True, description="Only return approved comments"),
@@ -22,19 +27,34 @@ def read_comments(
 ) -> Any:
     """
     Retrieve comments
+
+    Article comments are keyset-paginated: the next page cursor is returned in
+    the X-Next-Cursor header. `skip` is still honoured for offset paging.
     """
     from uuid import UUID
 
     if article_id:
         article_uuid = UUID(article_id)
-        comments = crud.get_comments_by_article(
-            db,
-            article_id=article_uuid,
-            skip=skip,
-            limit=limit,
-            approved_only=approved_only,
-            with_relationships=True
-        )
+        if skip and not cursor:
+            comments = crud.get_comments_by_article(
+                db,
+                article_id=article_uuid,
+                skip=skip,
+                limit=limit,
+                approved_only=approved_only,
+                with_relationships=True
+            )
+        else:
+            page = crud.get_comments_by_article_page(
+                db,
+                article_id=article_uuid,
+                cursor_params=CursorPaginationParams(cursor=cursor, limit=limit),
+                approved_only=approved_only,
+                with_relationships=True
+            )
+            if page.next_cursor:
+                response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+            comments = page.items
     elif author_id:
         author_uuid = UUID(author_id)
         comments = crud.get_comments_by_author(
@@ -54,17 +74,35 @@ def read_comments(
     return comments
 
 
+@router.get("/article/{article_id}/tree", response_model=CommentTreePage)
+async def read_article_comment_tree(
+    article_id: str,
+    skip: int = Query(0, ge=0, description="Number of top-level threads to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Number of top-level threads to return"),
+    db: AsyncSession = Depends(get_async_db)
+) -> Any:
+    """
+    Get the approved comment tree of an article, paginated by top-level thread
+
+    Each thread carries its full reply subtree, so the client does not need
+    to call /{comment_id}/replies per thread.
+    """
+    from uuid import UUID
+    article_uuid = UUID(article_id)
+    return await crud.get_comment_tree_page(db, article_id=article_uuid, skip=skip, limit=limit)
+
+
 @router.get("/{comment_id}", response_model=CommentWithAuthor)
-def read_comment_by_id(
+async def read_comment_by_id(
     comment_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Get a specific comment by id
     """
     from uuid import UUID
     comment_uuid = UUID(comment_id)
-    comment = crud.get_comment(db, comment_id=comment_uuid, with_relationships=True)
+    comment = await async_comment.get_comment(db, comment_id=comment_uuid, with_relationships=True)
     if not comment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,18 +112,18 @@ def read_comment_by_id(
 
 
 @router.get("/{comment_id}/replies", response_model=List[CommentWithAuthor])
-def read_comment_replies(
+async def read_comment_replies(
     comment_id: str,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Get replies to a comment
     """
     from uuid import UUID
     comment_uuid = UUID(comment_id)
-    replies = crud.get_replies(db, comment_id=comment_uuid, skip=skip, limit=limit, with_relationships=True)
+    replies = await async_comment.get_replies(db, comment_id=comment_uuid, skip=skip, limit=limit, with_relationships=True)
     return replies
 
 
@@ -93,6 +131,7 @@ def read_comment_replies(
 def create_comment(
     *,
     db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     comment_in: CommentCreate,
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
@@ -100,6 +139,7 @@ def create_comment(
     Create new comment
     """
     comment = crud.create_comment(db, comment=comment_in, author_id=current_user.id)  # type: ignore
+    background_tasks.add_task(crud.clear_comment_caches, None, comment.article_id)
     return comment
 
 
@@ -107,6 +147,7 @@ def create_comment(
 def update_comment(
     *,
     db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     comment_id: str,
     comment_in: CommentUpdate,
     current_user: User = Depends(get_current_active_user)
@@ -126,7 +167,9 @@ def update_comment(
     # 使用统一的权限检查
     check_edit_permission(comment, current_user, superuser_bypass=True, resource_name="评论")
 
+    article_id = comment.article_id
     comment = crud.update_comment(db, comment_id=comment_uuid, comment_update=comment_in)
+    background_tasks.add_task(crud.clear_comment_caches, comment_uuid, article_id)
     return comment
 
 
@@ -134,19 +177,19 @@ def update_comment(
 def delete_comment(
     *,
     db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     comment_id: str,
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """
     Delete a comment
     """
-    from sqlalchemy.orm import joinedload
     from uuid import UUID
 
     comment_uuid = UUID(comment_id)
 
     # Load comment with its article relationship to avoid N+1 queries
-    comment = db.query(Comment).options(joinedload(Comment.article)).filter(Comment.id == comment_uuid).first()
+    comment = crud.get_comment(db, comment_id=comment_uuid, with_relationships=True)
     if not comment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -156,6 +199,7 @@ def delete_comment(
     # 使用统一的权限检查（评论作者或文章作者可以删除）
     check_comment_delete_permission(comment, comment.article, current_user, resource_name="评论")
 
+    article_id = comment.article_id
     deleted = crud.delete_comment(db, comment_id=comment_uuid)
     if not deleted:
         raise HTTPException(
@@ -163,6 +207,8 @@ def delete_comment(
             detail="Comment not found",
         )
 
+    background_tasks.add_task(crud.clear_comment_caches, comment_uuid, article_id)
+
     return {"message": "Comment deleted successfully"}
 
 
@@ -170,6 +216,7 @@ def delete_comment(
 def approve_comment(
     *,
     db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     comment_id: str,
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
@@ -177,13 +224,12 @@ def approve_comment(
     Approve a comment (admin or article author only)
     只能对已发布的文章批准评论
     """
-    from sqlalchemy.orm import joinedload
     from uuid import UUID
 
     comment_uuid = UUID(comment_id)
 
     # First get the comment with its article relationship to avoid N+1 queries
-    comment = db.query(Comment).options(joinedload(Comment.article)).filter(Comment.id == comment_uuid).first()
+    comment = crud.get_comment(db, comment_id=comment_uuid, with_relationships=True)
     if not comment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -209,4 +255,6 @@ def approve_comment(
             detail="Comment not found",
         )
 
+    background_tasks.add_task(crud.clear_comment_caches, comment_uuid, comment.article_id)
+
     return comment
\ No newline at end of file
@@ -6,8 +6,8 @@ Conversations API Endpoints
 from typing import Optional
 from fastapi import APIRouter, Depends, status, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db, AsyncSessionLocal
 from app.core.dependencies import get_current_active_user
 from app.schemas.conversation import (
     ConversationCreate,
@@ -30,7 +30,7 @@ router = APIRouter()
 @router.post("/", response_model=Conversation, status_code=status.HTTP_201_CREATED)
 async def create_conversation(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     conversation_in: ConversationCreate,
     current_user: User = Depends(get_current_active_user),
 ) -> Conversation:
@@ -56,7 +56,7 @@ async def create_conversation(
 @router.get("/{conversation_id}", response_model=Conversation, status_code=status.HTTP_200_OK)
 async def get_conversation(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     conversation_id: str,
     current_user: User = Depends(get_current_active_user),
 ) -> Conversation:
@@ -85,17 +85,19 @@ async def get_conversation(
 @router.get("/", response_model=ConversationListResponse, status_code=status.HTTP_200_OK)
 async def list_conversations(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_active_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
 ) -> ConversationListResponse:
     """
     获取对话列表
     
-    - **skip**: 跳过数量（分页）
+    - **skip**: 跳过数量（偏移分页，兼容旧客户端）
     - **limit**: 限制数量（分页）
+    - **cursor**: 上一页返回的 next_cursor（游标分页）
     - **status**: 状态筛选（可选）
     """
     return await conversation_service.list_conversations(
@@ -105,13 +107,14 @@ async def list_conversations(
         skip=skip,
         limit=limit,
         status=status,
+        cursor=cursor,
     )
 
 
 @router.put("/{conversation_id}", response_model=Conversation, status_code=status.HTTP_200_OK)
 async def update_conversation(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     conversation_id: str,
     conversation_in: ConversationUpdate,
     current_user: User = Depends(get_current_active_user),
@@ -147,7 +150,7 @@ async def update_conversation(
 @router.delete("/{conversation_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_conversation(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     conversation_id: str,
     current_user: User = Depends(get_current_active_user),
 ):
@@ -176,7 +179,7 @@ async def delete_conversation(
 @router.post("/chat", response_model=ChatResponse, status_code=status.HTTP_200_OK)
 async def chat(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     chat_request: ChatRequest,
     current_user: User = Depends(get_current_active_user),
 ) -> ChatResponse:
@@ -202,7 +205,6 @@ async def chat(
 @router.post("/chat/stream")
 async def chat_stream(
     *,
-    db: Session = Depends(get_db),
     chat_request: ChatRequest,
     current_user: User = Depends(get_current_active_user),
 ):
@@ -215,18 +217,24 @@ async def chat_stream(
     - **temperature**: 温度参数（0.0-2.0）
     - **max_tokens**: 最大 Token 数（可选）
     - **stream**: 是否流式响应（此处固定为 True）
+    - **stream_mode**: delta（默认，仅发送增量，最后一帧附完整内容）或 full（每帧附累计内容）
     - **prompt_id**: 使用的 Prompt ID（可选）
     """
     chat_request.stream = True
+    tenant_id = str(current_user.tenant_id)
+    user_id = str(current_user.id)
     
     async def generate():
-        async for chunk in conversation_service.chat_stream(
-            db=db,
-            chat_request=chat_request,
-            tenant_id=str(current_user.tenant_id),
-            user_id=str(current_user.id),
-        ):
-            yield f"data: {chunk.json()}\n\n"
+        # 流式响应在依赖项退出后仍在发送，因此在生成器内部持有独立的会话
+        async with AsyncSessionLocal() as stream_db:
+            async for chunk in conversation_service.chat_stream(
+                db=stream_db,
+                chat_request=chat_request,
+                tenant_id=tenant_id,
+                user_id=user_id,
+            ):
+                # 增量帧省略空字段（content 等），只发送 delta
+                yield f"data: {chunk.model_dump_json(exclude_none=True)}\n\n"
         yield "data: [DONE]\n\n"
     
     return StreamingResponse(
@@ -238,36 +246,48 @@ async def chat_stream(
 @router.get("/{conversation_id}/messages", status_code=status.HTTP_200_OK)
 async def get_conversation_messages(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     conversation_id: str,
     current_user: User = Depends(get_current_active_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
 ):
     """
     获取对话消息列表
     
     - **conversation_id**: 对话 ID
-    - **skip**: 跳过数量（分页）
+    - **skip**: 跳过数量（偏移分页，兼容旧客户端）
     - **limit**: 限制数量（分页）
+    - **cursor**: 上一页返回的 next_cursor（游标分页）
     """
-    from app.crud.conversation import get_conversation_messages
+    from app.crud.async_conversation import get_conversation_messages, get_conversation_messages_page
+    from app.utils.pagination import CursorPaginationParams
     
-    messages = get_conversation_messages(
-        db, conversation_id, skip, limit
-    )
+    if skip and not cursor:
+        messages = await get_conversation_messages(
+            db, conversation_id, skip, limit
+        )
+        next_cursor = None
+    else:
+        page = await get_conversation_messages_page(
+            db, conversation_id, CursorPaginationParams(cursor=cursor, limit=limit)
+        )
+        messages, next_cursor = page.items, page.next_cursor
     
     return {
         "conversation_id": conversation_id,
         "messages": messages,
         "total": len(messages),
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
     }
 
 
 @router.delete("/{conversation_id}/messages", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_conversation_messages(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     conversation_id: str,
     current_user: User = Depends(get_current_active_user),
 ):
@@ -276,8 +296,8 @@ async def delete_conversation_messages(
     
     - **conversation_id**: 对话 ID
     """
-    from app.crud.conversation import delete_conversation_messages
+    from app.crud.async_conversation import delete_conversation_messages
     
-    delete_conversation_messages(db, conversation_id)
+    await delete_conversation_messages(db, conversation_id)
     
     app_logger.info(f"User {current_user.username} deleted messages from conversation: {conversation_id}")
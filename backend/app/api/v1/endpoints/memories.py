@@ -6,7 +6,8 @@ Memories API Endpoints
 from typing import Optional
 from fastapi import APIRouter, Depends, status, Query
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db, get_async_db
 from app.core.dependencies import get_current_active_user
 from app.schemas.memory import (
     MemoryCreate,
@@ -134,7 +135,7 @@ async def list_memories(
 @router.post("/search", response_model=MemorySearchResponse, status_code=status.HTTP_200_OK)
 async def search_memories(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     search_request: MemorySearchRequest,
     current_user: User = Depends(get_current_active_user),
 ) -> MemorySearchResponse:
@@ -1,5 +1,5 @@
 from typing import Any, List, Optional, Dict
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.dependencies import get_current_active_user, get_current_superuser
@@ -11,6 +11,7 @@ from app.schemas.message import (
 from app.models.user import User
 from uuid import UUID
 from app.utils.common_helpers import parse_uuid
+from app.utils.pagination import CursorPaginationParams, NEXT_CURSOR_HEADER
 from app.utils.permission_helpers import check_edit_permission, check_delete_permission
 from app.utils.logger import app_logger
 
@@ -19,14 +20,19 @@ router = APIRouter()
 
 @router.get("/", response_model=List[MessageWithAuthor])
 def read_messages(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor for keyset pagination (from X-Next-Cursor)"),
     danmaku_only: bool = Query(False, description="Only return danmaku messages"),
     author_id: Optional[str] = Query(None, description="Filter by author ID"),
     db: Session = Depends(get_db)
 ) -> Any:
     """
     Retrieve messages
+
+    Top-level messages are keyset-paginated: the next page cursor is returned in
+    the X-Next-Cursor header. `skip` is still honoured for offset paging.
     """
     if author_id:
         author_uuid = UUID(author_id)
@@ -37,7 +43,7 @@ def read_messages(
             limit=limit,
             with_relationships=True
         )
-    else:
+    elif skip and not cursor:
         messages = crud.get_messages(
             db,
             skip=skip,
@@ -45,6 +51,16 @@ def read_messages(
             danmaku_only=danmaku_only,
             with_relationships=True
         )
+    else:
+        page = crud.get_messages_page(
+            db,
+            cursor_params=CursorPaginationParams(cursor=cursor, limit=limit),
+            danmaku_only=danmaku_only,
+            with_relationships=True
+        )
+        if page.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+        messages = page.items
     return messages
 
 
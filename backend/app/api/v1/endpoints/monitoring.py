@@ -1,14 +1,20 @@
 """健康检查和监控功能"""
 
-import asyncio
 import time
 import psutil
 from typing import Dict, Any
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 from app.core.config import settings
 from app.services.cache_service import cache_service
 from app.utils.logger import app_logger
+from app.utils.metrics import CONTENT_TYPE_LATEST, metrics_registry
+from app.utils.perf_monitor import (
+    HTTP_REQUEST_DURATION,
+    get_cache_hit_ratio,
+    get_database_pool_stats,
+    sample_cpu_percent,
+)
 from datetime import datetime
 
 
@@ -90,8 +96,8 @@ async def health_check():
 @router.get("/metrics", response_model=SystemMetrics)
 async def get_system_metrics():
     """获取系统指标"""
-    # CPU使用率
-    cpu_percent = psutil.cpu_percent(interval=1)
+    # CPU使用率（非阻塞，距上次采样以来的平均值）
+    cpu_percent = sample_cpu_percent()
     
     # 内存使用率
     memory = psutil.virtual_memory()
@@ -110,17 +116,17 @@ async def get_system_metrics():
         except:
             gpu_usage_percent = 0.0  # 如果无法获取GPU信息，则设为0
     
-    # 活跃连接数（模拟值，实际应用中需要从连接池获取真实数据）
-    active_connections = 10  # 这只是一个示例值
+    # 活跃连接数：同步与异步连接池中已借出的连接
+    active_connections = sum(
+        stats.get("checked_out", 0) for stats in get_database_pool_stats().values()
+    )
     
-    # 缓存命中率（模拟计算）
-    # 实际应用中需要通过Redis统计信息计算
-    cache_hit_ratio = 0.95  # 示例值
+    # 缓存命中率（L1 + Redis）
+    cache_hit_ratio = get_cache_hit_ratio()
     
-    # 响应时间（模拟值）
-    start = time.time()
-    await asyncio.sleep(0.01)  # 模拟处理时间
-    response_time_ms = (time.time() - start) * 1000
+    # 平均响应时间（进程启动以来所有请求）
+    duration_sum, request_count = HTTP_REQUEST_DURATION.totals()
+    response_time_ms = duration_sum / request_count * 1000 if request_count else 0.0
     
     return SystemMetrics(
         cpu_percent=cpu_percent,
@@ -133,13 +139,19 @@ async def get_system_metrics():
     )
 
 
+@router.get("/metrics/prometheus")
+async def get_prometheus_metrics():
+    """以 Prometheus 文本格式导出进程内指标（供抓取）"""
+    return Response(content=metrics_registry.render(), media_type=CONTENT_TYPE_LATEST)
+
+
 @router.get("/monitoring/status")
 async def get_monitoring_status():
     """获取监控状态"""
     uptime = time.time() - start_time
     
     # 获取系统信息
-    cpu_percent = psutil.cpu_percent(interval=1)
+    cpu_percent = sample_cpu_percent()
     memory = psutil.virtual_memory()
     
     # 检查服务依赖
@@ -168,6 +180,15 @@ async def get_monitoring_status():
     }
 
 
+@router.get("/monitoring/cache")
+async def get_cache_stats():
+    """获取分层缓存（进程内 L1 / Redis L2）命中统计"""
+    return {
+        "timestamp": datetime.utcnow(),
+        **cache_service.get_stats()
+    }
+
+
 @router.get("/monitoring/logs")
 async def get_recent_logs(count: int = 10):
     """获取最近的日志条目"""
@@ -1,5 +1,5 @@
 from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.dependencies import get_current_active_user, get_current_superuser
@@ -49,6 +49,19 @@ def get_growth_statistics(
     return stats
 
 
+@router.get("/views", response_model=dict)
+def get_view_statistics(
+    days: int = Query(30, ge=1, le=366),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Get view statistics (today / this week / this month and daily trend)
+    """
+    stats = StatisticsService.get_view_statistics(db, days=days)
+    return stats
+
+
 @router.get("/content", response_model=dict)
 def get_content_statistics(
     db: Session = Depends(get_db),
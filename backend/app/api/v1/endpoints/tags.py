@@ -1,5 +1,5 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.dependencies import get_current_active_user, get_current_superuser
@@ -8,6 +8,8 @@ from app.schemas.tag import Tag, TagCreate, TagUpdate, TagWithArticleCount
 from app.schemas.article import ArticleWithAuthor
 from app.models.user import User
 from app.models.article import Article
+from app.services.cache_service import cache_service
+from app.utils.cache_keys import CacheTags
 from app.utils.common_helpers import parse_uuid
 from app.utils.logger import app_logger
 
@@ -89,6 +91,7 @@ def read_tag_by_id(
 def update_tag(
     *,
     db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     tag_id: str,
     tag_in: TagUpdate,
     current_user: User = Depends(get_current_superuser)
@@ -123,6 +126,10 @@ def update_tag(
             )
 
     tag = crud.update_tag(db, tag_id=tag_uuid, tag_update=tag_in)
+    # 文章缓存内嵌标签信息，按依赖标签失效
+    background_tasks.add_task(
+        cache_service.invalidate_tags, CacheTags.tag(tag_uuid), CacheTags.ARTICLE_LIST
+    )
     app_logger.info(f"更新标签: {tag.name} (ID: {tag_id}), 操作者: {current_user.username}")
     return tag
 
@@ -1,5 +1,6 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, File, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.core.dependencies import get_current_active_user, get_current_superuser
@@ -15,6 +16,9 @@ from app.utils.file_validation import (
     cleanup_temp_file, 
     FileValidationError
 )
+from app.services.auth_cache_service import auth_cache_service
+from app.services.cache_service import cache_service
+from app.utils.cache_keys import CacheTags
 from app.utils.logger import app_logger
 
 try:
@@ -117,6 +121,7 @@ def read_current_user(
 def update_current_user(
     *,
     db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     user_in: UserUpdate,
     current_user: UserModel = Depends(get_current_active_user)
 ) -> Any:
@@ -124,6 +129,9 @@ def update_current_user(
     Update current user's profile
     """
     user = crud.update_user(db, user_id=current_user.id, user_update=user_in)
+    background_tasks.add_task(auth_cache_service.invalidate_user, current_user.id)
+    # 文章缓存内嵌作者信息，按依赖标签失效
+    background_tasks.add_task(cache_service.invalidate_tags, CacheTags.user(current_user.id), CacheTags.ARTICLE_LIST)
     app_logger.info(f"User updated profile: {current_user.username} (ID: {current_user.id})")
     return user
 
@@ -182,7 +190,11 @@ async def upload_current_user_avatar(
             )
 
         # Update user's avatar in database
-        updated_user = crud.update_user(db, user_id=current_user.id, user_update=UserUpdate(avatar=avatar_url))
+        updated_user = await run_in_threadpool(
+            crud.update_user, db, user_id=current_user.id, user_update=UserUpdate(avatar=avatar_url)
+        )
+        await auth_cache_service.invalidate_user(current_user.id)
+        await cache_service.invalidate_tags(CacheTags.user(current_user.id), CacheTags.ARTICLE_LIST)
         
         if not updated_user:
             app_logger.error(f"Failed to update user avatar in database for user {current_user.id}")
@@ -240,6 +252,7 @@ def read_current_user_stats(
 def update_password(
     *,
     db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     password_data: PasswordUpdate,
     current_user: UserModel = Depends(get_current_active_user)
 ) -> Any:
@@ -261,6 +274,7 @@ def update_password(
             detail="旧密码错误或密码更新失败"
         )
     
+    background_tasks.add_task(auth_cache_service.invalidate_user, current_user.id)
     app_logger.info(f"User updated password: {current_user.username} (ID: {current_user.id})")
     return {"message": "密码更新成功"}
 
@@ -290,6 +304,7 @@ def read_user_by_id(
 def update_user(
     *,
     db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     user_id: str,
     user_in: UserUpdate,
     current_user: UserModel = Depends(get_current_superuser)  # 添加管理员权限要求
@@ -307,6 +322,8 @@ def update_user(
         )
 
     user = crud.update_user(db, user_id=user_uuid, user_update=user_in)
+    background_tasks.add_task(auth_cache_service.invalidate_user, user_uuid)
+    background_tasks.add_task(cache_service.invalidate_tags, CacheTags.user(user_uuid), CacheTags.ARTICLE_LIST)
     app_logger.info(f"Admin updated user: {user.username} (ID: {user.id})")
     return user
 
@@ -315,6 +332,7 @@ def update_user(
 def delete_user(
     *,
     db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
     user_id: str,
     current_user: UserModel = Depends(get_current_superuser)  # 添加管理员权限要求
 ) -> Any:
@@ -345,5 +363,7 @@ def delete_user(
             detail="User not found",
         )
 
+    background_tasks.add_task(auth_cache_service.invalidate_user, user_uuid)
+
     app_logger.info(f"Admin deleted user: {user.username} (ID: {user.id})")
     return {"message": "User deleted successfully"}
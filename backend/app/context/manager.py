@@ -3,8 +3,11 @@ Context Manager
 上下文管理器，负责对话上下文的窗口管理和检索
 """
 
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+import uuid
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.conversation import Conversation, ConversationMessage
 from app.models.context_history import ContextHistory
 from app.schemas.context import (
@@ -12,6 +15,10 @@ from app.schemas.context import (
     ContextConfig,
     ContextSummary as ContextSummarySchema,
 )
+from app.core.config import settings
+from app.services.cache_service import cache_service
+from app.services.tokenizer_service import tokenizer_service
+from app.utils.cache_keys import CacheKeys
 from app.utils.logger import app_logger
 
 
@@ -27,15 +34,19 @@ class ContextManager:
     
     async def get_context_window(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
         config: Optional[ContextConfig] = None,
     ) -> ContextWindow:
         """
         获取对话的上下文窗口
         
+        只读取对话末尾能放进 Token 预算的消息：从新到旧按 keyset 分批读取，预算用尽即停止。
+        窗口缓存在 Redis 中并记录末尾消息 ID，下一轮只读取其后的新消息追加并从头部裁剪；
+        对话累计 Token 数减去检查点已折叠的部分用于判断是否需要摘要，累计值同时用于校验缓存与数据库是否一致
+        
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
             config: 上下文配置
         
@@ -44,120 +55,232 @@ class ContextManager:
         """
         effective_config = config or self.config
         
-        messages = (
-            db.query(ConversationMessage)
-            .filter(ConversationMessage.conversation_id == conversation_id)
-            .order_by(ConversationMessage.created_at)
-            .all()
+        result = await db.execute(
+            select(Conversation.total_tokens).where(Conversation.id == conversation_id)
         )
+        conversation_tokens = result.scalar_one_or_none() or 0
         
-        message_dicts = [
-            {
-                "id": str(msg.id),
-                "role": msg.role,
-                "content": msg.content,
-                "tokens": msg.tokens,
-                "created_at": msg.created_at.isoformat(),
-            }
-            for msg in messages
+        checkpoint = None
+        summary_message = None
+        if effective_config.auto_summarize and conversation_tokens > effective_config.summarize_threshold:
+            checkpoint = await self._latest_checkpoint(db, conversation_id)
+            
+            # 只按检查点之后尚未折叠的 Token 数触发，长对话每累积一个阈值的新内容才摘要一次，
+            # 而不是越过阈值后每轮都生成检查点（检查点变化会使窗口缓存失效）
+            summarized = (checkpoint.total_tokens or 0) if checkpoint is not None else 0
+            unsummarized = conversation_tokens - summarized
+            if unsummarized > effective_config.summarize_threshold:
+                from app.services.context_summary_service import context_summary_service
+                
+                # 摘要在后台折叠，本次请求使用最新的检查点
+                context_summary_service.schedule(conversation_id, effective_config.keep_last_messages)
+            if checkpoint is not None and checkpoint.summary:
+                summary_message = {
+                    "id": f"summary_{checkpoint.id}",
+                    "role": "system",
+                    "content": f"[Summary] {checkpoint.summary}",
+                    "tokens": tokenizer_service.count(checkpoint.summary),
+                    "created_at": checkpoint.created_at.isoformat(),
+                }
+            else:
+                checkpoint = None
+        
+        budget = effective_config.max_tokens - (summary_message["tokens"] if summary_message else 0)
+        max_messages = effective_config.max_messages
+        signature = [
+            effective_config.max_tokens,
+            max_messages,
+            str(checkpoint.id) if checkpoint is not None else None,
         ]
         
-        total_tokens = sum(msg["tokens"] for msg in message_dicts)
+        messages, is_truncated = await self._load_cached_window(
+            db, conversation_id, conversation_tokens, signature, checkpoint, budget, max_messages,
+        )
+        if messages is None:
+            messages, is_truncated = await self._load_tail(
+                db, conversation_id, checkpoint, budget, max_messages,
+            )
+        
+        if messages:
+            await cache_service.set(
+                CacheKeys.context_window(conversation_id),
+                {
+                    "signature": signature,
+                    "conversation_tokens": conversation_tokens,
+                    "messages": messages,
+                    "is_truncated": is_truncated,
+                },
+                expire=settings.CONTEXT_WINDOW_CACHE_TTL,
+            )
+        
+        if summary_message is not None:
+            messages = [summary_message] + messages
+            is_truncated = True
         
         window = ContextWindow(
             conversation_id=conversation_id,
-            messages=message_dicts,
-            total_tokens=total_tokens,
+            messages=messages,
+            total_tokens=sum(msg["tokens"] for msg in messages),
             max_tokens=effective_config.max_tokens,
-            is_truncated=False,
+            is_truncated=is_truncated,
         )
         
-        if total_tokens > effective_config.max_tokens:
-            window = await self._truncate_window(
-                db,
-                window,
-                effective_config,
+        if is_truncated:
+            app_logger.debug(
+                f"Truncated context window for conversation {conversation_id}: "
+                f"{len(window.messages)} messages, {window.total_tokens} tokens"
             )
         
         return window
     
-    async def _truncate_window(
-        self,
-        db: Session,
-        window: ContextWindow,
-        config: ContextConfig,
-    ) -> ContextWindow:
+    @staticmethod
+    def _message_dict(msg: ConversationMessage) -> Dict[str, Any]:
+        return {
+            "id": str(msg.id),
+            "role": msg.role,
+            "content": msg.content,
+            # 回填前的历史消息没有存储 Token 数，临时计算
+            "tokens": msg.tokens or tokenizer_service.count(msg.content, msg.model),
+            "created_at": msg.created_at.isoformat(),
+        }
+    
+    @staticmethod
+    def _fit(messages: List[Dict[str, Any]], budget: int, max_messages: int) -> Tuple[List[Dict[str, Any]], bool]:
         """
-        裁剪上下文窗口
-        
-        根据 Token 数量或消息数量进行裁剪
+        从头部丢弃消息，直到窗口满足 Token 预算与消息数上限
         
         Args:
-            db: 数据库会话
-            window: 原始窗口
-            config: 上下文配置
+            messages: 按时间升序的消息
+            budget: Token 预算
+            max_messages: 最大消息数
         
         Returns:
-            ContextWindow: 裁剪后的窗口
+            Tuple[List[Dict[str, Any]], bool]: (裁剪后的消息, 是否发生裁剪)
         """
-        if config.auto_summarize and window.total_tokens > config.summarize_threshold:
-            from .summarizer import ContextSummarizer
-            
-            summarizer = ContextSummarizer()
-            await summarizer.create_summary(db, window.conversation_id)
-            
-            summaries = (
-                db.query(ContextHistory)
-                .filter(ContextHistory.conversation_id == window.conversation_id)
-                .order_by(ContextHistory.created_at)
-                .all()
-            )
-            
-            summary_messages = []
-            for summary in summaries:
-                if summary.summary:
-                    summary_messages.append({
-                        "id": f"summary_{summary.id}",
-                        "role": "system",
-                        "content": f"[Summary] {summary.summary}",
-                        "tokens": 100,
-                        "created_at": summary.created_at.isoformat(),
-                    })
-            
-            remaining_messages = window.messages[-config.keep_last_messages:]
-            
-            window.messages = summary_messages + remaining_messages
-            window.total_tokens = sum(msg["tokens"] for msg in window.messages)
+        used = sum(msg["tokens"] for msg in messages)
+        start = 0
+        while start < len(messages) and (used > budget or len(messages) - start > max_messages):
+            used -= messages[start]["tokens"]
+            start += 1
+        return messages[start:], start > 0
+    
+    async def _latest_checkpoint(self, db: AsyncSession, conversation_id: str) -> Optional[ContextHistory]:
+        result = await db.execute(
+            select(ContextHistory)
+            .where(ContextHistory.conversation_id == conversation_id)
+            .order_by(ContextHistory.created_at.desc())
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+    
+    async def _load_tail(
+        self,
+        db: AsyncSession,
+        conversation_id: str,
+        checkpoint: Optional[ContextHistory],
+        budget: int,
+        max_messages: int,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        从最新消息开始按 keyset 分批向前读取，预算用尽或到达摘要检查点时停止
         
-        elif len(window.messages) > config.max_messages:
-            window.messages = window.messages[-config.max_messages:]
-            window.total_tokens = sum(msg["tokens"] for msg in window.messages)
+        Args:
+            db: 异步数据库会话
+            conversation_id: 对话 ID
+            checkpoint: 摘要检查点，其覆盖的消息不再读取
+            budget: Token 预算
+            max_messages: 最大消息数
         
-        elif window.total_tokens > config.max_tokens:
-            accumulated_tokens = 0
-            truncated_messages = []
-            
-            for msg in reversed(window.messages):
-                if accumulated_tokens + msg["tokens"] > config.max_tokens:
-                    break
-                truncated_messages.append(msg)
-                accumulated_tokens += msg["tokens"]
-            
-            window.messages = list(reversed(truncated_messages))
-            window.total_tokens = accumulated_tokens
+        Returns:
+            Tuple[List[Dict[str, Any]], bool]: (按时间升序的消息, 是否因预算省略了更早的消息)
+        """
+        batch_size = settings.CONTEXT_WINDOW_BATCH_SIZE
+        row_key = tuple_(ConversationMessage.created_at, ConversationMessage.id)
+        
+        base = (
+            select(ConversationMessage)
+            .where(ConversationMessage.conversation_id == conversation_id)
+            .order_by(ConversationMessage.created_at.desc(), ConversationMessage.id.desc())
+            .limit(batch_size)
+        )
+        if checkpoint is not None and checkpoint.last_message_id is not None:
+            base = base.where(row_key > tuple_(checkpoint.covered_until, checkpoint.last_message_id))
+        
+        collected: List[Dict[str, Any]] = []
+        used = 0
+        bound = None
+        while True:
+            stmt = base if bound is None else base.where(row_key < tuple_(*bound))
+            rows = (await db.execute(stmt)).scalars().all()
+            for msg in rows:
+                message = self._message_dict(msg)
+                if used + message["tokens"] > budget or len(collected) >= max_messages:
+                    collected.reverse()
+                    return collected, True
+                collected.append(message)
+                used += message["tokens"]
+            if len(rows) < batch_size:
+                break
+            bound = (rows[-1].created_at, rows[-1].id)
+        
+        collected.reverse()
+        return collected, False
+    
+    async def _load_cached_window(
+        self,
+        db: AsyncSession,
+        conversation_id: str,
+        conversation_tokens: int,
+        signature: List[Any],
+        checkpoint: Optional[ContextHistory],
+        budget: int,
+        max_messages: int,
+    ) -> Tuple[Optional[List[Dict[str, Any]]], bool]:
+        """
+        基于缓存的上一轮窗口增量组装本轮窗口
         
-        window.is_truncated = True
+        只读取缓存末尾消息之后的新消息；新消息的 Token 数与对话累计值对不上时
+        （消息被删除、回填或并发写入）放弃缓存
         
-        app_logger.info(
-            f"Truncated context window for conversation {window.conversation_id}: "
-            f"{len(window.messages)} messages, {window.total_tokens} tokens"
+        Args:
+            db: 异步数据库会话
+            conversation_id: 对话 ID
+            conversation_tokens: 对话当前累计 Token 数
+            signature: 窗口配置与检查点签名，不一致时缓存失效
+            checkpoint: 摘要检查点
+            budget: Token 预算
+            max_messages: 最大消息数
+        
+        Returns:
+            Tuple[Optional[List[Dict[str, Any]]], bool]: (消息, 是否裁剪)；缓存不可用时消息为 None
+        """
+        cached = await cache_service.get(CacheKeys.context_window(conversation_id))
+        if not cached or cached.get("signature") != signature or not cached.get("messages"):
+            return None, False
+        
+        last = cached["messages"][-1]
+        result = await db.execute(
+            select(ConversationMessage)
+            .where(
+                ConversationMessage.conversation_id == conversation_id,
+                tuple_(ConversationMessage.created_at, ConversationMessage.id)
+                > tuple_(datetime.fromisoformat(last["created_at"]), uuid.UUID(last["id"])),
+            )
+            .order_by(ConversationMessage.created_at, ConversationMessage.id)
         )
+        newer = result.scalars().all()
         
-        return window
+        if cached["conversation_tokens"] + sum(msg.tokens or 0 for msg in newer) != conversation_tokens:
+            return None, False
+        
+        messages, trimmed = self._fit(
+            cached["messages"] + [self._message_dict(msg) for msg in newer], budget, max_messages,
+        )
+        return messages, cached["is_truncated"] or trimmed
     
     async def get_relevant_context(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
         query: str,
         top_k: int = 5,
@@ -168,7 +291,7 @@ class ContextManager:
         基于查询获取最相关的历史消息
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
             query: 查询内容
             top_k: 返回数量
@@ -176,12 +299,12 @@ class ContextManager:
         Returns:
             List[Dict[str, Any]]: 相关消息列表
         """
-        messages = (
-            db.query(ConversationMessage)
-            .filter(ConversationMessage.conversation_id == conversation_id)
+        result = await db.execute(
+            select(ConversationMessage)
+            .where(ConversationMessage.conversation_id == conversation_id)
             .order_by(ConversationMessage.created_at)
-            .all()
         )
+        messages = result.scalars().all()
         
         scored_messages = []
         for msg in messages:
@@ -226,25 +349,25 @@ class ContextManager:
     
     async def get_summaries(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
     ) -> List[ContextSummarySchema]:
         """
         获取对话的摘要列表
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
         
         Returns:
             List[ContextSummarySchema]: 摘要列表
         """
-        summaries = (
-            db.query(ContextHistory)
-            .filter(ContextHistory.conversation_id == conversation_id)
+        result = await db.execute(
+            select(ContextHistory)
+            .where(ContextHistory.conversation_id == conversation_id)
             .order_by(ContextHistory.created_at)
-            .all()
         )
+        summaries = result.scalars().all()
         
         return [
             ContextSummarySchema(
@@ -259,22 +382,24 @@ class ContextManager:
             for summary in summaries
         ]
     
-    def clear_context(
+    async def clear_context(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
     ) -> None:
         """
         清空对话的上下文历史
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
         """
-        db.query(ContextHistory).filter(
-            ContextHistory.conversation_id == conversation_id
-        ).delete()
+        await db.execute(
+            delete(ContextHistory).where(
+                ContextHistory.conversation_id == conversation_id
+            )
+        )
         
-        db.commit()
+        await db.commit()
         
         app_logger.info(f"Cleared context history for conversation {conversation_id}")
@@ -1,15 +1,32 @@
 """
 Context Summarizer
 上下文摘要器，负责对话内容的自动摘要
+
+摘要是滚动的：每个 ContextHistory 检查点记录摘要覆盖到的最后一条消息，
+之后只把检查点之后的新消息连同上一版摘要交给 LLM 折叠成新摘要，
+摘要与关键点在同一次调用中生成，成本与对话总长度无关
 """
 
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
+import json
+import uuid
+from typing import List, Optional, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.conversation import ConversationMessage
 from app.models.context_history import ContextHistory
 from app.utils.logger import app_logger
 
 
+SUMMARY_PROMPT = (
+    "你负责维护一段对话的滚动摘要。请把“新增对话”合并进“已有摘要”，"
+    "输出合并后的完整摘要（不超过300字）和3-5个关键点（每个不超过20字）。\n"
+    "只输出 JSON，格式为：{{\"summary\": \"...\", \"key_points\": [\"...\"]}}\n\n"
+    "已有摘要：\n{previous_summary}\n\n"
+    "已有关键点：\n{previous_key_points}\n\n"
+    "新增对话：\n{messages_text}"
+)
+
+
 class ContextSummarizer:
     """
     上下文摘要器
@@ -22,61 +39,92 @@ class ContextSummarizer:
     
     async def create_summary(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
         max_messages: Optional[int] = None,
-    ) -> ContextHistory:
+        keep_last: int = 0,
+    ) -> Optional[ContextHistory]:
         """
-        创建对话摘要
+        把上一个检查点之后的新消息折叠进摘要，生成新的检查点
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
-            max_messages: 最大消息数
+            max_messages: 本次最多折叠的消息数（从最早的新消息开始）
+            keep_last: 最近 N 条消息留在上下文窗口中原样发送，不折叠
         
         Returns:
-            ContextHistory: 创建的摘要记录
+            ContextHistory: 新的检查点；没有需要折叠的消息时为 None
         """
-        messages = (
-            db.query(ConversationMessage)
-            .filter(ConversationMessage.conversation_id == conversation_id)
-            .order_by(ConversationMessage.created_at)
-            .all()
-        )
-        
-        if max_messages:
-            messages = messages[-max_messages:]
+        previous = await self.get_summary(db, conversation_id)
+        # 只读取本批需要的行：最早的 max_messages 条加上之后至少 keep_last 条（确认它们不是最近的消息）
+        limit = max_messages + keep_last if max_messages else None
+        messages = await self._messages_after(db, conversation_id, previous, limit)
         
-        if not messages:
-            app_logger.warning(f"No messages found for conversation {conversation_id}")
+        if len(messages) <= keep_last:
             return None
+        messages = messages[:len(messages) - keep_last]
+        if max_messages:
+            messages = messages[:max_messages]
         
-        messages_text = self._format_messages(messages)
-        
-        summary = await self._generate_summary(messages_text)
-        key_points = await self._extract_key_points(messages_text)
+        summary, key_points = await self._summarize(previous, messages)
         
-        import uuid
         context_history = ContextHistory(
             id=uuid.uuid4(),
             conversation_id=conversation_id,
-            message_count=len(messages),
-            total_tokens=sum(msg.tokens for msg in messages),
+            message_count=(previous.message_count if previous else 0) + len(messages),
+            total_tokens=(previous.total_tokens if previous else 0) + sum(msg.tokens or 0 for msg in messages),
             summary=summary,
             key_points="; ".join(key_points),
+            covered_until=messages[-1].created_at,
+            last_message_id=messages[-1].id,
         )
         
         db.add(context_history)
-        db.commit()
-        db.refresh(context_history)
+        await db.commit()
+        await db.refresh(context_history)
         
         app_logger.info(
             f"Created summary for conversation {conversation_id}: "
-            f"{len(messages)} messages summarized"
+            f"{len(messages)} new messages folded, {context_history.message_count} in total"
         )
         
         return context_history
     
+    async def _messages_after(
+        self,
+        db: AsyncSession,
+        conversation_id: str,
+        checkpoint: Optional[ContextHistory],
+        limit: Optional[int] = None,
+    ) -> List[ConversationMessage]:
+        """
+        读取检查点之后的消息（按 (created_at, id) keyset）
+        
+        Args:
+            db: 异步数据库会话
+            conversation_id: 对话 ID
+            checkpoint: 上一个检查点，为 None 或旧版无检查点记录时从头读取
+            limit: 最多读取的消息数，None 表示不限制
+        
+        Returns:
+            List[ConversationMessage]: 按时间升序的消息列表
+        """
+        stmt = (
+            select(ConversationMessage)
+            .where(ConversationMessage.conversation_id == conversation_id)
+            .order_by(ConversationMessage.created_at, ConversationMessage.id)
+        )
+        if checkpoint is not None and checkpoint.last_message_id is not None:
+            stmt = stmt.where(
+                tuple_(ConversationMessage.created_at, ConversationMessage.id)
+                > tuple_(checkpoint.covered_until, checkpoint.last_message_id)
+            )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+    
     def _format_messages(self, messages: List[ConversationMessage]) -> str:
         """
         格式化消息列表
@@ -93,38 +141,98 @@ class ContextSummarizer:
             formatted.append(f"{role}: {msg.content}")
         return "\n\n".join(formatted)
     
-    async def _generate_summary(self, messages_text: str) -> str:
+    async def _summarize(
+        self,
+        previous: Optional[ContextHistory],
+        messages: List[ConversationMessage],
+    ) -> Tuple[str, List[str]]:
         """
-        生成对话摘要
+        一次 LLM 调用同时生成合并后的摘要与关键点
         
         Args:
-            messages_text: 消息文本
+            previous: 上一个检查点
+            messages: 需要折叠的新消息
         
         Returns:
-            str: 摘要内容
+            Tuple[str, List[str]]: (摘要, 关键点列表)
         """
+        messages_text = self._format_messages(messages)
+        previous_summary = previous.summary if previous and previous.summary else ""
+        previous_key_points = previous.key_points if previous and previous.key_points else ""
+        
         try:
             from app.core.langchain import get_langchain_model
             
             model = get_langchain_model()
             if model is None:
-                return self._fallback_summary(messages_text)
+                return self._fallback(previous, messages, messages_text)
             
-            from langchain_core.messages import SystemMessage, HumanMessage
+            from langchain_core.messages import SystemMessage
             
-            prompt = (
-                "请总结以下对话内容，提取主要讨论的主题和关键信息。"
-                "摘要应简洁明了，不超过200字。\n\n"
-                f"对话内容：\n{messages_text}"
+            prompt = SUMMARY_PROMPT.format(
+                previous_summary=previous_summary or "（无）",
+                previous_key_points=previous_key_points or "（无）",
+                messages_text=messages_text,
             )
-            
-            messages = [SystemMessage(content=prompt)]
-            result = await model.ainvoke(messages)
-            
-            return result.content
+            result = await model.ainvoke([SystemMessage(content=prompt)])
+            return self._parse_result(result.content, previous_key_points)
         except Exception as e:
             app_logger.error(f"Error generating summary: {e}")
-            return self._fallback_summary(messages_text)
+            return self._fallback(previous, messages, messages_text)
+    
+    def _parse_result(self, content: str, previous_key_points: str) -> Tuple[str, List[str]]:
+        """
+        解析 LLM 返回的 JSON 摘要
+        
+        返回内容不是合法 JSON 时把全文作为摘要，沿用已有关键点
+        
+        Args:
+            content: LLM 返回内容
+            previous_key_points: 已有关键点（分号分隔）
+        
+        Returns:
+            Tuple[str, List[str]]: (摘要, 关键点列表)
+        """
+        start, end = content.find("{"), content.rfind("}")
+        try:
+            data = json.loads(content[start:end + 1]) if start != -1 else {}
+        except json.JSONDecodeError:
+            data = {}
+        
+        summary = data.get("summary") if isinstance(data, dict) else None
+        if not isinstance(summary, str) or not summary.strip():
+            fallback_points = [kp.strip() for kp in previous_key_points.split(";") if kp.strip()]
+            return content.strip(), fallback_points[:5]
+        
+        key_points = data.get("key_points") or []
+        if isinstance(key_points, str):
+            key_points = key_points.split(";")
+        key_points = [str(kp).strip() for kp in key_points if str(kp).strip()]
+        return summary.strip(), key_points[:5]
+    
+    def _fallback(
+        self,
+        previous: Optional[ContextHistory],
+        messages: List[ConversationMessage],
+        messages_text: str,
+    ) -> Tuple[str, List[str]]:
+        """
+        LLM 不可用时的规则摘要
+        
+        Args:
+            previous: 上一个检查点
+            messages: 需要折叠的新消息
+            messages_text: 新消息文本
+        
+        Returns:
+            Tuple[str, List[str]]: (摘要, 关键点列表)
+        """
+        summary = self._fallback_summary(messages_text)
+        if previous and previous.summary:
+            summary = f"{previous.summary}\n\n{summary}"
+        key_points = [kp.strip() for kp in (previous.key_points or "").split(";") if kp.strip()] if previous else []
+        key_points.extend(self._fallback_key_points(messages_text))
+        return summary, key_points[-5:]
     
     def _fallback_summary(self, messages_text: str) -> str:
         """
@@ -146,42 +254,6 @@ class ContextSummarizer:
         else:
             return "简短的对话。"
     
-    async def _extract_key_points(self, messages_text: str) -> List[str]:
-        """
-        提取关键点
-        
-        Args:
-            messages_text: 消息文本
-        
-        Returns:
-            List[str]: 关键点列表
-        """
-        try:
-            from app.core.langchain import get_langchain_model
-            
-            model = get_langchain_model()
-            if model is None:
-                return self._fallback_key_points(messages_text)
-            
-            from langchain_core.messages import SystemMessage, HumanMessage
-            
-            prompt = (
-                "请从以下对话中提取3-5个关键点，每个关键点不超过20字。"
-                "用分号分隔返回。\n\n"
-                f"对话内容：\n{messages_text}"
-            )
-            
-            messages = [SystemMessage(content=prompt)]
-            result = await model.ainvoke(messages)
-            
-            key_points_text = result.content
-            key_points = [kp.strip() for kp in key_points_text.split(';') if kp.strip()]
-            
-            return key_points[:5]
-        except Exception as e:
-            app_logger.error(f"Error extracting key points: {e}")
-            return self._fallback_key_points(messages_text)
-    
     def _fallback_key_points(self, messages_text: str) -> List[str]:
         """
         备用关键点提取方法
@@ -204,43 +276,48 @@ class ContextSummarizer:
     
     async def update_summary(
         self,
-        db: Session,
+        db: AsyncSession,
         summary_id: str,
         messages: List[ConversationMessage],
     ) -> ContextHistory:
         """
-        更新现有摘要
+        把新增消息折叠进现有摘要
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             summary_id: 摘要 ID
             messages: 新增消息列表
         
         Returns:
             ContextHistory: 更新后的摘要
         """
-        summary = db.query(ContextHistory).filter(
-            ContextHistory.id == summary_id
-        ).first()
+        result = await db.execute(
+            select(ContextHistory).where(ContextHistory.id == summary_id)
+        )
+        summary = result.scalar_one_or_none()
         
         if not summary:
             return None
         
-        messages_text = self._format_messages(messages)
-        new_summary = await self._generate_summary(messages_text)
-        new_key_points = await self._extract_key_points(messages_text)
+        if summary.last_message_id is not None:
+            # 已折叠过的消息不再重复计入
+            checkpoint = (summary.covered_until, summary.last_message_id)
+            messages = [msg for msg in messages if (msg.created_at, msg.id) > checkpoint]
+        if not messages:
+            return summary
+        
+        new_summary, new_key_points = await self._summarize(summary, messages)
         
         summary.message_count += len(messages)
-        summary.total_tokens += sum(msg.tokens for msg in messages)
-        summary.summary = f"{summary.summary}\n\n{new_summary}"
-        if summary.key_points:
-            summary.key_points = f"{summary.key_points}; {'; '.join(new_key_points)}"
-        else:
-            summary.key_points = "; ".join(new_key_points)
+        summary.total_tokens += sum(msg.tokens or 0 for msg in messages)
+        summary.summary = new_summary
+        summary.key_points = "; ".join(new_key_points)
+        summary.covered_until = messages[-1].created_at
+        summary.last_message_id = messages[-1].id
         
         db.add(summary)
-        db.commit()
-        db.refresh(summary)
+        await db.commit()
+        await db.refresh(summary)
         
         app_logger.info(f"Updated summary {summary_id}")
         
@@ -248,22 +325,23 @@ class ContextSummarizer:
     
     async def get_summary(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
     ) -> Optional[ContextHistory]:
         """
         获取最新的对话摘要
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
         
         Returns:
             ContextHistory: 最新的摘要或 None
         """
-        return (
-            db.query(ContextHistory)
-            .filter(ContextHistory.conversation_id == conversation_id)
+        result = await db.execute(
+            select(ContextHistory)
+            .where(ContextHistory.conversation_id == conversation_id)
             .order_by(ContextHistory.created_at.desc())
-            .first()
+            .limit(1)
         )
+        return result.scalar_one_or_none()
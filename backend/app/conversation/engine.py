@@ -4,7 +4,7 @@ Conversation Engine
 """
 
 from typing import List, Optional, Dict, Any, AsyncIterator
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.conversation import (
     ConversationCreate,
     ConversationUpdate,
@@ -14,10 +14,13 @@ from app.schemas.conversation import (
     Conversation,
     ConversationMessage,
 )
-from app.crud import conversation as conversation_crud
+from app.schemas.memory import MemorySearchRequest
+from app.crud import async_conversation as conversation_crud
 from app.core.langchain import get_langchain_model
 from app.services.context_service import context_service
 from app.services.memory_service import memory_service
+from app.core.config import settings
+from app.utils.stream_coalescer import coalesce_deltas
 from app.utils.logger import app_logger
 
 
@@ -33,7 +36,7 @@ class ConversationEngine:
     
     async def create_conversation(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_in: ConversationCreate,
         tenant_id: str,
         user_id: str,
@@ -42,7 +45,7 @@ class ConversationEngine:
         创建新对话
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_in: 创建请求
             tenant_id: 租户 ID
             user_id: 用户 ID
@@ -50,13 +53,13 @@ class ConversationEngine:
         Returns:
             Conversation: 创建的对话对象
         """
-        return conversation_crud.create_conversation(
+        return await conversation_crud.create_conversation(
             db, conversation_in, tenant_id, user_id
         )
     
     async def get_conversation(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
         tenant_id: str,
         user_id: str,
@@ -65,7 +68,7 @@ class ConversationEngine:
         获取对话
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
             tenant_id: 租户 ID
             user_id: 用户 ID
@@ -73,7 +76,7 @@ class ConversationEngine:
         Returns:
             Conversation: 对话对象或 None
         """
-        conversation = conversation_crud.get_conversation(db, conversation_id)
+        conversation = await conversation_crud.get_conversation(db, conversation_id)
         
         if conversation and (
             str(conversation.tenant_id) == tenant_id and
@@ -85,7 +88,7 @@ class ConversationEngine:
     
     async def list_conversations(
         self,
-        db: Session,
+        db: AsyncSession,
         tenant_id: str,
         user_id: str,
         skip: int = 0,
@@ -96,7 +99,7 @@ class ConversationEngine:
         获取对话列表
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             tenant_id: 租户 ID
             user_id: 用户 ID
             skip: 跳过数量
@@ -106,13 +109,13 @@ class ConversationEngine:
         Returns:
             List[Conversation]: 对话列表
         """
-        return conversation_crud.get_conversations(
+        return await conversation_crud.get_conversations(
             db, tenant_id, user_id, skip, limit, status
         )
     
     async def chat(
         self,
-        db: Session,
+        db: AsyncSession,
         chat_request: ChatRequest,
         tenant_id: str,
         user_id: str,
@@ -121,7 +124,7 @@ class ConversationEngine:
         处理聊天请求（非流式）
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             chat_request: 聊天请求
             tenant_id: 租户 ID
             user_id: 用户 ID
@@ -156,7 +159,7 @@ class ConversationEngine:
         
         from app.schemas.conversation import ConversationMessageCreate
         
-        user_message = conversation_crud.create_conversation_message(
+        user_message = await conversation_crud.create_conversation_message(
             db,
             ConversationMessageCreate(
                 role="user",
@@ -171,16 +174,16 @@ class ConversationEngine:
             db=db,
             tenant_id=tenant_id,
             user_id=user_id,
-            search_request={
-                "query": chat_request.message,
-                "top_k": 5,
-            },
+            search_request=MemorySearchRequest(
+                query=chat_request.message,
+                top_k=5,
+            ),
         )
         
         messages = self._build_messages(
             context_window.messages,
             chat_request.message,
-            relevant_memories,
+            relevant_memories.memories,
         )
         
         llm_response = await self._call_llm(
@@ -190,7 +193,7 @@ class ConversationEngine:
             chat_request.max_tokens,
         )
         
-        assistant_message = conversation_crud.create_conversation_message(
+        assistant_message = await conversation_crud.create_conversation_message(
             db,
             ConversationMessageCreate(
                 role="assistant",
@@ -200,11 +203,10 @@ class ConversationEngine:
             chat_request.model,
         )
         
-        conversation_crud.update_conversation_stats(
+        await conversation_crud.update_conversation_stats(
             db,
             conversation_id,
             increment_messages=2,
-            increment_tokens=assistant_message.tokens,
         )
         
         return ChatResponse(
@@ -219,7 +221,7 @@ class ConversationEngine:
     
     async def chat_stream(
         self,
-        db: Session,
+        db: AsyncSession,
         chat_request: ChatRequest,
         tenant_id: str,
         user_id: str,
@@ -228,7 +230,7 @@ class ConversationEngine:
         处理聊天请求（流式）
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             chat_request: 聊天请求
             tenant_id: 租户 ID
             user_id: 用户 ID
@@ -265,7 +267,7 @@ class ConversationEngine:
         
         from app.schemas.conversation import ConversationMessageCreate
         
-        user_message = conversation_crud.create_conversation_message(
+        user_message = await conversation_crud.create_conversation_message(
             db,
             ConversationMessageCreate(
                 role="user",
@@ -282,49 +284,54 @@ class ConversationEngine:
             chat_request.message,
         )
         
-        accumulated_content = ""
+        # 增量按时间窗口合并后发送；内容用列表累积，结束时只拼接一次
+        parts: List[str] = []
+        full_mode = chat_request.stream_mode == "full"
         
-        async for chunk in self._call_llm_stream(
-            messages,
-            chat_request.model,
-            chat_request.temperature,
-            chat_request.max_tokens,
+        async for delta in coalesce_deltas(
+            self._call_llm_stream(
+                messages,
+                chat_request.model,
+                chat_request.temperature,
+                chat_request.max_tokens,
+            ),
+            settings.LLM_STREAM_COALESCE_MS / 1000,
         ):
-            if chunk:
-                accumulated_content += chunk
-                yield ChatStreamChunk(
-                    conversation_id=conversation_id,
-                    message_id="",
-                    role="assistant",
-                    content=accumulated_content,
-                    delta=chunk,
-                    finish_reason=None,
-                )
+            parts.append(delta)
+            yield ChatStreamChunk(
+                conversation_id=conversation_id,
+                message_id="",
+                role="assistant",
+                content="".join(parts) if full_mode else None,
+                delta=delta,
+                finish_reason=None,
+            )
         
-        yield ChatStreamChunk(
-            conversation_id=conversation_id,
-            message_id="",
-            role="assistant",
-            content=accumulated_content,
-            delta="",
-            finish_reason="stop",
-        )
+        content = "".join(parts)
         
-        assistant_message = conversation_crud.create_conversation_message(
+        assistant_message = await conversation_crud.create_conversation_message(
             db,
             ConversationMessageCreate(
                 role="assistant",
-                content=accumulated_content,
+                content=content,
             ),
             conversation_id,
             chat_request.model,
         )
         
-        conversation_crud.update_conversation_stats(
+        await conversation_crud.update_conversation_stats(
             db,
             conversation_id,
             increment_messages=2,
-            increment_tokens=len(accumulated_content),
+        )
+        
+        yield ChatStreamChunk(
+            conversation_id=conversation_id,
+            message_id=str(assistant_message.id),
+            role="assistant",
+            content=content,
+            delta="",
+            finish_reason="stop",
         )
     
     def _build_messages(
@@ -468,7 +475,7 @@ class ConversationEngine:
     
     async def delete_conversation(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
         tenant_id: str,
         user_id: str,
@@ -477,7 +484,7 @@ class ConversationEngine:
         删除对话
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
             tenant_id: 租户 ID
             user_id: 用户 ID
@@ -490,7 +497,7 @@ class ConversationEngine:
         )
         
         if conversation:
-            conversation_crud.delete_conversation(db, conversation_id)
+            await conversation_crud.delete_conversation(db, conversation_id)
             await context_service.clear_context(db, conversation_id)
             await memory_service.clear_short_term(conversation_id)
         
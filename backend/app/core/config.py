@@ -27,6 +27,7 @@ class Settings(BaseSettings):
     DATABASE_POOL_TIMEOUT: int = Field(default=30, description="数据库连接池超时时间（秒）")
     DATABASE_POOL_RECYCLE: int = Field(default=3600, description="数据库连接回收时间（秒）")
     DATABASE_MAX_OVERFLOW: int = Field(default=10, description="数据库连接池溢出大小（解决高并发阻塞问题）")
+    DATABASE_ASYNC_URL: Optional[str] = Field(default=None, description="异步数据库连接URL（为空时由 DATABASE_URL 自动推导）")
 
     # Application
     APP_NAME: str = Field(default="My Awesome Blog", description="应用名称")
@@ -46,6 +47,12 @@ class Settings(BaseSettings):
     PASSWORD_REQUIRE_NUMBERS: bool = Field(default=True, description="密码是否需要数字")
     PASSWORD_REQUIRE_UPPERCASE: bool = Field(default=True, description="密码是否需要大写字母")
     PASSWORD_REQUIRE_LOWERCASE: bool = Field(default=True, description="密码是否需要小写字母")
+    BCRYPT_ROUNDS: int = Field(default=12, ge=4, le=31, description="bcrypt 成本因子，调高后旧哈希在用户下次登录时重新计算")
+    PASSWORD_HASH_WORKERS: int = Field(default=4, description="密码哈希/校验线程池大小")
+    PASSWORD_HASH_MAX_PENDING: int = Field(default=64, description="密码哈希任务最大排队数（含执行中），超出时立即返回 503")
+    AUTH_PRINCIPAL_CACHE_TTL: int = Field(default=30, description="认证主体（用户）进程内缓存时间（秒），也是漏收用户变更广播时的最长延迟")
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = Field(default=10000, description="认证主体缓存最大用户数")
+    AUTH_REVOCATION_SYNC_INTERVAL: int = Field(default=30, description="令牌吊销集合全量同步间隔（秒），也是漏收吊销广播时的最长延迟")
 
     # Redis
     REDIS_HOST: str = Field(default="localhost", description="Redis主机地址")
@@ -80,17 +87,75 @@ class Settings(BaseSettings):
     RATE_LIMIT_AUTHENTICATED: str = Field(default="2000/hour", description="认证用户速率限制")
     RATE_LIMIT_LOGIN: str = Field(default="5/minute", description="登录接口速率限制")
     RATE_LIMIT_REGISTER: str = Field(default="3/minute", description="注册接口速率限制")
+    RATE_LIMIT_ENABLED: bool = Field(default=True, description="是否启用基于 Redis 的分布式限流")
+    RATE_LIMIT_LOCAL_BATCH: int = Field(default=10, description="余量充足时单次从 Redis 预取的令牌数（1 表示不预取）")
 
     # Cache
     CACHE_DEFAULT_TTL: int = Field(default=3600, description="默认缓存TTL（秒）")
     CACHE_ARTICLES_TTL: int = Field(default=1800, description="文章缓存TTL（秒）")
     CACHE_USERS_TTL: int = Field(default=900, description="用户缓存TTL（秒）")
+    CACHE_SERIALIZER: str = Field(default="orjson", description="缓存序列化器（orjson / pickle）")
+    CACHE_L1_ENABLED: bool = Field(default=True, description="是否启用进程内 L1 缓存")
+    CACHE_L1_MAX_ENTRIES: int = Field(default=10000, description="L1 缓存最大条目数（LRU 淘汰）")
+    CACHE_L1_MAX_TTL: int = Field(default=60, description="L1 缓存条目最长存活时间（秒）")
+    CACHE_LOCK_TIMEOUT: int = Field(default=10, description="缓存加载租约时长（秒），持有者崩溃时到期自动释放")
+    CACHE_LOCK_WAIT_TIMEOUT: float = Field(default=3.0, description="等待其他 worker 加载缓存的最长时间（秒）")
+
+    # Bloom Filter
+    BLOOM_FILTER_CAPACITY: int = Field(default=100000, description="布隆过滤器预期容量（键数量）")
+    BLOOM_FILTER_ERROR_RATE: float = Field(default=0.01, description="布隆过滤器目标误判率")
+    BLOOM_FILTER_REBUILD_INTERVAL: int = Field(default=3600, description="布隆过滤器全量重建间隔（秒）")
+
+    # View Counter
+    VIEW_COUNT_FLUSH_INTERVAL: int = Field(default=30, description="浏览量增量批量落库间隔（秒）")
+    VIEW_COUNT_PUSH_INTERVAL: float = Field(default=1.0, description="进程内浏览计数推送到 Redis 缓冲区的间隔（秒）")
+
+    # Request Log
+    REQUEST_LOG_ENABLED: bool = Field(default=True, description="是否将请求日志写入 request_logs 表")
+    REQUEST_LOG_BUFFER_SIZE: int = Field(default=10000, description="日志环形缓冲区容量（条），满时丢弃最旧记录")
+    REQUEST_LOG_FLUSH_INTERVAL_MS: int = Field(default=500, description="日志批量写入间隔（毫秒）")
+    REQUEST_LOG_FLUSH_BATCH: int = Field(default=1000, description="日志单批写入行数，积压达到该数量时立即写入")
+    REQUEST_LOG_RETENTION_DAYS: int = Field(default=30, description="请求日志保留天数（按日分区删除）")
+    REQUEST_LOG_PARTITIONS_AHEAD: int = Field(default=3, description="请求日志提前创建的日分区数")
+
+    # Context Window
+    CONTEXT_WINDOW_BATCH_SIZE: int = Field(default=50, description="组装上下文窗口时每批从新到旧读取的消息数")
+    CONTEXT_WINDOW_CACHE_TTL: int = Field(default=3600, description="上下文窗口缓存过期时间（秒）")
+
+    # Context Summary
+    CONTEXT_SUMMARY_WORKERS: int = Field(default=1, description="后台滚动摘要任务的并发数")
+    CONTEXT_SUMMARY_QUEUE_SIZE: int = Field(default=1000, description="待摘要对话队列长度，满时丢弃新的摘要请求")
+    CONTEXT_SUMMARY_BATCH_MESSAGES: int = Field(default=40, description="单次 LLM 调用折叠进摘要的最大消息数")
+    CONTEXT_SUMMARY_LEASE_TTL: int = Field(default=600, description="单个对话摘要的跨 worker 租约时长（秒），应大于一次摘要（多批 LLM 调用）的最长耗时")
+
+    # Article Search
+    SEARCH_TOKENIZER: str = Field(default="bigram", description="中文分词方式：bigram（二元组）或 jieba（需安装 jieba），修改后需重建索引")
+    SEARCH_BM25_K1: float = Field(default=1.2, description="BM25 词频饱和参数 k1")
+    SEARCH_BM25_B: float = Field(default=0.75, description="BM25 文档长度归一化参数 b")
+    SEARCH_SNIPPET_LENGTH: int = Field(default=120, description="搜索结果高亮摘要长度（字符）")
+    SEARCH_STATS_TTL: int = Field(default=60, description="BM25 语料统计（文档数、平均长度）的进程内缓存时间（秒）")
+
+    # Embedding / Memory Retrieval
+    EMBEDDING_MODEL: str = Field(default="", description="本地 sentence-transformers 模型名或路径（CPU），为空时使用特征哈希向量")
+    EMBEDDING_DIM: int = Field(default=512, description="向量维度，需与模型输出及 memories.embedding 列一致")
+    EMBEDDING_BATCH_SIZE: int = Field(default=32, description="向量化批量大小")
+    MEMORY_IMPORTANCE_WEIGHT: float = Field(default=0.2, description="记忆检索得分中重要性的权重，其余为余弦相似度")
+    MEMORY_MIN_SIMILARITY: float = Field(default=0.1, description="记忆检索的最小余弦相似度")
+    MEMORY_SEARCH_OVERSAMPLE: int = Field(default=4, description="向量检索候选数相对 top_k 的倍数（用于重要性重排）")
+    MEMORY_INDEX_MAX_SHARDS: int = Field(default=1000, description="进程内向量索引最多缓存的用户分片数（无 pgvector 时使用）")
 
     # LLM Configuration
     LLM_DEFAULT_MODEL: str = Field(default="deepseek-chat", description="默认使用的LLM模型")
     LLM_TIMEOUT: int = Field(default=120, description="LLM API请求超时时间（秒）")
     LLM_MAX_RETRIES: int = Field(default=3, description="LLM API请求最大重试次数")
     LLM_STREAM_ENABLED: bool = Field(default=True, description="是否启用流式响应")
+    LLM_STREAM_COALESCE_MS: int = Field(default=30, description="流式响应增量合并窗口（毫秒），0 表示逐 token 发送")
+    TOKENIZER_DIR: str = Field(default="tokenizers", description="分词器目录，按模型族存放 <family>/tokenizer.json（deepseek/glm/qwen），缺失时按字符估算")
+    LLM_CONNECT_TIMEOUT: float = Field(default=10.0, description="LLM API建立连接超时时间（秒）")
+    LLM_HTTP2_ENABLED: bool = Field(default=True, description="是否对LLM API启用HTTP/2（需安装h2，未安装时回退HTTP/1.1）")
+    LLM_HTTP_MAX_CONNECTIONS: int = Field(default=100, description="每个LLM提供商连接池的最大连接数")
+    LLM_HTTP_MAX_KEEPALIVE: int = Field(default=20, description="每个LLM提供商连接池保持的空闲长连接数")
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = Field(default=60.0, description="空闲长连接的保持时间（秒）")
 
     # DeepSeek Configuration
     DEEPSEEK_API_KEY: str = Field(default="", description="DeepSeek API密钥")
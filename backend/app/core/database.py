@@ -1,5 +1,6 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
 
@@ -49,4 +50,65 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def _build_async_database_url(url: str) -> str:
+    """
+    将同步数据库 URL 转换为对应的异步驱动 URL
+
+    Args:
+        url: 同步数据库连接 URL
+
+    Returns:
+        str: 异步驱动连接 URL
+    """
+    if url.startswith('postgresql://'):
+        return url.replace('postgresql://', 'postgresql+asyncpg://', 1)
+    if url.startswith('sqlite://'):
+        return url.replace('sqlite://', 'sqlite+aiosqlite://', 1)
+    return url
+
+
+# Async engine for hot request paths (chat, context, memory retrieval)
+# Kept alongside the sync engine so existing endpoints stay on get_db
+ASYNC_DATABASE_URL = settings.DATABASE_ASYNC_URL or _build_async_database_url(settings.DATABASE_URL)
+
+if ASYNC_DATABASE_URL.startswith('postgresql+asyncpg://'):
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        connect_args={
+            "timeout": 10,
+            "server_settings": {
+                "client_encoding": "UTF8",
+                "application_name": "MyAwesomeBlog"
+            }
+        }
+    )
+else:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+    )
+
+# Create AsyncSessionLocal class
+# expire_on_commit=False: ORM objects remain readable after commit without lazy IO
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+# Dependency to get async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -9,7 +9,9 @@ from app.core.database import get_db
 from app import crud
 import app.models  # Import all models to ensure proper initialization
 from app.models.user import User
+from app.services.auth_cache_service import auth_cache_service
 from app.services.cache_service import cache_service
+from app.utils.cache_keys import CacheKeys
 from app.utils.logger import app_logger
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -19,25 +21,22 @@ async def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme)
 ) -> User:
+    """
+    解析当前用户
+
+    带 jti 的令牌只查本地吊销集合，用户命中进程内主体缓存时不访问 Redis 与数据库；
+    不带 jti 的旧令牌仍按原方式查询 Redis 黑名单
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    # 检查令牌是否在黑名单中
-    try:
-        is_blacklisted = await cache_service.exists(f"blacklist:token:{token}")
-        if is_blacklisted:
-            app_logger.warning(f"Attempt to use blacklisted token")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been revoked",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    except Exception as e:
-        # 如果缓存服务出错，记录但不阻止认证（降级处理）
-        app_logger.error(f"Error checking token blacklist: {str(e)}")
+    revoked_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been revoked",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
     
     try:
         payload = security.verify_token(token)
@@ -47,12 +46,33 @@ async def get_current_user(
         user_id: Optional[str] = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-    except JWTError:
+        user_uuid = UUID(user_id)
+    except (JWTError, ValueError):
         raise credentials_exception
     
-    user = crud.get_user(db, user_id=UUID(user_id))
+    # 检查令牌是否已吊销
+    jti = payload.get("jti")
+    if jti is not None:
+        if auth_cache_service.is_revoked(jti):
+            app_logger.warning("Attempt to use revoked token")
+            raise revoked_exception
+    else:
+        try:
+            is_blacklisted = await cache_service.exists(CacheKeys.token_blacklist(token))
+        except Exception as e:
+            # 如果缓存服务出错，记录但不阻止认证（降级处理）
+            app_logger.error(f"Error checking token blacklist: {str(e)}")
+            is_blacklisted = False
+        if is_blacklisted:
+            app_logger.warning("Attempt to use blacklisted token")
+            raise revoked_exception
+    
+    user = auth_cache_service.get_principal(user_uuid)
     if user is None:
-        raise credentials_exception
+        user = crud.get_user(db, user_id=user_uuid)
+        if user is None:
+            raise credentials_exception
+        auth_cache_service.set_principal(user)
     
     return user
 
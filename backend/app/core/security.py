@@ -1,8 +1,11 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
+from fastapi import HTTPException, status
 from app.core.config import settings
+from app.utils.bounded_executor import BoundedExecutor, ExecutorSaturatedError
 from app.utils.logger import app_logger
 
 
@@ -15,7 +18,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti 用于吊销单个令牌（见 auth_cache_service）
+    to_encode.update({"exp": expire, "jti": to_encode.get("jti") or uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -29,11 +33,26 @@ def verify_token(token: str) -> Optional[dict]:
         return None
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """
-    验证密码
-    注意：bcrypt 自动处理72字节限制，无需手动截断
-    """
+# bcrypt 在 C 扩展中计算时释放 GIL，放在独立的有界线程池中执行，避免每次登录阻塞事件循环约 200ms；
+# 排队数达到上限时立即返回 503，撞库流量不会把请求无限堆积在队列里
+password_executor = BoundedExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    thread_name_prefix="password-hash",
+)
+
+
+class PasswordHashingBusyError(HTTPException):
+    """密码哈希线程池已满"""
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="服务繁忙，请稍后再试",
+            headers={"Retry-After": "1"},
+        )
+
+
+def _check_password(plain_password: str, hashed_password: str) -> bool:
     try:
         return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
     except ValueError as e:
@@ -42,10 +61,82 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
-def get_password_hash(password: str) -> str:
+def _hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode('utf-8')
+
+
+async def _run_in_password_executor(func, *args):
+    try:
+        return await password_executor.run(func, *args)
+    except ExecutorSaturatedError:
+        app_logger.warning(f"Password hashing rejected: {password_executor.pending} tasks pending")
+        raise PasswordHashingBusyError()
+
+
+def _call_in_password_executor(func, *args):
+    try:
+        return password_executor.call(func, *args)
+    except ExecutorSaturatedError:
+        app_logger.warning(f"Password hashing rejected: {password_executor.pending} tasks pending")
+        raise PasswordHashingBusyError()
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    生成密码哈希
+    验证密码（在密码哈希线程池中执行）
+    注意：bcrypt 自动处理72字节限制，无需手动截断
+
+    Raises:
+        PasswordHashingBusyError: 线程池排队已满
+    """
+    return await _run_in_password_executor(_check_password, plain_password, hashed_password)
+
+
+async def get_password_hash(password: str) -> str:
+    """
+    生成密码哈希（在密码哈希线程池中执行，成本因子为 BCRYPT_ROUNDS）
     注意：bcrypt 自动处理72字节限制，无需手动截断
     密码长度限制应在 schema 层验证（见 user.py schema 的 PasswordStr）
+
+    Raises:
+        PasswordHashingBusyError: 线程池排队已满
+    """
+    return await _run_in_password_executor(_hash_password, password)
+
+
+def verify_password_sync(plain_password: str, hashed_password: str) -> bool:
+    """
+    验证密码（同步版本，阻塞等待密码哈希线程池）
+    在 def 接口等运行于线程池线程的同步代码中使用，不要在事件循环线程中调用
+
+    Raises:
+        PasswordHashingBusyError: 线程池排队已满
+    """
+    return _call_in_password_executor(_check_password, plain_password, hashed_password)
+
+
+def get_password_hash_sync(password: str) -> str:
     """
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    生成密码哈希（同步版本，阻塞等待密码哈希线程池）
+    在 def 接口等运行于线程池线程的同步代码中使用，不要在事件循环线程中调用
+
+    Raises:
+        PasswordHashingBusyError: 线程池排队已满
+    """
+    return _call_in_password_executor(_hash_password, password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    判断哈希的成本因子是否低于当前配置（"$2b$<rounds>$..."）
+
+    Args:
+        hashed_password: bcrypt 哈希
+
+    Returns:
+        bool: 是否需要在下次成功登录时重新哈希
+    """
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return False
+    return int(parts[2]) < settings.BCRYPT_ROUNDS
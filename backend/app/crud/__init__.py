@@ -8,14 +8,16 @@ from app.crud.user import (
 from app.crud.article import (
     get_article_async, get_article_by_slug, get_articles,
     create_article, update_article, delete_article,
-    increment_view_count, get_featured_articles, get_related_articles,
-    get_articles_with_categories_and_tags, get_popular_articles
+    increment_view_count, get_featured_articles,
+    get_articles_with_categories_and_tags, get_popular_articles,
+    prime_article_cache, get_article_detail_json, get_article_detail_json_by_slug
 )
 
 from app.crud.comment import (
-    get_comment, get_comments_by_article, get_comments_by_author,
+    get_comment, get_comments_by_article, get_comments_by_article_page, get_comments_by_author,
     get_replies, create_comment, update_comment, delete_comment,
-    approve_comment
+    approve_comment, update_comment_with_cache_clear, delete_comment_with_cache_clear,
+    approve_comment_with_cache_clear, clear_comment_caches, get_comment_tree, get_comment_tree_page
 )
 
 from app.crud.category import (
@@ -70,6 +72,7 @@ from app.crud.typewriter_content import (
 from app.crud.message import (
     get_message,
     get_messages,
+    get_messages_page,
     get_messages_by_author,
     get_danmaku_messages,
     get_replies,
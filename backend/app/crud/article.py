@@ -1,50 +1,164 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from app.crud import async_article
 from app.models.article import Article
-from app.schemas.article import ArticleCreate, ArticleUpdate
-from app.services.cache_service import cache_service, cache_get_or_set
+from app.schemas.article import ArticleCreate, ArticleUpdate, ArticleWithAuthor, ArticleSearchResult
+from app.services.bloom_filter_service import bloom_filter_service
+from app.services.cache_service import cache_service, cache_get_or_set, cache_set_many
+from app.services.search_service import INDEXED_FIELDS, article_search_service
 from app.utils.pagination import CursorPaginationParams, CursorPaginationResult, paginate_with_cursor
-from app.utils.cache_keys import CacheKeys, CacheTTL
-from sqlalchemy import text
+from app.utils.cache_keys import CacheKeys, CacheTags, CacheTTL
 
 
 def get_article(db: Session, article_id: UUID) -> Optional[Article]:
     return db.query(Article).filter(Article.id == article_id).first()
 
 
-async def get_article_async(db: Session, article_id: UUID) -> Optional[Article]:
-    """异步获取文章，带缓存功能和缓存穿透防护"""
+async def get_article_async(db: AsyncSession, article_id: UUID) -> Optional[ArticleWithAuthor]:
+    """
+    异步获取文章，带缓存功能和缓存穿透防护
+
+    缓存与返回的都是 ArticleWithAuthor 响应 Schema，而不是 ORM 对象图；
+    未命中时通过 AsyncSession 加载，不阻塞事件循环
+    """
     cache_key = CacheKeys.article(article_id)
-    cached_article = await cache_service.get(cache_key)
 
-    if cached_article is not None:
+    # 布隆过滤器判定不存在时无需访问缓存与数据库
+    if not await bloom_filter_service.might_contain(cache_key):
+        return None
+
+    async def fetch() -> Optional[ArticleWithAuthor]:
+        article = await async_article.get_article_with_relationships(db, article_id)
+        return ArticleWithAuthor.model_validate(article) if article else None
+
+    # 未命中时单飞加载，过期后短时间内返回旧快照并由单个请求刷新
+    article_schema = await cache_get_or_set(
+        cache_key,
+        fetch,
+        CacheTTL.ARTICLE,
+        stale_ttl=CacheTTL.VERY_SHORT,
+        tags=CacheKeys.article_detail_tags,
+    )
+
+    if article_schema is not None:
         # 检查是否为空值缓存(用于缓存穿透防护)
-        if cached_article is False:  # 使用False标记空值
+        if article_schema is False:  # 使用False标记空值
             return None
-        return cached_article
+        return article_schema
 
-    from sqlalchemy.orm import joinedload
-    article = (
-        db.query(Article)
-        .options(joinedload(Article.author))
-        .options(joinedload(Article.categories))
-        .options(joinedload(Article.tags))
-        .filter(Article.id == article_id)
-        .first()
+    # 缓存空值,防止缓存穿透(使用False标记,60秒过期)
+    null_cache_key = CacheKeys.article_null(article_id)
+    await cache_service.set(null_cache_key, False, expire=CacheTTL.VERY_SHORT)
+
+    return None
+
+
+def serialize_article_detail(article: ArticleWithAuthor) -> Dict[str, str]:
+    """
+    预序列化文章详情响应（与 response_model=ArticleWithAuthor 的输出一致）
+
+    缓存值只包含字符串，缓存服务直接用 orjson 存储，不会回退到 pickle
+
+    Args:
+        article: 文章 Schema
+
+    Returns:
+        Dict[str, str]: {"id": 文章 ID, "body": 响应 JSON}
+    """
+    return {"id": str(article.id), "body": article.model_dump_json(by_alias=True)}
+
+
+async def _get_article_detail_json(
+    cache_key: str,
+    load: Callable[[], Awaitable[Optional[ArticleWithAuthor]]],
+) -> Optional[Tuple[str, bytes]]:
+    article_tags: List[str] = []
+
+    async def fetch() -> Optional[Dict[str, str]]:
+        article = await load()
+        if article is None:
+            return None
+        article_tags.extend(CacheKeys.article_detail_tags(article))
+        return serialize_article_detail(article)
+
+    detail = await cache_get_or_set(
+        cache_key,
+        fetch,
+        CacheTTL.ARTICLE,
+        stale_ttl=CacheTTL.VERY_SHORT,
+        tags=lambda _: article_tags,
     )
+    if detail is None:
+        return None
+    return detail["id"], detail["body"].encode()
 
-    if article:
-        # 缓存真实数据
-        await cache_service.set(cache_key, article, expire=CacheTTL.ARTICLE)
-    else:
-        # 缓存空值,防止缓存穿透(使用False标记,60秒过期)
-        null_cache_key = CacheKeys.article_null(article_id)
-        await cache_service.set(null_cache_key, False, expire=CacheTTL.VERY_SHORT)
 
-    return article
+async def get_article_detail_json(db: AsyncSession, article_id: UUID) -> Optional[Tuple[str, bytes]]:
+    """
+    获取预序列化的文章详情响应
+
+    命中缓存时只有一次缓存读取，不访问数据库也不重新序列化；未命中时经由
+    get_article_async 加载。响应中的 view_count 是快照，浏览量落库时随缓存失效刷新
+
+    Args:
+        db: 异步数据库会话
+        article_id: 文章 ID
+
+    Returns:
+        Optional[Tuple[str, bytes]]: (文章 ID, 响应 JSON)，文章不存在时为 None
+    """
+    return await _get_article_detail_json(
+        CacheKeys.article_json(article_id),
+        lambda: get_article_async(db, article_id),
+    )
+
+
+async def get_article_detail_json_by_slug(db: AsyncSession, slug: str) -> Optional[Tuple[str, bytes]]:
+    """
+    通过 slug 获取预序列化的文章详情响应
+
+    Args:
+        db: 异步数据库会话
+        slug: 文章 slug
+
+    Returns:
+        Optional[Tuple[str, bytes]]: (文章 ID, 响应 JSON)，文章不存在时为 None
+    """
+    return await _get_article_detail_json(
+        CacheKeys.article_json_by_slug(slug),
+        lambda: get_article_by_slug_with_relationships_async(db, slug),
+    )
+
+
+async def prime_article_cache(articles: List[ArticleWithAuthor]) -> bool:
+    """
+    用列表查询的结果批量预热单篇文章缓存与详情响应缓存（按 ID 与按 slug）
+
+    一次管道写入，后续打开详情页时无需再查询数据库
+
+    Args:
+        articles: 已加载作者/分类/标签的文章 Schema 列表
+
+    Returns:
+        bool: 是否写入成功
+    """
+    mapping = {}
+    tags = {}
+    for article in articles:
+        detail = serialize_article_detail(article)
+        entries = {CacheKeys.article(article.id): article, CacheKeys.article_json(article.id): detail}
+        if article.slug:
+            entries[CacheKeys.article_by_slug(article.slug)] = article
+            entries[CacheKeys.article_json_by_slug(article.slug)] = detail
+        article_tags = CacheKeys.article_detail_tags(article)
+        for key, value in entries.items():
+            mapping[key] = value
+            tags[key] = article_tags
+
+    return await cache_set_many(mapping, CacheTTL.ARTICLE, stale_ttl=CacheTTL.VERY_SHORT, tags=tags)
 
 
 def get_article_with_relationships(db: Session, article_id: UUID) -> Optional[Article]:
@@ -75,35 +189,40 @@ def get_article_by_slug_with_relationships(db: Session, slug: str) -> Optional[A
     )
 
 
-async def get_article_by_slug_with_relationships_async(db: Session, slug: str) -> Optional[Article]:
-    """异步获取文章，带缓存和关系数据,以及缓存穿透防护"""
+async def get_article_by_slug_with_relationships_async(db: AsyncSession, slug: str) -> Optional[ArticleWithAuthor]:
+    """
+    异步获取文章，带缓存和关系数据,以及缓存穿透防护
+
+    缓存与返回的都是 ArticleWithAuthor 响应 Schema，而不是 ORM 对象图
+    """
     cache_key = CacheKeys.article_by_slug(slug)
-    cached_article = await cache_service.get(cache_key)
 
-    if cached_article is not None:
-        # 检查是否为空值缓存
-        if cached_article is False:
-            return None
-        return cached_article
+    if not await bloom_filter_service.might_contain(cache_key):
+        return None
 
-    from sqlalchemy.orm import joinedload
-    article = (
-        db.query(Article)
-        .options(joinedload(Article.author))
-        .options(joinedload(Article.categories))
-        .options(joinedload(Article.tags))
-        .filter(Article.slug == slug)
-        .first()
+    async def fetch() -> Optional[ArticleWithAuthor]:
+        article = await async_article.get_article_by_slug_with_relationships(db, slug)
+        return ArticleWithAuthor.model_validate(article) if article else None
+
+    article_schema = await cache_get_or_set(
+        cache_key,
+        fetch,
+        CacheTTL.ARTICLE,
+        stale_ttl=CacheTTL.VERY_SHORT,
+        tags=CacheKeys.article_detail_tags,
     )
 
-    if article:
-        await cache_service.set(cache_key, article, expire=CacheTTL.ARTICLE)
-    else:
-        # 缓存空值,防止缓存穿透
-        null_cache_key = CacheKeys.article_slug_null(slug)
-        await cache_service.set(null_cache_key, False, expire=CacheTTL.VERY_SHORT)
+    if article_schema is not None:
+        # 检查是否为空值缓存
+        if article_schema is False:
+            return None
+        return article_schema
 
-    return article
+    # 缓存空值,防止缓存穿透
+    null_cache_key = CacheKeys.article_slug_null(slug)
+    await cache_service.set(null_cache_key, False, expire=CacheTTL.VERY_SHORT)
+
+    return None
 
 
 def get_articles(
@@ -144,12 +263,7 @@ def get_articles(
         query = query.filter(Article.author_id == author_id)
     
     if search:
-        search_filter = or_(
-            Article.title.ilike(f"%{search}%"),
-            Article.content.ilike(f"%{search}%"),
-            Article.excerpt.ilike(f"%{search}%"),
-        )
-        query = query.filter(search_filter)
+        query = query.filter(article_search_service.match_filter(search))
     
     # Filter by category if provided
     if category_id is not None:
@@ -207,6 +321,9 @@ def create_article(db: Session, article: ArticleCreate, author_id: UUID) -> Arti
                 article_tag = ArticleTag(article_id=db_article.id, tag_id=tag.id)
                 db.add(article_tag)
 
+    # 倒排索引与文章在同一事务内写入
+    article_search_service.index_article(db, db_article)
+
     db.commit()
     db.refresh(db_article)
     return db_article
@@ -218,6 +335,7 @@ async def update_article(db: Session, article_id: UUID, article_update: ArticleU
         return None
 
     update_data = article_update.model_dump(exclude_unset=True)
+    old_slug = db_article.slug
 
     # Handle publish status change
     if "is_published" in update_data:
@@ -230,17 +348,17 @@ async def update_article(db: Session, article_id: UUID, article_update: ArticleU
     for field, value in update_data.items():
         setattr(db_article, field, value)
 
+    # 只有标题、摘要或正文变化时才重建该文章的倒排索引
+    if any(field in update_data for field in INDEXED_FIELDS):
+        article_search_service.index_article(db, db_article)
+
     db.commit()
     db.refresh(db_article)
 
-    # 使用统一的缓存键更新缓存
-    cache_key = CacheKeys.article(article_id)
-    await cache_service.set(cache_key, db_article, expire=CacheTTL.ARTICLE)
-
-    # Also update by slug cache if slug was changed
-    if hasattr(article_update, 'slug') and article_update.slug:
-        slug_cache_key = CacheKeys.article_by_slug(article_update.slug)
-        await cache_service.set(slug_cache_key, db_article, expire=CacheTTL.ARTICLE)
+    # 失效缓存，下次读取时重新生成 Schema 快照（按 ID、旧 slug 与新 slug 的键均登记在文章标签下）
+    await cache_service.invalidate_tags(CacheTags.article(article_id), CacheTags.ARTICLE_LIST)
+    if db_article.slug != old_slug:
+        await bloom_filter_service.add_article(db_article.id, db_article.slug)
 
     return db_article
 
@@ -250,52 +368,49 @@ async def delete_article(db: Session, article_id: UUID) -> bool:
     if not db_article:
         return False
 
+    article_search_service.remove_articles(db, [article_id])
     db.delete(db_article)
     db.commit()
 
-    # 使用统一的缓存键删除缓存
-    cache_key = CacheKeys.article(article_id)
-    await cache_service.delete(cache_key)
-
-    if db_article.slug:
-        slug_cache_key = CacheKeys.article_by_slug(db_article.slug)
-        await cache_service.delete(slug_cache_key)
+    # 按依赖标签失效详情与列表缓存
+    await cache_service.invalidate_tags(CacheTags.article(article_id), CacheTags.ARTICLE_LIST)
 
     return True
 
 
-async def increment_view_count(db: Session, article_id: UUID) -> Optional[Article]:
-    from sqlalchemy.orm import joinedload
+async def increment_view_count(
+    db: AsyncSession,
+    article_id: UUID,
+    article: Optional[ArticleWithAuthor] = None,
+) -> Optional[ArticleWithAuthor]:
+    """
+    记录一次文章浏览
 
-    db_article = (
-        db.query(Article)
-        .options(joinedload(Article.author))
-        .options(joinedload(Article.categories))
-        .options(joinedload(Article.tags))
-        .filter(Article.id == article_id)
-        .first()
-    )
-    if not db_article:
-        return None
+    浏览量写入 Redis 缓冲区，由 view_counter_service 定期批量落库；
+    返回的文章 Schema 已合并尚未落库的增量
+    """
+    from app.services.view_counter_service import view_counter_service
 
-    db_article.view_count = db_article.view_count + 1  # type: ignore
-    db.commit()
+    if article is None:
+        article = await get_article_async(db, article_id)
+        if not article:
+            return None
 
-    # 使用统一的缓存键更新缓存
-    cache_key = CacheKeys.article(article_id)
-    await cache_service.set(cache_key, db_article, expire=CacheTTL.ARTICLE)
+    if not await view_counter_service.record_view(article_id):
+        # 已直接写库，补上本次浏览即可（缓存中的 Schema 可能被共享，返回副本）
+        return article.model_copy(update={"view_count": (article.view_count or 0) + 1})
 
-    return db_article
+    return await view_counter_service.merge_pending(article)
 
 
 def get_featured_articles(db: Session, limit: int = 10):
     """Get featured articles based on view count and publication date"""
     from sqlalchemy.orm import joinedload
     
-    # 使用 joinedload 预加载作者信息，避免 N+1 查询
+    # 预加载作者、分类与标签（响应为 ArticleWithAuthor），避免 N+1 查询
     return (
         db.query(Article)
-        .options(joinedload(Article.author))
+        .options(joinedload(Article.author), joinedload(Article.categories), joinedload(Article.tags))
         .filter(Article.is_published == True)
         .order_by(Article.view_count.desc(), Article.created_at.desc())
         .limit(limit)
@@ -303,62 +418,6 @@ def get_featured_articles(db: Session, limit: int = 10):
     )
 
 
-def get_related_articles(db: Session, article_id: UUID, limit: int = 5):
-    """Get articles related to a specific article based on category or tags"""
-    from sqlalchemy.orm import joinedload
-    from app.models.article_category import ArticleCategory
-    from app.models.article_tag import ArticleTag
-    
-    # Get the original article (预加载关联数据)
-    original_article = (
-        db.query(Article)
-        .options(joinedload(Article.article_categories))
-        .filter(Article.id == article_id)
-        .first()
-    )
-    if not original_article:
-        return []
-    
-    # Find articles in the same category (预加载作者信息)
-    related_by_category = []
-    if original_article.article_categories and len(original_article.article_categories) > 0:
-        category_id = original_article.article_categories[0].category_id
-        related_by_category = (
-            db.query(Article)
-            .options(joinedload(Article.author))  # 预加载作者，避免 N+1
-            .join(ArticleCategory)
-            .filter(
-                Article.id != article_id,
-                Article.is_published == True,
-                ArticleCategory.category_id == category_id
-            )
-            .order_by(Article.view_count.desc())
-            .limit(limit)
-            .all()
-        )
-    
-    # If we don't have enough articles from the same category, get popular articles
-    if len(related_by_category) < limit:
-        remaining = limit - len(related_by_category)
-        existing_ids = [a.id for a in related_by_category]
-        existing_ids.append(article_id)
-        
-        popular_articles = (
-            db.query(Article)
-            .options(joinedload(Article.author))  # 预加载作者，避免 N+1
-            .filter(
-                Article.is_published == True,
-                ~Article.id.in_(existing_ids)
-            )
-            .order_by(Article.view_count.desc(), Article.created_at.desc())
-            .limit(remaining)
-            .all()
-        )
-        related_by_category.extend(popular_articles)
-    
-    return related_by_category
-
-
 def get_articles_with_categories_and_tags(db: Session, skip: int = 0, limit: int = 100, published_only: bool = True, category_id: UUID = None, tag_id: UUID = None, author_id: UUID = None, search: str = None):
     """Get articles with optimized query including joined relationships for categories and tags"""
     from sqlalchemy.orm import joinedload
@@ -366,7 +425,6 @@ def get_articles_with_categories_and_tags(db: Session, skip: int = 0, limit: int
     from app.models.article_tag import ArticleTag
     from app.models.category import Category
     from app.models.tag import Tag
-    from sqlalchemy import or_
 
     query = db.query(Article).options(
         joinedload(Article.author),
@@ -387,12 +445,7 @@ def get_articles_with_categories_and_tags(db: Session, skip: int = 0, limit: int
         query = query.join(ArticleTag).filter(ArticleTag.tag_id == tag_id)
 
     if search:
-        search_filter = or_(
-            Article.title.ilike(f"%{search}%"),
-            Article.content.ilike(f"%{search}%"),
-            Article.excerpt.ilike(f"%{search}%"),
-        )
-        query = query.filter(search_filter)
+        query = query.filter(article_search_service.match_filter(search))
 
     return query.offset(skip).limit(limit).all()
 
@@ -437,11 +490,10 @@ async def get_articles_with_cursor_pagination(
     search: Optional[str] = None,
     category_id: Optional[UUID] = None,
     tag_id: Optional[UUID] = None,
-) -> CursorPaginationResult[Article]:
+) -> CursorPaginationResult[ArticleWithAuthor]:
     """
     使用游标分页获取文章
     """
-    from sqlalchemy import desc
     from sqlalchemy.orm import joinedload
     
     # 构建基础查询
@@ -459,12 +511,7 @@ async def get_articles_with_cursor_pagination(
         query = query.filter(Article.author_id == author_id)
     
     if search:
-        search_filter = or_(
-            Article.title.ilike(f"%{search}%"),
-            Article.content.ilike(f"%{search}%"),
-            Article.excerpt.ilike(f"%{search}%"),
-        )
-        query = query.filter(search_filter)
+        query = query.filter(article_search_service.match_filter(search))
     
     # Filter by category if provided
     if category_id is not None:
@@ -476,14 +523,14 @@ async def get_articles_with_cursor_pagination(
         from app.models.article_tag import ArticleTag
         query = query.join(ArticleTag).filter(ArticleTag.tag_id == tag_id)
     
-    # 按创建时间倒序排列
-    query = query.order_by(desc(Article.created_at))
-    
-    # 使用游标分页函数
+    # 按 (created_at, id) 倒序做 keyset 分页，对应复合索引 idx_article_published_created_id
     result = paginate_with_cursor(
         query=query,
         cursor_params=cursor_params,
         sort_field=Article.created_at,
+        item_class=ArticleWithAuthor,
+        tiebreaker=Article.id,
+        descending=True,
     )
     
     return result
@@ -495,28 +542,37 @@ def search_articles_fulltext(
     published_only: bool = True,
     skip: int = 0,
     limit: int = 100,
-) -> list[Article]:
+) -> List[ArticleSearchResult]:
     """
-    使用PostgreSQL全文搜索功能搜索文章
+    全文搜索文章（中文二元组/jieba 分词 + BM25 排序），附带高亮摘要
     """
-    # 构建全文搜索查询
-    search_condition = text(
-        "search_vector @@ plainto_tsquery('english', :search_term)"
-    )
-    
-    query = db.query(Article).filter(search_condition.params(search_term=search_query))
-    
-    # 应用发布状态过滤
-    if published_only:
-        query = query.filter(Article.is_published == True)
-    
-    # 添加相关性排序
-    rank_expression = text(
-        "ts_rank(search_vector, plainto_tsquery('english', :search_term)) DESC"
+    from sqlalchemy.orm import joinedload
+
+    hits = article_search_service.search(
+        db, search_query, published_only=published_only, skip=skip, limit=limit
     )
-    query = query.order_by(rank_expression.params(search_term=search_query))
-    
-    # 应用分页
-    query = query.offset(skip).limit(limit)
-    
-    return query.all()
\ No newline at end of file
+    if not hits:
+        return []
+
+    articles = {
+        article.id: article
+        for article in db.query(Article)
+        .options(
+            joinedload(Article.author),
+            joinedload(Article.categories),
+            joinedload(Article.tags),
+        )
+        .filter(Article.id.in_([article_id for article_id, _ in hits]))
+        .all()
+    }
+
+    results = []
+    for article_id, score in hits:
+        article = articles.get(article_id)
+        if article is None:
+            continue
+        result = ArticleSearchResult.model_validate(article)
+        result.score = round(score, 4)
+        result.snippet = article_search_service.snippet(article, search_query)
+        results.append(result)
+    return results
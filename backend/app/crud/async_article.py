@@ -0,0 +1,124 @@
+"""
+Article Async CRUD Operations
+文章异步数据库操作（基于 AsyncSession，用于高并发读取路径）
+"""
+
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from app.models.article import Article
+from app.models.article_category import ArticleCategory
+
+
+def _with_relationships(stmt):
+    """
+    为查询附加作者、分类、标签的预加载选项
+
+    多对多集合使用 selectinload，避免 joinedload 产生的行膨胀及 unique() 去重开销
+    """
+    return stmt.options(
+        joinedload(Article.author),
+        selectinload(Article.categories),
+        selectinload(Article.tags),
+    )
+
+
+async def get_article_with_relationships(db: AsyncSession, article_id: UUID) -> Optional[Article]:
+    """
+    根据 ID 获取文章及其关联数据
+
+    Args:
+        db: 异步数据库会话
+        article_id: 文章 ID
+
+    Returns:
+        Article: 文章对象或 None
+    """
+    stmt = _with_relationships(select(Article)).where(Article.id == article_id)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def get_article_by_slug_with_relationships(db: AsyncSession, slug: str) -> Optional[Article]:
+    """
+    根据 slug 获取文章及其关联数据
+
+    Args:
+        db: 异步数据库会话
+        slug: 文章 slug
+
+    Returns:
+        Article: 文章对象或 None
+    """
+    stmt = _with_relationships(select(Article)).where(Article.slug == slug)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def get_related_articles(db: AsyncSession, article_id: UUID, limit: int = 5) -> List[Article]:
+    """
+    获取相关文章：优先同分类的已发布文章（按浏览量），不足时用热门文章补齐
+
+    Args:
+        db: 异步数据库会话
+        article_id: 文章 ID
+        limit: 返回数量
+
+    Returns:
+        List[Article]: 文章列表（已预加载作者、分类、标签）
+    """
+    category_id = (await db.execute(
+        select(ArticleCategory.category_id).where(ArticleCategory.article_id == article_id).limit(1)
+    )).scalar_one_or_none()
+
+    related: List[Article] = []
+    if category_id is not None:
+        stmt = (
+            _with_relationships(select(Article))
+            .join(ArticleCategory, ArticleCategory.article_id == Article.id)
+            .where(
+                Article.id != article_id,
+                Article.is_published == True,
+                ArticleCategory.category_id == category_id,
+            )
+            .order_by(Article.view_count.desc())
+            .limit(limit)
+        )
+        related = list((await db.execute(stmt)).scalars().all())
+
+    if len(related) < limit:
+        excluded = [article.id for article in related] + [article_id]
+        stmt = (
+            _with_relationships(select(Article))
+            .where(Article.is_published == True, Article.id.not_in(excluded))
+            .order_by(Article.view_count.desc(), Article.created_at.desc())
+            .limit(limit - len(related))
+        )
+        related.extend((await db.execute(stmt)).scalars().all())
+
+    return related
+
+
+async def increment_view_count(db: AsyncSession, article_id: UUID, amount: int = 1) -> bool:
+    """
+    原子地增加文章浏览量
+
+    直接下发 UPDATE ... SET view_count = view_count + N，不加载文章实体
+
+    Args:
+        db: 异步数据库会话
+        article_id: 文章 ID
+        amount: 增加的数量
+
+    Returns:
+        bool: 是否更新成功
+    """
+    result = await db.execute(
+        update(Article)
+        .where(Article.id == article_id)
+        .values(view_count=Article.view_count + amount, updated_at=Article.updated_at)
+    )
+    await db.commit()
+    return result.rowcount > 0
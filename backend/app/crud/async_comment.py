@@ -0,0 +1,81 @@
+"""
+Comment Async CRUD Operations
+评论异步数据库操作（基于 AsyncSession，用于高并发读取路径）
+"""
+
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.models.comment import Comment
+
+
+async def get_comment(db: AsyncSession, comment_id: UUID, with_relationships: bool = False) -> Optional[Comment]:
+    """
+    根据 ID 获取评论
+
+    Args:
+        db: 异步数据库会话
+        comment_id: 评论 ID
+        with_relationships: 是否预加载文章和作者
+
+    Returns:
+        Comment: 评论对象或 None
+    """
+    stmt = select(Comment).where(Comment.id == comment_id)
+    if with_relationships:
+        stmt = stmt.options(joinedload(Comment.article), joinedload(Comment.author))
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def get_replies(
+    db: AsyncSession,
+    comment_id: UUID,
+    skip: int = 0,
+    limit: int = 100,
+    with_relationships: bool = True,
+) -> List[Comment]:
+    """
+    获取评论的回复列表
+
+    Args:
+        db: 异步数据库会话
+        comment_id: 父评论 ID
+        skip: 跳过数量
+        limit: 限制数量
+        with_relationships: 是否预加载作者，默认为 True 以防止 N+1 查询
+
+    Returns:
+        List[Comment]: 回复列表
+    """
+    stmt = select(Comment).where(Comment.parent_id == comment_id)
+
+    if with_relationships:
+        stmt = stmt.options(joinedload(Comment.author))
+
+    stmt = stmt.order_by(Comment.created_at.asc()).offset(skip).limit(limit)
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def get_approved_comments_by_article(db: AsyncSession, article_id: UUID) -> List[Comment]:
+    """
+    一次查询获取文章的全部已审核评论（含回复），按时间正序，预加载作者
+
+    Args:
+        db: 异步数据库会话
+        article_id: 文章 ID
+
+    Returns:
+        List[Comment]: 评论列表
+    """
+    stmt = (
+        select(Comment)
+        .options(joinedload(Comment.author))
+        .where(Comment.article_id == article_id, Comment.is_approved == True)
+        .order_by(Comment.created_at.asc(), Comment.id.asc())
+    )
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
@@ -0,0 +1,435 @@
+"""
+Conversation Async CRUD Operations
+对话异步数据库操作（基于 AsyncSession，供对话引擎使用）
+"""
+
+from typing import List, Optional
+from sqlalchemy import and_, desc, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.conversation import Conversation, ConversationMessage
+from app.schemas.conversation import ConversationCreate, ConversationUpdate, ConversationMessageCreate
+import uuid
+from app.utils.logger import app_logger
+from app.services.tokenizer_service import tokenizer_service
+from app.utils.pagination import CursorPaginationParams, CursorPaginationResult, paginate_with_cursor_async
+
+
+async def get_conversation(db: AsyncSession, conversation_id: str) -> Optional[Conversation]:
+    """
+    根据 ID 获取对话
+    
+    Args:
+        db: 异步数据库会话
+        conversation_id: 对话 ID
+    
+    Returns:
+        Conversation: 对话对象或 None
+    """
+    result = await db.execute(
+        select(Conversation).where(Conversation.id == conversation_id)
+    )
+    return result.scalar_one_or_none()
+
+
+# 对话最近活动时间：新建后未更新的对话 updated_at 为空，回退到 created_at
+# （对应表达式索引 idx_conversation_user_activity）
+conversation_activity = func.coalesce(Conversation.updated_at, Conversation.created_at)
+
+
+def _conversations_stmt(tenant_id: str, user_id: str, status: Optional[str]):
+    stmt = select(Conversation).where(
+        and_(
+            Conversation.tenant_id == tenant_id,
+            Conversation.user_id == user_id,
+        )
+    )
+    
+    if status:
+        stmt = stmt.where(Conversation.status == status)
+    return stmt
+
+
+async def get_conversations(
+    db: AsyncSession,
+    tenant_id: str,
+    user_id: str,
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+) -> List[Conversation]:
+    """
+    获取对话列表
+    
+    Args:
+        db: 异步数据库会话
+        tenant_id: 租户 ID
+        user_id: 用户 ID
+        skip: 跳过数量
+        limit: 限制数量
+        status: 状态筛选
+    
+    Returns:
+        List[Conversation]: 对话列表
+    """
+    stmt = _conversations_stmt(tenant_id, user_id, status)
+    stmt = stmt.order_by(desc(conversation_activity), desc(Conversation.id)).offset(skip).limit(limit)
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def get_conversations_page(
+    db: AsyncSession,
+    tenant_id: str,
+    user_id: str,
+    cursor_params: CursorPaginationParams,
+    status: Optional[str] = None,
+) -> CursorPaginationResult:
+    """
+    游标分页获取对话列表（按最近活动时间倒序）
+    
+    Args:
+        db: 异步数据库会话
+        tenant_id: 租户 ID
+        user_id: 用户 ID
+        cursor_params: 游标分页参数
+        status: 状态筛选
+    
+    Returns:
+        CursorPaginationResult: 分页结果
+    """
+    return await paginate_with_cursor_async(
+        db,
+        _conversations_stmt(tenant_id, user_id, status),
+        cursor_params,
+        conversation_activity,
+        tiebreaker=Conversation.id,
+        sort_key=lambda conversation: conversation.updated_at or conversation.created_at,
+    )
+
+
+async def count_conversations(
+    db: AsyncSession,
+    tenant_id: str,
+    user_id: str,
+    status: Optional[str] = None,
+) -> int:
+    """
+    统计对话数量
+    
+    Args:
+        db: 异步数据库会话
+        tenant_id: 租户 ID
+        user_id: 用户 ID
+        status: 状态筛选
+    
+    Returns:
+        int: 对话数量
+    """
+    stmt = select(func.count(Conversation.id)).where(
+        and_(
+            Conversation.tenant_id == tenant_id,
+            Conversation.user_id == user_id,
+        )
+    )
+    
+    if status:
+        stmt = stmt.where(Conversation.status == status)
+    
+    result = await db.execute(stmt)
+    return result.scalar_one()
+
+
+async def create_conversation(
+    db: AsyncSession,
+    conversation_in: ConversationCreate,
+    tenant_id: str,
+    user_id: str,
+) -> Conversation:
+    """
+    创建新对话
+    
+    Args:
+        db: 异步数据库会话
+        conversation_in: 创建请求
+        tenant_id: 租户 ID
+        user_id: 用户 ID
+    
+    Returns:
+        Conversation: 创建的对话对象
+    """
+    db_conversation = Conversation(
+        id=uuid.uuid4(),
+        tenant_id=tenant_id,
+        user_id=user_id,
+        **conversation_in.dict()
+    )
+    db.add(db_conversation)
+    await db.commit()
+    await db.refresh(db_conversation)
+    app_logger.info(f"Created conversation: {db_conversation.id}")
+    return db_conversation
+
+
+async def update_conversation(
+    db: AsyncSession,
+    db_conversation: Conversation,
+    conversation_in: ConversationUpdate,
+) -> Conversation:
+    """
+    更新对话
+    
+    Args:
+        db: 异步数据库会话
+        db_conversation: 现有对话对象
+        conversation_in: 更新请求
+    
+    Returns:
+        Conversation: 更新后的对话对象
+    """
+    for field, value in conversation_in.dict(exclude_unset=True).items():
+        setattr(db_conversation, field, value)
+    db.add(db_conversation)
+    await db.commit()
+    await db.refresh(db_conversation)
+    app_logger.info(f"Updated conversation: {db_conversation.id}")
+    return db_conversation
+
+
+async def delete_conversation(db: AsyncSession, conversation_id: str) -> Optional[Conversation]:
+    """
+    删除对话
+    
+    Args:
+        db: 异步数据库会话
+        conversation_id: 对话 ID
+    
+    Returns:
+        Conversation: 被删除的对话对象
+    """
+    conversation = await get_conversation(db, conversation_id)
+    if conversation:
+        await db.delete(conversation)
+        await db.commit()
+        app_logger.info(f"Deleted conversation: {conversation_id}")
+    return conversation
+
+
+async def get_conversation_messages(
+    db: AsyncSession,
+    conversation_id: str,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[ConversationMessage]:
+    """
+    获取对话消息列表
+    
+    Args:
+        db: 异步数据库会话
+        conversation_id: 对话 ID
+        skip: 跳过数量
+        limit: 限制数量
+    
+    Returns:
+        List[ConversationMessage]: 消息列表
+    """
+    result = await db.execute(
+        select(ConversationMessage)
+        .where(ConversationMessage.conversation_id == conversation_id)
+        .order_by(ConversationMessage.created_at, ConversationMessage.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def get_conversation_messages_page(
+    db: AsyncSession,
+    conversation_id: str,
+    cursor_params: CursorPaginationParams,
+) -> CursorPaginationResult:
+    """
+    游标分页获取对话消息（按 (created_at, id) 正序）
+    
+    Args:
+        db: 异步数据库会话
+        conversation_id: 对话 ID
+        cursor_params: 游标分页参数
+    
+    Returns:
+        CursorPaginationResult: 分页结果
+    """
+    return await paginate_with_cursor_async(
+        db,
+        select(ConversationMessage).where(ConversationMessage.conversation_id == conversation_id),
+        cursor_params,
+        ConversationMessage.created_at,
+        tiebreaker=ConversationMessage.id,
+        descending=False,
+    )
+
+
+async def create_conversation_message(
+    db: AsyncSession,
+    message_in: ConversationMessageCreate,
+    conversation_id: str,
+    model: Optional[str] = None,
+) -> ConversationMessage:
+    """
+    创建对话消息
+    
+    未指定 tokens 时按消息所用模型的分词器计算，并累加到对话的 total_tokens
+    
+    Args:
+        db: 异步数据库会话
+        message_in: 创建请求
+        conversation_id: 对话 ID
+        model: 模型名称
+    
+    Returns:
+        ConversationMessage: 创建的消息对象
+    """
+    data = message_in.dict()
+    if not data.get("tokens"):
+        # Token 数只在写入时计算一次
+        data["tokens"] = tokenizer_service.count(data["content"], model)
+    
+    db_message = ConversationMessage(
+        id=uuid.uuid4(),
+        conversation_id=conversation_id,
+        model=model,
+        **data
+    )
+    db.add(db_message)
+    # 累计 Token 数与消息在同一事务中更新，上下文窗口据此判断是否需要摘要
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(total_tokens=Conversation.total_tokens + data["tokens"])
+    )
+    await db.commit()
+    await db.refresh(db_message)
+    return db_message
+
+
+async def delete_conversation_messages(
+    db: AsyncSession,
+    conversation_id: str,
+) -> int:
+    """
+    删除对话的所有消息
+    
+    Args:
+        db: 异步数据库会话
+        conversation_id: 对话 ID
+    
+    Returns:
+        int: 删除的消息数量
+    """
+    result = await db.execute(
+        delete(ConversationMessage).where(
+            ConversationMessage.conversation_id == conversation_id
+        )
+    )
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(total_tokens=0, total_messages=0)
+    )
+    await db.commit()
+    
+    count = result.rowcount
+    app_logger.info(f"Deleted {count} messages from conversation {conversation_id}")
+    return count
+
+
+async def update_conversation_stats(
+    db: AsyncSession,
+    conversation_id: str,
+    increment_messages: int = 0,
+    increment_tokens: int = 0,
+) -> bool:
+    """
+    更新对话统计信息
+    
+    使用原子 UPDATE 累加计数，避免先读后写的竞争和额外往返
+    
+    Args:
+        db: 异步数据库会话
+        conversation_id: 对话 ID
+        increment_messages: 增加的消息数
+        increment_tokens: 增加的 Token 数
+    
+    Returns:
+        bool: 是否更新成功
+    """
+    result = await db.execute(
+        update(Conversation)
+        .where(Conversation.id == conversation_id)
+        .values(
+            total_messages=Conversation.total_messages + increment_messages,
+            total_tokens=Conversation.total_tokens + increment_tokens,
+        )
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+
+async def backfill_message_tokens(db: AsyncSession, batch_size: int = 500) -> int:
+    """
+    为未记录 Token 数的历史消息批量计算并写入 Token 数
+    
+    按主键 keyset 分批读取，同一批内按模型分组批量编码；
+    写入后重新汇总受影响对话的 total_tokens
+    
+    Args:
+        db: 异步数据库会话
+        batch_size: 每批处理的消息数
+    
+    Returns:
+        int: 更新的消息数量
+    """
+    updated = 0
+    last_id = None
+    
+    while True:
+        stmt = (
+            select(ConversationMessage.id, ConversationMessage.conversation_id, ConversationMessage.content, ConversationMessage.model)
+            .where(or_(ConversationMessage.tokens.is_(None), ConversationMessage.tokens == 0))
+            .order_by(ConversationMessage.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(ConversationMessage.id > last_id)
+        rows = (await db.execute(stmt)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        
+        by_model = {}
+        for row in rows:
+            by_model.setdefault(row.model, []).append(row)
+        
+        params = []
+        for model, group in by_model.items():
+            counts = tokenizer_service.count_batch([row.content for row in group], model)
+            params.extend({"id": row.id, "tokens": count} for row, count in zip(group, counts))
+        await db.execute(update(ConversationMessage), params)
+        
+        conversation_ids = {row.conversation_id for row in rows}
+        totals = (
+            select(func.coalesce(func.sum(ConversationMessage.tokens), 0))
+            .where(ConversationMessage.conversation_id == Conversation.id)
+            .scalar_subquery()
+        )
+        await db.execute(
+            update(Conversation)
+            .where(Conversation.id.in_(conversation_ids))
+            # 保持 updated_at 不变，回填不应改变对话的最近活动排序
+            .values(total_tokens=totals, updated_at=Conversation.updated_at)
+        )
+        await db.commit()
+        
+        updated += len(rows)
+        app_logger.info(f"Backfilled tokens for {updated} messages")
+    
+    return updated
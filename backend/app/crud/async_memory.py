@@ -0,0 +1,193 @@
+"""
+Memory Async CRUD Operations
+记忆异步数据库操作（基于 AsyncSession，供对话检索路径使用）
+"""
+
+import uuid
+from typing import List, Optional, Tuple
+from sqlalchemy import and_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.memory import nearest_memories_stmt
+from app.models.memory import Memory
+from app.utils.logger import app_logger
+from app.utils.vector_index import dot
+
+
+async def get_memory(db: AsyncSession, memory_id: str) -> Optional[Memory]:
+    """
+    根据 ID 获取记忆
+    
+    Args:
+        db: 异步数据库会话
+        memory_id: 记忆 ID
+    
+    Returns:
+        Memory: 记忆对象或 None
+    """
+    result = await db.execute(select(Memory).where(Memory.id == memory_id))
+    return result.scalar_one_or_none()
+
+
+async def search_memories(
+    db: AsyncSession,
+    tenant_id: str,
+    user_id: str,
+    query_embedding: List[float],
+    memory_type: Optional[str] = None,
+    min_importance: Optional[float] = None,
+    top_k: int = 10,
+) -> List[Tuple[Memory, float]]:
+    """
+    按向量相似度搜索记忆
+    
+    PostgreSQL 上在用户的记忆中按 pgvector 余弦距离精确排序，其它数据库在 Python 中计算用户全部记忆的相似度
+    
+    Args:
+        db: 异步数据库会话
+        tenant_id: 租户 ID
+        user_id: 用户 ID
+        query_embedding: 归一化的查询向量
+        memory_type: 记忆类型筛选
+        min_importance: 最小重要性筛选
+        top_k: 返回数量
+    
+    Returns:
+        List[Tuple[Memory, float]]: (记忆, 余弦相似度) 按相似度降序
+    """
+    stmt = _filtered(select(Memory), tenant_id, user_id, memory_type, min_importance)
+    
+    if db.bind.dialect.name == "postgresql":
+        result = await db.execute(nearest_memories_stmt(stmt, query_embedding, top_k))
+        return [(memory, 1.0 - dist) for memory, dist in result.all()]
+    
+    result = await db.execute(stmt)
+    scored = [(memory, dot(query_embedding, memory.embedding)) for memory in result.scalars().all()]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:top_k]
+
+
+def _filtered(stmt, tenant_id: str, user_id: str, memory_type: Optional[str], min_importance: Optional[float]):
+    stmt = stmt.where(
+        and_(
+            Memory.tenant_id == tenant_id,
+            Memory.user_id == user_id,
+            Memory.embedding.isnot(None),
+        )
+    )
+    if memory_type:
+        stmt = stmt.where(Memory.memory_type == memory_type)
+    if min_importance is not None:
+        stmt = stmt.where(Memory.importance >= min_importance)
+    return stmt
+
+
+async def get_memory_embeddings(
+    db: AsyncSession,
+    tenant_id: str,
+    user_id: str,
+) -> List[Tuple[uuid.UUID, List[float]]]:
+    """
+    获取用户全部记忆的向量（用于加载进程内向量索引分片）
+    
+    Args:
+        db: 异步数据库会话
+        tenant_id: 租户 ID
+        user_id: 用户 ID
+    
+    Returns:
+        List[Tuple[uuid.UUID, List[float]]]: (记忆 ID, 向量) 列表
+    """
+    stmt = _filtered(select(Memory.id, Memory.embedding), tenant_id, user_id, None, None)
+    result = await db.execute(stmt)
+    return [(row.id, row.embedding) for row in result.all()]
+
+
+async def get_memories_by_ids(
+    db: AsyncSession,
+    memory_ids: List[uuid.UUID],
+    memory_type: Optional[str] = None,
+    min_importance: Optional[float] = None,
+) -> List[Memory]:
+    """
+    按 ID 批量获取记忆（已删除的 ID 自动跳过）
+    
+    Args:
+        db: 异步数据库会话
+        memory_ids: 记忆 ID 列表
+        memory_type: 记忆类型筛选
+        min_importance: 最小重要性筛选
+    
+    Returns:
+        List[Memory]: 记忆列表（顺序不保证）
+    """
+    if not memory_ids:
+        return []
+    stmt = select(Memory).where(Memory.id.in_(memory_ids))
+    if memory_type:
+        stmt = stmt.where(Memory.memory_type == memory_type)
+    if min_importance is not None:
+        stmt = stmt.where(Memory.importance >= min_importance)
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def backfill_memory_embeddings(db: AsyncSession, embed, batch_size: int = 256) -> int:
+    """
+    为没有向量的历史记忆批量计算并写入向量
+    
+    Args:
+        db: 异步数据库会话
+        embed: 批量向量化函数 async (List[str]) -> List[List[float]]
+        batch_size: 每批处理的记忆数
+    
+    Returns:
+        int: 更新的记忆数量
+    """
+    updated = 0
+    last_id = None
+    
+    while True:
+        stmt = (
+            select(Memory.id, Memory.content)
+            .where(Memory.embedding.is_(None))
+            .order_by(Memory.id)
+            .limit(batch_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(Memory.id > last_id)
+        rows = (await db.execute(stmt)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        
+        vectors = await embed([row.content for row in rows])
+        await db.execute(
+            update(Memory),
+            [{"id": row.id, "embedding": vector} for row, vector in zip(rows, vectors)],
+        )
+        await db.commit()
+        
+        updated += len(rows)
+        app_logger.info(f"Backfilled embeddings for {updated} memories")
+    
+    return updated
+
+
+async def increment_memory_access(db: AsyncSession, memory_id: str) -> bool:
+    """
+    增加记忆访问计数
+    
+    Args:
+        db: 异步数据库会话
+        memory_id: 记忆 ID
+    
+    Returns:
+        bool: 是否更新成功
+    """
+    result = await db.execute(
+        update(Memory)
+        .where(Memory.id == memory_id)
+        .values(access_count=Memory.access_count + 1)
+    )
+    await db.commit()
+    return result.rowcount > 0
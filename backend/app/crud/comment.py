@@ -1,8 +1,13 @@
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.crud import async_comment
 from app.models.comment import Comment
-from app.schemas.comment import CommentCreate, CommentUpdate
+from app.schemas.comment import CommentCreate, CommentUpdate, CommentNode, CommentTree, CommentTreePage
+from app.services.cache_service import cache_service, cache_get_or_set
+from app.utils.cache_keys import CacheKeys, CacheTTL
+from app.utils.pagination import CursorPaginationParams, CursorPaginationResult, paginate_with_cursor
 
 
 def get_comment(db: Session, comment_id: UUID, with_relationships: bool = False) -> Optional[Comment]:
@@ -56,8 +61,13 @@ def get_comments_by_article(
         with_relationships: 是否预加载关联数据（作者），
                            默认为 True 以防止 N+1 查询问题
     """
+    query = _comments_by_article_query(db, article_id, approved_only, with_relationships)
+    return query.order_by(Comment.created_at.desc()).offset(skip).limit(limit).all()
+
+
+def _comments_by_article_query(db: Session, article_id: UUID, approved_only: bool, with_relationships: bool):
     from sqlalchemy.orm import joinedload
-    
+
     query = db.query(Comment).filter(Comment.article_id == article_id)
 
     if approved_only:
@@ -70,7 +80,135 @@ def get_comments_by_article(
     if with_relationships:
         query = query.options(joinedload(Comment.author))
 
-    return query.order_by(Comment.created_at.desc()).offset(skip).limit(limit).all()
+    return query
+
+
+def get_comments_by_article_page(
+    db: Session,
+    article_id: UUID,
+    cursor_params: CursorPaginationParams,
+    approved_only: bool = True,
+    with_relationships: bool = True,
+) -> CursorPaginationResult:
+    """
+    游标分页获取文章的顶层评论（按 (created_at, id) 倒序）
+
+    Args:
+        db: 数据库会话
+        article_id: 文章 ID
+        cursor_params: 游标分页参数
+        approved_only: 是否只返回已审核评论
+        with_relationships: 是否预加载作者
+
+    Returns:
+        CursorPaginationResult: 分页结果
+    """
+    query = _comments_by_article_query(db, article_id, approved_only, with_relationships)
+    return paginate_with_cursor(query, cursor_params, Comment.created_at, tiebreaker=Comment.id)
+
+
+def build_comment_tree(comments: Iterable[Comment]) -> List[CommentNode]:
+    """
+    把扁平的评论列表组装为评论树（O(n)）
+
+    父评论不在列表中的评论（例如父评论未审核）连同其子树一起被丢弃
+
+    Args:
+        comments: 按 (created_at, id) 正序排列的评论（需已加载作者）
+
+    Returns:
+        List[CommentNode]: 顶层评论，按时间倒序；每层回复按时间正序
+    """
+    nodes: Dict[UUID, CommentNode] = {}
+    for comment in comments:
+        nodes[comment.id] = CommentNode.model_validate(comment)
+
+    roots = []
+    for node in nodes.values():
+        if node.parent_id is None:
+            roots.append(node)
+        else:
+            parent = nodes.get(node.parent_id)
+            if parent is not None:
+                parent.children.append(node)
+
+    roots.reverse()
+    return roots
+
+
+def _count_nodes(nodes: List[CommentNode]) -> int:
+    count = 0
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+async def get_comment_tree(db: AsyncSession, article_id: UUID) -> CommentTree:
+    """
+    一次查询加载文章的全部已审核评论并组装为评论树
+
+    Args:
+        db: 异步数据库会话
+        article_id: 文章 ID
+
+    Returns:
+        CommentTree: 评论树
+    """
+    comments = await async_comment.get_approved_comments_by_article(db, article_id)
+    threads = build_comment_tree(comments)
+    return CommentTree(article_id=article_id, threads=threads, total_comments=_count_nodes(threads))
+
+
+def paginate_comment_tree(tree: CommentTree, skip: int = 0, limit: int = 20) -> CommentTreePage:
+    """
+    按顶层评论分页，每个顶层评论带上完整的回复子树
+
+    Args:
+        tree: 评论树
+        skip: 跳过的顶层评论数
+        limit: 返回的顶层评论数
+
+    Returns:
+        CommentTreePage: 分页结果
+    """
+    threads = tree.threads[skip:skip + limit]
+    return CommentTreePage(
+        article_id=tree.article_id,
+        threads=threads,
+        total_comments=tree.total_comments,
+        page_comments=_count_nodes(threads),
+        total_threads=len(tree.threads),
+        skip=skip,
+        limit=limit,
+    )
+
+
+async def get_comment_tree_page(db: AsyncSession, article_id: UUID, skip: int = 0, limit: int = 20) -> CommentTreePage:
+    """
+    获取文章评论树的一页（整棵树按文章缓存，由评论写入方失效）
+
+    Args:
+        db: 异步数据库会话
+        article_id: 文章 ID
+        skip: 跳过的顶层评论数
+        limit: 返回的顶层评论数
+
+    Returns:
+        CommentTreePage: 分页结果
+    """
+    async def fetch():
+        return await get_comment_tree(db, article_id)
+
+    tree = await cache_get_or_set(
+        CacheKeys.comment_tree(article_id),
+        fetch,
+        CacheTTL.COMMENT,
+        tags=CacheKeys.comment_tree_tags,
+    )
+    return paginate_comment_tree(tree, skip, limit)
 
 
 def get_comments_by_author(
@@ -143,6 +281,21 @@ def update_comment(db: Session, comment_id: UUID, comment_update: CommentUpdate)
     return db_comment
 
 
+async def clear_comment_caches(comment_id: Optional[UUID], article_id: Optional[UUID]) -> None:
+    """清除评论及其所属文章的评论列表、评论树缓存（同步接口中通过 BackgroundTasks 调用）"""
+    if comment_id:
+        await cache_service.delete(CacheKeys.comment(comment_id))
+
+    if article_id:
+        await cache_service.delete(CacheKeys.comment_list_by_article(
+            article_id,
+            approved_only=True,
+            skip=0,
+            limit=100
+        ))
+        await cache_service.delete(CacheKeys.comment_tree(article_id))
+
+
 async def update_comment_with_cache_clear(
     db: Session,
     comment_id: UUID,
@@ -161,19 +314,7 @@ async def update_comment_with_cache_clear(
     db.commit()
     db.refresh(db_comment)
 
-    # 清除缓存
-    cache_key = CacheKeys.comment(comment_id)
-    await cache_service.delete(cache_key)
-
-    # 清除文章评论列表缓存
-    if db_comment.article_id:
-        article_comments_key = CacheKeys.comment_list_by_article(
-            db_comment.article_id,
-            approved_only=True,
-            skip=0,
-            limit=100
-        )
-        await cache_service.delete(article_comments_key)
+    await clear_comment_caches(comment_id, db_comment.article_id)
 
     return db_comment
 
@@ -198,19 +339,7 @@ async def delete_comment_with_cache_clear(db: Session, comment_id: UUID) -> bool
     db.delete(db_comment)
     db.commit()
 
-    # 清除缓存
-    cache_key = CacheKeys.comment(comment_id)
-    await cache_service.delete(cache_key)
-
-    # 清除文章评论列表缓存
-    if article_id:
-        article_comments_key = CacheKeys.comment_list_by_article(
-            article_id,
-            approved_only=True,
-            skip=0,
-            limit=100
-        )
-        await cache_service.delete(article_comments_key)
+    await clear_comment_caches(comment_id, article_id)
 
     return True
 
@@ -239,18 +368,6 @@ async def approve_comment_with_cache_clear(
     db.commit()
     db.refresh(db_comment)
 
-    # 清除缓存
-    cache_key = CacheKeys.comment(comment_id)
-    await cache_service.delete(cache_key)
-
-    # 清除文章评论列表缓存
-    if db_comment.article_id:
-        article_comments_key = CacheKeys.comment_list_by_article(
-            db_comment.article_id,
-            approved_only=True,
-            skip=0,
-            limit=100
-        )
-        await cache_service.delete(article_comments_key)
+    await clear_comment_caches(comment_id, db_comment.article_id)
 
     return db_comment
\ No newline at end of file
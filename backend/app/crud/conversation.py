@@ -10,6 +10,7 @@ from app.models.conversation import Conversation, ConversationMessage
 from app.schemas.conversation import ConversationCreate, ConversationUpdate, ConversationMessageCreate
 import uuid
 from app.utils.logger import app_logger
+from app.services.tokenizer_service import tokenizer_service
 
 
 def get_conversation(db: Session, conversation_id: str) -> Optional[Conversation]:
@@ -178,6 +179,8 @@ def create_conversation_message(
     """
     创建对话消息
     
+    未指定 tokens 时按消息所用模型的分词器计算，并累加到对话的 total_tokens
+    
     Args:
         db: 数据库会话
         message_in: 创建请求
@@ -187,13 +190,22 @@ def create_conversation_message(
     Returns:
         ConversationMessage: 创建的消息对象
     """
+    data = message_in.dict()
+    if not data.get("tokens"):
+        # Token 数只在写入时计算一次
+        data["tokens"] = tokenizer_service.count(data["content"], model)
+    
     db_message = ConversationMessage(
         id=uuid.uuid4(),
         conversation_id=conversation_id,
         model=model,
-        **message_in.dict()
+        **data
     )
     db.add(db_message)
+    db.query(Conversation).filter(Conversation.id == conversation_id).update(
+        {Conversation.total_tokens: Conversation.total_tokens + data["tokens"]},
+        synchronize_session=False,
+    )
     db.commit()
     db.refresh(db_message)
     return db_message
@@ -222,6 +234,10 @@ def delete_conversation_messages(
     db.query(ConversationMessage).filter(
         ConversationMessage.conversation_id == conversation_id
     ).delete()
+    db.query(Conversation).filter(Conversation.id == conversation_id).update(
+        {Conversation.total_tokens: 0, Conversation.total_messages: 0},
+        synchronize_session=False,
+    )
     db.commit()
     
     app_logger.info(f"Deleted {count} messages from conversation {conversation_id}")
@@ -3,13 +3,14 @@ Memory CRUD Operations
 记忆数据库操作
 """
 
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import Float, and_, desc, select
 from app.models.memory import Memory
 from app.schemas.memory import MemoryCreate, MemoryUpdate
 from datetime import datetime
 from app.utils.logger import app_logger
+from app.utils.vector_index import dot
 
 
 def get_memory(db: Session, memory_id: str) -> Optional[Memory]:
@@ -70,34 +71,58 @@ def get_memories(
     )
 
 
+def nearest_memories_stmt(stmt, query_embedding: List[float], top_k: int):
+    """
+    构造按余弦距离精确排序的检索语句（PostgreSQL / pgvector）
+
+    先在物化 CTE 中按租户/用户等条件过滤（走 idx_memory_user）并计算距离，再在外层排序取 top_k。
+    全局近似索引会先取近邻再过滤，单个用户只占很小比例时结果会少于 top_k 甚至为空
+
+    Args:
+        stmt: 已带过滤条件的 select(Memory) 语句
+        query_embedding: 归一化的查询向量
+        top_k: 返回数量
+
+    Returns:
+        Select: 返回 (Memory, 余弦距离) 的语句
+    """
+    distance = Memory.embedding.op("<=>", return_type=Float)(query_embedding).label("distance")
+    candidates = stmt.add_columns(distance).cte("candidates").prefix_with("MATERIALIZED")
+    memory = aliased(Memory, candidates)
+    return select(memory, candidates.c.distance).order_by(candidates.c.distance).limit(top_k)
+
+
 def search_memories(
     db: Session,
     tenant_id: str,
     user_id: str,
-    query: str,
+    query_embedding: List[float],
     memory_type: Optional[str] = None,
     min_importance: Optional[float] = None,
     top_k: int = 10,
-) -> List[Memory]:
+) -> List[Tuple[Memory, float]]:
     """
-    搜索记忆
+    按向量相似度搜索记忆
+    
+    PostgreSQL 上在用户的记忆中按 pgvector 余弦距离精确排序，其它数据库在 Python 中计算用户全部记忆的相似度
     
     Args:
         db: 数据库会话
         tenant_id: 租户 ID
         user_id: 用户 ID
-        query: 搜索查询
+        query_embedding: 归一化的查询向量
         memory_type: 记忆类型筛选
         min_importance: 最小重要性筛选
         top_k: 返回数量
     
     Returns:
-        List[Memory]: 匹配的记忆列表
+        List[Tuple[Memory, float]]: (记忆, 余弦相似度) 按相似度降序
     """
     query_obj = db.query(Memory).filter(
         and_(
             Memory.tenant_id == tenant_id,
             Memory.user_id == user_id,
+            Memory.embedding.isnot(None),
         )
     )
     
@@ -106,13 +131,13 @@ def search_memories(
     if min_importance is not None:
         query_obj = query_obj.filter(Memory.importance >= min_importance)
     
-    query_obj = query_obj.filter(Memory.content.ilike(f"%{query}%"))
+    if db.bind.dialect.name == "postgresql":
+        rows = db.execute(nearest_memories_stmt(query_obj.statement, query_embedding, top_k)).all()
+        return [(memory, 1.0 - dist) for memory, dist in rows]
     
-    return (
-        query_obj.order_by(desc(Memory.importance), desc(Memory.created_at))
-        .limit(top_k)
-        .all()
-    )
+    scored = [(memory, dot(query_embedding, memory.embedding)) for memory in query_obj.all()]
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:top_k]
 
 
 def get_expired_memories(db: Session, tenant_id: str) -> List[Memory]:
@@ -144,6 +169,7 @@ def create_memory(
     memory_in: MemoryCreate,
     tenant_id: str,
     user_id: str,
+    embedding: Optional[List[float]] = None,
 ) -> Memory:
     """
     创建新记忆
@@ -153,6 +179,7 @@ def create_memory(
         memory_in: 创建请求
         tenant_id: 租户 ID
         user_id: 用户 ID
+        embedding: 内容向量
     
     Returns:
         Memory: 创建的记忆对象
@@ -162,6 +189,7 @@ def create_memory(
         id=uuid.uuid4(),
         tenant_id=tenant_id,
         user_id=user_id,
+        embedding=embedding,
         **memory_in.dict()
     )
     db.add(db_memory)
@@ -176,6 +204,7 @@ def create_memories_batch(
     memories_in: List[MemoryCreate],
     tenant_id: str,
     user_id: str,
+    embeddings: Optional[List[List[float]]] = None,
 ) -> List[Memory]:
     """
     批量创建记忆
@@ -185,6 +214,7 @@ def create_memories_batch(
         memories_in: 创建请求列表
         tenant_id: 租户 ID
         user_id: 用户 ID
+        embeddings: 与 memories_in 一一对应的内容向量
     
     Returns:
         List[Memory]: 创建的记忆对象列表
@@ -192,11 +222,12 @@ def create_memories_batch(
     import uuid
     db_memories = []
     
-    for memory_in in memories_in:
+    for index, memory_in in enumerate(memories_in):
         db_memory = Memory(
             id=uuid.uuid4(),
             tenant_id=tenant_id,
             user_id=user_id,
+            embedding=embeddings[index] if embeddings else None,
             **memory_in.dict()
         )
         db.add(db_memory)
@@ -211,7 +242,12 @@ def create_memories_batch(
     return db_memories
 
 
-def update_memory(db: Session, db_memory: Memory, memory_in: MemoryUpdate) -> Memory:
+def update_memory(
+    db: Session,
+    db_memory: Memory,
+    memory_in: MemoryUpdate,
+    embedding: Optional[List[float]] = None,
+) -> Memory:
     """
     更新记忆
     
@@ -219,12 +255,15 @@ def update_memory(db: Session, db_memory: Memory, memory_in: MemoryUpdate) -> Me
         db: 数据库会话
         db_memory: 现有记忆对象
         memory_in: 更新请求
+        embedding: 内容变更后的新向量
     
     Returns:
         Memory: 更新后的记忆对象
     """
     for field, value in memory_in.dict(exclude_unset=True).items():
         setattr(db_memory, field, value)
+    if embedding is not None:
+        db_memory.embedding = embedding
     db.add(db_memory)
     db.commit()
     db.refresh(db_memory)
@@ -3,6 +3,7 @@ from uuid import UUID
 from sqlalchemy.orm import Session, joinedload
 from app.models.message import Message
 from app.schemas.message import MessageCreate, MessageUpdate
+from app.utils.pagination import CursorPaginationParams, CursorPaginationResult, paginate_with_cursor
 
 
 def get_message(db: Session, message_id: UUID, with_relationships: bool = False) -> Optional[Message]:
@@ -12,13 +13,7 @@ def get_message(db: Session, message_id: UUID, with_relationships: bool = False)
     return query.filter(Message.id == message_id, Message.is_deleted == False).first()
 
 
-def get_messages(
-    db: Session,
-    skip: int = 0,
-    limit: int = 100,
-    danmaku_only: bool = False,
-    with_relationships: bool = False,
-) -> List[Message]:
+def _messages_query(db: Session, danmaku_only: bool, with_relationships: bool):
     query = db.query(Message).filter(Message.is_deleted == False)
     
     if danmaku_only:
@@ -30,9 +25,31 @@ def get_messages(
     if with_relationships:
         query = query.options(joinedload(Message.author))
     
+    return query
+
+
+def get_messages(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    danmaku_only: bool = False,
+    with_relationships: bool = False,
+) -> List[Message]:
+    query = _messages_query(db, danmaku_only, with_relationships)
     return query.order_by(Message.created_at.desc()).offset(skip).limit(limit).all()
 
 
+def get_messages_page(
+    db: Session,
+    cursor_params: CursorPaginationParams,
+    danmaku_only: bool = False,
+    with_relationships: bool = False,
+) -> CursorPaginationResult:
+    """游标分页获取顶层留言（按 (created_at, id) 倒序）"""
+    query = _messages_query(db, danmaku_only, with_relationships)
+    return paginate_with_cursor(query, cursor_params, Message.created_at, tiebreaker=Message.id)
+
+
 def get_messages_by_author(
     db: Session,
     author_id: UUID,
@@ -0,0 +1,145 @@
+"""
+Request Log CRUD Operations
+请求日志 / 审计日志批量写入与分区维护
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Tuple, Type
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.utils.logger import app_logger
+from app.utils.partitions import check_default_partition, ensure_range_partition
+
+
+_PARTITION_NAME = re.compile(r"^request_logs_(\d{8})$")
+
+
+async def bulk_insert_rows(db: AsyncSession, model: Type, rows: List[Dict[str, Any]]) -> int:
+    """
+    批量写入日志行并提交
+
+    PostgreSQL（asyncpg）上使用 COPY，其它数据库使用多行 INSERT
+
+    Args:
+        db: 异步数据库会话
+        model: ORM 模型类
+        rows: 行数据（键为列名，所有行的列集合一致）
+
+    Returns:
+        int: 写入行数
+    """
+    if not rows:
+        return 0
+
+    if db.bind.dialect.name == "postgresql" and db.bind.dialect.driver == "asyncpg":
+        columns = list(rows[0].keys())
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            model.__tablename__,
+            records=[tuple(row[column] for column in columns) for row in rows],
+            columns=columns,
+        )
+    else:
+        await db.execute(insert(model), rows)
+
+    await db.commit()
+    return len(rows)
+
+
+def _day_partition(day: date) -> Tuple[str, str, str]:
+    return (
+        f"request_logs_{day:%Y%m%d}",
+        f"{day.isoformat()} 00:00:00+00",
+        f"{(day + timedelta(days=1)).isoformat()} 00:00:00+00",
+    )
+
+
+async def ensure_request_log_partitions(db: AsyncSession, today: date, days_ahead: int = 3) -> None:
+    """
+    为请求日志表提前创建当天及之后若干天的分区（仅 PostgreSQL）
+
+    每个分区单独提交，某一天失败（例如当天的行已落入 DEFAULT 分区且迁移失败）时跳过并继续；
+    之后检查 DEFAULT 分区，有行时告警并把这些行迁入对应的日分区，使保留策略能够删除它们
+
+    Args:
+        db: 异步数据库会话
+        today: 当前日期（UTC）
+        days_ahead: 额外创建的天数
+    """
+    if db.bind.dialect.name != "postgresql":
+        return
+
+    for offset in range(days_ahead + 1):
+        partition, lower, upper = _day_partition(today + timedelta(days=offset))
+        await ensure_range_partition(db, "request_logs", partition, "timestamp", lower, upper)
+
+    if await check_default_partition(db, "request_logs"):
+        await recover_request_log_partitions(db)
+    app_logger.info("Ensured request_logs partitions")
+
+
+async def recover_request_log_partitions(db: AsyncSession) -> int:
+    """
+    把 DEFAULT 分区中的行按 UTC 日期迁入对应的日分区（仅 PostgreSQL）
+
+    Args:
+        db: 异步数据库会话
+
+    Returns:
+        int: 成功创建（或已存在）的日分区数
+    """
+    if db.bind.dialect.name != "postgresql":
+        return 0
+
+    result = await db.execute(text(
+        "SELECT DISTINCT (timestamp AT TIME ZONE 'UTC')::date FROM request_logs_default"
+    ))
+    days = sorted(row[0] for row in result.all())
+    await db.commit()
+
+    recovered = 0
+    for day in days:
+        partition, lower, upper = _day_partition(day)
+        if await ensure_range_partition(db, "request_logs", partition, "timestamp", lower, upper):
+            recovered += 1
+    return recovered
+
+
+async def drop_expired_request_log_partitions(db: AsyncSession, today: date, retention_days: int) -> List[str]:
+    """
+    删除超过保留期的请求日志日分区（仅 PostgreSQL）
+
+    Args:
+        db: 异步数据库会话
+        today: 当前日期（UTC）
+        retention_days: 保留天数
+
+    Returns:
+        List[str]: 已删除的分区名
+    """
+    if db.bind.dialect.name != "postgresql":
+        return []
+
+    result = await db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'request_logs'"
+    ))
+
+    cutoff = today - timedelta(days=retention_days)
+    dropped: List[str] = []
+    for (name,) in result.all():
+        match = _PARTITION_NAME.match(name)
+        if not match:
+            continue
+        if datetime.strptime(match.group(1), "%Y%m%d").date() < cutoff:
+            await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+
+    await db.commit()
+    if dropped:
+        app_logger.info(f"Dropped expired request_logs partitions: {', '.join(sorted(dropped))}")
+    return dropped
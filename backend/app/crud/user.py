@@ -1,9 +1,18 @@
 from typing import Optional
 from uuid import UUID
 from sqlalchemy.orm import Session
-from app.core.security import get_password_hash, verify_password
+from app.core.config import settings
+from app.core.security import (
+    PasswordHashingBusyError,
+    get_password_hash,
+    get_password_hash_sync,
+    password_needs_rehash,
+    verify_password,
+    verify_password_sync,
+)
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.utils.logger import app_logger
 
 
 def get_user(db: Session, user_id: UUID) -> Optional[User]:
@@ -34,7 +43,7 @@ def get_users(db: Session, skip: int = 0, limit: int = 100):
 
 
 def create_user(db: Session, user: UserCreate) -> User:
-    hashed_password = get_password_hash(user.password)
+    hashed_password = get_password_hash_sync(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -54,6 +63,11 @@ def create_user(db: Session, user: UserCreate) -> User:
 
 
 def update_user(db: Session, user_id: UUID, user_update: UserUpdate) -> Optional[User]:
+    """
+    更新用户资料（同步，在线程池线程中调用）
+
+    调用方需随后执行 auth_cache_service.invalidate_user 丢弃各 worker 上的主体缓存
+    """
     db_user = get_user(db, user_id)
     if not db_user:
         return None
@@ -62,7 +76,7 @@ def update_user(db: Session, user_id: UUID, user_update: UserUpdate) -> Optional
     
     # Handle password update
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+        update_data["hashed_password"] = get_password_hash_sync(update_data.pop("password"))
     
     for field, value in update_data.items():
         setattr(db_user, field, value)
@@ -73,6 +87,9 @@ def update_user(db: Session, user_id: UUID, user_update: UserUpdate) -> Optional
 
 
 def delete_user(db: Session, user_id: UUID) -> bool:
+    """
+    删除用户（调用方需随后执行 auth_cache_service.invalidate_user）
+    """
     db_user = get_user(db, user_id)
     if not db_user:
         return False
@@ -82,14 +99,31 @@ def delete_user(db: Session, user_id: UUID) -> bool:
     return True
 
 
-from app.core.security import verify_password
+async def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+    """
+    校验用户名与密码
+
+    校验成功且哈希的成本因子低于 BCRYPT_ROUNDS 时，用明文密码重新哈希并保存（成本因子升级）
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+    Raises:
+        PasswordHashingBusyError: 密码哈希线程池排队已满
+    """
     user = get_user_by_username(db, username)
     if not user:
         return None
-    if not verify_password(password, str(user.hashed_password)):
+    hashed_password = str(user.hashed_password)
+    if not await verify_password(password, hashed_password):
         return None
+
+    if password_needs_rehash(hashed_password):
+        try:
+            user.hashed_password = await get_password_hash(password)
+            db.commit()
+            db.refresh(user)
+            app_logger.info(f"Rehashed password for user {user.id} with cost {settings.BCRYPT_ROUNDS}")
+        except PasswordHashingBusyError:
+            # 线程池繁忙时跳过升级，下次登录再试，不影响本次登录
+            pass
     return user
 
 
@@ -159,17 +193,17 @@ def get_user_stats(db: Session, user_id: UUID):
 def update_user_password(db: Session, user_id: UUID, old_password: str, new_password: str) -> bool:
     """
     更新用户密码
-    验证旧密码后更新为新密码
+    验证旧密码后更新为新密码（同步，在线程池线程中调用；调用方需随后执行 auth_cache_service.invalidate_user）
     """
     user = get_user(db, user_id)
     if not user:
         return False
     
     # 验证旧密码
-    if not verify_password(old_password, str(user.hashed_password)):
+    if not verify_password_sync(old_password, str(user.hashed_password)):
         return False
     
     # 更新为新密码
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = get_password_hash_sync(new_password)
     db.commit()
     return True
\ No newline at end of file
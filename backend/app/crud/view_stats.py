@@ -0,0 +1,229 @@
+"""
+View Statistics CRUD Operations
+浏览量按日汇总数据库操作
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+from uuid import UUID
+from sqlalchemy import delete, func, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.article_view_daily import ArticleViewDaily, SiteViewDaily, ViewCountFlush
+from app.utils.logger import app_logger
+from app.utils.partitions import check_default_partition, ensure_range_partition
+
+
+def _site_views_upsert(dialect_name: str, view_date: date, views: int):
+    """
+    构造全站日汇总的累加 UPSERT 语句
+
+    Args:
+        dialect_name: 数据库方言名称
+        view_date: 日期
+        views: 增加的浏览量
+
+    Returns:
+        Insert: INSERT ... ON CONFLICT DO UPDATE 语句
+    """
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+    stmt = dialect_insert(SiteViewDaily).values(view_date=view_date, views=views)
+    return stmt.on_conflict_do_update(
+        index_elements=[SiteViewDaily.view_date],
+        set_={
+            "views": SiteViewDaily.views + stmt.excluded.views,
+            "updated_at": func.now(),
+        },
+    )
+
+
+async def record_daily_views(
+    db: AsyncSession,
+    deltas: Dict[UUID, int],
+    view_date: date,
+) -> None:
+    """
+    追加文章每日浏览流水并累加全站日汇总
+
+    不提交事务，由调用方与 view_count 更新在同一事务内提交
+
+    Args:
+        db: 异步数据库会话
+        deltas: 文章 ID -> 浏览量增量
+        view_date: 归属日期
+    """
+    if not deltas:
+        return
+
+    await db.execute(
+        insert(ArticleViewDaily),
+        [
+            {"view_date": view_date, "article_id": article_id, "views": views}
+            for article_id, views in deltas.items()
+        ],
+    )
+    await db.execute(
+        _site_views_upsert(db.bind.dialect.name, view_date, sum(deltas.values()))
+    )
+
+
+def _month_partition(month_start: date) -> Tuple[str, str, str]:
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    return f"article_view_daily_{month_start:%Y%m}", month_start.isoformat(), next_month.isoformat()
+
+
+async def ensure_view_partitions(db: AsyncSession, today: date, months_ahead: int = 1) -> None:
+    """
+    为流水表提前创建当月及之后若干月的分区（仅 PostgreSQL）
+
+    每个分区单独提交，某个月失败不影响其余月份；之后检查 DEFAULT 分区，
+    有行时告警并把这些行迁入对应的月分区
+
+    Args:
+        db: 异步数据库会话
+        today: 当前日期
+        months_ahead: 额外创建的月份数
+    """
+    if db.bind.dialect.name != "postgresql":
+        return
+
+    month_start = today.replace(day=1)
+    for _ in range(months_ahead + 1):
+        partition, lower, upper = _month_partition(month_start)
+        await ensure_range_partition(db, "article_view_daily", partition, "view_date", lower, upper)
+        month_start = (month_start + timedelta(days=32)).replace(day=1)
+
+    if await check_default_partition(db, "article_view_daily"):
+        await recover_view_partitions(db)
+    app_logger.info("Ensured article_view_daily partitions")
+
+
+async def recover_view_partitions(db: AsyncSession) -> int:
+    """
+    把 DEFAULT 分区中的行按月迁入对应的月分区（仅 PostgreSQL）
+
+    Args:
+        db: 异步数据库会话
+
+    Returns:
+        int: 成功创建（或已存在）的月分区数
+    """
+    if db.bind.dialect.name != "postgresql":
+        return 0
+
+    result = await db.execute(text(
+        "SELECT DISTINCT date_trunc('month', view_date)::date FROM article_view_daily_default"
+    ))
+    months = sorted(row[0] for row in result.all())
+    await db.commit()
+
+    recovered = 0
+    for month_start in months:
+        partition, lower, upper = _month_partition(month_start)
+        if await ensure_range_partition(db, "article_view_daily", partition, "view_date", lower, upper):
+            recovered += 1
+    return recovered
+
+
+async def prune_view_count_flushes(db: AsyncSession, before: datetime) -> int:
+    """
+    删除早于指定时间的浏览量快照落库记录
+
+    快照在下一轮 flush 即被清理，记录只需覆盖重试窗口
+
+    Args:
+        db: 异步数据库会话
+        before: 截止时间
+
+    Returns:
+        int: 删除的记录数
+    """
+    result = await db.execute(delete(ViewCountFlush).where(ViewCountFlush.flushed_at < before))
+    await db.commit()
+    return result.rowcount or 0
+
+
+def get_site_views_since(db: Session, start_date: date) -> int:
+    """
+    统计某日（含）以来的全站浏览量
+
+    Args:
+        db: 数据库会话
+        start_date: 起始日期
+
+    Returns:
+        int: 浏览量
+    """
+    return db.query(func.sum(SiteViewDaily.views)).filter(
+        SiteViewDaily.view_date >= start_date
+    ).scalar() or 0
+
+
+def get_site_views_total(db: Session) -> int:
+    """
+    统计全站累计浏览量（汇总表每天一行，与文章数量无关）
+
+    Args:
+        db: 数据库会话
+
+    Returns:
+        int: 浏览量
+    """
+    return db.query(func.sum(SiteViewDaily.views)).scalar() or 0
+
+
+def get_site_views_by_day(db: Session, start_date: date, end_date: date) -> List[Tuple[date, int]]:
+    """
+    获取日期区间内（含两端）的全站每日浏览量
+
+    Args:
+        db: 数据库会话
+        start_date: 起始日期
+        end_date: 结束日期
+
+    Returns:
+        List[Tuple[date, int]]: (日期, 浏览量) 列表，按日期升序
+    """
+    rows = (
+        db.query(SiteViewDaily.view_date, SiteViewDaily.views)
+        .filter(SiteViewDaily.view_date >= start_date, SiteViewDaily.view_date <= end_date)
+        .order_by(SiteViewDaily.view_date)
+        .all()
+    )
+    return [(row.view_date, row.views) for row in rows]
+
+
+def get_article_views_by_day(
+    db: Session,
+    article_id: UUID,
+    start_date: date,
+    end_date: date,
+) -> List[Tuple[date, int]]:
+    """
+    获取单篇文章日期区间内（含两端）的每日浏览量
+
+    Args:
+        db: 数据库会话
+        article_id: 文章 ID
+        start_date: 起始日期
+        end_date: 结束日期
+
+    Returns:
+        List[Tuple[date, int]]: (日期, 浏览量) 列表，按日期升序
+    """
+    rows = (
+        db.query(ArticleViewDaily.view_date, func.sum(ArticleViewDaily.views).label("views"))
+        .filter(
+            ArticleViewDaily.article_id == article_id,
+            ArticleViewDaily.view_date >= start_date,
+            ArticleViewDaily.view_date <= end_date,
+        )
+        .group_by(ArticleViewDaily.view_date)
+        .order_by(ArticleViewDaily.view_date)
+        .all()
+    )
+    return [(row.view_date, int(row.views)) for row in rows]
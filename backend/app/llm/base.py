@@ -2,9 +2,22 @@
 LLM 抽象基类定义
 """
 
+import importlib.util
 from abc import ABC, abstractmethod
 from typing import List, Optional, AsyncIterator
+import httpx
 from pydantic import BaseModel, Field
+from app.core.config import settings
+
+
+def http2_available() -> bool:
+    """
+    是否可以启用 HTTP/2（需要安装 h2，即 httpx[http2]）
+
+    Returns:
+        bool: 配置开启且依赖可用时为 True
+    """
+    return settings.LLM_HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
 
 
 class ChatMessage(BaseModel):
@@ -66,6 +79,46 @@ class LLMProvider(ABC):
         self.api_key = api_key
         self.base_url = base_url
         self.model = model
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """
+        创建带连接池的 HTTP 客户端
+
+        Returns:
+            httpx.AsyncClient: HTTP 客户端
+        """
+        return httpx.AsyncClient(
+            http2=http2_available(),
+            timeout=httpx.Timeout(settings.LLM_TIMEOUT, connect=settings.LLM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        提供商共享的长连接 HTTP 客户端
+
+        首次使用时创建，之后所有请求复用同一个连接池（TCP/TLS 握手只发生一次）
+
+        Returns:
+            httpx.AsyncClient: HTTP 客户端
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    async def aclose(self) -> None:
+        """
+        关闭 HTTP 客户端并释放连接池
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     @abstractmethod
     async def chat(self, request: ChatCompletionRequest) -> ChatCompletionResponse:
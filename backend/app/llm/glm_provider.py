@@ -23,10 +23,6 @@ class GLMProvider(LLMProvider):
     智谱AI LLM 提供商
     """
 
-    def __init__(self, api_key: str, base_url: str, model: str):
-        super().__init__(api_key, base_url, model)
-        self.timeout = settings.LLM_TIMEOUT
-
     @retry(
         stop=stop_after_attempt(settings.LLM_MAX_RETRIES),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -56,16 +52,15 @@ class GLMProvider(LLMProvider):
             payload['max_tokens'] = request.max_tokens
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f'{self.base_url}/chat/completions',
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                data = response.json()
+            response = await self.client.post(
+                f'{self.base_url}/chat/completions',
+                headers=headers,
+                json=payload
+            )
+            response.raise_for_status()
+            data = response.json()
 
-                return self._parse_response(data, request.model or self.model)
+            return self._parse_response(data, request.model or self.model)
 
         except httpx.HTTPStatusError as e:
             app_logger.error(f"GLM API error: {e.response.status_code} - {e.response.text}")
@@ -104,27 +99,26 @@ class GLMProvider(LLMProvider):
             payload['max_tokens'] = request.max_tokens
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                async with client.stream(
-                    'POST',
-                    f'{self.base_url}/chat/completions',
-                    headers=headers,
-                    json=payload
-                ) as response:
-                    response.raise_for_status()
-                    async for line in response.aiter_lines():
-                        if line.startswith('data: '):
-                            data_str = line[6:]
-                            if data_str == '[DONE]':
-                                break
-                            try:
-                                import json
-                                data = json.loads(data_str)
-                                chunk = self._parse_stream_chunk(data)
-                                if chunk:
-                                    yield chunk
-                            except json.JSONDecodeError:
-                                continue
+            async with self.client.stream(
+                'POST',
+                f'{self.base_url}/chat/completions',
+                headers=headers,
+                json=payload
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if line.startswith('data: '):
+                        data_str = line[6:]
+                        if data_str == '[DONE]':
+                            break
+                        try:
+                            import json
+                            data = json.loads(data_str)
+                            chunk = self._parse_stream_chunk(data)
+                            if chunk:
+                                yield chunk
+                        except json.JSONDecodeError:
+                            continue
 
         except httpx.HTTPStatusError as e:
             app_logger.error(f"GLM stream API error: {e.response.status_code}")
@@ -121,6 +121,31 @@ class LLMProviderFactory:
         """
         return list(cls._providers.keys())
 
+    @classmethod
+    def startup(cls) -> None:
+        """
+        预先创建所有已配置提供商的实例及其连接池
+        """
+        for provider_name in cls._providers:
+            api_key, _, _ = cls._get_provider_config(provider_name)
+            if api_key:
+                provider = cls.create(provider_name)
+                if provider is not None:
+                    # 触发客户端创建
+                    provider.client
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """
+        关闭所有提供商实例的 HTTP 客户端并清除实例缓存
+        """
+        for provider_name, provider in list(cls._instances.items()):
+            try:
+                await provider.aclose()
+            except Exception as e:
+                app_logger.error(f"Failed to close LLM provider client {provider_name}: {e}")
+        cls.clear_instances()
+
     @classmethod
     def clear_instances(cls):
         """
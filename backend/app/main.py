@@ -8,15 +8,23 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.router import api_router
 from app.core.config import settings
 from app.utils.logger import app_logger
-from app.utils.middleware import RequestLoggingMiddleware
+from app.middleware.pipeline import RequestPipelineMiddleware
+from app.utils.middleware import RequestLoggingStage
 from app.core.exception_handler import add_exception_handlers
 from app.services.cache_service import cache_service
-from app.utils.rate_limit import add_rate_limit_middleware
-from app.utils.perf_monitor import PerformanceMonitoringMiddleware
+from app.utils.rate_limit import add_rate_limit_middleware, RateLimitStage
+from app.utils.perf_monitor import PerformanceMonitoringStage
 from app.utils.api_docs import customize_openapi
 from app.utils.config_validator import validate_and_log_config
-from app.middleware.request_size_limit import RequestSizeLimitMiddleware
+from app.middleware.request_size_limit import RequestSizeLimitStage
 from app.services.weather_update_service import weather_update_service
+from app.services.view_counter_service import view_counter_service
+from app.services.bloom_filter_service import bloom_filter_service
+from app.services.request_log_service import request_log_service
+from app.services.context_summary_service import context_summary_service
+from app.llm import LLMProviderFactory
+from app.core.security import password_executor
+from app.services.auth_cache_service import auth_cache_service
 
 # Validate configuration on startup
 validate_and_log_config()
@@ -36,14 +44,13 @@ customize_openapi(app)
 # Add rate limiting middleware
 add_rate_limit_middleware(app)
 
-# Add performance monitoring middleware
-app.add_middleware(PerformanceMonitoringMiddleware)
-
-# Add request size limit middleware (防止大请求体DoS攻击)
-app.add_middleware(RequestSizeLimitMiddleware)
-
-# Add custom middleware for request logging
-app.add_middleware(RequestLoggingMiddleware)
+# Request pipeline: request ID / access log, size limit (防止大请求体DoS攻击), rate limit, performance monitoring
+# 单层纯 ASGI 中间件，不缓冲流式响应
+pipeline_stages = [RequestLoggingStage(), RequestSizeLimitStage()]
+if settings.RATE_LIMIT_ENABLED:
+    pipeline_stages.append(RateLimitStage())
+pipeline_stages.append(PerformanceMonitoringStage())
+app.add_middleware(RequestPipelineMiddleware, stages=pipeline_stages)
 
 # Set up CORS - 限制允许的HTTP方法和头部
 if settings.BACKEND_CORS_ORIGINS:
@@ -53,7 +60,7 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],  # 明确列出允许的HTTP方法
         allow_headers=["Content-Type", "Authorization", "X-Requested-With", "Accept", "Origin"],  # 限制允许的头部
-        expose_headers=["X-Request-ID"],  # 暴露给客户端的头部
+        expose_headers=["X-Request-ID", "X-Next-Cursor", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset", "Retry-After"],  # 暴露给客户端的头部
         max_age=600,  # 预检请求缓存时间（秒）
     )
 
@@ -68,22 +75,54 @@ add_exception_handlers(app)
 async def startup_event():
     app_logger.info("Connecting to Redis...")
     await cache_service.connect()
+    auth_cache_service.start()
     
     app_logger.info("Starting weather update scheduler...")
     weather_update_service.start()
     await weather_update_service.initial_update()
     
+    app_logger.info("Starting view counter flush scheduler...")
+    view_counter_service.start()
+    
+    app_logger.info("Starting bloom filter rebuild scheduler...")
+    bloom_filter_service.start()
+    
+    app_logger.info("Starting request log writer...")
+    request_log_service.start()
+    
+    app_logger.info("Creating LLM provider clients...")
+    LLMProviderFactory.startup()
+    
+    app_logger.info("Starting context summary workers...")
+    context_summary_service.start()
+    
     app_logger.info("Application startup complete")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    # 先写回剩余浏览量，再关闭 Redis 连接
+    app_logger.info("Flushing pending view counts...")
+    await view_counter_service.shutdown()
+    await request_log_service.shutdown()
+    
+    await context_summary_service.shutdown()
+    
+    app_logger.info("Closing LLM provider clients...")
+    await LLMProviderFactory.shutdown()
+    
+    await auth_cache_service.shutdown()
+    
     app_logger.info("Closing Redis connection...")
     await cache_service.close()
     
     app_logger.info("Stopping weather update scheduler...")
     weather_update_service.shutdown()
     
+    bloom_filter_service.shutdown()
+    
+    password_executor.shutdown(wait=False)
+    
     app_logger.info("Application shutdown complete")
 
 # Health check endpoint
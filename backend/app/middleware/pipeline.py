@@ -0,0 +1,174 @@
+"""
+纯 ASGI 请求管道
+将请求 ID、计时、请求大小限制、限流、访问日志等横切逻辑组合为一个中间件，
+每个请求只经过一层 ASGI 调用，不创建额外任务，也不缓冲响应体（SSE 流式响应直接透传）
+"""
+
+import time
+from typing import List, Optional, Sequence
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.utils.logger import app_logger
+
+
+class RequestContext:
+    """
+    单个请求在管道中的上下文
+    """
+
+    __slots__ = (
+        "scope", "request_id", "start_time", "duration", "response_time", "status_code",
+        "response_started", "response_headers", "exception",
+    )
+
+    def __init__(self, scope: Scope):
+        self.scope = scope
+        self.request_id: Optional[str] = None
+        self.start_time = time.perf_counter()
+        self.duration = 0.0
+        # 发出响应头时的耗时（秒）
+        self.response_time = 0.0
+        self.status_code = 500
+        self.response_started = False
+        # 追加到响应头的 (name, value) 列表，在 http.response.start 时写入
+        self.response_headers: List[tuple] = []
+        self.exception: Optional[BaseException] = None
+
+    @property
+    def state(self) -> dict:
+        """与 request.state 共享的字典"""
+        return self.scope.setdefault("state", {})
+
+    @property
+    def method(self) -> str:
+        return self.scope["method"]
+
+    @property
+    def path(self) -> str:
+        return self.scope["path"]
+
+    @property
+    def client_host(self) -> str:
+        client = self.scope.get("client")
+        return client[0] if client else "unknown"
+
+    def header(self, name: bytes) -> Optional[str]:
+        """
+        读取请求头（name 为小写 bytes）
+
+        Returns:
+            Optional[str]: 头部值，不存在时返回 None
+        """
+        for key, value in self.scope["headers"]:
+            if key == name:
+                return value.decode("latin-1")
+        return None
+
+    def elapsed(self) -> float:
+        """从进入管道到现在的耗时（秒）"""
+        return time.perf_counter() - self.start_time
+
+
+class PipelineStage:
+    """
+    管道阶段基类
+
+    子类按需覆盖以下钩子，未覆盖的钩子不会被调用：
+    - on_request: 请求进入时调用，返回 Response 则短路（不再调用应用）
+    - wrap_receive: 包装 receive（如限制请求体大小）
+    - on_response_start: 响应头发送前调用，可通过 ctx.response_headers 追加头部
+    - on_complete: 请求结束后调用（包括异常与短路的情况）
+    """
+
+    async def on_request(self, ctx: RequestContext) -> Optional[Response]:
+        return None
+
+    def wrap_receive(self, ctx: RequestContext, receive: Receive) -> Receive:
+        return receive
+
+    def on_response_start(self, ctx: RequestContext, message: Message) -> None:
+        return None
+
+    def on_complete(self, ctx: RequestContext) -> None:
+        return None
+
+
+def _overrides(stage: PipelineStage, hook: str) -> bool:
+    return getattr(type(stage), hook) is not getattr(PipelineStage, hook)
+
+
+class RequestPipelineMiddleware:
+    """
+    单层纯 ASGI 中间件，按顺序执行各管道阶段
+
+    用法：
+        app.add_middleware(RequestPipelineMiddleware, stages=[...])
+    """
+
+    def __init__(self, app: ASGIApp, stages: Sequence[PipelineStage] = ()):
+        self.app = app
+        self.stages = list(stages)
+        # 预先筛选实现了各钩子的阶段，请求路径上不做多余调用
+        self._on_request = [s for s in self.stages if _overrides(s, "on_request")]
+        self._wrap_receive = [s for s in self.stages if _overrides(s, "wrap_receive")]
+        self._on_response_start = [s for s in self.stages if _overrides(s, "on_response_start")]
+        self._on_complete = [s for s in self.stages if _overrides(s, "on_complete")]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        ctx = RequestContext(scope)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                ctx.response_started = True
+                ctx.status_code = message["status"]
+                ctx.response_time = ctx.elapsed()
+                for stage in self._on_response_start:
+                    stage.on_response_start(ctx, message)
+                if ctx.response_headers:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (name.encode("latin-1"), value.encode("latin-1"))
+                        for name, value in ctx.response_headers
+                    ]
+            await send(message)
+
+        try:
+            for stage in self._on_request:
+                response = await stage.on_request(ctx)
+                if response is not None:
+                    await response(scope, receive, send_wrapper)
+                    return
+
+            for stage in self._wrap_receive:
+                receive = stage.wrap_receive(ctx, receive)
+
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            ctx.exception = exc
+            if ctx.response_started:
+                raise
+            await self._internal_error(ctx)(scope, receive, send_wrapper)
+        finally:
+            # 流式响应（SSE）的耗时包含整个响应体的发送过程
+            ctx.duration = ctx.elapsed()
+            for stage in self._on_complete:
+                try:
+                    stage.on_complete(ctx)
+                except Exception as e:
+                    app_logger.error(f"Pipeline stage {type(stage).__name__} failed: {e}")
+
+    @staticmethod
+    def _internal_error(ctx: RequestContext) -> Response:
+        return JSONResponse(
+            status_code=500,
+            content={
+                "detail": "Internal server error",
+                "request_id": ctx.request_id,
+            },
+        )
+
+
+__all__ = ["RequestContext", "PipelineStage", "RequestPipelineMiddleware"]
@@ -21,4 +21,7 @@ from app.models.prompt import Prompt
 from app.models.conversation import Conversation, ConversationMessage
 from app.models.memory import Memory
 from app.models.context_history import ContextHistory
-from app.models.weather import Weather
\ No newline at end of file
+from app.models.weather import Weather
+from app.models.article_view_daily import ArticleViewDaily, SiteViewDaily, ViewCountFlush
+from app.models.article_search import ArticleSearchTerm, ArticleSearchDoc
+
@@ -10,7 +10,7 @@ class Article(Base):
 
     # 添加复合索引以优化常用查询
     __table_args__ = (
-        Index('idx_article_published_created', 'is_published', 'created_at'),  # 按发布状态和时间查询
+        Index('idx_article_published_created_id', 'is_published', 'created_at', 'id'),  # 按发布状态和时间的 keyset 分页
         Index('idx_article_author_published', 'author_id', 'is_published'),   # 按作者和发布状态查询
         Index('idx_article_published_featured', 'is_published', 'is_featured', 'created_at'),  # 精选文章查询
         Index('idx_article_published_pinned', 'is_published', 'is_pinned', 'published_at'),    # 置顶文章查询
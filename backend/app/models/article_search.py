@@ -0,0 +1,36 @@
+"""
+Article Search Index Models
+文章全文检索倒排索引模型
+"""
+
+from sqlalchemy import Column, String, DateTime, UUID, Index, ForeignKey, Float
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class ArticleSearchTerm(Base):
+    """
+    倒排表：每个 (词项, 文章) 一行，保存加权词频
+
+    检索只按主键前缀 term 读取查询词项的倒排链，与文章总数无关
+    """
+    __tablename__ = "article_search_terms"
+
+    __table_args__ = (
+        Index('idx_article_search_terms_article', 'article_id'),
+    )
+
+    term = Column(String(64), primary_key=True)
+    article_id = Column(UUID(as_uuid=True), ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    tf = Column(Float, nullable=False)
+
+
+class ArticleSearchDoc(Base):
+    """
+    已索引文章的文档长度（BM25 长度归一化）
+    """
+    __tablename__ = "article_search_docs"
+
+    article_id = Column(UUID(as_uuid=True), ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    length = Column(Float, nullable=False)
+    indexed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,57 @@
+"""
+Article View Rollup Models
+文章浏览量按日汇总模型
+"""
+
+from sqlalchemy import Column, Integer, BigInteger, String, Date, DateTime, UUID, Index, ForeignKey
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class ArticleViewDaily(Base):
+    """
+    文章每日浏览量流水（只追加）
+
+    每次浏览量批量落库追加一行 (日期, 文章, 增量)；PostgreSQL 上按 view_date 做范围分区，
+    按日查询只扫描对应分区
+    """
+    __tablename__ = "article_view_daily"
+
+    __table_args__ = (
+        Index('idx_article_view_daily_date_article', 'view_date', 'article_id'),
+        Index('idx_article_view_daily_article_date', 'article_id', 'view_date'),
+    )
+
+    # PostgreSQL 上的表由迁移 011 创建，主键为 (id, view_date)（分区键必须包含在主键中）；
+    # ORM 只需 id 唯一，这里只声明 id 为主键，SQLite 上 create_all 才能生成自增主键
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    view_date = Column(Date, nullable=False)
+    article_id = Column(UUID(as_uuid=True), ForeignKey("articles.id", ondelete="CASCADE"), nullable=False)
+    views = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SiteViewDaily(Base):
+    """
+    全站每日浏览量物化汇总
+
+    与流水在同一事务内累加，日/周/月统计只需读取至多 31 行
+    """
+    __tablename__ = "site_view_daily"
+
+    view_date = Column(Date, primary_key=True)
+    views = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ViewCountFlush(Base):
+    """
+    已落库的浏览量快照记录
+
+    与 view_count 更新在同一事务内写入；快照删除失败后重试时据此跳过，保证同一快照只应用一次
+    """
+    __tablename__ = "view_count_flushes"
+
+    snapshot_id = Column(String(32), primary_key=True)
+    article_count = Column(Integer, nullable=False, default=0)
+    flushed_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, UUID
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, UUID, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
@@ -8,6 +8,10 @@ from app.core.database import Base
 class Comment(Base):
     __tablename__ = "comments"
 
+    __table_args__ = (
+        Index('idx_comment_article_created_id', 'article_id', 'created_at', 'id'),  # 文章评论 keyset 分页
+    )
+
     id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
     content = Column(Text, nullable=False)
     is_approved = Column(Boolean, default=False)
@@ -14,12 +14,16 @@ class ContextHistory(Base):
     上下文历史模型
     
     记录对话的上下文状态，用于智能窗口管理
+
+    每条记录是一个滚动摘要检查点：摘要覆盖对话开始到 (covered_until, last_message_id) 为止的全部消息，
+    最新一条记录即当前有效摘要，下一次只需折叠检查点之后的新消息
     """
     __tablename__ = "context_history"
     
     __table_args__ = (
         Index('idx_ctx_conversation', 'conversation_id'),
         Index('idx_ctx_created', 'created_at'),
+        Index('idx_ctx_conversation_created', 'conversation_id', 'created_at'),  # 取最新检查点
     )
     
     id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
@@ -28,4 +32,6 @@ class ContextHistory(Base):
     total_tokens = Column(Integer, default=0)
     summary = Column(Text)
     key_points = Column(Text)
+    covered_until = Column(DateTime(timezone=True))  # 已折叠的最后一条消息的 created_at
+    last_message_id = Column(UUID(as_uuid=True))  # 已折叠的最后一条消息的 ID
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -44,6 +44,15 @@ class Conversation(Base):
     prompt = relationship("Prompt")
 
 
+# 对话列表按最近活动时间 keyset 分页（表达式索引需在列定义之后声明）
+Index(
+    'idx_conversation_user_activity',
+    Conversation.user_id,
+    func.coalesce(Conversation.updated_at, Conversation.created_at),
+    Conversation.id,
+)
+
+
 class ConversationMessage(Base):
     """
     对话消息模型
@@ -55,6 +64,7 @@ class ConversationMessage(Base):
     __table_args__ = (
         Index('idx_conv_msg_conversation', 'conversation_id'),
         Index('idx_conv_msg_created', 'created_at'),
+        Index('idx_conv_msg_conversation_created_id', 'conversation_id', 'created_at', 'id'),  # 消息 keyset 分页
     )
     
     id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
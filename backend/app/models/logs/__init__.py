@@ -0,0 +1,4 @@
+from app.models.logs.audit_log import AuditLog
+from app.models.logs.request_log import RequestLog
+
+__all__ = ["AuditLog", "RequestLog"]
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index, UUID
+from sqlalchemy.sql import func
+import uuid
+from app.core.database import Base
+
+
+class RequestLog(Base):
+    """
+    Model for tracking API requests with detailed information.
+
+    Rows are written in batches by request_log_service, never per request.
+    On PostgreSQL the table is range-partitioned by day on `timestamp`, so
+    retention drops whole partitions instead of running DELETEs.
+    """
+    __tablename__ = "request_logs"
+
+    __table_args__ = (
+        # Only lookups that are actually used: by request id, and per-user history.
+        # Time-range scans are served by partition pruning plus a BRIN index.
+        Index('idx_request_logs_request_id', 'request_id'),
+        Index('idx_request_logs_user_timestamp', 'user_id', 'timestamp'),
+        Index('idx_request_logs_timestamp_brin', 'timestamp', postgresql_using='brin'),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    request_id = Column(String(36), nullable=False)  # UUID
+    method = Column(String(10), nullable=False)  # GET, POST, PUT, DELETE, etc.
+    url = Column(String(500), nullable=False)
+    path = Column(String(500), nullable=False)
+    user_agent = Column(Text, nullable=True)
+    ip_address = Column(String(45), nullable=True)  # Supports IPv6
+    referer = Column(String(500), nullable=True)
+
+    # Request details
+    request_headers = Column(Text, nullable=True)  # JSON string of headers
+    request_body = Column(Text, nullable=True)
+
+    # Response details
+    response_status = Column(Integer, nullable=False)
+    response_body = Column(Text, nullable=True)
+    response_time = Column(Integer, nullable=False)  # time to response headers, in milliseconds
+
+    # Timing (partition key, so it is part of the primary key)
+    timestamp = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+    duration = Column(Integer, nullable=False)  # in milliseconds, including streamed body
+
+    # Additional fields
+    user_id = Column(UUID(as_uuid=True), nullable=True)  # Foreign key to users table
+    session_id = Column(String(100), nullable=True)
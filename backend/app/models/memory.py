@@ -6,8 +6,52 @@ Memory Model
 from sqlalchemy import Column, String, Text, DateTime, UUID, Index, ForeignKey, Float, Integer
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator, UserDefinedType
 import uuid
+from app.core.config import settings
 from app.core.database import Base
+from app.utils.vector_index import format_vector, parse_vector
+
+
+class _PGVector(UserDefinedType):
+    """pgvector 的 VECTOR(dim) 列类型"""
+    cache_ok = True
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def get_col_spec(self, **kw):
+        return f"VECTOR({self.dim})"
+
+
+class EmbeddingVector(TypeDecorator):
+    """
+    向量列
+
+    PostgreSQL 上为 pgvector 的 VECTOR(dim)（见迁移 015），其它数据库以文本存储；
+    两者都使用 "[x1,x2,...]" 文本格式传输，Python 侧为 List[float]
+    """
+    impl = Text
+    cache_ok = True
+
+    def __init__(self, dim: int):
+        super().__init__()
+        self.dim = dim
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(_PGVector(self.dim))
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return format_vector(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, list):
+            return value
+        return parse_vector(value)
 
 
 class Memory(Base):
@@ -31,7 +75,7 @@ class Memory(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     memory_type = Column(String(50), nullable=False, index=True)
     content = Column(Text, nullable=False)
-    embedding = Column(Text, nullable=True)
+    embedding = Column(EmbeddingVector(settings.EMBEDDING_DIM), nullable=True)
     importance = Column(Float, default=0.5, index=True)
     access_count = Column(Integer, default=0)
     expires_at = Column(DateTime(timezone=True), nullable=True, index=True)
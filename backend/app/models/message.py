@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, UUID
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, UUID, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import uuid
@@ -8,6 +8,10 @@ from app.core.database import Base
 class Message(Base):
     __tablename__ = "messages"
 
+    __table_args__ = (
+        Index('idx_message_created_id', 'created_at', 'id'),  # 留言 keyset 分页
+    )
+
     id = Column(UUID(as_uuid=True), primary_key=True, index=True, default=uuid.uuid4)
     content = Column(Text, nullable=False)
     color = Column(String(7), default="#00D9FF")  # 弹幕颜色，默认科技蓝
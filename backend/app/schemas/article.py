@@ -69,9 +69,16 @@ class ArticleWithAuthor(Article):
             return self.categories[0]
         return None
 
+class ArticleSearchResult(ArticleWithAuthor):
+    """全文检索结果：附带 BM25 得分与高亮摘要（HTML，命中部分以 <mark> 标记）"""
+    score: float = 0.0
+    snippet: Optional[str] = None
+
+
 # For nested relationships
 from app.schemas.user import User
 from app.schemas.category import Category
 from app.schemas.tag import Tag
 ArticleWithAuthor.model_rebuild()
+ArticleSearchResult.model_rebuild()
 ArticleWithAuthor.update_forward_refs()
\ No newline at end of file
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
-from pydantic import BaseModel, field_serializer
+from pydantic import BaseModel, Field, field_serializer
 
 
 # Base schemas
@@ -55,9 +55,34 @@ class CommentWithAuthorAndArticle(Comment):
     article: Optional["Article"] = None
 
 
+# Threaded comment tree
+class CommentNode(CommentWithAuthor):
+    children: List["CommentNode"] = Field(default_factory=list, description="按时间正序排列的回复")
+
+
+class CommentTree(BaseModel):
+    article_id: UUID
+    threads: List[CommentNode] = Field(default_factory=list, description="顶层评论，按时间倒序")
+    total_comments: int = 0
+
+    @field_serializer('article_id')
+    def serialize_article_id(self, value: UUID) -> str:
+        return str(value)
+
+
+class CommentTreePage(CommentTree):
+    page_comments: int = Field(default=0, description="本页评论数（含回复）")
+    total_threads: int = 0
+    skip: int = 0
+    limit: int = 20
+
+
 # For nested relationships
 from app.schemas.user import User
 from app.schemas.article import Article
 CommentWithAuthor.update_forward_refs()
 CommentWithArticle.update_forward_refs()
-CommentWithAuthorAndArticle.update_forward_refs()
\ No newline at end of file
+CommentWithAuthorAndArticle.update_forward_refs()
+CommentNode.model_rebuild()
+CommentTree.model_rebuild()
+CommentTreePage.model_rebuild()
@@ -3,7 +3,7 @@ Conversation Schemas
 对话管理相关的请求和响应 Schema
 """
 
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -110,6 +110,7 @@ class ConversationListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class ChatRequest(BaseModel):
@@ -122,6 +123,10 @@ class ChatRequest(BaseModel):
     temperature: float = Field(default=0.7, ge=0.0, le=2.0, description="温度参数")
     max_tokens: Optional[int] = Field(None, ge=1, description="最大 Token 数")
     stream: bool = Field(default=False, description="是否流式响应")
+    stream_mode: Literal["delta", "full"] = Field(
+        default="delta",
+        description="流式模式：delta 仅发送增量，完整内容只在最后一帧；full 每帧附带累计内容（兼容旧客户端）",
+    )
     prompt_id: Optional[str] = Field(None, description="使用的 Prompt ID")
 
 
@@ -141,10 +146,12 @@ class ChatResponse(BaseModel):
 class ChatStreamChunk(BaseModel):
     """
     聊天流式响应块
+
+    增量帧只携带 delta；最后一帧（finish_reason 非空）携带完整 content 与已保存的 message_id
     """
     conversation_id: str
     message_id: str
     role: str
-    content: str
+    content: Optional[str] = None
     delta: str
     finish_reason: Optional[str] = None
@@ -0,0 +1,206 @@
+"""
+Auth Cache Service
+认证主体缓存与令牌吊销
+
+- 主体缓存：进程内按用户 ID 缓存用户列快照，短 TTL，命中时认证不访问数据库
+- 吊销集合：Redis 有序集合 auth:revoked（成员为 jti，分数为令牌过期时间），每个 worker 在内存中
+  保存一份副本，通过 pub/sub 增量推送，并定期全量同步，认证时只查本地副本
+
+吊销与用户变更通过 pub/sub 在毫秒级传播到所有 worker；订阅中断时，最长延迟由
+AUTH_REVOCATION_SYNC_INTERVAL（吊销）与 AUTH_PRINCIPAL_CACHE_TTL（用户变更）兜底
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional, Union
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+from app.core.config import settings
+from app.models.user import User
+from app.services.cache_service import cache_service
+from app.utils.cache_keys import CacheKeys
+from app.utils.local_cache import LocalCache
+from app.utils.logger import app_logger
+
+
+class AuthCacheService:
+    """
+    认证缓存服务类
+    """
+
+    # 认证事件频道，消息格式："r|<jti>|<exp>"（吊销令牌）或 "u|<user_id>"（用户变更）
+    EVENTS_CHANNEL = "auth:events"
+
+    def __init__(self):
+        self.principals = LocalCache(
+            max_entries=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+            max_ttl=settings.AUTH_PRINCIPAL_CACHE_TTL,
+        )
+        self._revoked: Dict[str, float] = {}
+        self._next_prune = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    # ==================== 主体缓存 ====================
+
+    @staticmethod
+    def _principal_key(user_id: Any) -> str:
+        return f"principal:{user_id}"
+
+    def get_principal(self, user_id: Any) -> Optional[User]:
+        """
+        获取缓存的用户
+
+        每次返回一个新的游离（detached）User 实例，请求之间不共享可变对象；
+        只加载了列属性，访问关系属性会报错
+
+        Args:
+            user_id: 用户 ID
+
+        Returns:
+            Optional[User]: 用户，未命中时为 None
+        """
+        snapshot = self.principals.get(self._principal_key(user_id))
+        if snapshot is None:
+            return None
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return user
+
+    def set_principal(self, user: User) -> None:
+        """
+        缓存用户的列快照
+
+        Args:
+            user: 从数据库加载的用户
+        """
+        snapshot = {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+        self.principals.set(self._principal_key(user.id), snapshot)
+
+    async def invalidate_user(self, user_id: Any) -> None:
+        """
+        用户资料、权限或状态变更后丢弃所有 worker 上的主体缓存
+
+        Args:
+            user_id: 用户 ID
+        """
+        self.principals.delete(self._principal_key(user_id))
+        await self._publish(f"u|{user_id}")
+
+    # ==================== 令牌吊销 ====================
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        令牌是否已吊销（只查本地副本）
+
+        Args:
+            jti: 令牌 ID
+
+        Returns:
+            bool: 是否已吊销
+        """
+        self._prune()
+        return jti in self._revoked
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        """
+        吊销令牌，记录保留到令牌过期为止
+
+        Args:
+            jti: 令牌 ID
+            expires_at: 令牌过期时间（Unix 时间戳）
+        """
+        self._revoked[jti] = expires_at
+        if cache_service.redis is None:
+            return
+        key = CacheKeys.revoked_tokens()
+        now = time.time()
+        # 集合至少保留到其中最晚过期的令牌过期为止
+        ttl = max(int(expires_at - now), settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, 1)
+        try:
+            async with cache_service.redis.pipeline(transaction=False) as pipe:
+                pipe.zadd(key, {jti: expires_at})
+                pipe.zremrangebyscore(key, "-inf", now)
+                pipe.expire(key, ttl)
+                pipe.publish(self.EVENTS_CHANNEL, f"r|{jti}|{expires_at}")
+                await pipe.execute()
+        except Exception as e:
+            app_logger.error(f"Failed to store token revocation: {e}")
+
+    def _prune(self) -> None:
+        now = time.time()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + 60
+        for jti in [jti for jti, exp in self._revoked.items() if exp <= now]:
+            del self._revoked[jti]
+
+    async def _sync_revoked(self) -> None:
+        """从 Redis 全量加载未过期的吊销记录"""
+        members = await cache_service.redis.zrangebyscore(
+            CacheKeys.revoked_tokens(), time.time(), "+inf", withscores=True
+        )
+        self._revoked = {
+            (jti.decode() if isinstance(jti, bytes) else jti): float(exp) for jti, exp in members
+        }
+
+    def _apply_event(self, data: Union[bytes, str]) -> None:
+        if isinstance(data, bytes):
+            data = data.decode()
+        kind, _, body = data.partition("|")
+        if kind == "r":
+            jti, _, exp = body.partition("|")
+            self._revoked[jti] = float(exp)
+        elif kind == "u":
+            self.principals.delete(self._principal_key(body))
+
+    async def _publish(self, message: str) -> None:
+        if cache_service.redis is None:
+            return
+        try:
+            await cache_service.redis.publish(self.EVENTS_CHANNEL, message)
+        except Exception as e:
+            app_logger.error(f"Failed to publish auth event: {e}")
+
+    async def _listen(self) -> None:
+        """订阅认证事件，每次（重新）订阅后以及每个同步周期做一次全量同步"""
+        while True:
+            pubsub = cache_service.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.EVENTS_CHANNEL)
+                # 先订阅再全量加载，两者之间发布的事件不会丢失
+                await self._sync_revoked()
+                next_sync = time.monotonic() + settings.AUTH_REVOCATION_SYNC_INTERVAL
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._apply_event(message["data"])
+                    if time.monotonic() >= next_sync:
+                        await self._sync_revoked()
+                        next_sync = time.monotonic() + settings.AUTH_REVOCATION_SYNC_INTERVAL
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception as e:
+                # 订阅中断期间可能漏收用户变更，清空主体缓存后重连
+                app_logger.error(f"Auth event subscriber error, reconnecting: {e}")
+                self.principals.clear()
+                await pubsub.aclose()
+                await asyncio.sleep(1)
+
+    def start(self) -> None:
+        """启动事件订阅（需在 cache_service.connect() 之后调用）"""
+        if self._task is None and cache_service.redis is not None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def shutdown(self) -> None:
+        """停止事件订阅"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+auth_cache_service = AuthCacheService()
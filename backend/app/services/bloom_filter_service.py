@@ -0,0 +1,184 @@
+"""
+Bloom Filter Service
+缓存穿透防护用的共享布隆过滤器
+
+过滤器中保存已存在的文章缓存键（按 ID 与按 slug），启动时从 articles 表预热，
+之后按固定间隔全量重建以清除已删除文章并纠正漏写。
+每个 worker 都调度重建任务，但只有取得 Redis 租约的一个 worker 执行；成功后
+租约保留到接近下一个重建周期，其余 worker 在本周期内跳过
+"""
+
+from datetime import datetime
+from typing import AsyncIterator, Iterable, List
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.article import Article
+from app.services.cache_service import cache_service
+from app.utils.bloom_filter import RedisBloomFilter
+from app.utils.cache_keys import CacheKeys
+from app.utils.logger import app_logger
+from app.utils.single_flight import RedisLease
+
+
+class BloomFilterService:
+    """
+    布隆过滤器服务类
+    """
+
+    # 预热时每批读取的文章数量
+    BATCH_SIZE = 1000
+
+    def __init__(self):
+        self.scheduler = AsyncIOScheduler()
+        self.filter = RedisBloomFilter(
+            "cache_keys",
+            capacity=settings.BLOOM_FILTER_CAPACITY,
+            error_rate=settings.BLOOM_FILTER_ERROR_RATE,
+        )
+
+    @staticmethod
+    def article_keys(article_id, slug) -> List[str]:
+        """
+        文章对应的全部缓存键
+
+        Args:
+            article_id: 文章 ID
+            slug: 文章 slug
+
+        Returns:
+            List[str]: 缓存键列表
+        """
+        keys = [CacheKeys.article(article_id)]
+        if slug:
+            keys.append(CacheKeys.article_by_slug(slug))
+        return keys
+
+    async def might_contain(self, key: str) -> bool:
+        """
+        判断缓存键对应的数据是否可能存在
+
+        Redis 不可用时放行
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            bool: False 表示一定不存在
+        """
+        if cache_service.redis is None:
+            return True
+        try:
+            return await self.filter.might_contain(cache_service.redis, key)
+        except Exception as e:
+            app_logger.warning(f"Bloom filter check failed for {key}: {e}")
+            return True
+
+    async def add(self, keys: Iterable[str]) -> None:
+        """
+        添加缓存键
+
+        Args:
+            keys: 缓存键列表
+        """
+        if cache_service.redis is None:
+            return
+        try:
+            await self.filter.add_many(cache_service.redis, keys)
+        except Exception as e:
+            app_logger.error(f"Failed to add keys to bloom filter: {e}")
+
+    async def add_article(self, article_id, slug) -> None:
+        """
+        新增或修改文章后登记其缓存键
+
+        Args:
+            article_id: 文章 ID
+            slug: 文章 slug
+        """
+        await self.add(self.article_keys(article_id, slug))
+
+    @property
+    def lease_ttl(self) -> float:
+        """重建租约时长：覆盖重建过程，并在成功后作为本周期的冷却时间"""
+        return settings.BLOOM_FILTER_REBUILD_INTERVAL * 0.9
+
+    async def _iter_article_keys(self) -> AsyncIterator[List[str]]:
+        async with AsyncSessionLocal() as session:
+            last_id = None
+            while True:
+                stmt = select(Article.id, Article.slug).order_by(Article.id).limit(self.BATCH_SIZE)
+                if last_id is not None:
+                    stmt = stmt.where(Article.id > last_id)
+                rows = (await session.execute(stmt)).all()
+                if not rows:
+                    return
+
+                batch: List[str] = []
+                for article_id, slug in rows:
+                    batch.extend(self.article_keys(article_id, slug))
+                yield batch
+                last_id = rows[-1][0]
+
+    async def rebuild(self) -> int:
+        """
+        从 articles 表全量重建过滤器（多个 worker 中只有取得租约的一个执行）
+
+        Returns:
+            int: 写入的键数量
+        """
+        if cache_service.redis is None:
+            return 0
+
+        lease = RedisLease(cache_service.redis, self.filter.lease_key, self.lease_ttl)
+        try:
+            if not await lease.acquire():
+                app_logger.debug("Bloom filter rebuild is running or recently done on another worker, skipping")
+                return 0
+            count = await self.filter.rebuild(cache_service.redis, self._iter_article_keys(), lease)
+        except Exception as e:
+            app_logger.error(f"Failed to rebuild bloom filter: {e}")
+            # 失败时释放租约，允许其他 worker 重试
+            try:
+                await lease.release()
+            except Exception as release_error:
+                app_logger.warning(f"Failed to release bloom filter rebuild lease: {release_error}")
+            return 0
+
+        app_logger.info(
+            f"Rebuilt bloom filter with {count} keys "
+            f"({self.filter.size // 8} bytes, k={self.filter.hash_count})"
+        )
+        return count
+
+    def start(self) -> None:
+        """
+        启动时预热并定期重建
+        """
+        app_logger.info("Starting bloom filter rebuild scheduler")
+
+        self.scheduler.add_job(
+            self.rebuild,
+            IntervalTrigger(seconds=settings.BLOOM_FILTER_REBUILD_INTERVAL),
+            id="bloom_filter_rebuild",
+            name="Bloom Filter Rebuild",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            next_run_time=datetime.now(),
+        )
+
+        self.scheduler.start()
+        app_logger.success("Bloom filter rebuild scheduler started")
+
+    def shutdown(self) -> None:
+        """
+        停止定期重建任务
+        """
+        self.scheduler.shutdown(wait=False)
+        app_logger.info("Bloom filter rebuild scheduler stopped")
+
+
+bloom_filter_service = BloomFilterService()
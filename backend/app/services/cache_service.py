@@ -1,8 +1,15 @@
 import redis.asyncio as redis
+import asyncio
 import json
-import pickle
-from typing import Any, Optional, Union, Dict, List
+import random
+import time
+import uuid
+from typing import Any, Callable, Optional, Union, Dict, List, Tuple
 from app.core.config import settings
+from app.utils.cache_keys import CacheKeys, CacheTags
+from app.utils.cache_serializer import CacheSerializer, PickleSerializer, get_serializer
+from app.utils.local_cache import LocalCache
+from app.utils.single_flight import RedisLease, SingleFlight, wait_for_value
 from app.utils.logger import app_logger
 
 
@@ -11,8 +18,83 @@ class CacheService:
     Redis缓存服务类
     """
 
-    def __init__(self):
+    # L1 失效广播频道
+    INVALIDATION_CHANNEL = "cache:invalidate"
+
+    # KEYS: 标签集合；ARGV: 键的过期时间（0 表示不过期）, 键
+    # 标签集合至少与其成员存活一样久，新建的集合随成员设置过期时间
+    REGISTER_TAGS_SCRIPT = """
+local ttl = tonumber(ARGV[1])
+for i = 1, #KEYS do
+    local existed = redis.call('EXISTS', KEYS[i]) == 1
+    redis.call('SADD', KEYS[i], ARGV[2])
+    if ttl > 0 then
+        local current = redis.call('TTL', KEYS[i])
+        if not existed or (current >= 0 and current < ttl) then
+            redis.call('EXPIRE', KEYS[i], ttl)
+        end
+    else
+        redis.call('PERSIST', KEYS[i])
+    end
+end
+return #KEYS
+"""
+
+    # KEYS: 标签集合；返回被删除的键
+    INVALIDATE_TAGS_SCRIPT = """
+local deleted = {}
+for i = 1, #KEYS do
+    local members = redis.call('SMEMBERS', KEYS[i])
+    for j = 1, #members, 500 do
+        redis.call('DEL', unpack(members, j, math.min(j + 499, #members)))
+    end
+    for _, member in ipairs(members) do
+        deleted[#deleted + 1] = member
+    end
+    redis.call('DEL', KEYS[i])
+end
+return deleted
+"""
+
+    def __init__(self, serializer: Optional[CacheSerializer] = None):
         self.redis = None
+        self.serializer = serializer or get_serializer(settings.CACHE_SERIALIZER)
+        # 主序列化器无法处理的值（如 ORM 实例）以及历史数据使用 pickle
+        self._fallback_serializer = PickleSerializer()
+
+        # 进程内 L1 缓存（可选），失效通过 Redis pub/sub 广播到所有 worker
+        self.local_cache: Optional[LocalCache] = None
+        if settings.CACHE_L1_ENABLED:
+            self.local_cache = LocalCache(
+                max_entries=settings.CACHE_L1_MAX_ENTRIES,
+                max_ttl=settings.CACHE_L1_MAX_TTL,
+            )
+        self._node_id = uuid.uuid4().hex
+        self._invalidation_task: Optional[asyncio.Task] = None
+        self.l2_hits = 0
+        self.l2_misses = 0
+
+    def _serialize(self, value: Any) -> bytes:
+        """
+        序列化缓存值，主序列化器不支持的类型回退到 pickle
+        :param value: 值
+        :return: 序列化后的字节
+        """
+        try:
+            return self.serializer.dumps(value)
+        except TypeError as e:
+            app_logger.debug(f"Falling back to pickle for cache value: {e}")
+            return self._fallback_serializer.dumps(value)
+
+    def _deserialize(self, data: bytes) -> Any:
+        """
+        反序列化缓存值，根据数据头选择序列化器
+        :param data: 序列化后的字节
+        :return: 值
+        """
+        if self.serializer.can_load(data):
+            return self.serializer.loads(data)
+        return self._fallback_serializer.loads(data)
 
     async def connect(self):
         """
@@ -32,31 +114,138 @@ class CacheService:
             app_logger.error(f"Failed to connect to Redis: {e}")
             raise
 
+        if self.local_cache is not None:
+            self._invalidation_task = asyncio.create_task(self._listen_invalidations())
+
     async def close(self):
         """
         关闭Redis连接
         """
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidation_task = None
         if self.redis:
             await self.redis.aclose()
 
+    async def _listen_invalidations(self):
+        """
+        订阅 L1 失效广播，丢弃其他 worker 已失效的本地条目
+        """
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._apply_invalidation(message["data"])
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception as e:
+                # 订阅中断期间可能漏收消息，清空 L1 后重连
+                app_logger.error(f"Cache invalidation subscriber error, reconnecting: {e}")
+                if self.local_cache is not None:
+                    self.local_cache.clear()
+                await pubsub.aclose()
+                await asyncio.sleep(1)
+
+    def _apply_invalidation(self, data: Union[bytes, str]) -> None:
+        """
+        处理一条失效消息，格式为 "<node_id>|<k|m|p|a>|<key、换行分隔的多个 key 或 pattern>"
+        """
+        if self.local_cache is None:
+            return
+        if isinstance(data, bytes):
+            data = data.decode()
+
+        node_id, kind, target = data.split("|", 2)
+        if node_id == self._node_id:
+            # 本进程发出的失效已在本地处理
+            return
+
+        if kind == "k":
+            self.local_cache.delete(target)
+        elif kind == "m":
+            for key in target.split("\n"):
+                self.local_cache.delete(key)
+        elif kind == "p":
+            self.local_cache.delete_pattern(target)
+        elif kind == "a":
+            self.local_cache.clear()
+
+    def _invalidation_message(self, kind: str, target: str = "") -> str:
+        return f"{self._node_id}|{kind}|{target}"
+
+    async def _broadcast_invalidation(self, kind: str, target: str = "") -> None:
+        """
+        广播 L1 失效消息（未启用 L1 时不发送）
+        """
+        if self.local_cache is None:
+            return
+        try:
+            await self.redis.publish(self.INVALIDATION_CHANNEL, self._invalidation_message(kind, target))
+        except Exception as e:
+            app_logger.error(f"Failed to broadcast cache invalidation: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取分层缓存命中统计
+        :return: 各层命中/未命中数据
+        """
+        l2_total = self.l2_hits + self.l2_misses
+        return {
+            "l1": self.local_cache.stats() if self.local_cache is not None else {"enabled": False},
+            "l2": {
+                "hits": self.l2_hits,
+                "misses": self.l2_misses,
+                "hit_rate": self.l2_hits / l2_total if l2_total else 0.0,
+            },
+        }
+
+    def _queue_tag_registration(self, pipe, key: str, tags: Optional[List[str]], expire: Optional[int]) -> None:
+        """
+        在管道中追加把键登记到依赖标签集合的命令
+        """
+        if tags:
+            tag_keys = [CacheTags.key(tag) for tag in tags]
+            pipe.eval(self.REGISTER_TAGS_SCRIPT, len(tag_keys), *tag_keys, expire or 0, key)
+
     async def set(
         self,
         key: str,
         value: Any,
-        expire: Optional[int] = 3600
+        expire: Optional[int] = 3600,
+        tags: Optional[List[str]] = None
     ) -> bool:
         """
         设置缓存值
         :param key: 键
         :param value: 值
         :param expire: 过期时间（秒）
+        :param tags: 依赖标签，数据变更时通过 invalidate_tags 失效
         :return: 是否设置成功
         """
         try:
-            # 序列化值
-            serialized_value = pickle.dumps(value)
-            result = await self.redis.set(key, serialized_value, ex=expire)
-            return result is not None
+            serialized_value = self._serialize(value)
+            if self.local_cache is None and not tags:
+                result = await self.redis.set(key, serialized_value, ex=expire)
+                return result is not None
+
+            # SET、标签登记与失效广播在同一次往返中发出
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.set(key, serialized_value, ex=expire)
+            self._queue_tag_registration(pipe, key, tags, expire)
+            if self.local_cache is not None:
+                pipe.publish(self.INVALIDATION_CHANNEL, self._invalidation_message("k", key))
+            results = await pipe.execute()
+
+            if self.local_cache is not None:
+                self.local_cache.set(key, value, ttl=expire)
+            return results[0] is not None
         except Exception as e:
             app_logger.error(f"Failed to set cache: {e}")
             return False
@@ -67,12 +256,31 @@ class CacheService:
         :param key: 键
         :return: 缓存的值，如果不存在则返回None
         """
+        if self.local_cache is not None:
+            value = self.local_cache.get(key, LocalCache.MISSING)
+            if value is not LocalCache.MISSING:
+                return value
+
         try:
-            value = await self.redis.get(key)
-            if value is not None:
-                # 反序列化值
-                return pickle.loads(value)
-            return None
+            if self.local_cache is None:
+                value = await self.redis.get(key)
+                ttl_ms = None
+            else:
+                # 同时取回剩余 TTL，L1 条目不会比 Redis 中的更晚过期
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.get(key)
+                pipe.pttl(key)
+                value, ttl_ms = await pipe.execute()
+
+            if value is None:
+                self.l2_misses += 1
+                return None
+
+            self.l2_hits += 1
+            result = self._deserialize(value)
+            if self.local_cache is not None:
+                self.local_cache.set(key, result, ttl=ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else None)
+            return result
         except Exception as e:
             app_logger.error(f"Failed to get cache: {e}")
             return None
@@ -83,39 +291,87 @@ class CacheService:
         :param keys: 键列表
         :return: 值列表
         """
-        try:
-            values = await self.redis.mget(keys)
-            result = []
-            for value in values:
-                if value is not None:
-                    result.append(pickle.loads(value))
+        result: List[Optional[Any]] = [None] * len(keys)
+        missing_indexes = list(range(len(keys)))
+
+        if self.local_cache is not None:
+            missing_indexes = []
+            for index, key in enumerate(keys):
+                value = self.local_cache.get(key, LocalCache.MISSING)
+                if value is LocalCache.MISSING:
+                    missing_indexes.append(index)
                 else:
-                    result.append(None)
+                    result[index] = value
+            if not missing_indexes:
+                return result
+
+        try:
+            values = await self.redis.mget([keys[index] for index in missing_indexes])
+            for index, value in zip(missing_indexes, values):
+                if value is None:
+                    self.l2_misses += 1
+                    continue
+                self.l2_hits += 1
+                result[index] = self._deserialize(value)
+                if self.local_cache is not None:
+                    # MGET 不返回 TTL，使用 L1 上限
+                    self.local_cache.set(keys[index], result[index])
             return result
         except Exception as e:
             app_logger.error(f"Failed to get multiple cache values: {e}")
-            return [None] * len(keys)
+            return result
+
+    @staticmethod
+    def jittered_ttl(expire: Optional[int], jitter: float = 0.0) -> Optional[int]:
+        """
+        为过期时间添加随机抖动，避免同批写入的键同时过期（缓存雪崩）
+        :param expire: 过期时间（秒）
+        :param jitter: 最大抖动比例，如 0.1 表示增加 0~10%
+        :return: 抖动后的过期时间
+        """
+        if not expire or jitter <= 0:
+            return expire
+        return expire + random.randint(0, int(expire * jitter))
 
-    async def mset(self, mapping: Dict[str, Any], expire: Optional[int] = 3600) -> bool:
+    async def mset(
+        self,
+        mapping: Dict[str, Any],
+        expire: Optional[int] = 3600,
+        jitter: float = 0.0,
+        tags: Optional[Dict[str, List[str]]] = None
+    ) -> bool:
         """
         批量设置多个缓存值
+
+        所有 SET EX 在一个事务管道中一次往返发出，不存在键没有过期时间的窗口
         :param mapping: 键值对映射
         :param expire: 过期时间（秒）
+        :param jitter: 过期时间最大抖动比例（每个键独立抖动）
+        :param tags: 键 -> 依赖标签
         :return: 是否设置成功
         """
-        try:
-            serialized_mapping = {}
-            for key, value in mapping.items():
-                serialized_mapping[key] = pickle.dumps(value)
-
-            # 先执行批量设置
-            result = await self.redis.mset(serialized_mapping)
+        if not mapping:
+            return True
 
-            # 然后为每个键单独设置过期时间
-            for key in mapping.keys():
-                await self.redis.expire(key, expire)
+        try:
+            ttls = {key: self.jittered_ttl(expire, jitter) for key in mapping}
 
-            return result is not None
+            pipe = self.redis.pipeline(transaction=True)
+            for key, value in mapping.items():
+                pipe.set(key, self._serialize(value), ex=ttls[key])
+            if tags:
+                for key in mapping:
+                    self._queue_tag_registration(pipe, key, tags.get(key), ttls[key])
+            if self.local_cache is not None:
+                for key in mapping:
+                    pipe.publish(self.INVALIDATION_CHANNEL, self._invalidation_message("k", key))
+            results = await pipe.execute()
+
+            if self.local_cache is not None:
+                for key, value in mapping.items():
+                    self.local_cache.set(key, value, ttl=ttls[key])
+
+            return all(results[:len(mapping)])
         except Exception as e:
             app_logger.error(f"Failed to set multiple cache values: {e}")
             return False
@@ -126,20 +382,59 @@ class CacheService:
         :param key: 键
         :return: 是否删除成功
         """
+        if self.local_cache is not None:
+            self.local_cache.delete(key)
+
         try:
-            result = await self.redis.delete(key)
+            if self.local_cache is None:
+                result = await self.redis.delete(key)
+            else:
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.delete(key)
+                pipe.publish(self.INVALIDATION_CHANNEL, self._invalidation_message("k", key))
+                result, _ = await pipe.execute()
             return result > 0
         except Exception as e:
             app_logger.error(f"Failed to delete cache: {e}")
             return False
 
+    async def invalidate_tags(self, *tags: str) -> int:
+        """
+        按依赖标签失效缓存
+
+        只删除登记在这些标签下的键，代价与成员数量成正比
+        :param tags: 依赖标签
+        :return: 删除的键数量（包括已自然过期的键）
+        """
+        if not tags:
+            return 0
+
+        try:
+            tag_keys = [CacheTags.key(tag) for tag in tags]
+            deleted = await self.redis.eval(self.INVALIDATE_TAGS_SCRIPT, len(tag_keys), *tag_keys)
+        except Exception as e:
+            app_logger.error(f"Failed to invalidate cache tags {tags}: {e}")
+            return 0
+
+        keys = [key.decode() if isinstance(key, bytes) else key for key in deleted]
+        if keys and self.local_cache is not None:
+            for key in keys:
+                self.local_cache.delete(key)
+            await self._broadcast_invalidation("m", "\n".join(keys))
+        return len(keys)
+
     async def delete_pattern(self, pattern: str, batch_size: int = 100) -> int:
         """
         根据模式删除多个缓存键（使用SCAN渐进式删除，避免KEYS命令阻塞Redis）
+        需要遍历整个键空间，数据变更时应优先使用 invalidate_tags
         :param pattern: 键模式，例如 "user:*" 或 "article:*"
         :param batch_size: 每批扫描的键数量，默认100
         :return: 删除的键的数量
         """
+        if self.local_cache is not None:
+            self.local_cache.delete_pattern(pattern)
+        await self._broadcast_invalidation("p", pattern)
+
         try:
             deleted_count = 0
             cursor = 0
@@ -183,6 +478,10 @@ class CacheService:
         清空所有缓存
         :return: 是否清空成功
         """
+        if self.local_cache is not None:
+            self.local_cache.clear()
+        await self._broadcast_invalidation("a")
+
         try:
             await self.redis.flushall()
             return True
@@ -228,7 +527,7 @@ class CacheService:
         """
         try:
             import zlib
-            serialized_value = pickle.dumps(value)
+            serialized_value = self._serialize(value)
 
             # 如果序列化后的数据大于1KB，则进行压缩
             if len(serialized_value) > 1024:
@@ -239,6 +538,9 @@ class CacheService:
                 stored_value = serialized_value
 
             result = await self.redis.set(key, stored_value, ex=expire)
+            if self.local_cache is not None:
+                self.local_cache.delete(key)
+                await self._broadcast_invalidation("k", key)
             return result is not None
         except Exception as e:
             app_logger.error(f"Failed to set compressed cache: {e}")
@@ -258,9 +560,9 @@ class CacheService:
                     import zlib
                     compressed_data = value[11:]  # 移除 'COMPRESSED:' 前缀
                     decompressed_data = zlib.decompress(compressed_data)
-                    return pickle.loads(decompressed_data)
+                    return self._deserialize(decompressed_data)
                 else:
-                    return pickle.loads(value)
+                    return self._deserialize(value)
             return None
         except Exception as e:
             app_logger.error(f"Failed to get decompressed cache: {e}")
@@ -272,34 +574,159 @@ cache_service = CacheService()
 
 
 # 便捷函数
+# 进程内单飞：同一键的并发加载共享一个任务
+_single_flight = SingleFlight()
+
+# 启用 stale-while-revalidate 时缓存值的信封字段（软过期时间戳）
+_SWR_FRESH_UNTIL = "__swr_fresh_until__"
+
+
+def _wrap_swr(value: Any, expire: int) -> Dict[str, Any]:
+    return {_SWR_FRESH_UNTIL: time.time() + expire, "value": value}
+
+
+def _unwrap_swr(cached: Any) -> Tuple[Any, bool]:
+    """
+    拆开 SWR 信封
+    :return: (值, 是否仍新鲜)；非信封值视为新鲜
+    """
+    if isinstance(cached, dict) and _SWR_FRESH_UNTIL in cached:
+        return cached["value"], cached[_SWR_FRESH_UNTIL] > time.time()
+    return cached, True
+
+
+async def _load_and_store(key: str, fetch_func, expire: Optional[int], stale_ttl: int, tags, args, kwargs) -> Any:
+    value = await fetch_func(*args, **kwargs)
+    if value is not None:
+        key_tags = tags(value) if callable(tags) else tags
+        if stale_ttl and expire:
+            # Redis 中保留到软过期之后 stale_ttl 秒，期间可返回旧值
+            await cache_service.set(key, _wrap_swr(value, expire), expire + stale_ttl, tags=key_tags)
+        else:
+            await cache_service.set(key, value, expire, tags=key_tags)
+    return value
+
+
+async def cache_set_many(
+    mapping: Dict[str, Any],
+    expire: Optional[int] = 3600,
+    stale_ttl: int = 0,
+    jitter: float = 0.1,
+    tags: Optional[Dict[str, List[str]]] = None,
+) -> bool:
+    """
+    批量预热缓存，写入格式与 cache_get_or_set 一致
+    :param mapping: 键值对映射
+    :param expire: 过期时间（秒）
+    :param stale_ttl: 过期后允许返回旧值的时间（秒），应与读取方一致
+    :param jitter: 过期时间最大抖动比例
+    :param tags: 键 -> 依赖标签
+    :return: 是否设置成功
+    """
+    if stale_ttl and expire:
+        mapping = {key: _wrap_swr(value, expire) for key, value in mapping.items()}
+        expire = expire + stale_ttl
+    return await cache_service.mset(mapping, expire, jitter=jitter, tags=tags)
+
+
+async def _acquire_lease(key: str) -> Optional[RedisLease]:
+    """
+    尝试获取跨 worker 加载租约
+    :return: 获取成功返回租约；已被其他 worker 持有返回 None；Redis 不可用时返回未持有的租约（直接加载）
+    """
+    lease = RedisLease(cache_service.redis, CacheKeys.cache_lock(key), settings.CACHE_LOCK_TIMEOUT)
+    try:
+        if await lease.acquire():
+            return lease
+        return None
+    except Exception as e:
+        app_logger.warning(f"Cache lease unavailable for {key}, loading directly: {e}")
+        return lease
+
+
+async def _release_lease(key: str, lease: RedisLease) -> None:
+    try:
+        await lease.release()
+    except Exception as e:
+        # 释放失败时租约会自然到期
+        app_logger.warning(f"Failed to release cache lease for {key}: {e}")
+
+
 async def cache_get_or_set(
     key: str,
     fetch_func,
     expire: Optional[int] = 3600,
     *args,
+    stale_ttl: int = 0,
+    tags: Union[List[str], Callable[[Any], List[str]], None] = None,
     **kwargs
 ) -> Any:
     """
     获取缓存值，如果不存在则调用fetch_func获取并存储到缓存
+
+    缓存未命中时按单飞方式加载：同一进程内的并发请求共享一次加载，
+    跨 worker 通过 Redis 租约保证只有一个 worker 查询数据源，其余 worker
+    在 CACHE_LOCK_WAIT_TIMEOUT 内等待其写入的结果，超时后自行加载。
+    stale_ttl > 0 时启用 stale-while-revalidate：值过期后的 stale_ttl 秒内
+    继续返回旧值，只由取得租约的一个请求负责刷新。
+
     :param key: 缓存键
     :param fetch_func: 获取数据的函数
     :param expire: 过期时间（秒）
     :param args: 传递给fetch_func的位置参数
+    :param stale_ttl: 过期后允许返回旧值的时间（秒），0 表示不启用
+    :param tags: 依赖标签，或根据加载结果计算标签的函数
     :param kwargs: 传递给fetch_func的关键字参数
     :return: 数据
     """
     # 尝试从缓存获取
     cached_value = await cache_service.get(key)
     if cached_value is not None:
-        return cached_value
+        value, fresh = _unwrap_swr(cached_value)
+        if fresh:
+            return value
+
+        # 已过期：本进程已有请求在刷新时直接返回旧值
+        if _single_flight.in_flight(key):
+            return value
+
+        async def revalidate():
+            lease = await _acquire_lease(key)
+            if lease is None:
+                # 其他 worker 正在刷新
+                return value
+            try:
+                return await _load_and_store(key, fetch_func, expire, stale_ttl, tags, args, kwargs)
+            except Exception as e:
+                app_logger.error(f"Failed to revalidate cache {key}, serving stale value: {e}")
+                return value
+            finally:
+                await _release_lease(key, lease)
+
+        return await _single_flight.do(key, revalidate)
+
+    async def load():
+        lease = await _acquire_lease(key)
+        if lease is None:
+            # 其他 worker 正在加载，有界等待其结果
+            cached = await wait_for_value(lambda: cache_service.get(key), settings.CACHE_LOCK_WAIT_TIMEOUT)
+            if cached is not None:
+                return _unwrap_swr(cached)[0]
+            app_logger.warning(f"Timed out waiting for cache fill of {key}, loading directly")
+            return await _load_and_store(key, fetch_func, expire, stale_ttl, tags, args, kwargs)
 
-    # 如果缓存不存在，调用fetch_func获取数据
-    value = await fetch_func(*args, **kwargs)
-
-    # 存储到缓存
-    await cache_service.set(key, value, expire)
-
-    return value
+        try:
+            # 双重检查：租约获取前其他 worker 可能刚写入
+            cached = await cache_service.get(key)
+            if cached is not None:
+                value, fresh = _unwrap_swr(cached)
+                if fresh:
+                    return value
+            return await _load_and_store(key, fetch_func, expire, stale_ttl, tags, args, kwargs)
+        finally:
+            await _release_lease(key, lease)
+
+    return await _single_flight.do(key, load)
 
 
 async def cache_get_or_set_compressed(
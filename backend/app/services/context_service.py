@@ -4,7 +4,8 @@ Context Service
 """
 
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.context import (
     ContextWindow,
     ContextConfig,
@@ -28,7 +29,7 @@ class ContextService:
 
     async def get_context_window(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
         config: Optional[ContextConfig] = None,
     ) -> ContextWindow:
@@ -36,7 +37,7 @@ class ContextService:
         获取对话的上下文窗口
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
             config: 上下文配置
         
@@ -48,7 +49,7 @@ class ContextService:
 
     async def get_relevant_context(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
         query: str,
         top_k: int = 5,
@@ -57,7 +58,7 @@ class ContextService:
         获取相关上下文
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
             query: 查询内容
             top_k: 返回数量
@@ -70,14 +71,14 @@ class ContextService:
 
     async def get_summaries(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
     ) -> List[ContextSummarySchema]:
         """
         获取对话的摘要列表
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
         
         Returns:
@@ -88,7 +89,7 @@ class ContextService:
 
     async def create_summary(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
         max_messages: Optional[int] = None,
     ):
@@ -96,7 +97,7 @@ class ContextService:
         创建对话摘要
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
             max_messages: 最大消息数
         """
@@ -105,7 +106,7 @@ class ContextService:
 
     async def update_summary(
         self,
-        db: Session,
+        db: AsyncSession,
         summary_id: str,
         conversation_id: str,
     ):
@@ -113,35 +114,36 @@ class ContextService:
         更新摘要
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             summary_id: 摘要 ID
             conversation_id: 对话 ID
         """
         from app.models.conversation import ConversationMessage
         
-        messages = (
-            db.query(ConversationMessage)
-            .filter(ConversationMessage.conversation_id == conversation_id)
-            .all()
+        result = await db.execute(
+            select(ConversationMessage)
+            .where(ConversationMessage.conversation_id == conversation_id)
+            .order_by(ConversationMessage.created_at)
         )
+        messages = list(result.scalars().all())
         
         summarizer = ContextSummarizer()
         return await summarizer.update_summary(db, summary_id, messages)
 
     async def clear_context(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
     ) -> None:
         """
         清空对话的上下文历史
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
         """
         manager = ContextManager(self.default_config)
-        manager.clear_context(db, conversation_id)
+        await manager.clear_context(db, conversation_id)
         app_logger.info(f"Cleared context for conversation {conversation_id}")
 
 
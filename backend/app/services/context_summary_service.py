@@ -0,0 +1,166 @@
+"""
+Context Summary Service
+后台滚动摘要服务
+
+请求路径只把需要摘要的对话 ID 放入队列（同一对话排队或摘要期间只保留一份），
+后台任务逐个把检查点之后的新消息折叠进摘要，LLM 调用不再阻塞用户请求。
+跨 worker 通过每个对话一个 Redis 租约保证同一对话只有一个摘要在执行
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Set
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.context.summarizer import ContextSummarizer
+from app.services.cache_service import cache_service
+from app.utils.cache_keys import CacheKeys
+from app.utils.logger import app_logger
+from app.utils.single_flight import RedisLease
+
+
+class ContextSummaryService:
+    """
+    后台滚动摘要服务类
+    """
+
+    def __init__(self):
+        self.summarizer = ContextSummarizer()
+        self._queue: Optional[asyncio.Queue] = None
+        # 排队中或正在摘要的对话 ID -> 保留不折叠的最近消息数
+        self._pending: Dict[str, int] = {}
+        # 正在摘要的对话，以及摘要期间再次被请求、结束后需要重新排队的对话
+        self._running: Set[str] = set()
+        self._rerun: Set[str] = set()
+        self._workers: List[asyncio.Task] = []
+        self.dropped = 0
+
+    def schedule(self, conversation_id: str, keep_last: int = 0) -> bool:
+        """
+        请求后台更新对话摘要（不做 IO）
+
+        Args:
+            conversation_id: 对话 ID
+            keep_last: 最近 N 条消息不折叠进摘要
+
+        Returns:
+            bool: 是否已排队（服务未启动或队列已满时为 False）
+        """
+        if self._queue is None:
+            return False
+        if conversation_id in self._pending:
+            self._pending[conversation_id] = keep_last
+            if conversation_id in self._running:
+                # 摘要开始后到达的消息可能未被折叠，结束后再排队一次
+                self._rerun.add(conversation_id)
+            return True
+        try:
+            self._queue.put_nowait(conversation_id)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            app_logger.warning(f"Context summary queue full, skipped conversation {conversation_id}")
+            return False
+        self._pending[conversation_id] = keep_last
+        return True
+
+    async def summarize(self, conversation_id: str, keep_last: int = 0) -> int:
+        """
+        把对话检查点之后的消息分批折叠进摘要，直到没有可折叠的消息
+
+        持有该对话的 Redis 租约期间执行，多个 worker 不会对同一对话并发生成检查点；
+        Redis 未连接时只依赖进程内去重
+
+        Args:
+            conversation_id: 对话 ID
+            keep_last: 最近 N 条消息不折叠进摘要
+
+        Returns:
+            int: 新建的检查点数量（其他 worker 正在摘要该对话时为 0）
+        """
+        lease = None
+        if cache_service.redis is not None:
+            lease = RedisLease(
+                cache_service.redis,
+                CacheKeys.context_summary_lock(conversation_id),
+                settings.CONTEXT_SUMMARY_LEASE_TTL,
+            )
+            try:
+                if not await lease.acquire():
+                    app_logger.debug(f"Conversation {conversation_id} is being summarized on another worker")
+                    return 0
+            except Exception as e:
+                app_logger.error(f"Failed to acquire summary lease for conversation {conversation_id}: {e}")
+                return 0
+
+        try:
+            return await self._summarize(conversation_id, keep_last)
+        finally:
+            if lease is not None:
+                try:
+                    await lease.release()
+                except Exception as e:
+                    # 释放失败时租约会自然到期
+                    app_logger.warning(f"Failed to release summary lease for conversation {conversation_id}: {e}")
+
+    async def _summarize(self, conversation_id: str, keep_last: int) -> int:
+        batch = settings.CONTEXT_SUMMARY_BATCH_MESSAGES
+        checkpoints = 0
+        async with AsyncSessionLocal() as session:
+            while True:
+                checkpoint = await self.summarizer.create_summary(
+                    session, conversation_id, max_messages=batch, keep_last=keep_last,
+                )
+                if checkpoint is None:
+                    break
+                checkpoints += 1
+        return checkpoints
+
+    async def _run(self) -> None:
+        while True:
+            conversation_id = await self._queue.get()
+            # 摘要结束前保留在 _pending 中，期间的新请求不会再次入队让另一个任务并发摘要
+            keep_last = self._pending.get(conversation_id, 0)
+            self._running.add(conversation_id)
+            try:
+                await self.summarize(conversation_id, keep_last)
+            except Exception as e:
+                app_logger.error(f"Failed to summarize conversation {conversation_id}: {e}")
+            finally:
+                self._running.discard(conversation_id)
+                keep_last = self._pending.pop(conversation_id, 0)
+                if conversation_id in self._rerun:
+                    self._rerun.discard(conversation_id)
+                    self.schedule(conversation_id, keep_last)
+                self._queue.task_done()
+
+    def start(self) -> None:
+        """
+        启动后台摘要任务
+        """
+        app_logger.info("Starting context summary workers")
+        self._queue = asyncio.Queue(maxsize=settings.CONTEXT_SUMMARY_QUEUE_SIZE)
+        self._pending.clear()
+        self._running.clear()
+        self._rerun.clear()
+        self._workers = [
+            asyncio.create_task(self._run())
+            for _ in range(max(settings.CONTEXT_SUMMARY_WORKERS, 1))
+        ]
+        app_logger.success("Context summary workers started")
+
+    async def shutdown(self) -> None:
+        """
+        停止后台摘要任务（未完成的摘要直接放弃，下次触发时会从检查点继续）
+        """
+        app_logger.info("Shutting down context summary workers")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._pending.clear()
+        self._running.clear()
+        self._rerun.clear()
+        app_logger.info("Context summary workers stopped")
+
+
+context_summary_service = ContextSummaryService()
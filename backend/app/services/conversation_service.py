@@ -4,7 +4,7 @@ Conversation Service
 """
 
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.conversation import (
     ConversationCreate,
     ConversationUpdate,
@@ -28,7 +28,7 @@ class ConversationService:
 
     async def create_conversation(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_in: ConversationCreate,
         tenant_id: str,
         user_id: str,
@@ -37,7 +37,7 @@ class ConversationService:
         创建新对话
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_in: 创建请求
             tenant_id: 租户 ID
             user_id: 用户 ID
@@ -51,7 +51,7 @@ class ConversationService:
 
     async def get_conversation(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
         tenant_id: str,
         user_id: str,
@@ -60,7 +60,7 @@ class ConversationService:
         获取对话
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
             tenant_id: 租户 ID
             user_id: 用户 ID
@@ -74,45 +74,58 @@ class ConversationService:
 
     async def list_conversations(
         self,
-        db: Session,
+        db: AsyncSession,
         tenant_id: str,
         user_id: str,
         skip: int = 0,
         limit: int = 100,
         status: Optional[str] = None,
+        cursor: Optional[str] = None,
     ) -> ConversationListResponse:
         """
         获取对话列表
         
+        未指定 skip 时使用游标分页，下一页游标通过 next_cursor 返回
+        
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             tenant_id: 租户 ID
             user_id: 用户 ID
-            skip: 跳过数量
+            skip: 跳过数量（偏移分页）
             limit: 限制数量
             status: 状态筛选
+            cursor: 游标
         
         Returns:
             ConversationListResponse: 对话列表响应
         """
-        from app.crud.conversation import count_conversations
-        
-        conversations = await conversation_engine.list_conversations(
-            db, tenant_id, user_id, skip, limit, status
-        )
-        
-        total = count_conversations(db, tenant_id, user_id, status)
+        from app.crud.async_conversation import count_conversations, get_conversations_page
+        from app.utils.pagination import CursorPaginationParams
+        
+        next_cursor = None
+        if skip and not cursor:
+            conversations = await conversation_engine.list_conversations(
+                db, tenant_id, user_id, skip, limit, status
+            )
+        else:
+            page = await get_conversations_page(
+                db, tenant_id, user_id, CursorPaginationParams(cursor=cursor, limit=limit), status
+            )
+            conversations, next_cursor = page.items, page.next_cursor
+        
+        total = await count_conversations(db, tenant_id, user_id, status)
         
         return ConversationListResponse(
             conversations=conversations,
             total=total,
             page=skip // limit + 1,
             page_size=limit,
+            next_cursor=next_cursor,
         )
 
     async def chat(
         self,
-        db: Session,
+        db: AsyncSession,
         chat_request: ChatRequest,
         tenant_id: str,
         user_id: str,
@@ -121,7 +134,7 @@ class ConversationService:
         处理聊天请求（非流式）
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             chat_request: 聊天请求
             tenant_id: 租户 ID
             user_id: 用户 ID
@@ -135,7 +148,7 @@ class ConversationService:
 
     async def chat_stream(
         self,
-        db: Session,
+        db: AsyncSession,
         chat_request: ChatRequest,
         tenant_id: str,
         user_id: str,
@@ -144,7 +157,7 @@ class ConversationService:
         处理聊天请求（流式）
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             chat_request: 聊天请求
             tenant_id: 租户 ID
             user_id: 用户 ID
@@ -159,7 +172,7 @@ class ConversationService:
 
     async def update_conversation(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
         conversation_in: ConversationUpdate,
         tenant_id: str,
@@ -169,7 +182,7 @@ class ConversationService:
         更新对话
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
             conversation_in: 更新请求
             tenant_id: 租户 ID
@@ -178,9 +191,9 @@ class ConversationService:
         Returns:
             Conversation: 更新后的对话对象或 None
         """
-        from app.crud.conversation import get_conversation, update_conversation
+        from app.crud.async_conversation import get_conversation, update_conversation
         
-        conversation = get_conversation(db, conversation_id)
+        conversation = await get_conversation(db, conversation_id)
         
         if not conversation or (
             str(conversation.tenant_id) != tenant_id or
@@ -189,11 +202,11 @@ class ConversationService:
             return None
         
         app_logger.info(f"Updating conversation: {conversation_id}")
-        return update_conversation(db, conversation, conversation_in)
+        return await update_conversation(db, conversation, conversation_in)
 
     async def delete_conversation(
         self,
-        db: Session,
+        db: AsyncSession,
         conversation_id: str,
         tenant_id: str,
         user_id: str,
@@ -202,7 +215,7 @@ class ConversationService:
         删除对话
         
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             conversation_id: 对话 ID
             tenant_id: 租户 ID
             user_id: 用户 ID
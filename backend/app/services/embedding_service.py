@@ -0,0 +1,168 @@
+"""
+Embedding Service
+文本向量化服务
+
+优先使用本地 sentence-transformers 模型（仅 CPU，批量编码）；未配置模型或未安装依赖时
+使用特征哈希向量（英文单词 + 中日韩字符二元组），同样输出 L2 归一化的定长向量，
+保证记忆检索在开发与测试环境中可用
+"""
+
+import asyncio
+import hashlib
+import math
+import re
+import threading
+from typing import List, Optional
+from app.core.config import settings
+from app.utils.logger import app_logger
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SentenceTransformer = None
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+_CJK_RUN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+")
+
+
+def _features(text: str) -> List[str]:
+    """
+    提取哈希向量的特征：英文单词，以及中日韩连续字符的单字与二元组
+    """
+    lowered = text.lower()
+    features = _WORD.findall(lowered)
+    for run in _CJK_RUN.findall(lowered):
+        features.extend(run)
+        features.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return features
+
+
+def hashing_embedding(text: str, dim: int) -> List[float]:
+    """
+    特征哈希向量
+
+    每个特征用稳定哈希映射到一个维度并带正负号，词频取对数后 L2 归一化
+
+    Args:
+        text: 文本
+        dim: 向量维度
+
+    Returns:
+        List[float]: 归一化向量（空文本为全零向量）
+    """
+    counts = {}
+    for feature in _features(text):
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        index = value % dim
+        sign = 1.0 if value >> 63 else -1.0
+        counts[index] = counts.get(index, 0.0) + sign
+
+    vector = [0.0] * dim
+    for index, count in counts.items():
+        if count:
+            vector[index] = math.copysign(1.0 + math.log(abs(count)), count)
+
+    norm = math.sqrt(sum(x * x for x in vector))
+    if norm == 0:
+        return vector
+    return [x / norm for x in vector]
+
+
+class EmbeddingService:
+    """
+    文本向量化服务类
+    """
+
+    def __init__(self):
+        self.dim = settings.EMBEDDING_DIM
+        self._model = None
+        self._model_loaded = False
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model_loaded:
+            return self._model
+
+        with self._lock:
+            if self._model_loaded:
+                return self._model
+            if settings.EMBEDDING_MODEL and SENTENCE_TRANSFORMERS_AVAILABLE:
+                try:
+                    model = SentenceTransformer(settings.EMBEDDING_MODEL, device="cpu")
+                    model_dim = model.get_sentence_embedding_dimension()
+                    if model_dim != self.dim:
+                        app_logger.error(
+                            f"Embedding model {settings.EMBEDDING_MODEL} outputs {model_dim} dimensions, "
+                            f"EMBEDDING_DIM is {self.dim}; falling back to hashing embeddings"
+                        )
+                    else:
+                        self._model = model
+                        app_logger.info(f"Loaded embedding model {settings.EMBEDDING_MODEL}")
+                except Exception as e:
+                    app_logger.error(f"Failed to load embedding model {settings.EMBEDDING_MODEL}: {e}")
+            self._model_loaded = True
+        return self._model
+
+    @property
+    def backend(self) -> str:
+        """当前使用的向量化方式"""
+        return "model" if self._get_model() is not None else "hashing"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        批量向量化（CPU 密集，在线程中调用）
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            List[List[float]]: 与 texts 一一对应的 L2 归一化向量
+        """
+        if not texts:
+            return []
+        model = self._get_model()
+        if model is None:
+            return [hashing_embedding(text, self.dim) for text in texts]
+        vectors = model.encode(
+            texts,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return [[float(x) for x in vector] for vector in vectors]
+
+    async def aembed(self, texts: List[str]) -> List[List[float]]:
+        """
+        批量向量化（在线程池中执行，不阻塞事件循环）
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            List[List[float]]: 向量列表
+        """
+        if not texts:
+            return []
+        return await asyncio.to_thread(self.embed, texts)
+
+    async def aembed_one(self, text: str) -> Optional[List[float]]:
+        """
+        单条文本向量化
+
+        Args:
+            text: 文本
+
+        Returns:
+            Optional[List[float]]: 向量，文本为空时为 None
+        """
+        if not text:
+            return None
+        vectors = await self.aembed([text])
+        return vectors[0]
+
+
+embedding_service = EmbeddingService()
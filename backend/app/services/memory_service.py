@@ -1,5 +1,6 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.memory import (
     MemoryCreate,
     MemoryUpdate,
@@ -11,9 +12,20 @@ from app.schemas.memory import (
     MemoryBatchCreate,
 )
 from app.crud import memory as memory_crud
+from app.crud import async_memory as async_memory_crud
+from app.core.config import settings
+from app.services.embedding_service import embedding_service
+from app.utils.vector_index import ShardedVectorIndex
 from app.utils.logger import app_logger
 
 
+memory_index = ShardedVectorIndex(max_shards=settings.MEMORY_INDEX_MAX_SHARDS)
+
+
+def _shard_key(tenant_id, user_id) -> tuple:
+    return (str(tenant_id), str(user_id))
+
+
 class MemoryService:
     """
     记忆服务类
@@ -41,15 +53,12 @@ class MemoryService:
         Returns:
             Memory: 创建的记忆对象
         """
-        memory = await memory_crud.create_memory(
-            db=db,
-            content=memory_in.content,
-            memory_type=memory_in.memory_type,
-            tenant_id=tenant_id,
-            user_id=user_id,
-            importance=memory_in.importance,
-            expires_at=memory_in.expires_at,
+        embedding = await embedding_service.aembed_one(memory_in.content)
+        memory = memory_crud.create_memory(
+            db, memory_in, tenant_id, user_id, embedding=embedding
         )
+        if embedding is not None:
+            memory_index.upsert(_shard_key(tenant_id, user_id), memory.id, embedding)
 
         return memory
 
@@ -115,16 +124,19 @@ class MemoryService:
 
     async def search_memories(
         self,
-        db: Session,
+        db: AsyncSession,
         tenant_id: str,
         user_id: str,
         search_request: MemorySearchRequest,
     ) -> MemorySearchResponse:
         """
-        搜索记忆
+        语义搜索记忆
+
+        先按向量相似度召回 top_k * MEMORY_SEARCH_OVERSAMPLE 条候选，再按
+        (1 - w) * 相似度 + w * 重要性 重新排序，低于 MEMORY_MIN_SIMILARITY 的结果被过滤
 
         Args:
-            db: 数据库会话
+            db: 异步数据库会话
             tenant_id: 租户 ID
             user_id: 用户 ID
             search_request: 搜索请求
@@ -132,16 +144,25 @@ class MemoryService:
         Returns:
             MemorySearchResponse: 搜索结果响应
         """
-        memories = memory_crud.search_memories(
-            db=db,
-            tenant_id=tenant_id,
-            user_id=user_id,
-            query=search_request.query,
-            memory_type=search_request.memory_type,
-            min_importance=search_request.min_importance,
-            top_k=search_request.top_k,
+        query_embedding = await embedding_service.aembed_one(search_request.query)
+        candidates = await self._vector_candidates(
+            db,
+            tenant_id,
+            user_id,
+            query_embedding,
+            search_request.memory_type,
+            search_request.min_importance,
+            search_request.top_k * settings.MEMORY_SEARCH_OVERSAMPLE,
         )
 
+        weight = settings.MEMORY_IMPORTANCE_WEIGHT
+        scored = [
+            (mem, similarity, (1 - weight) * similarity + weight * (mem.importance or 0.0))
+            for mem, similarity in candidates
+            if similarity >= settings.MEMORY_MIN_SIMILARITY
+        ]
+        scored.sort(key=lambda item: item[2], reverse=True)
+
         results = [
             {
                 "id": str(mem.id),
@@ -150,8 +171,10 @@ class MemoryService:
                 "importance": mem.importance,
                 "access_count": mem.access_count,
                 "created_at": mem.created_at.isoformat(),
+                "similarity": round(similarity, 4),
+                "score": round(score, 4),
             }
-            for mem in memories
+            for mem, similarity, score in scored[:search_request.top_k]
         ]
 
         return MemorySearchResponse(
@@ -160,6 +183,50 @@ class MemoryService:
             total=len(results),
         )
 
+    async def _vector_candidates(
+        self,
+        db: AsyncSession,
+        tenant_id: str,
+        user_id: str,
+        query_embedding: List[float],
+        memory_type: Optional[str],
+        min_importance: Optional[float],
+        limit: int,
+    ) -> List[Tuple[Any, float]]:
+        """
+        向量召回候选记忆
+
+        PostgreSQL 在用户的记忆中按 pgvector 余弦距离精确排序；其它数据库使用按用户分片的进程内索引，
+        分片首次访问时从数据库加载
+
+        Returns:
+            List[Tuple[Memory, float]]: (记忆, 相似度) 列表
+        """
+        if query_embedding is None:
+            return []
+
+        if db.bind.dialect.name == "postgresql":
+            return await async_memory_crud.search_memories(
+                db=db,
+                tenant_id=tenant_id,
+                user_id=user_id,
+                query_embedding=query_embedding,
+                memory_type=memory_type,
+                min_importance=min_importance,
+                top_k=limit,
+            )
+
+        key = _shard_key(tenant_id, user_id)
+        if not memory_index.has_shard(key):
+            items = await async_memory_crud.get_memory_embeddings(db, tenant_id, user_id)
+            memory_index.load_shard(key, items)
+
+        hits = dict(memory_index.search(key, query_embedding, limit))
+        memories = await async_memory_crud.get_memories_by_ids(
+            db, list(hits.keys()), memory_type, min_importance
+        )
+        return [(mem, hits[mem.id]) for mem in memories]
+
     async def update_memory(
         self,
         db: Session,
@@ -183,7 +250,14 @@ class MemoryService:
         if not memory or str(memory.user_id) != user_id:
             return None
 
-        return memory_crud.update_memory(db, memory, memory_in)
+        embedding = None
+        if memory_in.content is not None and memory_in.content != memory.content:
+            embedding = await embedding_service.aembed_one(memory_in.content)
+
+        memory = memory_crud.update_memory(db, memory, memory_in, embedding=embedding)
+        if embedding is not None:
+            memory_index.upsert(_shard_key(memory.tenant_id, memory.user_id), memory.id, embedding)
+        return memory
 
     async def delete_memory(
         self,
@@ -206,6 +280,7 @@ class MemoryService:
         if not memory or str(memory.user_id) != user_id:
             return None
 
+        memory_index.remove(_shard_key(memory.tenant_id, memory.user_id), memory.id)
         return memory_crud.delete_memory(db, memory_id)
 
     async def batch_create_memories(
@@ -229,13 +304,21 @@ class MemoryService:
         """
         from app.crud.memory import create_memories_batch
 
+        embeddings = await embedding_service.aembed(
+            [memory_in.content for memory_in in batch_request.memories]
+        )
         memories = create_memories_batch(
             db=db,
             memories_in=batch_request.memories,
             tenant_id=tenant_id,
             user_id=user_id,
+            embeddings=embeddings,
         )
 
+        key = _shard_key(tenant_id, user_id)
+        for memory, embedding in zip(memories, embeddings):
+            memory_index.upsert(key, memory.id, embedding)
+
         return memories
 
     async def get_stats(
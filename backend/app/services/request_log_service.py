@@ -0,0 +1,215 @@
+"""
+Request Log Service
+请求日志缓冲写入服务
+
+请求管道只把记录追加到进程内环形缓冲区，后台任务每隔固定毫秒数或积压达到批量阈值时
+批量写入数据库（PostgreSQL 上为 COPY）；缓冲区满时丢弃最旧记录并计数，数据库故障不会拖慢请求。
+请求日志表按天分区，过期数据直接删除整个分区
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud.request_log import (
+    bulk_insert_rows,
+    drop_expired_request_log_partitions,
+    ensure_request_log_partitions,
+)
+from app.models.logs.request_log import RequestLog
+from app.utils.log_buffer import LogBuffer
+from app.utils.logger import app_logger
+from app.utils.metrics import metrics_registry
+
+
+class RequestLogService:
+    """
+    请求日志缓冲写入服务类
+    """
+
+    def __init__(self):
+        self.scheduler = AsyncIOScheduler()
+        self.requests = LogBuffer(
+            "request_logs",
+            capacity=settings.REQUEST_LOG_BUFFER_SIZE,
+            flush_threshold=settings.REQUEST_LOG_FLUSH_BATCH,
+        )
+        self._buffers = ((self.requests, RequestLog),)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @staticmethod
+    def _truncate(value: Optional[str], length: int) -> Optional[str]:
+        if value is None or len(value) <= length:
+            return value
+        return value[:length]
+
+    def record_request(
+        self,
+        request_id: str,
+        method: str,
+        path: str,
+        query_string: str,
+        status_code: int,
+        response_time: float,
+        duration: float,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        referer: Optional[str] = None,
+        user_id: Optional[str] = None,
+    ) -> None:
+        """
+        追加一条请求日志（不做 IO）
+
+        Args:
+            request_id: 请求 ID
+            method: HTTP 方法
+            path: 请求路径
+            query_string: 查询字符串
+            status_code: 响应状态码
+            response_time: 发出响应头的耗时（秒）
+            duration: 总耗时（秒，流式响应包含响应体发送时间）
+            ip_address: 客户端 IP
+            user_agent: User-Agent
+            referer: Referer
+            user_id: 已登录用户 ID
+        """
+        if not settings.REQUEST_LOG_ENABLED:
+            return
+
+        url = f"{path}?{query_string}" if query_string else path
+        try:
+            user_uuid = uuid.UUID(user_id) if user_id else None
+        except ValueError:
+            user_uuid = None
+
+        self.requests.append({
+            "id": uuid.uuid4(),
+            "request_id": request_id,
+            "method": method,
+            "url": self._truncate(url, 500),
+            "path": self._truncate(path, 500),
+            "user_agent": user_agent,
+            "ip_address": ip_address,
+            "referer": self._truncate(referer, 500),
+            "response_status": status_code,
+            "response_time": int(response_time * 1000),
+            "timestamp": datetime.now(timezone.utc),
+            "duration": int(duration * 1000),
+            "user_id": user_uuid,
+        })
+
+    async def flush(self) -> int:
+        """
+        将缓冲区中的记录分批写入数据库
+
+        写入失败的批次直接丢弃并计数，不回填缓冲区，避免数据库故障时反复重试占满内存
+
+        Returns:
+            int: 本次写入的行数
+        """
+        total = 0
+        for buffer, model in self._buffers:
+            while len(buffer):
+                rows = buffer.drain(settings.REQUEST_LOG_FLUSH_BATCH)
+                try:
+                    async with AsyncSessionLocal() as session:
+                        written = await bulk_insert_rows(session, model, rows)
+                except Exception as e:
+                    buffer.mark_failed(len(rows))
+                    app_logger.error(f"Failed to write {len(rows)} rows to {buffer.name}: {e}")
+                    break
+                buffer.mark_written(written)
+                total += written
+        return total
+
+    async def _run(self) -> None:
+        interval = settings.REQUEST_LOG_FLUSH_INTERVAL_MS / 1000
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                app_logger.error(f"Request log flush loop error: {e}")
+
+    async def maintain_partitions(self) -> None:
+        """
+        提前创建日分区并删除过期分区
+        """
+        today = datetime.now(timezone.utc).date()
+        try:
+            async with AsyncSessionLocal() as session:
+                await ensure_request_log_partitions(session, today, settings.REQUEST_LOG_PARTITIONS_AHEAD)
+                await drop_expired_request_log_partitions(session, today, settings.REQUEST_LOG_RETENTION_DAYS)
+        except Exception as e:
+            app_logger.error(f"Failed to maintain request_logs partitions: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """各缓冲区统计"""
+        return {buffer.name: buffer.stats() for buffer, _ in self._buffers}
+
+    def start(self) -> None:
+        """
+        启动后台写入任务与分区维护任务
+        """
+        app_logger.info("Starting request log writer")
+
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        for buffer, _ in self._buffers:
+            buffer.bind(self._wakeup)
+        self._task = asyncio.create_task(self._run())
+
+        # 启动时立即执行一次，之后每天检查分区
+        self.scheduler.add_job(
+            self.maintain_partitions,
+            CronTrigger(hour=0, minute=10),
+            id="request_log_partitions",
+            name="Request Log Partitions",
+            replace_existing=True,
+            next_run_time=datetime.now(),
+        )
+        self.scheduler.start()
+        app_logger.success("Request log writer started")
+
+    async def shutdown(self) -> None:
+        """
+        停止后台任务并写入剩余记录
+        """
+        app_logger.info("Shutting down request log writer")
+        self.scheduler.shutdown(wait=False)
+        self._stopping = True
+        if self._task is not None:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        app_logger.info("Request log writer stopped")
+
+
+request_log_service = RequestLogService()
+
+
+@metrics_registry.register_collector
+def _collect_log_buffers():
+    samples = []
+    for stat, type_name, help_text in (
+        ("pending", "gauge", "Log rows waiting to be written"),
+        ("appended", "counter", "Log rows appended to the buffer"),
+        ("written", "counter", "Log rows written to the database"),
+        ("dropped", "counter", "Log rows dropped because the buffer was full"),
+        ("failed", "counter", "Log rows dropped because the database write failed"),
+    ):
+        name = f"log_buffer_{stat}" if type_name == "gauge" else f"log_buffer_{stat}_total"
+        values = [({"table": table}, stats[stat]) for table, stats in request_log_service.stats().items()]
+        samples.append((name, type_name, help_text, values))
+    return samples
@@ -0,0 +1,246 @@
+"""
+Article Search Service
+文章全文检索服务
+
+倒排索引保存在 article_search_terms / article_search_docs 两张表中，文章写入时在同一事务内增量更新；
+检索只读取查询词项的倒排链并在数据库中按 BM25 聚合打分，PostgreSQL 与 SQLite 共用同一实现
+"""
+
+import time
+from typing import Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import case, delete, false, func, insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.article import Article
+from app.models.article_search import ArticleSearchDoc, ArticleSearchTerm
+from app.utils.logger import app_logger
+from app.utils.text_search import bm25_idf, highlight_snippet, tokenize, weighted_term_frequencies
+
+
+# 字段权重：标题命中比摘要、正文更重要
+TITLE_WEIGHT = 3
+EXCERPT_WEIGHT = 2
+CONTENT_WEIGHT = 1
+
+# 影响索引内容的文章字段
+INDEXED_FIELDS = ("title", "excerpt", "content")
+
+
+class ArticleSearchService:
+    """
+    文章全文检索服务类
+    """
+
+    def __init__(self):
+        self._stats: Optional[Tuple[int, float]] = None
+        self._stats_expires_at = 0.0
+
+    @property
+    def use_jieba(self) -> bool:
+        return settings.SEARCH_TOKENIZER == "jieba"
+
+    def query_terms(self, query: Optional[str]) -> List[str]:
+        """
+        查询分词（去重，保持顺序）
+
+        Args:
+            query: 查询字符串
+
+        Returns:
+            List[str]: 词项列表
+        """
+        return list(dict.fromkeys(tokenize(query, self.use_jieba, for_query=True)))
+
+    def index_article(self, db: Session, article: Article) -> None:
+        """
+        重建一篇文章的倒排索引（不提交，随调用方事务一起提交）
+
+        Args:
+            db: 数据库会话
+            article: 文章对象（需已有 ID）
+        """
+        frequencies = weighted_term_frequencies(
+            (
+                (article.title, TITLE_WEIGHT),
+                (article.excerpt, EXCERPT_WEIGHT),
+                (article.content, CONTENT_WEIGHT),
+            ),
+            self.use_jieba,
+        )
+
+        self.remove_articles(db, [article.id])
+        if frequencies:
+            db.execute(
+                insert(ArticleSearchTerm),
+                [
+                    {"term": term, "article_id": article.id, "tf": float(tf)}
+                    for term, tf in frequencies.items()
+                ],
+            )
+        db.execute(
+            insert(ArticleSearchDoc).values(
+                article_id=article.id, length=float(sum(frequencies.values()))
+            )
+        )
+
+    def remove_articles(self, db: Session, article_ids: Iterable[UUID]) -> None:
+        """
+        删除文章的倒排索引（不提交）
+
+        Args:
+            db: 数据库会话
+            article_ids: 文章 ID 列表
+        """
+        article_ids = list(article_ids)
+        if not article_ids:
+            return
+        db.execute(delete(ArticleSearchTerm).where(ArticleSearchTerm.article_id.in_(article_ids)))
+        db.execute(delete(ArticleSearchDoc).where(ArticleSearchDoc.article_id.in_(article_ids)))
+
+    def match_filter(self, query: str):
+        """
+        构造"文章包含全部查询词项"的过滤条件，替代 title/content/excerpt 上的 ILIKE 扫描
+
+        Args:
+            query: 查询字符串
+
+        Returns:
+            SQLAlchemy 条件表达式，可用于同步 Query 与异步 select
+        """
+        terms = self.query_terms(query)
+        if not terms:
+            return false()
+        matched = (
+            select(ArticleSearchTerm.article_id)
+            .where(ArticleSearchTerm.term.in_(terms))
+            .group_by(ArticleSearchTerm.article_id)
+            .having(func.count() == len(terms))
+        )
+        return Article.id.in_(matched)
+
+    def _corpus_stats(self, db: Session) -> Tuple[int, float]:
+        now = time.monotonic()
+        if self._stats is None or now >= self._stats_expires_at:
+            total, avg_length = db.query(
+                func.count(ArticleSearchDoc.article_id), func.avg(ArticleSearchDoc.length)
+            ).one()
+            self._stats = (total or 0, float(avg_length or 1.0))
+            self._stats_expires_at = now + settings.SEARCH_STATS_TTL
+        return self._stats
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        published_only: bool = True,
+        skip: int = 0,
+        limit: int = 20,
+    ) -> List[Tuple[UUID, float]]:
+        """
+        BM25 检索
+
+        Args:
+            db: 数据库会话
+            query: 查询字符串
+            published_only: 是否仅检索已发布文章
+            skip: 跳过数量
+            limit: 返回数量
+
+        Returns:
+            List[Tuple[UUID, float]]: (文章 ID, 得分) 按得分降序
+        """
+        terms = self.query_terms(query)
+        if not terms:
+            return []
+
+        doc_freqs = dict(
+            db.query(ArticleSearchTerm.term, func.count())
+            .filter(ArticleSearchTerm.term.in_(terms))
+            .group_by(ArticleSearchTerm.term)
+            .all()
+        )
+        if not doc_freqs:
+            return []
+
+        total_docs, avg_length = self._corpus_stats(db)
+        total_docs = max(total_docs, max(doc_freqs.values()))
+        idf = case(
+            {term: bm25_idf(total_docs, df) for term, df in doc_freqs.items()},
+            value=ArticleSearchTerm.term,
+            else_=0.0,
+        )
+
+        k1, b = settings.SEARCH_BM25_K1, settings.SEARCH_BM25_B
+        tf = ArticleSearchTerm.tf
+        norm = k1 * (1 - b + b * ArticleSearchDoc.length / avg_length)
+        score = func.sum(idf * tf * (k1 + 1) / (tf + norm)).label("score")
+
+        stmt = (
+            db.query(ArticleSearchTerm.article_id, score)
+            .join(ArticleSearchDoc, ArticleSearchDoc.article_id == ArticleSearchTerm.article_id)
+            .filter(ArticleSearchTerm.term.in_(list(doc_freqs)))
+        )
+        if published_only:
+            stmt = stmt.join(Article, Article.id == ArticleSearchTerm.article_id).filter(
+                Article.is_published == True
+            )
+
+        rows = (
+            stmt.group_by(ArticleSearchTerm.article_id)
+            .order_by(score.desc(), ArticleSearchTerm.article_id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        return [(row.article_id, float(row.score)) for row in rows]
+
+    def snippet(self, article: Article, query: str) -> str:
+        """
+        生成文章的高亮摘要（正文无命中时使用摘要或标题）
+
+        Args:
+            article: 文章对象
+            query: 查询字符串
+
+        Returns:
+            str: 摘要 HTML
+        """
+        terms = self.query_terms(query)
+        lowered = (article.content or "").lower()
+        source = article.content if any(term in lowered for term in terms) else (article.excerpt or article.title)
+        return highlight_snippet(source, terms, settings.SEARCH_SNIPPET_LENGTH)
+
+    def reindex_all(self, db: Session, batch_size: int = 200) -> int:
+        """
+        重建全部文章的索引（分批提交）
+
+        Args:
+            db: 数据库会话
+            batch_size: 每批文章数
+
+        Returns:
+            int: 索引的文章数量
+        """
+        indexed = 0
+        last_id = None
+        while True:
+            query = db.query(Article).order_by(Article.id)
+            if last_id is not None:
+                query = query.filter(Article.id > last_id)
+            articles = query.limit(batch_size).all()
+            if not articles:
+                break
+            last_id = articles[-1].id
+            for article in articles:
+                self.index_article(db, article)
+            db.commit()
+            db.expunge_all()
+            indexed += len(articles)
+            app_logger.info(f"Indexed {indexed} articles for search")
+
+        self._stats = None
+        return indexed
+
+
+article_search_service = ArticleSearchService()
@@ -65,36 +65,34 @@ class StatisticsService:
         }
 
     @staticmethod
-    def get_view_statistics(db: Session) -> Dict:
+    def get_view_statistics(db: Session, days: int = 30) -> Dict:
         """
         获取浏览量统计
+
+        总量与今日/本周/本月数据均来自全站日汇总表（每天一行），与文章数量无关；
+        周、月按自然周（周一起）和自然月计算
         """
-        # 总浏览量
-        total_views = db.query(func.sum(Article.view_count)).scalar() or 0
+        from app.crud.view_stats import get_site_views_by_day, get_site_views_total
 
-        # 今日浏览量
-        today = datetime.now(timezone.utc).date()
-        today_views = db.query(func.sum(Article.view_count)).filter(
-            func.date(Article.updated_at) == today
-        ).scalar() or 0
+        # 总浏览量（已落库部分，汇总表启用前的历史浏览量由迁移 019 补为基线行）
+        total_views = get_site_views_total(db)
 
-        # 本周浏览量
-        week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-        week_views = db.query(func.sum(Article.view_count)).filter(
-            Article.updated_at >= week_ago
-        ).scalar() or 0
+        today = datetime.now(timezone.utc).date()
+        week_start = today - timedelta(days=today.weekday())
+        month_start = today.replace(day=1)
+        trend_start = today - timedelta(days=days - 1)
 
-        # 本月浏览量
-        month_ago = datetime.now(timezone.utc) - timedelta(days=30)
-        month_views = db.query(func.sum(Article.view_count)).filter(
-            Article.updated_at >= month_ago
-        ).scalar() or 0
+        daily = get_site_views_by_day(db, min(month_start, week_start, trend_start), today)
 
         return {
             "total": total_views,
-            "today": today_views,
-            "this_week": week_views,
-            "this_month": month_views
+            "today": sum(views for day, views in daily if day == today),
+            "this_week": sum(views for day, views in daily if day >= week_start),
+            "this_month": sum(views for day, views in daily if day >= month_start),
+            "daily": [
+                {"date": day.isoformat(), "views": views}
+                for day, views in daily if day >= trend_start
+            ],
         }
 
     @staticmethod
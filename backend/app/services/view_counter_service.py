@@ -0,0 +1,440 @@
+"""
+View Counter Service
+文章浏览量写回缓冲服务
+
+浏览量先累加到 Redis Hash，由后台任务按固定间隔把聚合后的增量
+以一条批量 UPDATE 写回 articles.view_count，避免热点文章每次访问都提交事务；
+同一事务内追加按日流水并累加全站日汇总，供浏览量统计使用。
+文章详情接口在进程内计数（record_view_nowait），按 VIEW_COUNT_PUSH_INTERVAL
+批量推送到 Redis Hash，请求路径上不等待任何网络往返。
+落库在跨 worker 租约下执行；每次把待落库 Hash RENAME 为带唯一 ID 的快照，
+快照 ID 与 UPDATE 在同一事务内写入 view_count_flushes，重试时已应用的快照只做清理
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List
+from uuid import UUID
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from pydantic import BaseModel
+from sqlalchemy import case, update
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud import async_article
+from app.crud.view_stats import record_daily_views, ensure_view_partitions, prune_view_count_flushes
+from app.models.article import Article
+from app.models.article_view_daily import ViewCountFlush
+from app.services.cache_service import cache_service
+from app.utils.cache_keys import CacheKeys
+from app.utils.logger import app_logger
+from app.utils.single_flight import RedisLease
+
+
+# KEYS: 待落库 Hash, 快照 ID 集合; ARGV: 快照键前缀, 新快照 ID
+SNAPSHOT_SCRIPT = """
+if redis.call('exists', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('rename', KEYS[1], ARGV[1] .. ARGV[2])
+redis.call('sadd', KEYS[2], ARGV[2])
+return 1
+"""
+
+# KEYS: 待落库 Hash, 快照 ID 集合; ARGV: 快照键前缀, 文章 ID...
+PENDING_SCRIPT = """
+local fields = {unpack(ARGV, 2)}
+local totals = redis.call('hmget', KEYS[1], unpack(fields))
+for i = 1, #totals do
+    totals[i] = tonumber(totals[i]) or 0
+end
+for _, snapshot_id in ipairs(redis.call('smembers', KEYS[2])) do
+    local values = redis.call('hmget', ARGV[1] .. snapshot_id, unpack(fields))
+    for i = 1, #values do
+        totals[i] = totals[i] + (tonumber(values[i]) or 0)
+    end
+end
+return totals
+"""
+
+# 落库记录保留天数（只需覆盖快照重试窗口）
+FLUSH_RECORD_RETENTION_DAYS = 7
+
+
+class ViewCounterService:
+    """
+    浏览量写回缓冲服务类
+    """
+
+    def __init__(self):
+        self.scheduler = AsyncIOScheduler()
+        self.pending_key = CacheKeys.stats_article_views_pending()
+        self.snapshots_key = CacheKeys.stats_article_views_snapshots()
+        self.flushing_prefix = CacheKeys.stats_article_views_flushing("")
+        self.lease_key = CacheKeys.stats_article_views_flush_lock()
+        # 租约覆盖数轮落库间隔；持有者崩溃后到期释放，快照由下一个持有者重试
+        self.lease_ttl = max(settings.VIEW_COUNT_FLUSH_INTERVAL * 2, 60)
+        self._local_counts: Dict[str, int] = {}
+
+    async def record_view(self, article_id: UUID, amount: int = 1) -> bool:
+        """
+        记录文章浏览
+
+        Redis 不可用时退化为直接原子更新数据库
+
+        Args:
+            article_id: 文章 ID
+            amount: 增加的浏览量
+
+        Returns:
+            bool: 是否写入了 Redis 缓冲区
+        """
+        try:
+            await cache_service.redis.hincrby(self.pending_key, str(article_id), amount)
+            return True
+        except Exception as e:
+            app_logger.warning(f"View buffer unavailable, writing view count directly: {e}")
+
+        async with AsyncSessionLocal() as session:
+            await async_article.increment_view_count(session, article_id, amount)
+        return False
+
+    def record_view_nowait(self, article_id: Any, amount: int = 1) -> None:
+        """
+        在进程内记录文章浏览（不等待），由 push_local_views 定期批量推送
+
+        进程异常退出时最多丢失一个推送间隔内的计数
+
+        Args:
+            article_id: 文章 ID
+            amount: 增加的浏览量
+        """
+        key = str(article_id)
+        self._local_counts[key] = self._local_counts.get(key, 0) + amount
+
+    async def push_local_views(self) -> int:
+        """
+        把进程内计数以一次管道写入 Redis 缓冲区
+
+        Redis 不可用时退化为直接原子更新数据库
+
+        Returns:
+            int: 推送的文章数量
+        """
+        if not self._local_counts:
+            return 0
+        counts, self._local_counts = self._local_counts, {}
+
+        try:
+            pipe = cache_service.redis.pipeline(transaction=False)
+            for article_id, amount in counts.items():
+                pipe.hincrby(self.pending_key, article_id, amount)
+            await pipe.execute()
+            return len(counts)
+        except Exception as e:
+            app_logger.warning(f"View buffer unavailable, writing {len(counts)} view counts directly: {e}")
+
+        try:
+            async with AsyncSessionLocal() as session:
+                for article_id, amount in counts.items():
+                    await async_article.increment_view_count(session, UUID(article_id), amount)
+        except Exception as e:
+            app_logger.error(f"Failed to write view counts: {e}")
+            return 0
+        return len(counts)
+
+    async def get_pending_views(self, article_id: UUID) -> int:
+        """
+        获取文章尚未落库的浏览量增量
+
+        Args:
+            article_id: 文章 ID
+
+        Returns:
+            int: 待落库增量（包括正在落库的部分）
+        """
+        counts = await self.get_pending_views_many([article_id])
+        return counts.get(str(article_id), 0)
+
+    async def get_pending_views_many(self, article_ids: Iterable[UUID]) -> Dict[str, int]:
+        """
+        批量获取文章尚未落库的浏览量增量
+
+        Args:
+            article_ids: 文章 ID 列表
+
+        Returns:
+            Dict[str, int]: 文章 ID -> 待落库增量（包括尚未清理的快照）
+        """
+        fields = [str(article_id) for article_id in article_ids]
+        if not fields:
+            return {}
+
+        try:
+            totals = await cache_service.redis.eval(
+                PENDING_SCRIPT, 2, self.pending_key, self.snapshots_key, self.flushing_prefix, *fields
+            )
+        except Exception as e:
+            app_logger.error(f"Failed to read pending view counts: {e}")
+            return {}
+
+        return {field: int(total or 0) for field, total in zip(fields, totals)}
+
+    @staticmethod
+    def _add_view_count(article: Any, pending: int) -> Any:
+        """
+        返回 view_count 增加 pending 后的文章对象
+
+        Schema 对象可能来自进程内 L1 缓存、被多个请求共享，因此复制后再修改
+        """
+        view_count = (article.view_count or 0) + pending
+        if isinstance(article, BaseModel):
+            return article.model_copy(update={"view_count": view_count})
+        article.view_count = view_count
+        return article
+
+    async def merge_pending(self, article: Any) -> Any:
+        """
+        将待落库增量合并到文章对象的 view_count 上
+
+        Args:
+            article: 文章对象（ORM 对象或具有 id/view_count 属性的对象）
+
+        Returns:
+            Any: 合并后的文章对象（Schema 对象返回副本）
+        """
+        pending = await self.get_pending_views(article.id)
+        if pending:
+            article = self._add_view_count(article, pending)
+        return article
+
+    async def merge_pending_many(self, articles: List[Any]) -> List[Any]:
+        """
+        将待落库增量批量合并到文章列表上
+
+        Args:
+            articles: 文章对象列表
+
+        Returns:
+            List[Any]: 合并后的文章列表
+        """
+        counts = await self.get_pending_views_many(article.id for article in articles)
+        return [
+            self._add_view_count(article, counts[str(article.id)]) if counts.get(str(article.id)) else article
+            for article in articles
+        ]
+
+    async def flush(self) -> int:
+        """
+        将缓冲区中的增量批量写回数据库
+
+        持有跨 worker 租约时，先把待落库 Hash 原子地 RENAME 为带唯一 ID 的快照，
+        新的浏览继续写入新 Hash；随后逐个应用尚未清理的快照（包括之前失败遗留的）
+
+        Returns:
+            int: 本次写回的文章数量
+        """
+        if cache_service.redis is None:
+            return 0
+
+        lease = RedisLease(cache_service.redis, self.lease_key, self.lease_ttl)
+        try:
+            if not await lease.acquire():
+                return 0
+        except Exception as e:
+            app_logger.error(f"Failed to acquire view count flush lease: {e}")
+            return 0
+
+        try:
+            await cache_service.redis.eval(
+                SNAPSHOT_SCRIPT, 2, self.pending_key, self.snapshots_key,
+                self.flushing_prefix, uuid.uuid4().hex,
+            )
+            snapshot_ids = await cache_service.redis.smembers(self.snapshots_key)
+            flushed = 0
+            for snapshot_id in sorted(
+                sid.decode() if isinstance(sid, bytes) else sid for sid in snapshot_ids
+            ):
+                flushed += await self._flush_snapshot(snapshot_id)
+            return flushed
+        except Exception as e:
+            app_logger.error(f"Failed to snapshot pending view counts: {e}")
+            return 0
+        finally:
+            try:
+                await lease.release()
+            except Exception as e:
+                app_logger.warning(f"Failed to release view count flush lease: {e}")
+
+    async def _flush_snapshot(self, snapshot_id: str) -> int:
+        """
+        把一个快照写回数据库并清理
+
+        快照 ID 与 UPDATE 在同一事务内写入 view_count_flushes；已有记录说明快照已应用
+        （上次写库成功但清理失败），直接清理，不会重复累加
+
+        Args:
+            snapshot_id: 快照 ID
+
+        Returns:
+            int: 写回的文章数量（失败时为 0，快照保留到下一轮重试）
+        """
+        snapshot_key = CacheKeys.stats_article_views_flushing(snapshot_id)
+        try:
+            raw = await cache_service.redis.hgetall(snapshot_key)
+        except Exception as e:
+            app_logger.error(f"Failed to read view count snapshot {snapshot_id}: {e}")
+            return 0
+
+        deltas: Dict[UUID, int] = {}
+        for field, value in raw.items():
+            field = field.decode() if isinstance(field, bytes) else field
+            try:
+                delta = int(value)
+                if delta:
+                    deltas[UUID(field)] = delta
+            except (TypeError, ValueError):
+                app_logger.warning(f"Skipping malformed view count entry: {field}={value!r}")
+
+        flushed = []
+        if deltas:
+            try:
+                async with AsyncSessionLocal() as session:
+                    if await session.get(ViewCountFlush, snapshot_id) is not None:
+                        app_logger.info(f"View count snapshot {snapshot_id} already applied, cleaning up")
+                    else:
+                        # 先写入快照记录：租约过期导致两个 worker 同时应用同一快照时，
+                        # 后者在主键冲突处失败回滚
+                        record = ViewCountFlush(snapshot_id=snapshot_id)
+                        session.add(record)
+                        await session.flush()
+
+                        result = await session.execute(
+                            update(Article)
+                            .where(Article.id.in_(list(deltas.keys())))
+                            .values(
+                                view_count=Article.view_count + case(deltas, value=Article.id, else_=0),
+                                # 浏览量不是内容修改，保持 updated_at 不变（抑制 onupdate）
+                                updated_at=Article.updated_at,
+                            )
+                            .returning(Article.id, Article.slug)
+                            .execution_options(synchronize_session=False)
+                        )
+                        flushed = result.all()
+
+                        # 增量按落库时的 UTC 日期归档
+                        flushed_ids = {article_id for article_id, _ in flushed}
+                        await record_daily_views(
+                            session,
+                            {article_id: delta for article_id, delta in deltas.items() if article_id in flushed_ids},
+                            datetime.now(timezone.utc).date(),
+                        )
+                        record.article_count = len(flushed)
+                        await session.commit()
+            except Exception as e:
+                app_logger.error(f"Failed to flush view count snapshot {snapshot_id}, will retry: {e}")
+                return 0
+
+        try:
+            await cache_service.redis.delete(snapshot_key)
+            await cache_service.redis.srem(self.snapshots_key, snapshot_id)
+        except Exception as e:
+            app_logger.warning(f"Failed to clean up view count snapshot {snapshot_id}: {e}")
+
+        # 缓存中的文章快照携带旧的 view_count，落库后失效以免与已清空的增量相减；
+        # 预序列化的详情响应同时失效，其中的浏览量最多滞后一个落库间隔
+        for article_id, slug in flushed:
+            await cache_service.delete(CacheKeys.article(article_id))
+            await cache_service.delete(CacheKeys.article_json(article_id))
+            if slug:
+                await cache_service.delete(CacheKeys.article_by_slug(slug))
+                await cache_service.delete(CacheKeys.article_json_by_slug(slug))
+
+        if flushed:
+            app_logger.info(f"Flushed view counts for {len(flushed)} articles")
+        return len(flushed)
+
+    async def prune_flush_records(self) -> None:
+        """
+        删除超过保留期的快照落库记录
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                removed = await prune_view_count_flushes(
+                    session, datetime.now(timezone.utc) - timedelta(days=FLUSH_RECORD_RETENTION_DAYS)
+                )
+            if removed:
+                app_logger.info(f"Pruned {removed} view count flush records")
+        except Exception as e:
+            app_logger.error(f"Failed to prune view count flush records: {e}")
+
+    async def ensure_partitions(self) -> None:
+        """
+        提前创建浏览流水表的月分区
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                await ensure_view_partitions(session, datetime.now(timezone.utc).date())
+        except Exception as e:
+            app_logger.error(f"Failed to ensure view rollup partitions: {e}")
+
+    def start(self) -> None:
+        """
+        启动定期写回任务
+        """
+        app_logger.info("Starting view counter flush scheduler")
+
+        self.scheduler.add_job(
+            self.flush,
+            IntervalTrigger(seconds=settings.VIEW_COUNT_FLUSH_INTERVAL),
+            id="view_count_flush",
+            name="View Count Flush",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+
+        self.scheduler.add_job(
+            self.push_local_views,
+            IntervalTrigger(seconds=settings.VIEW_COUNT_PUSH_INTERVAL),
+            id="view_count_push",
+            name="View Count Push",
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+        )
+
+        # 启动时立即执行一次，之后每天检查分区
+        self.scheduler.add_job(
+            self.ensure_partitions,
+            CronTrigger(hour=0, minute=5),
+            id="view_rollup_partitions",
+            name="View Rollup Partitions",
+            replace_existing=True,
+            next_run_time=datetime.now(),
+        )
+
+        self.scheduler.add_job(
+            self.prune_flush_records,
+            CronTrigger(hour=0, minute=15),
+            id="view_flush_records_prune",
+            name="View Count Flush Records Prune",
+            replace_existing=True,
+        )
+
+        self.scheduler.start()
+        app_logger.success("View counter flush scheduler started")
+
+    async def shutdown(self) -> None:
+        """
+        停止定期写回任务并写回剩余增量
+        """
+        app_logger.info("Shutting down view counter flush scheduler")
+        self.scheduler.shutdown(wait=False)
+        await self.push_local_views()
+        await self.flush()
+        app_logger.info("View counter flush scheduler stopped")
+
+
+view_counter_service = ViewCounterService()
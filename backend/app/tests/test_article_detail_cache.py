@@ -0,0 +1,187 @@
+"""
+文章详情响应缓存与进程内浏览计数测试
+"""
+
+import json
+import uuid
+from datetime import datetime, timezone
+import app.api.v1.endpoints.articles as articles_endpoint
+import app.crud.article as article_crud
+from app.schemas.article import ArticleWithAuthor
+from app.services.cache_service import cache_service
+from app.services.view_counter_service import ViewCounterService
+from app.utils.cache_serializer import OrjsonSerializer
+from app.utils.cache_keys import CacheKeys, CacheTags
+
+
+class FailingSession:
+    def query(self, *args, **kwargs):
+        raise AssertionError("should not hit the database")
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def hincrby(self, key, field, amount):
+        self.ops.append((key, field, amount))
+
+    async def execute(self):
+        for key, field, amount in self.ops:
+            fields = self.redis.hashes.setdefault(key, {})
+            fields[field] = fields.get(field, 0) + amount
+
+
+class FakeRedis:
+    def __init__(self):
+        self.hashes = {}
+        self.pipelines = 0
+
+    def pipeline(self, transaction=True):
+        self.pipelines += 1
+        return FakePipeline(self)
+
+
+def make_article() -> ArticleWithAuthor:
+    return ArticleWithAuthor(
+        id=uuid.uuid4(),
+        author_id=uuid.uuid4(),
+        title="缓存设计",
+        slug="cache-design",
+        content="正文",
+        view_count=42,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+def test_serialize_article_detail_matches_response_model():
+    """测试预序列化的详情响应与 response_model 的 JSON 输出一致，且缓存值可由 orjson 直接存储"""
+    article = make_article()
+    serializer = OrjsonSerializer()
+
+    detail = article_crud.serialize_article_detail(article)
+
+    assert detail["id"] == str(article.id)
+    assert json.loads(detail["body"]) == article.model_dump(mode="json", by_alias=True)
+    assert "category" in json.loads(detail["body"])
+    data = serializer.dumps(detail)
+    assert data.startswith(OrjsonSerializer.MAGIC)
+    assert serializer.loads(data) == detail
+
+
+async def test_article_detail_json_tags_dependencies(monkeypatch):
+    """测试详情响应缓存登记文章详情依赖的标签，写入方按标签失效"""
+    article = make_article()
+    stored = {}
+
+    async def fake_get_article_async(db, article_id):
+        return article
+
+    async def fake_cache_get_or_set(key, fetch, expire, stale_ttl=0, tags=None):
+        value = await fetch()
+        stored[key] = (value, tags(value))
+        return value
+
+    monkeypatch.setattr(article_crud, "get_article_async", fake_get_article_async)
+    monkeypatch.setattr(article_crud, "cache_get_or_set", fake_cache_get_or_set)
+
+    detail = await article_crud.get_article_detail_json(None, article.id)
+
+    value, tags = stored[CacheKeys.article_json(article.id)]
+    assert detail == (value["id"], value["body"].encode())
+    assert CacheTags.article(article.id) in tags
+    assert CacheTags.user(article.author_id) in tags
+
+
+async def test_read_article_serves_cached_bytes_without_database(monkeypatch):
+    """测试详情接口直接返回缓存的响应字节，浏览只在进程内计数"""
+    article = make_article()
+    cached = article_crud.serialize_article_detail(article)
+    detail = cached["id"], cached["body"].encode()
+    counter = ViewCounterService()
+
+    async def fake_get_article_detail_json(db, article_id):
+        return detail
+
+    monkeypatch.setattr(articles_endpoint.crud, "get_article_detail_json", fake_get_article_detail_json)
+    monkeypatch.setattr(articles_endpoint, "view_counter_service", counter)
+
+    response = await articles_endpoint.read_article_by_id(str(article.id), db=FailingSession())
+    await articles_endpoint.read_article_by_id(str(article.id), db=FailingSession())
+
+    assert response.body == detail[1]
+    assert response.media_type == "application/json"
+    assert counter._local_counts == {str(article.id): 2}
+
+
+async def test_push_local_views_batches_into_buffer(monkeypatch):
+    """测试进程内计数以一次管道推送到 Redis 缓冲区，推送后清空"""
+    redis = FakeRedis()
+    monkeypatch.setattr(cache_service, "redis", redis)
+    counter = ViewCounterService()
+    first, second = uuid.uuid4(), uuid.uuid4()
+
+    for _ in range(3):
+        counter.record_view_nowait(first)
+    counter.record_view_nowait(second)
+
+    assert await counter.push_local_views() == 2
+    assert redis.pipelines == 1
+    assert redis.hashes[counter.pending_key] == {str(first): 3, str(second): 1}
+    assert await counter.push_local_views() == 0
+
+
+async def test_article_lists_are_tagged_and_served_from_cache(monkeypatch):
+    """测试列表（游标与 offset 兼容路径）、精选与热门接口的缓存登记在列表标签下，命中时不访问数据库"""
+    from fastapi import BackgroundTasks, Response
+    from app.utils.pagination import CursorPaginationResult, NEXT_CURSOR_HEADER
+
+    article = make_article()
+    stored = {}
+    loads = []
+
+    async def fake_cache_get_or_set(key, fetch, expire, stale_ttl=0, tags=None):
+        if key not in stored:
+            stored[key] = (await fetch(), tags)
+        return stored[key][0]
+
+    def fake_load(db, **kwargs):
+        loads.append(kwargs)
+        return [article]
+
+    def fake_load_page(db, cursor_params, **kwargs):
+        loads.append(kwargs)
+        return CursorPaginationResult(items=[article], next_cursor="next", has_more=True)
+
+    monkeypatch.setattr(articles_endpoint, "cache_get_or_set", fake_cache_get_or_set)
+    monkeypatch.setattr(articles_endpoint, "get_articles_by_multiple_filters", fake_load)
+    monkeypatch.setattr(articles_endpoint, "get_articles_page_by_multiple_filters", fake_load_page)
+    monkeypatch.setattr(articles_endpoint, "get_popular_articles_optimized", fake_load)
+    monkeypatch.setattr(articles_endpoint.crud, "get_featured_articles", fake_load)
+
+    list_filters = dict(published_only=True, author_id=None, category_id=None, tag_id=None, search=None)
+    for _ in range(2):
+        background_tasks = BackgroundTasks()
+        response = Response()
+        listed = await articles_endpoint.read_articles(
+            response, background_tasks, skip=0, limit=10, cursor=None, db=FailingSession(), **list_filters
+        )
+        offset_listed = await articles_endpoint.read_articles(
+            Response(), BackgroundTasks(), skip=10, limit=10, cursor=None, db=FailingSession(), **list_filters
+        )
+        featured = await articles_endpoint.read_featured_articles(limit=5, db=FailingSession())
+        popular = await articles_endpoint.read_popular_articles(limit=5, days=7, db=FailingSession())
+
+    assert len(loads) == 4
+    assert listed == offset_listed == featured == popular == [article]
+    assert response.headers[NEXT_CURSOR_HEADER] == "next"
+    assert set(stored) == {
+        CacheKeys.article_cursor(None, 10, ":published=True:author=None:category=None:tag=None"),
+        CacheKeys.article_list(skip=10, limit=10),
+        CacheKeys.article_featured(5),
+        CacheKeys.article_popular(5, 7),
+    }
+    assert all(tags == [CacheTags.ARTICLE_LIST] for _, tags in stored.values())
+    # 只有未命中的那次请求预热单篇文章缓存
+    assert background_tasks.tasks == []
@@ -0,0 +1,54 @@
+"""
+文章全文检索测试
+"""
+
+from app.services.search_service import ArticleSearchService
+from app.utils.text_search import (
+    bm25_idf,
+    bm25_term_score,
+    highlight_snippet,
+    tokenize,
+    weighted_term_frequencies,
+)
+
+
+def test_tokenize_cjk_bigrams_and_words():
+    """测试英文按单词、中文按二元组切分；索引额外包含单字，查询只用二元组"""
+    assert tokenize("Redis缓存设计 V2", for_query=True) == ["redis", "缓存", "存设", "设计", "v2"]
+    assert tokenize("缓存") == ["缓", "存", "缓存"]
+    assert tokenize("缓", for_query=True) == ["缓"]
+    assert tokenize("，。！ ") == []
+
+
+def test_weighted_term_frequencies():
+    """测试按字段权重累加词频"""
+    frequencies = weighted_term_frequencies((("Redis 缓存", 3), ("redis", 1)))
+    assert frequencies["redis"] == 4
+    assert frequencies["缓存"] == 3
+
+
+def test_bm25_prefers_rare_terms_and_short_documents():
+    """测试 BM25 对稀有词项与短文档给出更高得分"""
+    assert bm25_idf(100, 1) > bm25_idf(100, 50) > 0
+    idf = bm25_idf(100, 5)
+    short = bm25_term_score(2, doc_length=50, avg_length=100, idf=idf, k1=1.2, b=0.75)
+    long = bm25_term_score(2, doc_length=400, avg_length=100, idf=idf, k1=1.2, b=0.75)
+    assert short > long
+
+
+def test_highlight_snippet_marks_and_escapes():
+    """测试摘要选取命中最密集的片段，合并相邻命中并转义 HTML"""
+    text = "开头无关内容。" * 20 + "讨论 <Redis> 缓存设计与缓存穿透"
+    snippet = highlight_snippet(text, tokenize("redis 缓存设计", for_query=True), length=40)
+
+    assert snippet.startswith("…")
+    assert "&lt;<mark>Redis</mark>&gt;" in snippet
+    assert "<mark>缓存设计</mark>" in snippet
+    assert highlight_snippet("", ["x"]) == ""
+
+
+def test_query_terms_deduplicated():
+    """测试查询词项去重并保持顺序，无有效词项时过滤条件恒假"""
+    service = ArticleSearchService()
+    assert service.query_terms("缓存 缓存 redis") == ["缓存", "redis"]
+    assert str(service.match_filter("!!!")) == "false"
@@ -0,0 +1,206 @@
+"""
+异步读取路径测试（AsyncSession）
+"""
+
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import UUID, create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+import app.api.v1.endpoints.comments as comments_endpoint
+import app.crud.article as article_crud
+from app.crud import async_article
+from app.models.article import Article
+from app.models.article_category import ArticleCategory
+from app.models.article_tag import ArticleTag
+from app.models.category import Category
+from app.models.comment import Comment
+from app.models.tag import Tag
+from app.models.user import User
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+TABLES = [
+    User.__table__, Category.__table__, Tag.__table__, Article.__table__,
+    ArticleCategory.__table__, ArticleTag.__table__, Comment.__table__,
+]
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+async def _session_factory(tmp_path):
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url)
+    for table in TABLES:
+        table.create(sync_engine)
+    sync_engine.dispose()
+
+    engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+def _user(name):
+    return User(
+        id=uuid.uuid4(), tenant_id=uuid.uuid4(), username=name, email=f"{name}@example.com",
+        hashed_password="x", is_active=True, is_superuser=False, created_at=BASE_TIME,
+    )
+
+
+def _article(author, slug, views=0, published=True):
+    return Article(
+        id=uuid.uuid4(), title=slug, slug=slug, content="正文", author_id=author.id,
+        view_count=views, is_published=published, created_at=BASE_TIME,
+    )
+
+
+async def test_article_detail_loads_through_async_session(tmp_path, monkeypatch):
+    """测试详情缓存未命中时通过 AsyncSession 加载作者、分类与标签并序列化"""
+    engine, session_factory = await _session_factory(tmp_path)
+    author = _user("writer")
+    category = Category(id=uuid.uuid4(), name="后端", slug="backend")
+    tag = Tag(id=uuid.uuid4(), name="缓存", slug="cache")
+    article = _article(author, "async-detail")
+    async with session_factory() as session:
+        session.add_all([author, category, tag, article])
+        await session.flush()
+        session.add_all([
+            ArticleCategory(article_id=article.id, category_id=category.id),
+            ArticleTag(article_id=article.id, tag_id=tag.id),
+        ])
+        await session.commit()
+
+    async def might_contain(key):
+        return True
+
+    async def passthrough(key, fetch, expire, stale_ttl=0, tags=None):
+        return await fetch()
+
+    monkeypatch.setattr(article_crud.bloom_filter_service, "might_contain", might_contain)
+    monkeypatch.setattr(article_crud, "cache_get_or_set", passthrough)
+
+    async with session_factory() as session:
+        article_id, body = await article_crud.get_article_detail_json(session, article.id)
+        missing = await article_crud.get_article_detail_json_by_slug(session, "missing")
+
+    detail = json.loads(body)
+    assert article_id == str(article.id)
+    assert detail["author"]["username"] == "writer"
+    assert [c["slug"] for c in detail["categories"]] == ["backend"]
+    assert [t["slug"] for t in detail["tags"]] == ["cache"]
+    assert missing is None
+    await engine.dispose()
+
+
+async def test_related_articles_prefer_same_category(tmp_path):
+    """测试相关文章先取同分类（按浏览量），不足时用其它热门文章补齐，排除自身与未发布文章"""
+    engine, session_factory = await _session_factory(tmp_path)
+    author = _user("writer")
+    category = Category(id=uuid.uuid4(), name="后端", slug="backend")
+    origin = _article(author, "origin", views=1)
+    same_low = _article(author, "same-low", views=5)
+    same_high = _article(author, "same-high", views=50)
+    popular = _article(author, "popular", views=100)
+    draft = _article(author, "draft", views=1000, published=False)
+    async with session_factory() as session:
+        session.add_all([author, category, origin, same_low, same_high, popular, draft])
+        await session.flush()
+        session.add_all([
+            ArticleCategory(article_id=a.id, category_id=category.id) for a in (origin, same_low, same_high)
+        ])
+        await session.commit()
+
+    async with session_factory() as session:
+        related = await async_article.get_related_articles(session, origin.id, limit=3)
+
+    assert [a.slug for a in related] == ["same-high", "same-low", "popular"]
+    assert related[0].author.username == "writer"
+    assert [c.slug for c in related[0].categories] == ["backend"]
+    await engine.dispose()
+
+
+async def test_comment_read_endpoints_use_async_session(tmp_path):
+    """测试评论详情与回复接口通过 AsyncSession 读取并预加载作者"""
+    engine, session_factory = await _session_factory(tmp_path)
+    author = _user("writer")
+    article = _article(author, "commented")
+    root = Comment(id=uuid.uuid4(), content="root", article_id=article.id, author_id=author.id,
+                   is_approved=True, created_at=BASE_TIME)
+    replies = [
+        Comment(id=uuid.uuid4(), content=f"reply {i}", article_id=article.id, author_id=author.id,
+                parent_id=root.id, is_approved=True, created_at=BASE_TIME + timedelta(minutes=i))
+        for i in range(2)
+    ]
+    async with session_factory() as session:
+        session.add_all([author, article, root, *replies])
+        await session.commit()
+
+    async with session_factory() as session:
+        comment = await comments_endpoint.read_comment_by_id(str(root.id), db=session)
+        children = await comments_endpoint.read_comment_replies(str(root.id), skip=0, limit=10, db=session)
+
+    assert comment.author.username == "writer"
+    assert [c.content for c in children] == ["reply 0", "reply 1"]
+    assert all(c.author.username == "writer" for c in children)
+    await engine.dispose()
+
+
+async def test_comment_tree_loads_through_async_session(tmp_path, monkeypatch):
+    """测试评论树缓存未命中时通过 AsyncSession 一次加载已审核评论并分页"""
+    import app.crud.comment as comment_crud
+
+    engine, session_factory = await _session_factory(tmp_path)
+    author = _user("writer")
+    article = _article(author, "tree")
+    root = Comment(id=uuid.uuid4(), content="root", article_id=article.id, author_id=author.id,
+                   is_approved=True, created_at=BASE_TIME)
+    reply = Comment(id=uuid.uuid4(), content="reply", article_id=article.id, author_id=author.id,
+                    parent_id=root.id, is_approved=True, created_at=BASE_TIME + timedelta(minutes=1))
+    pending = Comment(id=uuid.uuid4(), content="pending", article_id=article.id, author_id=author.id,
+                      is_approved=False, created_at=BASE_TIME + timedelta(minutes=2))
+    async with session_factory() as session:
+        session.add_all([author, article, root, reply, pending])
+        await session.commit()
+
+    async def passthrough(key, fetch, expire, stale_ttl=0, tags=None):
+        return await fetch()
+
+    monkeypatch.setattr(comment_crud, "cache_get_or_set", passthrough)
+
+    async with session_factory() as session:
+        page = await comments_endpoint.read_article_comment_tree(str(article.id), skip=0, limit=10, db=session)
+
+    assert page.total_threads == 1
+    assert page.threads[0].author.username == "writer"
+    assert [node.content for node in page.threads[0].children] == ["reply"]
+    await engine.dispose()
+
+
+def test_comment_writers_run_in_threadpool_and_clear_caches_after_response(monkeypatch):
+    """测试评论写接口为同步函数，缓存清理登记为响应后的后台任务"""
+    import inspect
+    from types import SimpleNamespace
+    from fastapi import BackgroundTasks
+
+    for endpoint in ("create_comment", "update_comment", "delete_comment", "approve_comment"):
+        assert not inspect.iscoroutinefunction(getattr(comments_endpoint, endpoint))
+
+    comment_id, article_id = uuid.uuid4(), uuid.uuid4()
+    comment = SimpleNamespace(id=comment_id, article_id=article_id, author_id="u1",
+                              article=SimpleNamespace(author_id="u1"))
+    monkeypatch.setattr(comments_endpoint.crud, "get_comment", lambda db, comment_id, with_relationships: comment)
+    monkeypatch.setattr(comments_endpoint.crud, "delete_comment", lambda db, comment_id: True)
+    monkeypatch.setattr(comments_endpoint, "check_comment_delete_permission", lambda *args, **kwargs: None)
+    background_tasks = BackgroundTasks()
+
+    response = comments_endpoint.delete_comment(
+        db=None, background_tasks=background_tasks, comment_id=str(comment_id), current_user=None,
+    )
+
+    assert response == {"message": "Comment deleted successfully"}
+    assert [(task.func, task.args) for task in background_tasks.tasks] == [
+        (comments_endpoint.crud.clear_comment_caches, (comment_id, article_id))
+    ]
@@ -0,0 +1,94 @@
+"""
+认证主体缓存与令牌吊销测试
+"""
+
+import time
+import uuid
+import pytest
+from fastapi import HTTPException
+import app.core.dependencies as dependencies
+from app.core.security import create_access_token, verify_token
+from app.models.user import User
+from app.services.auth_cache_service import AuthCacheService
+
+
+class FailingSession:
+    def query(self, *args, **kwargs):
+        raise AssertionError("should not hit the database")
+
+
+def make_user() -> User:
+    return User(
+        id=uuid.uuid4(),
+        tenant_id=uuid.uuid4(),
+        username="alice",
+        email="alice@example.com",
+        hashed_password="x",
+        is_active=True,
+        is_superuser=False,
+    )
+
+
+@pytest.fixture
+def auth_cache(monkeypatch):
+    service = AuthCacheService()
+    monkeypatch.setattr(dependencies, "auth_cache_service", service)
+    return service
+
+
+def test_access_tokens_carry_unique_jti():
+    """测试每个访问令牌都带有唯一的 jti"""
+    first = verify_token(create_access_token({"sub": "u1"}))
+    second = verify_token(create_access_token({"sub": "u1"}))
+    assert first["jti"] and first["jti"] != second["jti"]
+
+
+async def test_cached_principal_skips_database(auth_cache, monkeypatch):
+    """测试主体缓存未命中时查库并缓存，命中后不再访问数据库，且每次返回独立实例"""
+    user = make_user()
+    loads = []
+
+    def fake_get_user(db, user_id):
+        loads.append(user_id)
+        return user
+
+    monkeypatch.setattr(dependencies.crud, "get_user", fake_get_user)
+    token = create_access_token({"sub": str(user.id)})
+
+    assert await dependencies.get_current_user(db=None, token=token) is user
+    first = await dependencies.get_current_user(db=FailingSession(), token=token)
+    second = await dependencies.get_current_user(db=FailingSession(), token=token)
+
+    assert loads == [user.id]
+    assert first is not second
+    assert first.id == user.id and first.username == "alice" and first.is_active is True
+
+
+async def test_revoked_jti_rejected_locally(auth_cache):
+    """测试吊销的 jti 在本地即被拒绝（未连接 Redis 时同样生效）"""
+    user = make_user()
+    auth_cache.set_principal(user)
+    token = create_access_token({"sub": str(user.id)})
+    payload = verify_token(token)
+
+    await auth_cache.revoke(payload["jti"], payload["exp"])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await dependencies.get_current_user(db=FailingSession(), token=token)
+    assert exc_info.value.detail == "Token has been revoked"
+
+
+def test_events_apply_revocations_and_user_invalidation():
+    """测试 pub/sub 事件：吊销写入本地集合，用户变更丢弃主体缓存，过期记录被清理"""
+    service = AuthCacheService()
+    user = make_user()
+    service.set_principal(user)
+
+    service._apply_event(f"r|abc|{time.time() + 60}".encode())
+    service._apply_event(f"u|{user.id}")
+    assert service.is_revoked("abc")
+    assert service.get_principal(user.id) is None
+
+    service._apply_event(f"r|old|{time.time() - 1}")
+    service._next_prune = 0
+    assert not service.is_revoked("old")
@@ -0,0 +1,107 @@
+"""
+布隆过滤器测试
+"""
+
+import pytest
+from app.utils.bloom_filter import RedisBloomFilter
+
+
+def test_bloom_filter_sizing():
+    """测试位数组大小与哈希个数按容量和误判率计算"""
+    bloom = RedisBloomFilter("test", capacity=100000, error_rate=0.01)
+
+    # 1% 误判率约需 9.6 bit/元素、7 个哈希函数
+    assert 950000 < bloom.size < 970000
+    assert bloom.hash_count == 7
+
+
+def test_bloom_filter_positions_are_stable_and_in_range():
+    """测试位下标确定且落在位数组范围内"""
+    bloom = RedisBloomFilter("test", capacity=1000, error_rate=0.01)
+    positions = bloom.positions("article:1")
+
+    assert positions == bloom.positions("article:1")
+    assert len(positions) == bloom.hash_count
+    assert all(0 <= offset < bloom.size for offset in positions)
+    assert positions != bloom.positions("article:2")
+
+
+def test_bloom_filter_false_positive_rate():
+    """测试按下标模拟的误判率接近目标值"""
+    bloom = RedisBloomFilter("test", capacity=5000, error_rate=0.01)
+    bits = bytearray(bloom.size)
+    for i in range(5000):
+        for offset in bloom.positions(f"article:{i}"):
+            bits[offset] = 1
+
+    assert all(all(bits[o] for o in bloom.positions(f"article:{i}")) for i in range(5000))
+    false_positives = sum(
+        all(bits[o] for o in bloom.positions(f"missing:{i}")) for i in range(10000)
+    )
+    assert false_positives / 10000 < 0.02
+
+
+def test_bloom_filter_rejects_invalid_parameters():
+    """测试非法参数"""
+    with pytest.raises(ValueError):
+        RedisBloomFilter("test", capacity=0, error_rate=0.01)
+    with pytest.raises(ValueError):
+        RedisBloomFilter("test", capacity=10, error_rate=1.5)
+
+
+class LeaseRedis:
+    """只实现租约所需的 SET NX / 令牌校验删除"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        if self.values.get(key) == token:
+            del self.values[key]
+            return 1
+        return 0
+
+
+async def test_bloom_rebuild_runs_on_one_worker(monkeypatch):
+    """测试同一周期内只有取得租约的 worker 重建，成功后租约保留供其他 worker 跳过"""
+    from app.services import bloom_filter_service as module
+
+    redis = LeaseRedis()
+    monkeypatch.setattr(module.cache_service, "redis", redis)
+    runs = []
+
+    async def fake_rebuild(redis_client, items, lease):
+        runs.append(lease.token)
+        return 3
+
+    first, second = module.BloomFilterService(), module.BloomFilterService()
+    monkeypatch.setattr(first.filter, "rebuild", fake_rebuild)
+    monkeypatch.setattr(second.filter, "rebuild", fake_rebuild)
+
+    assert await first.rebuild() == 3
+    assert await second.rebuild() == 0
+    assert len(runs) == 1
+    assert redis.values[first.filter.lease_key] == runs[0]
+
+
+async def test_bloom_rebuild_failure_releases_lease(monkeypatch):
+    """测试重建失败时释放租约，其他 worker 可以重试"""
+    from app.services import bloom_filter_service as module
+
+    redis = LeaseRedis()
+    monkeypatch.setattr(module.cache_service, "redis", redis)
+    service = module.BloomFilterService()
+
+    async def failing_rebuild(redis_client, items, lease):
+        raise RuntimeError("lost lease")
+
+    monkeypatch.setattr(service.filter, "rebuild", failing_rebuild)
+
+    assert await service.rebuild() == 0
+    assert service.filter.lease_key not in redis.values
@@ -0,0 +1,40 @@
+"""
+缓存键与依赖标签测试
+"""
+
+from types import SimpleNamespace
+from uuid import uuid4
+from app.utils.cache_keys import CacheKeys, CacheTags
+
+
+def test_article_detail_tags_cover_embedded_relations():
+    """测试文章详情缓存声明了文章、作者、分类与标签依赖"""
+    article = SimpleNamespace(
+        id=uuid4(),
+        author_id=uuid4(),
+        categories=[SimpleNamespace(id=uuid4())],
+        tags=[SimpleNamespace(id=uuid4()), SimpleNamespace(id=uuid4())],
+    )
+
+    tags = CacheKeys.article_detail_tags(article)
+
+    assert tags[0] == CacheTags.article(article.id)
+    assert CacheTags.user(article.author_id) in tags
+    assert CacheTags.category(article.categories[0].id) in tags
+    assert all(CacheTags.tag(tag.id) in tags for tag in article.tags)
+
+
+def test_article_detail_tags_without_relations():
+    """测试缺少关联数据时只依赖文章本身"""
+    article = SimpleNamespace(id=uuid4(), categories=None, tags=None)
+
+    assert CacheKeys.article_detail_tags(article) == [CacheTags.article(article.id)]
+
+
+def test_tag_set_keys_are_namespaced():
+    """测试标签集合键与缓存键不冲突"""
+    article_id = uuid4()
+
+    assert CacheTags.key(CacheTags.article(article_id)) != CacheKeys.article(article_id)
+    assert CacheTags.key(CacheTags.ARTICLE_LIST).startswith("cachetag:")
+    assert CacheKeys.article_list_tags() == [CacheTags.ARTICLE_LIST]
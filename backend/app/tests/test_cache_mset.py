@@ -0,0 +1,163 @@
+"""
+批量写入缓存（mset / cache_set_many）测试
+"""
+
+import uuid
+from datetime import datetime, timezone
+import app.crud.article as article_crud
+from app.schemas.article import ArticleWithAuthor
+from app.services.cache_service import CacheService, cache_get_or_set, cache_service, cache_set_many
+from app.utils.cache_keys import CacheKeys, CacheTags, CacheTTL
+from app.utils.cache_serializer import OrjsonSerializer
+
+
+class FakePipeline:
+    """记录管道中的命令，execute 时一次性应用"""
+
+    def __init__(self, redis, transaction):
+        self.redis = redis
+        self.transaction = transaction
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", key, value, ex))
+
+    def eval(self, script, numkeys, *args):
+        self.commands.append(("eval", script, args[:numkeys], args[numkeys:]))
+
+    def publish(self, channel, message):
+        self.commands.append(("publish", channel, message))
+
+    async def execute(self):
+        self.redis.executed.append(self)
+        results = []
+        for command in self.commands:
+            if command[0] == "set":
+                _, key, value, ex = command
+                self.redis.values[key] = value
+                self.redis.ttls[key] = ex
+                results.append(key not in self.redis.failing_keys)
+            elif command[0] == "eval":
+                _, script, tag_keys, argv = command
+                assert script == CacheService.REGISTER_TAGS_SCRIPT
+                for tag_key in tag_keys:
+                    self.redis.tags.setdefault(tag_key, {})[argv[1]] = argv[0]
+                results.append(len(tag_keys))
+            else:
+                results.append(1)
+        return results
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+        self.tags = {}
+        self.executed = []
+        self.failing_keys = set()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self, transaction)
+
+    async def get(self, key):
+        return self.values.get(key)
+
+
+def _setup(monkeypatch) -> FakeRedis:
+    redis = FakeRedis()
+    monkeypatch.setattr(cache_service, "redis", redis)
+    monkeypatch.setattr(cache_service, "local_cache", None)
+    return redis
+
+
+def make_article(slug: str) -> ArticleWithAuthor:
+    return ArticleWithAuthor(
+        id=uuid.uuid4(),
+        author_id=uuid.uuid4(),
+        title=slug,
+        slug=slug,
+        content="正文",
+        view_count=0,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+async def test_mset_sends_one_transaction_with_per_key_ttl_and_tags(monkeypatch):
+    """测试所有 SET EX 与标签登记在一个事务管道中发出，标签登记使用对应键的 TTL"""
+    redis = _setup(monkeypatch)
+    mapping = {f"k{i}": {"value": i} for i in range(50)}
+    tags = {key: [f"tag:{key}"] for key in mapping}
+
+    assert await cache_service.mset(mapping, expire=1000, jitter=0.1, tags=tags) is True
+
+    assert len(redis.executed) == 1 and redis.executed[0].transaction is True
+    assert set(redis.ttls) == set(mapping)
+    for key in mapping:
+        assert redis.tags[CacheTags.key(f"tag:{key}")] == {key: redis.ttls[key]}
+
+
+async def test_mset_jitter_stays_within_bounds(monkeypatch):
+    """测试每个键独立抖动，过期时间落在 [expire, expire * (1 + jitter)]，不抖动时保持原值"""
+    redis = _setup(monkeypatch)
+    mapping = {f"k{i}": i for i in range(200)}
+
+    await cache_service.mset(mapping, expire=1000, jitter=0.1)
+
+    assert all(1000 <= ttl <= 1100 for ttl in redis.ttls.values())
+    assert len(set(redis.ttls.values())) > 1
+
+    await cache_service.mset(mapping, expire=1000)
+    assert set(redis.ttls.values()) == {1000}
+
+
+async def test_mset_reports_failed_set_and_skips_empty_mapping(monkeypatch):
+    """测试任一 SET 失败时返回 False，空映射不访问 Redis"""
+    redis = _setup(monkeypatch)
+    redis.failing_keys.add("b")
+
+    assert await cache_service.mset({"a": 1, "b": 2}) is False
+    assert await cache_service.mset({}) is True
+    assert len(redis.executed) == 1
+
+
+async def test_cache_set_many_primes_values_readable_by_cache_get_or_set(monkeypatch):
+    """测试批量预热写入 SWR 信封并延长 stale_ttl，之后 cache_get_or_set 直接命中不再加载"""
+    redis = _setup(monkeypatch)
+
+    assert await cache_set_many({"primed": {"id": 1}}, expire=600, stale_ttl=60, jitter=0.0) is True
+    assert redis.ttls["primed"] == 660
+
+    async def fetch():
+        raise AssertionError("primed key should not be loaded")
+
+    assert await cache_get_or_set("primed", fetch, 600, stale_ttl=60) == {"id": 1}
+
+
+async def test_prime_article_cache_writes_detail_keys_with_dependency_tags(monkeypatch):
+    """测试列表结果批量预热单篇文章（按 ID 与 slug）的 Schema 与详情响应缓存，并登记文章依赖标签"""
+    redis = _setup(monkeypatch)
+    articles = [make_article("first"), make_article("second")]
+
+    assert await article_crud.prime_article_cache(articles) is True
+
+    assert len(redis.executed) == 1
+    for article in articles:
+        keys = {
+            CacheKeys.article(article.id),
+            CacheKeys.article_json(article.id),
+            CacheKeys.article_by_slug(article.slug),
+            CacheKeys.article_json_by_slug(article.slug),
+        }
+        assert keys <= set(redis.ttls)
+        upper = (CacheTTL.ARTICLE + CacheTTL.VERY_SHORT) * 1.1
+        assert all(CacheTTL.ARTICLE + CacheTTL.VERY_SHORT <= redis.ttls[key] <= upper for key in keys)
+        assert set(redis.tags[CacheTags.key(CacheTags.article(article.id))]) == keys
+
+    cached = await cache_service.get(CacheKeys.article_by_slug("first"))
+    assert cached["value"] == articles[0]
+
+    # 详情响应缓存值为 JSON 原生结构，由 orjson 存储而非回退到 pickle
+    detail_key = CacheKeys.article_json(articles[0].id)
+    assert redis.values[detail_key].startswith(OrjsonSerializer.MAGIC)
+    detail = await cache_service.get(detail_key)
+    assert detail["value"] == article_crud.serialize_article_detail(articles[0])
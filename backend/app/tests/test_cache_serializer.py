@@ -0,0 +1,74 @@
+import pickle
+import uuid
+from datetime import datetime, timezone
+
+from app.schemas.tag import Tag
+from app.utils.cache_serializer import OrjsonSerializer, PickleSerializer, get_serializer
+
+
+def _tag() -> Tag:
+    return Tag(
+        id=uuid.uuid4(),
+        name="Python",
+        slug="python",
+        created_at=datetime.now(timezone.utc),
+    )
+
+
+def test_orjson_roundtrip_restores_schema():
+    """顶层 Schema 序列化后应还原为同一类型"""
+    serializer = OrjsonSerializer()
+    tag = _tag()
+
+    restored = serializer.loads(serializer.dumps(tag))
+
+    assert isinstance(restored, Tag)
+    assert restored == tag
+
+
+def test_orjson_roundtrip_nested_schemas_and_plain_values():
+    """容器中的 Schema 与普通 JSON 值都应无损还原"""
+    serializer = OrjsonSerializer()
+    tag = _tag()
+    value = {"items": [tag], "total": 1, "cached": False}
+
+    restored = serializer.loads(serializer.dumps(value))
+
+    assert restored["total"] == 1
+    assert restored["cached"] is False
+    assert isinstance(restored["items"][0], Tag)
+    assert restored["items"][0] == tag
+
+
+def test_orjson_rejects_unsupported_types():
+    """不支持的类型抛出 TypeError，由 CacheService 回退到 pickle"""
+    serializer = OrjsonSerializer()
+
+    try:
+        serializer.dumps({"raw": b"bytes"})
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("bytes should not be JSON serializable")
+
+
+def test_orjson_does_not_revive_schemas_outside_app_schemas():
+    """信封中的类路径不在 app.schemas 下时保持原始 dict"""
+    serializer = OrjsonSerializer()
+    payload = serializer.MAGIC + b'{"__schema__": "os:system", "data": {"a": 1}}'
+
+    restored = serializer.loads(payload)
+
+    assert restored == {"__schema__": "os:system", "data": {"a": 1}}
+
+
+def test_serializers_detect_their_own_payloads():
+    """读取时根据数据头区分 orjson 与历史 pickle 数据"""
+    orjson_serializer = OrjsonSerializer()
+    pickle_serializer = PickleSerializer()
+
+    assert orjson_serializer.can_load(orjson_serializer.dumps({"a": 1}))
+    assert orjson_serializer.can_load(orjson_serializer.dumps(_tag()))
+    assert not orjson_serializer.can_load(pickle.dumps({"a": 1}))
+    assert pickle_serializer.can_load(pickle.dumps({"a": 1}))
+    assert isinstance(get_serializer("ORJSON"), OrjsonSerializer)
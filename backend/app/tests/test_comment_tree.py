@@ -0,0 +1,86 @@
+"""
+评论树加载测试
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.crud.comment import build_comment_tree, paginate_comment_tree
+from app.models.comment import Comment
+from app.schemas.comment import CommentTree
+from app.utils.cache_keys import CacheKeys, CacheTags
+
+
+ARTICLE_ID = uuid.uuid4()
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _comment(minute, parent=None, author_id=None):
+    return Comment(
+        id=uuid.uuid4(),
+        content=f"comment {minute}",
+        is_approved=True,
+        created_at=BASE_TIME + timedelta(minutes=minute),
+        article_id=ARTICLE_ID,
+        author_id=author_id or uuid.uuid4(),
+        parent_id=parent.id if parent is not None else None,
+    )
+
+
+def test_build_comment_tree_nests_replies():
+    """测试顶层评论按时间倒序、回复按时间正序逐层嵌套"""
+    first = _comment(0)
+    second = _comment(1)
+    reply = _comment(2, parent=first)
+    nested = _comment(3, parent=reply)
+    later_reply = _comment(4, parent=first)
+
+    threads = build_comment_tree([first, second, reply, nested, later_reply])
+
+    assert [node.id for node in threads] == [second.id, first.id]
+    assert [node.id for node in threads[1].children] == [reply.id, later_reply.id]
+    assert [node.id for node in threads[1].children[0].children] == [nested.id]
+
+
+def test_build_comment_tree_drops_orphaned_subtrees():
+    """测试父评论缺失（未审核）时回复连同子树一起丢弃，输入顺序不影响结果"""
+    root = _comment(0)
+    hidden = _comment(1, parent=root)
+    orphan = _comment(2, parent=hidden)
+    orphan_reply = _comment(3, parent=orphan)
+    reply = _comment(4, parent=root)
+
+    threads = build_comment_tree([orphan_reply, reply, orphan, root])
+
+    assert [node.id for node in threads] == [root.id]
+    assert [node.id for node in threads[0].children] == [reply.id]
+
+
+def test_paginate_comment_tree_by_thread():
+    """测试按顶层评论分页，每页带完整子树；总评论数为整棵树的数量，本页评论数单独返回"""
+    roots = [_comment(i * 10) for i in range(5)]
+    replies = [_comment(i * 10 + 1, parent=root) for i, root in enumerate(roots)]
+    threads = build_comment_tree(roots + replies)
+    tree = CommentTree(article_id=ARTICLE_ID, threads=threads, total_comments=10)
+
+    page = paginate_comment_tree(tree, skip=1, limit=2)
+
+    assert page.total_threads == 5
+    assert page.total_comments == 10
+    assert page.page_comments == 4
+    assert [node.id for node in page.threads] == [roots[3].id, roots[2].id]
+    assert all(len(node.children) == 1 for node in page.threads)
+
+
+def test_comment_tree_cache_tags_cover_all_authors():
+    """测试评论树缓存标签包含文章与所有层级评论的作者"""
+    author_a, author_b = uuid.uuid4(), uuid.uuid4()
+    root = _comment(0, author_id=author_a)
+    reply = _comment(1, parent=root, author_id=author_b)
+    tree = CommentTree(article_id=ARTICLE_ID, threads=build_comment_tree([root, reply]), total_comments=2)
+
+    tags = CacheKeys.comment_tree_tags(tree)
+
+    assert CacheTags.article(ARTICLE_ID) in tags
+    assert CacheTags.user(author_a) in tags
+    assert CacheTags.user(author_b) in tags
@@ -0,0 +1,201 @@
+"""
+滚动摘要测试
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from app.context.summarizer import ContextSummarizer
+from app.models.context_history import ContextHistory
+from app.services.cache_service import cache_service
+from app.services.context_summary_service import ContextSummaryService
+from app.utils.cache_keys import CacheKeys
+from app.utils.single_flight import RedisLease
+
+
+class FakeSession:
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, obj):
+        pass
+
+
+def make_messages(count):
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            role="user" if i % 2 == 0 else "assistant",
+            content=f"message {i}",
+            tokens=10,
+            created_at=start + timedelta(seconds=i),
+        )
+        for i in range(count)
+    ]
+
+
+async def test_create_summary_folds_only_new_messages(monkeypatch):
+    """测试只折叠检查点之后、最近 keep_last 条之前的消息，计数累加且只调用一次 LLM"""
+    summarizer = ContextSummarizer()
+    previous = ContextHistory(message_count=6, total_tokens=60, summary="旧摘要", key_points="a; b")
+    new_messages = make_messages(8)
+    calls = []
+
+    async def fake_get_summary(db, conversation_id):
+        return previous
+
+    async def fake_messages_after(db, conversation_id, checkpoint, limit=None):
+        assert checkpoint is previous
+        # 只读取本批 3 条加上之后的 2 条
+        assert limit == 5
+        return new_messages[:limit]
+
+    async def fake_summarize(prev, messages):
+        calls.append(messages)
+        return "新摘要", ["c"]
+
+    monkeypatch.setattr(summarizer, "get_summary", fake_get_summary)
+    monkeypatch.setattr(summarizer, "_messages_after", fake_messages_after)
+    monkeypatch.setattr(summarizer, "_summarize", fake_summarize)
+
+    checkpoint = await summarizer.create_summary(FakeSession(), "conv", max_messages=3, keep_last=2)
+
+    assert len(calls) == 1
+    assert calls[0] == new_messages[:3]
+    assert checkpoint.message_count == 9
+    assert checkpoint.total_tokens == 90
+    assert checkpoint.summary == "新摘要"
+    assert checkpoint.last_message_id == new_messages[2].id
+    assert checkpoint.covered_until == new_messages[2].created_at
+
+
+async def test_create_summary_without_new_messages(monkeypatch):
+    """测试检查点之后只有保留的最近消息时不调用 LLM"""
+    summarizer = ContextSummarizer()
+
+    async def fake_get_summary(db, conversation_id):
+        return None
+
+    async def fake_messages_after(db, conversation_id, checkpoint, limit=None):
+        return make_messages(2)[:limit]
+
+    async def fail_summarize(prev, messages):
+        raise AssertionError("should not summarize")
+
+    monkeypatch.setattr(summarizer, "get_summary", fake_get_summary)
+    monkeypatch.setattr(summarizer, "_messages_after", fake_messages_after)
+    monkeypatch.setattr(summarizer, "_summarize", fail_summarize)
+
+    assert await summarizer.create_summary(FakeSession(), "conv", keep_last=2) is None
+    assert await summarizer.create_summary(FakeSession(), "conv", max_messages=40, keep_last=2) is None
+
+
+def test_parse_combined_result():
+    """测试解析摘要与关键点的 JSON 输出，非 JSON 输出时整体作为摘要"""
+    summarizer = ContextSummarizer()
+
+    content = '```json\n{"summary": "讨论了缓存", "key_points": ["Redis", "TTL", ""]}\n```'
+    assert summarizer._parse_result(content, "") == ("讨论了缓存", ["Redis", "TTL"])
+    assert summarizer._parse_result("纯文本摘要", "旧; 点") == ("纯文本摘要", ["旧", "点"])
+
+
+async def test_schedule_deduplicates_and_bounds_queue():
+    """测试同一对话排队期间只保留一份，队列满时丢弃"""
+    service = ContextSummaryService()
+    assert service.schedule("a") is False  # 未启动
+
+    service._queue = asyncio.Queue(maxsize=1)
+    assert service.schedule("a", keep_last=4) is True
+    assert service.schedule("a", keep_last=6) is True
+    assert service._queue.qsize() == 1
+    assert service._pending == {"a": 6}
+
+    assert service.schedule("b") is False
+    assert service.dropped == 1
+
+
+class FakeLeaseRedis:
+    """只实现租约用到的 SET NX 与释放脚本"""
+
+    def __init__(self):
+        self.strings = {}
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        assert script == RedisLease.RELEASE_SCRIPT
+        if self.strings.get(key) == token:
+            del self.strings[key]
+            return 1
+        return 0
+
+
+async def test_conversation_stays_pending_until_summary_finishes(monkeypatch):
+    """测试摘要期间对话仍在 _pending 中，新请求不会让另一个任务并发摘要，结束后只重新排队一次"""
+    monkeypatch.setattr(cache_service, "redis", None)
+    service = ContextSummaryService()
+    service._queue = asyncio.Queue()
+    started, release = asyncio.Event(), asyncio.Event()
+    calls = []
+
+    async def slow_summarize(conversation_id, keep_last):
+        calls.append((conversation_id, keep_last))
+        started.set()
+        await release.wait()
+        return 1
+
+    monkeypatch.setattr(service, "_summarize", slow_summarize)
+    workers = [asyncio.create_task(service._run()) for _ in range(2)]
+    try:
+        service.schedule("a", keep_last=4)
+        await started.wait()
+
+        assert service._pending == {"a": 4}
+        assert service.schedule("a", keep_last=6) is True
+        assert service.schedule("a", keep_last=8) is True
+        assert service._queue.qsize() == 0
+        assert calls == [("a", 4)]
+
+        release.set()
+        await service._queue.join()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    assert calls == [("a", 4), ("a", 8)]
+    assert service._pending == {} and not service._running and not service._rerun
+
+
+async def test_summarize_skips_conversation_leased_by_another_worker(monkeypatch):
+    """测试其他 worker 持有对话摘要租约时跳过，取得租约时摘要并在结束后释放"""
+    redis = FakeLeaseRedis()
+    monkeypatch.setattr(cache_service, "redis", redis)
+    service = ContextSummaryService()
+    calls = []
+
+    async def fake_summarize(conversation_id, keep_last):
+        calls.append(conversation_id)
+        assert CacheKeys.context_summary_lock(conversation_id) in redis.strings
+        return 2
+
+    monkeypatch.setattr(service, "_summarize", fake_summarize)
+    redis.strings[CacheKeys.context_summary_lock("busy")] = "other-worker"
+
+    assert await service.summarize("busy") == 0
+    assert await service.summarize("free") == 2
+
+    assert calls == ["free"]
+    assert redis.strings == {CacheKeys.context_summary_lock("busy"): "other-worker"}
@@ -0,0 +1,215 @@
+"""
+上下文窗口组装测试
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from sqlalchemy import UUID, create_engine, func, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+import app.context.manager as manager_module
+from app.context.manager import ContextManager
+from app.context.summarizer import ContextSummarizer
+from app.models.context_history import ContextHistory
+from app.models.conversation import Conversation, ConversationMessage
+from app.schemas.context import ContextConfig
+from app.services.context_summary_service import context_summary_service
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+class ConversationId(str):
+    """接口以字符串传递对话 ID；SQLite 下 UUID 列的绑定需要 .hex（PostgreSQL 驱动直接接受字符串）"""
+
+    @property
+    def hex(self):
+        return uuid.UUID(self).hex
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    async def execute(self, stmt):
+        self.queries += 1
+        return FakeResult(self.rows)
+
+
+class FakeCache:
+    def __init__(self, value):
+        self.value = value
+
+    async def get(self, key):
+        return self.value
+
+    async def set(self, key, value, expire=None):
+        self.value = value
+        return True
+
+
+def message_dict(index, tokens):
+    created_at = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=index)
+    return {
+        "id": str(uuid.uuid4()),
+        "role": "user",
+        "content": f"m{index}",
+        "tokens": tokens,
+        "created_at": created_at.isoformat(),
+    }
+
+
+def message_row(index, tokens):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        role="assistant",
+        content=f"m{index}",
+        tokens=tokens,
+        model="deepseek-chat",
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=index),
+    )
+
+
+def test_fit_trims_oldest_messages():
+    """测试按 Token 预算与消息数上限从头部裁剪"""
+    messages = [message_dict(i, 10) for i in range(5)]
+
+    fitted, trimmed = ContextManager._fit(messages, budget=30, max_messages=10)
+    assert fitted == messages[2:]
+    assert trimmed is True
+
+    fitted, trimmed = ContextManager._fit(messages, budget=100, max_messages=2)
+    assert fitted == messages[3:]
+
+    fitted, trimmed = ContextManager._fit(messages, budget=100, max_messages=10)
+    assert fitted == messages
+    assert trimmed is False
+
+
+async def test_cached_window_appends_only_new_messages(monkeypatch):
+    """测试缓存命中时只追加末尾消息之后的新消息"""
+    cached_messages = [message_dict(i, 10) for i in range(3)]
+    cached = {
+        "signature": [100, 50, None],
+        "conversation_tokens": 30,
+        "messages": cached_messages,
+        "is_truncated": False,
+    }
+    monkeypatch.setattr(manager_module, "cache_service", FakeCache(cached))
+    db = FakeSession([message_row(3, 10), message_row(4, 10)])
+
+    messages, truncated = await ContextManager()._load_cached_window(
+        db, "conv", 50, [100, 50, None], None, budget=40, max_messages=50,
+    )
+
+    assert db.queries == 1
+    assert [msg["content"] for msg in messages] == ["m1", "m2", "m3", "m4"]
+    assert truncated is True
+
+
+async def test_cached_window_rejected_when_totals_disagree(monkeypatch):
+    """测试缓存签名不一致或累计 Token 数对不上时放弃缓存"""
+    cached = {
+        "signature": [100, 50, None],
+        "conversation_tokens": 30,
+        "messages": [message_dict(0, 30)],
+        "is_truncated": False,
+    }
+    monkeypatch.setattr(manager_module, "cache_service", FakeCache(cached))
+    manager = ContextManager()
+
+    # 消息被删除：新消息之和与累计值对不上
+    messages, _ = await manager._load_cached_window(
+        FakeSession([message_row(1, 10)]), "conv", 10, [100, 50, None], None, 100, 50,
+    )
+    assert messages is None
+
+    # 摘要检查点变化
+    messages, _ = await manager._load_cached_window(
+        FakeSession([]), "conv", 30, [100, 50, "checkpoint"], None, 100, 50,
+    )
+    assert messages is None
+
+
+async def test_long_conversation_summarizes_once_per_threshold_and_keeps_cache(tmp_path, monkeypatch):
+    """测试越过阈值后只在未折叠 Token 数再次超过阈值时摘要，其余轮次窗口缓存命中、不新增检查点"""
+    url = f"sqlite:///{tmp_path / 'context.db'}"
+    sync_engine = create_engine(url)
+    for table in (Conversation.__table__, ConversationMessage.__table__, ContextHistory.__table__):
+        table.create(sync_engine)
+    sync_engine.dispose()
+    engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    conversation_id = uuid.uuid4()
+    async with session_factory() as session:
+        session.add(Conversation(id=conversation_id, tenant_id=uuid.uuid4(), user_id=uuid.uuid4(),
+                                 title="t", model="deepseek-chat", total_tokens=0))
+        await session.commit()
+
+    scheduled = []
+    tail_loads = []
+    manager = ContextManager()
+    summarizer = ContextSummarizer()
+    load_tail = manager._load_tail
+
+    async def counting_load_tail(*args, **kwargs):
+        tail_loads.append(1)
+        return await load_tail(*args, **kwargs)
+
+    async def fake_llm(previous, messages):
+        return f"summary of {len(messages)}", ["point"]
+
+    monkeypatch.setattr(manager_module, "cache_service", FakeCache(None))
+    monkeypatch.setattr(manager, "_load_tail", counting_load_tail)
+    monkeypatch.setattr(summarizer, "_summarize", fake_llm)
+    monkeypatch.setattr(context_summary_service, "schedule", lambda cid, keep_last=0: scheduled.append(cid) or True)
+
+    config = ContextConfig(max_tokens=4096, summarize_threshold=1000, keep_last_messages=2)
+    base = datetime(2026, 1, 1)
+    for turn in range(1, 21):
+        async with session_factory() as session:
+            session.add(ConversationMessage(id=uuid.uuid4(), conversation_id=conversation_id, role="user",
+                                            content=f"m{turn}", tokens=100,
+                                            created_at=base + timedelta(seconds=turn)))
+            await session.execute(update(Conversation).where(Conversation.id == conversation_id)
+                                  .values(total_tokens=Conversation.total_tokens + 100))
+            await session.commit()
+
+            window = await manager.get_context_window(session, ConversationId(conversation_id), config)
+
+        # 模拟后台任务：被调度时把检查点之后的消息（保留最近 2 条）折叠进摘要
+        if scheduled:
+            scheduled.clear()
+            async with session_factory() as session:
+                checkpoint = await summarizer.create_summary(session, conversation_id, max_messages=40, keep_last=2)
+                # SQLite 的 now() 只精确到秒，显式拉开检查点时间
+                await session.execute(update(ContextHistory).where(ContextHistory.id == checkpoint.id)
+                                      .values(created_at=base + timedelta(minutes=turn)))
+                await session.commit()
+
+    async with session_factory() as session:
+        checkpoints = (await session.execute(select(func.count()).select_from(ContextHistory))).scalar()
+    await engine.dispose()
+
+    # 第 11 轮（1100 Token）与第 20 轮（未折叠 1100 Token）各摘要一次
+    assert checkpoints == 2
+    # 只有第一轮与第 11 轮检查点生成后的下一轮重新读取尾部，其余轮次增量命中缓存
+    assert len(tail_loads) == 2
+    assert window.messages[0]["content"].startswith("[Summary]")
+    assert [msg["content"] for msg in window.messages[1:]] == [f"m{i}" for i in range(10, 21)]
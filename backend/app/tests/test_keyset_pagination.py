@@ -0,0 +1,103 @@
+"""
+游标（keyset）分页测试
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from sqlalchemy import UUID, create_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from app.models.article import Article
+from app.models.article_category import ArticleCategory
+from app.models.article_tag import ArticleTag
+from app.models.category import Category
+from app.models.tag import Tag
+from app.models.user import User
+from app.utils.db_utils import get_articles_page_by_multiple_filters
+from app.utils.pagination import (
+    CursorPaginationParams,
+    build_keyset_page,
+    decode_keyset_cursor,
+    encode_keyset_cursor,
+)
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+def test_keyset_cursor_roundtrip_keeps_types():
+    """测试游标编解码后保留时间与 UUID 类型"""
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    item_id = uuid.uuid4()
+
+    cursor = encode_keyset_cursor([created_at, item_id])
+
+    assert "+" not in cursor and "/" not in cursor
+    assert decode_keyset_cursor(cursor) == [created_at, item_id]
+
+
+def test_invalid_keyset_cursor_returns_none():
+    """测试无效游标被忽略（从第一页开始）"""
+    assert decode_keyset_cursor("not-a-cursor") is None
+    assert decode_keyset_cursor("WzFd") is None  # 只有一个值
+
+
+def test_build_keyset_page_sets_next_cursor_from_last_item():
+    """测试多取一条判断是否有下一页，并以最后一条生成游标"""
+    rows = [
+        SimpleNamespace(id=uuid.uuid4(), created_at=datetime(2024, 1, day))
+        for day in (5, 4, 3)
+    ]
+
+    page = build_keyset_page(rows, 2, lambda r: r.created_at, lambda r: r.id)
+
+    assert page.has_more is True
+    assert len(page.items) == 2
+    assert decode_keyset_cursor(page.next_cursor) == [rows[1].created_at, rows[1].id]
+
+    last_page = build_keyset_page(rows[:2], 2, lambda r: r.created_at, lambda r: r.id)
+    assert last_page.has_more is False
+    assert last_page.next_cursor is None
+
+
+def test_article_list_keyset_pages_follow_order_and_break_ties(tmp_path):
+    """测试文章列表按 (created_at, id) 倒序翻页，时间相同的文章不重复也不遗漏，草稿被过滤"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'keyset.db'}")
+    for table in (User.__table__, Category.__table__, Tag.__table__, Article.__table__,
+                  ArticleCategory.__table__, ArticleTag.__table__):
+        table.create(engine)
+
+    base = datetime(2024, 1, 1)
+    author = User(id=uuid.uuid4(), tenant_id=uuid.uuid4(), username="writer", email="w@example.com",
+                  hashed_password="x", is_active=True, is_superuser=False)
+    # 三篇文章共用同一时间，只能靠 id 区分先后
+    articles = [
+        Article(id=uuid.uuid4(), title=f"a{i}", slug=f"a{i}", content="c", author_id=author.id,
+                is_published=i != 4, created_at=base + timedelta(hours=min(i, 2)))
+        for i in range(6)
+    ]
+    db = sessionmaker(bind=engine)()
+    try:
+        db.add_all([author, *articles])
+        db.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            page = get_articles_page_by_multiple_filters(db, CursorPaginationParams(cursor=cursor, limit=2))
+            seen.extend(page.items)
+            if not page.has_more:
+                break
+            cursor = page.next_cursor
+
+        expected = sorted(
+            (a for a in articles if a.is_published), key=lambda a: (a.created_at, a.id.hex), reverse=True
+        )
+        assert [a.id for a in seen] == [a.id for a in expected]
+        assert seen[0].author.username == "writer"
+    finally:
+        db.close()
+        engine.dispose()
@@ -0,0 +1,67 @@
+"""
+LLM 提供商共享 HTTP 客户端测试
+"""
+
+import json
+import httpx
+from app.llm.base import ChatCompletionRequest, ChatMessage
+from app.llm.deepseek_provider import DeepSeekProvider
+from app.llm.provider_factory import LLMProviderFactory
+
+
+def make_provider(handler) -> DeepSeekProvider:
+    provider = DeepSeekProvider(api_key="test-key", base_url="http://llm.test/v1", model="deepseek-chat")
+    provider._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return provider
+
+
+def make_request() -> ChatCompletionRequest:
+    return ChatCompletionRequest(messages=[ChatMessage(role="user", content="hi")], model="deepseek-chat")
+
+
+async def test_chat_and_stream_reuse_one_client():
+    """测试普通与流式调用复用同一个客户端，调用结束后客户端不被关闭"""
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["authorization"] == "Bearer test-key"
+        if json.loads(request.content)["stream"]:
+            body = 'data: {"choices": [{"delta": {"content": "he"}}]}\n\ndata: [DONE]\n\n'
+            return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json={"choices": [{"message": {"role": "assistant", "content": "hello"}}]})
+
+    provider = make_provider(handler)
+    client = provider.client
+
+    response = await provider.chat(make_request())
+    chunks = [chunk.content async for chunk in provider.stream_chat(make_request())]
+
+    assert response.message.content == "hello"
+    assert chunks == ["he"]
+    assert provider.client is client
+    assert not client.is_closed
+
+    await provider.aclose()
+    assert client.is_closed
+
+
+async def test_client_recreated_after_close():
+    """测试客户端关闭后再次使用时重新创建"""
+    provider = DeepSeekProvider(api_key="test-key", base_url="http://llm.test/v1", model="deepseek-chat")
+    first = provider.client
+    await provider.aclose()
+
+    second = provider.client
+    assert second is not first
+    assert not second.is_closed
+    await provider.aclose()
+
+
+async def test_factory_shutdown_closes_clients():
+    """测试工厂关闭时释放所有实例的连接池并清除缓存"""
+    provider = make_provider(lambda request: httpx.Response(200))
+    client = provider.client
+    LLMProviderFactory._instances["deepseek-test"] = provider
+
+    await LLMProviderFactory.shutdown()
+
+    assert client.is_closed
+    assert "deepseek-test" not in LLMProviderFactory._instances
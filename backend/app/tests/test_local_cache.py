@@ -0,0 +1,58 @@
+"""
+进程内 L1 缓存测试
+"""
+
+import time
+from app.utils.local_cache import LocalCache
+
+
+def test_local_cache_get_set_and_stats():
+    """测试基本读写与命中统计"""
+    cache = LocalCache(max_entries=10, max_ttl=60)
+
+    assert cache.get("missing") is None
+    cache.set("a", {"value": 1})
+    assert cache.get("a") == {"value": 1}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_local_cache_evicts_least_recently_used():
+    """测试超出容量时淘汰最久未使用的键"""
+    cache = LocalCache(max_entries=2, max_ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_local_cache_ttl_is_clamped_and_expires():
+    """测试 TTL 不超过上限且到期后失效"""
+    cache = LocalCache(max_entries=10, max_ttl=0.05)
+    cache.set("a", 1, ttl=3600)
+    assert cache.get("a") == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_local_cache_delete_pattern():
+    """测试按 glob 模式删除"""
+    cache = LocalCache()
+    cache.set("article:1", 1)
+    cache.set("article:slug:foo", 2)
+    cache.set("user:1", 3)
+
+    assert cache.delete_pattern("article:*") == 2
+    assert cache.get("user:1") == 3
+    assert cache.delete("user:1") is True
+    assert cache.delete("user:1") is False
@@ -0,0 +1,45 @@
+"""
+日志环形缓冲区测试
+"""
+
+import asyncio
+from app.utils.log_buffer import LogBuffer
+
+
+def test_log_buffer_drops_oldest_when_full():
+    """测试缓冲区满时覆盖最旧记录并计数"""
+    buffer = LogBuffer("test", capacity=3, flush_threshold=10)
+    for index in range(5):
+        buffer.append({"n": index})
+
+    assert len(buffer) == 3
+    assert buffer.stats()["dropped"] == 2
+    assert [row["n"] for row in buffer.drain(10)] == [2, 3, 4]
+
+
+def test_log_buffer_drains_in_batches():
+    """测试按批取出并统计写入结果"""
+    buffer = LogBuffer("test", capacity=100, flush_threshold=10)
+    for index in range(25):
+        buffer.append({"n": index})
+
+    first = buffer.drain(10)
+    assert [row["n"] for row in first] == list(range(10))
+    buffer.mark_written(len(first))
+    buffer.mark_failed(len(buffer.drain(10)))
+
+    stats = buffer.stats()
+    assert (stats["pending"], stats["written"], stats["failed"]) == (5, 10, 10)
+
+
+async def test_log_buffer_wakes_writer_at_threshold():
+    """测试积压达到阈值时唤醒写入任务"""
+    wakeup = asyncio.Event()
+    buffer = LogBuffer("test", capacity=100, flush_threshold=3)
+    buffer.bind(wakeup)
+
+    buffer.append({})
+    buffer.append({})
+    assert not wakeup.is_set()
+    buffer.append({})
+    assert wakeup.is_set()
@@ -0,0 +1,73 @@
+"""
+记忆向量检索测试
+"""
+
+from app.services.embedding_service import hashing_embedding
+from app.utils.vector_index import ShardedVectorIndex, dot, format_vector, parse_vector
+
+
+def test_hashing_embedding_is_normalized_and_semantic():
+    """测试哈希向量归一化，且共享词语的文本相似度更高"""
+    query = hashing_embedding("我喜欢喝咖啡", 512)
+    related = hashing_embedding("用户每天早上喝一杯咖啡", 512)
+    unrelated = hashing_embedding("the deployment uses kubernetes", 512)
+
+    assert abs(dot(query, query) - 1.0) < 1e-9
+    assert dot(query, related) > dot(query, unrelated)
+    assert hashing_embedding("", 16) == [0.0] * 16
+
+
+def test_vector_text_roundtrip():
+    """测试 pgvector 文本格式的序列化与解析"""
+    vector = [0.5, -0.25, 1.0]
+    assert format_vector(vector) == "[0.5,-0.25,1.0]"
+    assert parse_vector(format_vector(vector)) == vector
+    assert parse_vector(None) is None
+
+
+def test_sharded_index_search_and_updates():
+    """测试分片隔离、增量写入与删除，未加载的分片忽略写入"""
+    index = ShardedVectorIndex(max_shards=10)
+    index.load_shard("u1", [("a", [1.0, 0.0]), ("b", [0.0, 1.0])])
+
+    assert index.search("u1", [1.0, 0.0], 1) == [("a", 1.0)]
+    assert index.search("u2", [1.0, 0.0], 1) == []
+
+    index.upsert("u1", "c", [0.8, 0.6])
+    assert [item_id for item_id, _ in index.search("u1", [0.6, 0.8], 2)] == ["c", "b"]
+
+    index.remove("u1", "c")
+    assert [item_id for item_id, _ in index.search("u1", [0.6, 0.8], 3)] == ["b", "a"]
+
+    index.upsert("u2", "x", [1.0, 0.0])
+    assert not index.has_shard("u2")
+
+
+def test_sharded_index_evicts_least_recently_used():
+    """测试分片数超过上限时淘汰最久未使用的分片"""
+    index = ShardedVectorIndex(max_shards=2)
+    index.load_shard("u1", [("a", [1.0])])
+    index.load_shard("u2", [("b", [1.0])])
+    index.search("u1", [1.0], 1)
+    index.load_shard("u3", [("c", [1.0])])
+
+    assert index.has_shard("u1")
+    assert not index.has_shard("u2")
+    assert len(index) == 2
+
+
+def test_postgres_memory_search_ranks_within_user_before_limit():
+    """测试 PostgreSQL 检索先按用户过滤并计算距离（物化 CTE），再在外层排序取 top_k"""
+    from sqlalchemy import select
+    from sqlalchemy.dialects import postgresql
+    from app.crud.memory import nearest_memories_stmt
+    from app.models.memory import Memory
+
+    stmt = select(Memory).where(Memory.user_id == "u1", Memory.tenant_id == "t1")
+    sql = str(nearest_memories_stmt(stmt, [1.0, 0.0], 5).compile(dialect=postgresql.dialect()))
+
+    assert "WITH candidates AS MATERIALIZED" in sql
+    cte, outer = sql.split("\nFROM candidates")
+    assert "memories.user_id" in cte and "<=>" in cte
+    assert "ORDER BY candidates.distance" in outer
+    assert "LIMIT" in outer
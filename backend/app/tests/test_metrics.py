@@ -0,0 +1,62 @@
+"""
+进程内指标注册表测试
+"""
+
+import pytest
+from app.utils.metrics import MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    """测试直方图按 Prometheus 格式导出累计桶、总和与总数"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+
+    histogram.observe(0.05, route="/a/{id}")
+    histogram.observe(0.5, route="/a/{id}")
+    histogram.observe(3, route="/a/{id}")
+
+    text = registry.render()
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{route="/a/{id}",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a/{id}",le="1"} 2' in text
+    assert 'latency_seconds_bucket{route="/a/{id}",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{route="/a/{id}"} 3' in text
+    assert histogram.totals() == (3.55, 3)
+
+
+def test_counter_and_gauge_labels():
+    """测试计数器只增不减，标签必须与定义一致"""
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requests", ("method",))
+    gauge = registry.gauge("in_progress", "In progress")
+
+    counter.inc(method="GET")
+    counter.inc(2, method="GET")
+    gauge.inc()
+    gauge.dec()
+
+    assert counter.value(method="GET") == 3
+    assert gauge.value() == 0
+    with pytest.raises(ValueError):
+        counter.inc(-1, method="GET")
+    with pytest.raises(ValueError):
+        counter.inc(path="/")
+
+    # 重复注册返回同一个指标
+    assert registry.counter("requests_total", "Requests", ("method",)) is counter
+
+
+def test_collectors_are_rendered_and_failures_skipped():
+    """测试采集函数在抓取时调用，单个采集失败不影响其他指标"""
+    registry = MetricsRegistry()
+
+    @registry.register_collector
+    def pool():
+        return [("db_pool_checked_out", "gauge", "Checked out", [({"pool": "sync"}, 2)])]
+
+    @registry.register_collector
+    def broken():
+        raise RuntimeError("boom")
+
+    text = registry.render()
+    assert 'db_pool_checked_out{pool="sync"} 2' in text
@@ -0,0 +1,130 @@
+"""
+密码哈希线程池测试
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+import bcrypt
+import pytest
+import app.crud.user as user_crud
+from app.core import security
+from app.core.config import settings
+from app.utils.bounded_executor import BoundedExecutor, ExecutorSaturatedError
+
+
+def make_hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+
+
+async def test_bounded_executor_fails_fast_when_full():
+    """测试排队任务数达到上限时立即拒绝，任务结束后释放名额"""
+    executor = BoundedExecutor(max_workers=1, max_pending=2)
+    gate = threading.Event()
+
+    running = [asyncio.ensure_future(executor.run(gate.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    with pytest.raises(ExecutorSaturatedError):
+        await executor.run(lambda: None)
+    assert executor.rejected == 1
+
+    gate.set()
+    await asyncio.gather(*running)
+    assert executor.pending == 0
+    assert await executor.run(lambda: 42) == 42
+    executor.shutdown()
+
+
+async def test_hash_and_verify_in_executor(monkeypatch):
+    """测试哈希与校验在线程池中执行，且使用配置的成本因子"""
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    hashed = await security.get_password_hash("Secret123!")
+
+    assert hashed.startswith("$2b$04$")
+    assert await security.verify_password("Secret123!", hashed) is True
+    assert await security.verify_password("wrong", hashed) is False
+    assert await security.verify_password("Secret123!", "not-a-hash") is False
+
+
+async def test_busy_executor_maps_to_503(monkeypatch):
+    """测试线程池已满时抛出带 Retry-After 的 503"""
+    async def saturated(func, *args):
+        raise ExecutorSaturatedError("full")
+
+    monkeypatch.setattr(security.password_executor, "run", saturated)
+    with pytest.raises(security.PasswordHashingBusyError) as exc_info:
+        await security.verify_password("x", make_hash("x", 4))
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+
+
+def test_password_needs_rehash(monkeypatch):
+    """测试按哈希中的成本因子判断是否需要升级"""
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    assert security.password_needs_rehash(make_hash("x", 4)) is True
+    assert security.password_needs_rehash(make_hash("x", 5)) is False
+    assert security.password_needs_rehash("garbage") is False
+
+
+async def test_authenticate_rehashes_outdated_cost(monkeypatch):
+    """测试登录成功时把低成本因子的哈希升级到当前配置"""
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    user = SimpleNamespace(id="u1", hashed_password=make_hash("Secret123!", 4))
+    db = SimpleNamespace(commit=lambda: None, refresh=lambda obj: None)
+    monkeypatch.setattr(user_crud, "get_user_by_username", lambda db, username: user)
+
+    assert await user_crud.authenticate_user(db, "alice", "wrong") is None
+    assert user.hashed_password.startswith("$2b$04$")
+
+    assert await user_crud.authenticate_user(db, "alice", "Secret123!") is user
+    assert user.hashed_password.startswith("$2b$05$")
+    assert bcrypt.checkpw(b"Secret123!", user.hashed_password.encode())
+
+
+def test_bounded_executor_call_from_sync_code():
+    """测试同步调用在线程池中执行并阻塞等待结果，排队已满时同样立即拒绝"""
+    executor = BoundedExecutor(max_workers=1, max_pending=1)
+    gate = threading.Event()
+
+    assert executor.call(threading.current_thread) is not threading.current_thread()
+
+    blocker = threading.Thread(target=executor.call, args=(gate.wait,))
+    blocker.start()
+    while executor.pending == 0:
+        time.sleep(0.01)
+    with pytest.raises(ExecutorSaturatedError):
+        executor.call(lambda: None)
+
+    gate.set()
+    blocker.join()
+    assert executor.pending == 0
+    executor.shutdown()
+
+
+def test_user_write_endpoints_hash_without_event_loop(monkeypatch):
+    """测试用户写接口为同步函数（在线程池中运行），经同步接口调用密码线程池，并在响应后失效主体缓存"""
+    import inspect
+    from fastapi import BackgroundTasks
+    import app.api.v1.endpoints.users as users_endpoint
+    from app.schemas.user import PasswordUpdate
+
+    for endpoint in ("create_user", "update_current_user", "update_password", "update_user", "delete_user"):
+        assert not inspect.iscoroutinefunction(getattr(users_endpoint, endpoint))
+
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    user = SimpleNamespace(id="u1", username="alice", hashed_password=make_hash("OldSecret1!", 4))
+    db = SimpleNamespace(commit=lambda: None)
+    monkeypatch.setattr(user_crud, "get_user", lambda db, user_id: user)
+    background_tasks = BackgroundTasks()
+
+    response = users_endpoint.update_password(
+        db=db,
+        background_tasks=background_tasks,
+        password_data=PasswordUpdate(old_password="OldSecret1!", new_password="NewSecret1!"),
+        current_user=user,
+    )
+
+    assert response == {"message": "密码更新成功"}
+    assert bcrypt.checkpw(b"NewSecret1!", user.hashed_password.encode())
+    assert [(task.func.__name__, task.args) for task in background_tasks.tasks] == [("invalidate_user", ("u1",))]
@@ -0,0 +1,110 @@
+"""
+分布式限流测试
+"""
+
+import pytest
+from app.core.security import create_access_token
+from app.middleware.pipeline import RequestContext
+from app.utils.gcra_limiter import GCRARateLimiter
+from app.utils.rate_limit import RateLimitStage, parse_rate_limit
+
+
+def make_context(method: str, path: str, headers=None) -> RequestContext:
+    return RequestContext({
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": headers or [],
+        "client": ("10.0.0.1", 5000),
+    })
+
+
+def test_parse_rate_limit_formats():
+    """测试解析策略表与配置中的两种写法"""
+    assert parse_rate_limit("5 per minute") == (5, 60)
+    assert parse_rate_limit("1000/hour") == (1000, 3600)
+    assert parse_rate_limit("10 per 5 minutes") == (10, 300)
+    with pytest.raises(ValueError):
+        parse_rate_limit("often")
+
+
+def test_rate_limit_policy_and_identity():
+    """测试按路由选择策略，登录用户按用户 ID 计数"""
+    stage = RateLimitStage(GCRARateLimiter())
+
+    anonymous = make_context("POST", "/api/v1/auth/login")
+    assert stage.identify(anonymous) == ("ip:10.0.0.1", False)
+    assert stage.policy(anonymous, False) == ("login", "5 per minute")
+
+    token = create_access_token({"sub": "user-1"})
+    authenticated = make_context("POST", "/api/v1/comments/", [(b"authorization", f"Bearer {token}".encode())])
+    identity, is_user = stage.identify(authenticated)
+    assert (identity, is_user) == ("user:user-1", True)
+    assert stage.policy(authenticated, True) == ("comment", "10 per hour")
+    assert stage.policy(make_context("GET", "/api/v1/articles/"), True)[0] == "global"
+
+
+async def test_prefetched_tokens_are_consumed_locally():
+    """测试预取的令牌在本地消耗，不访问 Redis"""
+    limiter = GCRARateLimiter(local_batch=5)
+    limiter.local.set("ratelimit:ip:1:global", [2, 90, 0.0], ttl=60)
+
+    first = await limiter.check(None, "ratelimit:ip:1:global", 100, 3600)
+    second = await limiter.check(None, "ratelimit:ip:1:global", 100, 3600)
+
+    assert first.allowed and second.allowed
+    assert (first.remaining, second.remaining) == (91, 90)
+    assert limiter.stats()["local_hits"] == 2
+    assert limiter.stats()["redis_checks"] == 0
+
+
+class LuaScriptRedis:
+    """在 Lua 运行时中执行限流脚本，redis.call 只实现 TIME / GET / SET"""
+
+    def __init__(self, lupa):
+        self.now_ms = 1_700_000_000_000
+        self.store = {}
+        self.lua = lupa.LuaRuntime()
+        self.lua.globals().redis = self.lua.table(call=self._call)
+
+    def _call(self, command, *args):
+        if command == "TIME":
+            return self.lua.table(str(self.now_ms // 1000), str(self.now_ms % 1000 * 1000))
+        if command == "GET":
+            return self.store.get(args[0])
+        if command == "SET":
+            self.store[args[0]] = args[1]
+            return "OK"
+        raise AssertionError(f"unexpected command {command}")
+
+    def register_script(self, script):
+        run = self.lua.eval(f"function(KEYS, ARGV) {script} end")
+
+        async def call(keys, args):
+            return list(run(self.lua.table(*keys), self.lua.table(*[str(arg) for arg in args])).values())
+
+        return call
+
+
+async def test_gcra_grant_prefetches_only_while_burst_is_mostly_unused():
+    """测试突发额度已用不到 1/4 时才预取（最多剩余的 1/4，不超过 local_batch），否则每次只发放一个令牌"""
+    lupa = pytest.importorskip("lupa")
+    redis = LuaScriptRedis(lupa)
+    limiter = GCRARateLimiter(local_batch=10)
+
+    async def grant(key, limit, window=3600):
+        await limiter.check(redis, key, limit, window)
+        entry = limiter.local.get(key)
+        limiter.local.delete(key)
+        return entry[0] + 1 if entry else 1
+
+    # 未使用：min(local_batch, 100 // 4)
+    assert await grant("fresh", 100) == 10
+    # 已用 10、20 次（< 25），仍预取 10 个
+    assert await grant("fresh", 100) == 10
+    assert await grant("fresh", 100) == 10
+    # 已用 30 次（>= 1/4），之后每次都访问 Redis
+    assert await grant("fresh", 100) == 1
+    # 额度较小时预取量受剩余令牌的 1/4 限制
+    assert await grant("small", 20) == 5
+    assert await grant("tiny", 5, window=60) == 1
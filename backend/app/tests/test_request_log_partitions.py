@@ -0,0 +1,84 @@
+"""
+请求日志分区维护测试
+"""
+
+from datetime import date
+from types import SimpleNamespace
+from app.crud.request_log import ensure_request_log_partitions
+
+
+class FakeResult:
+    rowcount = 0
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def scalar(self):
+        return len(self.rows)
+
+    def all(self):
+        return self.rows
+
+
+class RecordingSession:
+    """记录执行的 SQL，包含 fail_on 中任一片段的语句抛出异常；default_days 为 DEFAULT 分区中的日期"""
+
+    def __init__(self, fail_on=(), default_days=()):
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+        self.fail_on = fail_on
+        self.default_days = list(default_days)
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, statement):
+        sql = str(statement)
+        self.statements.append(sql)
+        if any(fragment in sql for fragment in self.fail_on):
+            raise RuntimeError("partition error")
+        if "FROM request_logs_default" in sql and sql.startswith("SELECT"):
+            return FakeResult((day,) for day in self.default_days)
+        return FakeResult()
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+async def test_request_log_partitions_skip_failed_day():
+    """测试每天的分区单独提交，某一天创建与迁移都失败时跳过并继续创建后续日期"""
+    session = RecordingSession(fail_on=("request_logs_20240502",))
+
+    await ensure_request_log_partitions(session, date(2024, 5, 1), days_ahead=2)
+
+    creates = [sql for sql in session.statements if "PARTITION OF request_logs FOR VALUES" in sql]
+    assert [sql.split()[5] for sql in creates] == [
+        "request_logs_20240501",
+        "request_logs_20240502",
+        "request_logs_20240503",
+    ]
+    assert "FROM ('2024-05-03 00:00:00+00') TO ('2024-05-04 00:00:00+00')" in creates[2]
+    assert session.rollbacks == 2
+    assert session.commits >= 3
+
+
+async def test_request_log_partitions_recover_default_rows():
+    """测试 DEFAULT 分区有行时按日期迁入对应的日分区"""
+    session = RecordingSession(
+        fail_on=("IF NOT EXISTS request_logs_20240420",),
+        default_days=[date(2024, 4, 20)],
+    )
+
+    await ensure_request_log_partitions(session, date(2024, 5, 1), days_ahead=0)
+
+    assert any(sql.startswith("LOCK TABLE request_logs_default") for sql in session.statements)
+    assert any(
+        sql.startswith("INSERT INTO request_logs_20240420 SELECT * FROM request_logs_default")
+        for sql in session.statements
+    )
+    assert any(
+        sql.startswith("ALTER TABLE request_logs ATTACH PARTITION request_logs_20240420")
+        for sql in session.statements
+    )
@@ -0,0 +1,86 @@
+"""
+纯 ASGI 请求管道测试
+"""
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from app.middleware.pipeline import RequestPipelineMiddleware
+from app.middleware.request_size_limit import RequestSizeLimitStage
+from app.utils.middleware import RequestLoggingStage
+from app.utils.perf_monitor import HTTP_REQUEST_DURATION, PerformanceMonitoringStage
+
+
+def build_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"item_id": item_id}
+
+    @app.post("/upload")
+    async def upload(payload: dict):
+        return payload
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            for index in range(3):
+                yield f"data: {index}\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    app.add_middleware(
+        RequestPipelineMiddleware,
+        stages=[
+            RequestLoggingStage(),
+            RequestSizeLimitStage(max_content_length=64),
+            PerformanceMonitoringStage(),
+        ],
+    )
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def test_pipeline_sets_request_id_and_records_route_template():
+    """测试响应头包含请求 ID，延迟按路由模板记录"""
+    client = build_client()
+    before = HTTP_REQUEST_DURATION.snapshot(method="GET", route="/items/{item_id}", status="200")
+
+    response = client.get("/items/42")
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"]
+    assert float(response.headers["X-Process-Time"]) >= 0
+    _, _, count = HTTP_REQUEST_DURATION.snapshot(method="GET", route="/items/{item_id}", status="200")
+    assert count == (before[2] if before else 0) + 1
+
+
+def test_pipeline_rejects_oversized_body():
+    """测试超过限制的请求体返回 413（按 Content-Length 与分块传输两种方式）"""
+    client = build_client()
+
+    response = client.post("/upload", json={"data": "x" * 100})
+    assert response.status_code == 413
+    assert response.json()["error_code"] == "REQUEST_TOO_LARGE"
+
+    chunked = client.post(
+        "/upload",
+        content=iter([b'{"data": "', b"x" * 100, b'"}']),
+        headers={"Content-Type": "application/json"},
+    )
+    assert chunked.status_code == 413
+
+
+def test_pipeline_converts_unhandled_errors_and_streams():
+    """测试未处理异常返回带请求 ID 的 500，流式响应逐块透传"""
+    client = build_client()
+
+    response = client.get("/boom")
+    assert response.status_code == 500
+    assert response.json()["request_id"] == response.headers["X-Request-ID"]
+
+    stream = client.get("/stream")
+    assert stream.text == "data: 0\n\ndata: 1\n\ndata: 2\n\n"
@@ -0,0 +1,74 @@
+"""
+单飞请求合并测试
+"""
+
+import asyncio
+import pytest
+from app.utils.single_flight import SingleFlight, wait_for_value
+
+
+async def test_single_flight_shares_one_load():
+    """测试并发调用只执行一次加载并共享结果"""
+    flight = SingleFlight()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*[flight.do("key", load) for _ in range(20)])
+
+    assert results == ["value"] * 20
+    assert calls == 1
+    # 完成后不保留任何状态
+    assert len(flight) == 0
+
+
+async def test_single_flight_propagates_errors_and_allows_retry():
+    """测试异常传播给所有等待者，之后可以重新加载"""
+    flight = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flight.do("key", failing), flight.do("key", failing), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+    async def ok():
+        return 1
+
+    assert await flight.do("key", ok) == 1
+
+
+async def test_single_flight_caller_cancellation_does_not_cancel_load():
+    """测试单个调用方被取消不影响其他等待者"""
+    flight = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("key", load))
+    second = asyncio.ensure_future(flight.do("key", load))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+async def test_wait_for_value_is_bounded():
+    """测试等待其他 worker 结果时有超时上限"""
+    async def never():
+        return None
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    assert await wait_for_value(never, timeout=0.1, interval=0.01) is None
+    assert loop.time() - started < 0.5
@@ -0,0 +1,65 @@
+"""
+流式增量合并测试
+"""
+
+import asyncio
+from app.utils.stream_coalescer import coalesce_deltas
+
+
+async def tokens(items, delay=0.0):
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+async def collect(source, window):
+    return [frame async for frame in coalesce_deltas(source, window)]
+
+
+async def test_coalesce_merges_fast_tokens_and_keeps_content():
+    """测试窗口内的增量被合并，首个增量立即发出，内容不丢失"""
+    items = [f"t{index} " for index in range(50)]
+
+    frames = await collect(tokens(items), window=0.05)
+
+    assert frames[0] == "t0 "
+    assert len(frames) < len(items)
+    assert "".join(frames) == "".join(items)
+
+
+async def test_coalesce_flushes_on_upstream_stall():
+    """测试上游停顿时窗口到期即发出已积累的内容"""
+    received = []
+
+    async def stalled():
+        yield "a"
+        yield "b"
+        await asyncio.sleep(0.2)
+        yield "c"
+
+    async for frame in coalesce_deltas(stalled(), window=0.02):
+        received.append((frame, asyncio.get_running_loop().time()))
+
+    assert [frame for frame, _ in received] == ["a", "b", "c"]
+    # "b" 在停顿期间发出，而不是等到 "c" 到达
+    assert received[2][1] - received[1][1] > 0.1
+
+
+async def test_coalesce_closes_upstream_when_consumer_stops():
+    """测试消费方提前结束时关闭上游"""
+    closed = asyncio.Event()
+
+    async def endless():
+        try:
+            while True:
+                yield "x"
+                await asyncio.sleep(0.001)
+        finally:
+            closed.set()
+
+    stream = coalesce_deltas(endless(), window=0.01)
+    assert await stream.__anext__() == "x"
+    await stream.aclose()
+
+    assert closed.is_set()
@@ -0,0 +1,55 @@
+"""
+Token 计数服务测试
+"""
+
+import json
+import pytest
+from app.services.tokenizer_service import TokenizerService, estimate_tokens, model_family
+
+
+def test_estimate_tokens_by_character_class():
+    """测试启发式估算按中日韩字符与其它字符分别计数，忽略空白"""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("你好世界") == 3  # 4 * 0.6 向上取整
+    assert estimate_tokens("abcdefghij") == 3  # 10 * 0.3
+    assert estimate_tokens("abc   def\n") == estimate_tokens("abcdef")
+    assert estimate_tokens("a") == 1
+
+
+def test_model_family():
+    """测试模型名称（含提供商前缀）映射到模型族"""
+    assert model_family("deepseek-chat") == "deepseek"
+    assert model_family("deepseek_deepseek-chat") == "deepseek"
+    assert model_family("GLM-4") == "glm"
+    assert model_family("qwen-max") == "qwen"
+    assert model_family("gpt-4o") is None
+    assert model_family(None) is None
+
+
+def test_fallback_without_tokenizer_files(tmp_path):
+    """测试分词器文件缺失时回退到估算，且只尝试加载一次"""
+    service = TokenizerService(tokenizer_dir=str(tmp_path))
+
+    assert service.count("你好，world", "deepseek-chat") == estimate_tokens("你好，world")
+    assert service.count_batch(["你好", "", "hello"], "qwen-max") == [
+        estimate_tokens("你好"), 0, estimate_tokens("hello"),
+    ]
+    assert service._tokenizers == {"deepseek": None, "qwen": None}
+
+
+def test_loads_bpe_tokenizer_from_local_file(tmp_path):
+    """测试按模型族从本地 tokenizer.json 加载分词器并批量计数"""
+    pytest.importorskip("tokenizers")
+    vocab = {"[UNK]": 0, "hello": 1, "world": 2}
+    tokenizer_json = {
+        "version": "1.0",
+        "model": {"type": "WordLevel", "vocab": vocab, "unk_token": "[UNK]"},
+        "pre_tokenizer": {"type": "Whitespace"},
+    }
+    (tmp_path / "glm").mkdir()
+    (tmp_path / "glm" / "tokenizer.json").write_text(json.dumps(tokenizer_json))
+    service = TokenizerService(tokenizer_dir=str(tmp_path))
+
+    assert service.get_tokenizer("glm-4") is not None
+    assert service.count("hello world hello", "glm-4") == 3
+    assert service.count_batch(["hello", "hello world"], "glm-4") == [1, 2]
@@ -0,0 +1,188 @@
+"""
+浏览量缓冲落库测试（快照、租约与重试幂等）
+"""
+
+import uuid
+from sqlalchemy import UUID, create_engine, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from app.models.article import Article
+from app.models.article_view_daily import ArticleViewDaily, SiteViewDaily, ViewCountFlush
+from app.services import view_counter_service as view_counter_module
+from app.services.cache_service import cache_service
+from app.services.view_counter_service import PENDING_SCRIPT, SNAPSHOT_SCRIPT, ViewCounterService
+from app.utils.single_flight import RedisLease
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+TABLES = [Article.__table__, ArticleViewDaily.__table__, SiteViewDaily.__table__, ViewCountFlush.__table__]
+
+
+class FakeRedis:
+    """只实现落库路径用到的命令，按脚本分派 EVAL"""
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = {}
+        self.sets = {}
+        self.fail_deletes = 0
+
+    async def set(self, key, value, nx=False, px=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value
+        return True
+
+    async def eval(self, script, numkeys, *args):
+        keys, argv = args[:numkeys], args[numkeys:]
+        if script == RedisLease.RELEASE_SCRIPT:
+            if self.strings.get(keys[0]) == argv[0]:
+                del self.strings[keys[0]]
+                return 1
+            return 0
+        if script == SNAPSHOT_SCRIPT:
+            if keys[0] not in self.hashes:
+                return 0
+            self.hashes[argv[0] + argv[1]] = self.hashes.pop(keys[0])
+            self.sets.setdefault(keys[1], set()).add(argv[1])
+            return 1
+        if script == PENDING_SCRIPT:
+            fields = argv[1:]
+            totals = [int(self.hashes.get(keys[0], {}).get(field, 0)) for field in fields]
+            for snapshot_id in self.sets.get(keys[1], set()):
+                snapshot = self.hashes.get(argv[0] + snapshot_id, {})
+                totals = [total + int(snapshot.get(field, 0)) for total, field in zip(totals, fields)]
+            return totals
+        raise AssertionError("unexpected script")
+
+    async def hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+
+    async def hgetall(self, key):
+        return {field.encode(): str(value).encode() for field, value in self.hashes.get(key, {}).items()}
+
+    async def smembers(self, key):
+        return {member.encode() for member in self.sets.get(key, set())}
+
+    async def srem(self, key, member):
+        self.sets.get(key, set()).discard(member)
+
+    async def delete(self, *keys):
+        if self.fail_deletes:
+            self.fail_deletes -= 1
+            raise ConnectionError("redis unavailable")
+        for key in keys:
+            self.hashes.pop(key, None)
+            self.strings.pop(key, None)
+
+
+async def _setup(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'views.db'}"
+    sync_engine = create_engine(url)
+    for table in TABLES:
+        table.create(sync_engine)
+    sync_engine.dispose()
+
+    engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        article = Article(id=uuid.uuid4(), title="t", slug="t", content="c", author_id=uuid.uuid4(), view_count=10)
+        session.add(article)
+        await session.commit()
+
+    redis = FakeRedis()
+    monkeypatch.setattr(cache_service, "redis", redis)
+    monkeypatch.setattr(view_counter_module, "AsyncSessionLocal", session_factory)
+
+    async def noop_delete(key):
+        return True
+
+    monkeypatch.setattr(cache_service, "delete", noop_delete)
+    return engine, session_factory, redis, article.id
+
+
+async def _view_count(session_factory, article_id):
+    async with session_factory() as session:
+        return (await session.execute(select(Article.view_count).where(Article.id == article_id))).scalar()
+
+
+async def test_flush_applies_snapshot_under_lease(tmp_path, monkeypatch):
+    """测试待落库 Hash 被重命名为唯一快照并应用，快照 ID 与更新同事务记录，之后清理快照与租约"""
+    engine, session_factory, redis, article_id = await _setup(tmp_path, monkeypatch)
+    counter = ViewCounterService()
+    await redis.hincrby(counter.pending_key, str(article_id), 5)
+
+    assert await counter.get_pending_views(article_id) == 5
+    assert await counter.flush() == 1
+
+    assert await _view_count(session_factory, article_id) == 15
+    async with session_factory() as session:
+        records = (await session.execute(select(ViewCountFlush))).scalars().all()
+    assert len(records) == 1 and records[0].article_count == 1
+    assert counter.pending_key not in redis.hashes
+    assert not redis.sets.get(counter.snapshots_key)
+    assert counter.lease_key not in redis.strings
+    await engine.dispose()
+
+
+async def test_flush_skips_while_another_worker_holds_lease(tmp_path, monkeypatch):
+    """测试租约被其他 worker 持有时不做快照也不写库"""
+    engine, session_factory, redis, article_id = await _setup(tmp_path, monkeypatch)
+    counter = ViewCounterService()
+    await redis.hincrby(counter.pending_key, str(article_id), 5)
+    redis.strings[counter.lease_key] = "other-worker"
+
+    assert await counter.flush() == 0
+
+    assert await _view_count(session_factory, article_id) == 10
+    assert redis.hashes[counter.pending_key] == {str(article_id): 5}
+    await engine.dispose()
+
+
+async def test_flush_retry_after_cleanup_failure_does_not_double_count(tmp_path, monkeypatch):
+    """测试写库成功但删除快照失败时，下一轮识别已应用的快照只做清理，新增浏览仍然落库"""
+    engine, session_factory, redis, article_id = await _setup(tmp_path, monkeypatch)
+    counter = ViewCounterService()
+    await redis.hincrby(counter.pending_key, str(article_id), 5)
+    redis.fail_deletes = 1
+
+    assert await counter.flush() == 1
+    assert len(redis.sets[counter.snapshots_key]) == 1
+
+    await redis.hincrby(counter.pending_key, str(article_id), 2)
+    assert await counter.flush() == 1
+
+    assert await _view_count(session_factory, article_id) == 17
+    assert not redis.sets[counter.snapshots_key]
+    assert await counter.get_pending_views(article_id) == 0
+    await engine.dispose()
+
+
+async def test_flush_retries_snapshot_after_database_failure(tmp_path, monkeypatch):
+    """测试写库失败时快照保留并计入待落库增量，下一轮与新快照一起应用"""
+    engine, session_factory, redis, article_id = await _setup(tmp_path, monkeypatch)
+    counter = ViewCounterService()
+    await redis.hincrby(counter.pending_key, str(article_id), 5)
+
+    def failing_session():
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(view_counter_module, "AsyncSessionLocal", failing_session)
+    assert await counter.flush() == 0
+    assert len(redis.sets[counter.snapshots_key]) == 1
+    assert counter.lease_key not in redis.strings
+
+    await redis.hincrby(counter.pending_key, str(article_id), 3)
+    assert await counter.get_pending_views(article_id) == 8
+
+    monkeypatch.setattr(view_counter_module, "AsyncSessionLocal", session_factory)
+    assert await counter.flush() == 2
+
+    assert await _view_count(session_factory, article_id) == 18
+    assert not redis.sets[counter.snapshots_key]
+    await engine.dispose()
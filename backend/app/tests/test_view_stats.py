@@ -0,0 +1,117 @@
+"""
+浏览量按日汇总与分区维护测试
+"""
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from sqlalchemy import UUID, create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from app.crud.view_stats import ensure_view_partitions, get_article_views_by_day, record_daily_views
+from app.models.article import Article
+from app.models.article_view_daily import ArticleViewDaily, SiteViewDaily
+from app.services.statistics_service import StatisticsService
+
+
+@compiles(UUID, "sqlite")
+def _compile_uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+TABLES = [Article.__table__, ArticleViewDaily.__table__, SiteViewDaily.__table__]
+
+
+class FakeResult:
+    rowcount = 0
+
+    def scalar(self):
+        return 0
+
+    def all(self):
+        return []
+
+
+class RecordingSession:
+    """记录执行的 SQL，包含 fail_on 中任一片段的语句抛出异常"""
+
+    def __init__(self, fail_on=()):
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+        self.fail_on = fail_on
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, statement):
+        sql = str(statement)
+        self.statements.append(sql)
+        if any(fragment in sql for fragment in self.fail_on):
+            raise RuntimeError("partition error")
+        return FakeResult()
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+async def test_record_daily_views_and_view_statistics(tmp_path):
+    """测试流水与全站日汇总在同一会话内累加，浏览量统计按日汇总计算总量与今日/本周/本月"""
+    url = f"sqlite:///{tmp_path / 'views.db'}"
+    sync_engine = create_engine(url)
+    for table in TABLES:
+        table.create(sync_engine)
+
+    today = datetime.now(timezone.utc).date()
+    first, second = uuid.uuid4(), uuid.uuid4()
+    async_engine = create_async_engine(url.replace("sqlite://", "sqlite+aiosqlite://"))
+    async with AsyncSession(async_engine) as session:
+        await record_daily_views(session, {first: 3, second: 2}, today)
+        await record_daily_views(session, {first: 4}, today)
+        await record_daily_views(session, {second: 1}, today - timedelta(days=40))
+        await session.commit()
+    await async_engine.dispose()
+
+    db = sessionmaker(bind=sync_engine)()
+    try:
+        assert db.query(SiteViewDaily).filter(SiteViewDaily.view_date == today).one().views == 9
+        assert get_article_views_by_day(db, first, today, today) == [(today, 7)]
+
+        stats = StatisticsService.get_view_statistics(db, days=7)
+        assert stats["total"] == 10
+        assert stats["today"] == 9
+        assert stats["this_week"] == 9
+        assert stats["this_month"] == 9
+        assert stats["daily"] == [{"date": today.isoformat(), "views": 9}]
+    finally:
+        db.close()
+        sync_engine.dispose()
+
+
+async def test_view_partitions_committed_individually():
+    """测试每个月分区单独提交，某个月失败时回滚并继续创建后续月份"""
+    session = RecordingSession(fail_on=("FROM ('2024-05-01')", "LIKE article_view_daily"))
+
+    await ensure_view_partitions(session, date(2024, 5, 20), months_ahead=1)
+
+    creates = [sql for sql in session.statements if "PARTITION OF article_view_daily FOR VALUES" in sql]
+    assert len(creates) == 2
+    assert "article_view_daily_202406" in creates[1]
+    assert session.rollbacks == 2
+    assert session.commits >= 2
+
+
+async def test_view_partition_recovers_rows_from_default():
+    """测试 DEFAULT 分区已有当月数据时，在一个事务内迁出这些行并挂载新分区"""
+    session = RecordingSession(fail_on=("FROM ('2024-05-01')",))
+
+    await ensure_view_partitions(session, date(2024, 5, 20), months_ahead=0)
+
+    move = session.statements[1:6]
+    assert move[0].startswith("LOCK TABLE article_view_daily_default")
+    assert "CREATE TABLE article_view_daily_202405 (LIKE article_view_daily" in move[1]
+    assert move[2].startswith("INSERT INTO article_view_daily_202405 SELECT * FROM article_view_daily_default")
+    assert move[3].startswith("DELETE FROM article_view_daily_default")
+    assert move[4].startswith("ALTER TABLE article_view_daily ATTACH PARTITION article_view_daily_202405")
@@ -0,0 +1,197 @@
+"""
+布隆过滤器工具
+位数组存放在 Redis bitmap 中，所有 worker 共享；大小由预期容量和误判率确定，
+与实际写入的键数量无关
+"""
+
+import hashlib
+import math
+from typing import AsyncIterable, Iterable, List
+
+
+class RedisBloomFilter:
+    """
+    基于 Redis bitmap 的布隆过滤器
+
+    使用双重哈希（blake2b 的两个 64 位分量）生成 k 个位下标。
+    重建时先写入本次重建独占的临时键，完成后在仍持有重建租约的前提下
+    RENAME 原子替换；重建期间的新增通过 Lua 脚本同时写入临时键，不会丢失
+    """
+
+    # KEYS: 主键, 重建标记键（值为本次重建 ID）；ARGV[1]: 临时键前缀，其余为位下标
+    ADD_SCRIPT = """
+local run = redis.call('GET', KEYS[2])
+local building = false
+if run then
+    building = ARGV[1] .. run
+end
+for i = 2, #ARGV do
+    redis.call('SETBIT', KEYS[1], ARGV[i], 1)
+    if building then
+        redis.call('SETBIT', building, ARGV[i], 1)
+    end
+end
+return #ARGV - 1
+"""
+
+    # KEYS: 租约键, 临时键, 主键, 重建标记键；ARGV: 租约令牌, 重建 ID
+    SWAP_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('RENAME', KEYS[2], KEYS[3])
+if redis.call('GET', KEYS[4]) == ARGV[2] then
+    redis.call('DEL', KEYS[4])
+end
+return 1
+"""
+
+    # KEYS: 重建标记键；ARGV: 重建 ID
+    CLEAR_MARKER_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+    def __init__(self, name: str, capacity: int, error_rate: float):
+        """
+        Args:
+            name: 过滤器名称（决定 Redis 键）
+            capacity: 预期元素数量
+            error_rate: 目标误判率（0~1）
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.name = name
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = self.optimal_size(capacity, error_rate)
+        self.hash_count = self.optimal_hash_count(self.size, capacity)
+
+        self.key = f"bloom:{name}"
+        self.building_prefix = f"bloom:{name}:building:"
+        self.rebuilding_key = f"bloom:{name}:rebuilding"
+        self.lease_key = f"bloom:{name}:lease"
+
+    @staticmethod
+    def optimal_size(capacity: int, error_rate: float) -> int:
+        """位数组大小 m = -n·ln(p) / (ln2)^2"""
+        return max(int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))), 8)
+
+    @staticmethod
+    def optimal_hash_count(size: int, capacity: int) -> int:
+        """哈希函数个数 k = m/n·ln2"""
+        return max(int(round(size / capacity * math.log(2))), 1)
+
+    def positions(self, item: str) -> List[int]:
+        """
+        计算元素对应的位下标
+
+        Args:
+            item: 元素
+
+        Returns:
+            List[int]: k 个位下标
+        """
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    async def add_many(self, redis, items: Iterable[str]) -> None:
+        """
+        添加元素
+
+        Args:
+            redis: Redis 异步客户端
+            items: 元素列表
+        """
+        offsets = [offset for item in items for offset in self.positions(item)]
+        if offsets:
+            await redis.eval(self.ADD_SCRIPT, 2, self.key, self.rebuilding_key, self.building_prefix, *offsets)
+
+    async def might_contain(self, redis, item: str) -> bool:
+        """
+        判断元素是否可能存在
+
+        过滤器尚未构建时返回 True（宁可放行也不误拒）
+
+        Args:
+            redis: Redis 异步客户端
+            item: 元素
+
+        Returns:
+            bool: False 表示一定不存在
+        """
+        command: List = ["BITFIELD", self.key]
+        for offset in self.positions(item):
+            command.extend(["GET", "u1", offset])
+
+        pipe = redis.pipeline(transaction=False)
+        pipe.exists(self.key)
+        pipe.execute_command(*command)
+        exists, bits = await pipe.execute()
+        if not exists:
+            return True
+        return all(bits)
+
+    async def rebuild(self, redis, items: AsyncIterable[List[str]], lease) -> int:
+        """
+        按全量数据重建过滤器
+
+        调用方需先获取 lease_key 上的租约；每次重建写入独占的临时键，
+        租约在替换前已过期（被其他 worker 接管）时放弃本次结果
+
+        Args:
+            redis: Redis 异步客户端
+            items: 异步产生元素批次的迭代器
+            lease: 已获取的重建租约（RedisLease），其时长同时作为重建标记的过期时间
+
+        Returns:
+            int: 写入的元素数量
+
+        Raises:
+            RuntimeError: 替换前已失去租约
+        """
+        run_id = lease.token
+        building_key = self.building_prefix + run_id
+        marker_ttl_ms = lease.ttl_ms
+
+        await redis.set(self.rebuilding_key, run_id, px=marker_ttl_ms)
+        try:
+            pipe = redis.pipeline(transaction=True)
+            # 预分配完整位数组，内存占用固定为 m/8 字节
+            pipe.setbit(building_key, self.size - 1, 0)
+            pipe.pexpire(building_key, marker_ttl_ms)
+            await pipe.execute()
+
+            count = 0
+            async for batch in items:
+                command: List = ["BITFIELD", building_key]
+                for item in batch:
+                    for offset in self.positions(item):
+                        command.extend(["SET", "u1", offset, 1])
+                if len(command) > 2:
+                    await redis.execute_command(*command)
+                count += len(batch)
+
+            # 替换后主键不应带临时键的过期时间
+            await redis.persist(building_key)
+            swapped = await redis.eval(
+                self.SWAP_SCRIPT, 4,
+                lease.key, building_key, self.key, self.rebuilding_key,
+                lease.token, run_id,
+            )
+            if not swapped:
+                raise RuntimeError(f"Lost rebuild lease for bloom filter {self.name}")
+            return count
+        finally:
+            await redis.delete(building_key)
+            await redis.eval(self.CLEAR_MARKER_SCRIPT, 1, self.rebuilding_key, run_id)
+
+
+__all__ = ["RedisBloomFilter"]
@@ -0,0 +1,121 @@
+"""
+有界线程池
+限制执行中与排队中的任务总数，超出时立即拒绝而不是无限排队，
+用于 bcrypt 等 CPU 密集、会释放 GIL 的同步调用
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class ExecutorSaturatedError(RuntimeError):
+    """排队任务数已达上限"""
+
+
+class BoundedExecutor:
+    """
+    有界线程池
+
+    在事件循环中 await run(...)，同步函数在工作线程中执行，事件循环线程不被阻塞；
+    同步代码中使用 call(...)
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, thread_name_prefix: str = "bounded"):
+        """
+        Args:
+            max_workers: 工作线程数
+            max_pending: 执行中 + 排队中的最大任务数
+            thread_name_prefix: 线程名前缀
+        """
+        self.max_workers = max(max_workers, 1)
+        self.max_pending = max(max_pending, self.max_workers)
+        self.thread_name_prefix = thread_name_prefix
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        """执行中与排队中的任务数"""
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix=self.thread_name_prefix
+                    )
+        return self._executor
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturatedError(
+                    f"{self.thread_name_prefix} executor saturated ({self._pending} pending)"
+                )
+            self._pending += 1
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, func: Callable[..., Any], *args: Any) -> Future:
+        self._acquire()
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._release()
+            raise
+        # 在任务真正结束时释放名额：调用方被取消时，已提交的任务仍会占用线程直到完成
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        在线程池中执行同步函数
+
+        Args:
+            func: 同步函数
+            *args: 参数
+
+        Returns:
+            Any: 函数返回值
+
+        Raises:
+            ExecutorSaturatedError: 排队任务数已达上限
+        """
+        return await asyncio.wrap_future(self._submit(func, *args))
+
+    def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        在线程池中执行同步函数并阻塞等待结果
+
+        供同步代码（def 接口所在的线程池线程、脚本）使用，同样受排队上限约束；
+        不要在事件循环线程中调用
+
+        Args:
+            func: 同步函数
+            *args: 参数
+
+        Returns:
+            Any: 函数返回值
+
+        Raises:
+            ExecutorSaturatedError: 排队任务数已达上限
+        """
+        return self._submit(func, *args).result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """关闭线程池"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+__all__ = ["BoundedExecutor", "ExecutorSaturatedError"]
@@ -3,7 +3,7 @@
 统一管理所有缓存键的命名规范，避免缓存键混乱
 """
 
-from typing import Optional
+from typing import Any, List, Optional
 from uuid import UUID
 
 
@@ -53,6 +53,17 @@ class CacheKeys:
         """通过slug查询文章的空值缓存键"""
         return f"article:slug:null:{slug}"
 
+    @staticmethod
+    def article_json(article_id: UUID) -> str:
+        """文章详情响应（预序列化 JSON）缓存键"""
+        # v2：缓存值由 (ID, bytes) 元组改为 {"id", "body"} 字典，换键避免读到旧格式
+        return f"article:json:v2:{article_id}"
+
+    @staticmethod
+    def article_json_by_slug(slug: str) -> str:
+        """通过slug查询的文章详情响应（预序列化 JSON）缓存键"""
+        return f"article:json:v2:slug:{slug}"
+
     @staticmethod
     def article_list(
         skip: int = 0,
@@ -135,6 +146,28 @@ class CacheKeys:
         """评论回复列表缓存键"""
         return f"comment:replies:{comment_id}:skip={skip}:limit={limit}"
 
+    @staticmethod
+    def comment_tree(article_id: UUID) -> str:
+        """文章已审核评论树缓存键（整棵树，按顶层评论分页在读取时切片）"""
+        return f"comment:tree:{article_id}"
+
+    @staticmethod
+    def comment_tree_tags(tree: Any) -> List[str]:
+        """
+        评论树缓存依赖的标签
+
+        文章删除或评论作者资料变化时失效；评论自身的变更由评论写入方直接删除缓存键
+        """
+        tags = [CacheTags.article(tree.article_id)]
+        author_ids = set()
+        stack = list(tree.threads)
+        while stack:
+            node = stack.pop()
+            author_ids.add(node.author_id)
+            stack.extend(node.children)
+        tags.extend(CacheTags.user(author_id) for author_id in author_ids)
+        return tags
+
     # ==================== 分类相关 ====================
     @staticmethod
     def category(category_id: UUID) -> str:
@@ -173,6 +206,26 @@ class CacheKeys:
         """文章浏览量缓存键"""
         return f"stats:article:views:{article_id}"
 
+    @staticmethod
+    def stats_article_views_pending() -> str:
+        """待落库的文章浏览量增量（Hash: article_id -> delta）"""
+        return "stats:article:views:pending"
+
+    @staticmethod
+    def stats_article_views_flushing(snapshot_id: str) -> str:
+        """正在落库的文章浏览量增量快照（每次快照使用唯一 ID）"""
+        return f"stats:article:views:flushing:{snapshot_id}"
+
+    @staticmethod
+    def stats_article_views_snapshots() -> str:
+        """尚未清理的浏览量快照 ID 集合"""
+        return "stats:article:views:snapshots"
+
+    @staticmethod
+    def stats_article_views_flush_lock() -> str:
+        """浏览量落库租约锁（跨 worker 只有一个 flush 在执行）"""
+        return "stats:article:views:flush_lock"
+
     @staticmethod
     def stats_user_articles_count(user_id: UUID) -> str:
         """用户文章数量缓存键"""
@@ -183,12 +236,55 @@ class CacheKeys:
         """缓存命中率统计键"""
         return f"stats:cache:hit_rate:{func_name}"
 
+    # ==================== 依赖标签声明 ====================
+    @staticmethod
+    def article_detail_tags(article: Any) -> List[str]:
+        """
+        文章详情缓存（article / article_by_slug）依赖的标签
+
+        详情 Schema 内嵌作者、分类与标签，它们变化时也需要失效
+        """
+        tags = [CacheTags.article(article.id)]
+        author_id = getattr(article, "author_id", None)
+        if author_id:
+            tags.append(CacheTags.user(author_id))
+        tags.extend(CacheTags.category(category.id) for category in getattr(article, "categories", None) or [])
+        tags.extend(CacheTags.tag(tag.id) for tag in getattr(article, "tags", None) or [])
+        return tags
+
+    @staticmethod
+    def article_list_tags() -> List[str]:
+        """文章列表类缓存（article_list / article_cursor / featured / popular）依赖的标签"""
+        return [CacheTags.ARTICLE_LIST]
+
+    # ==================== 对话上下文相关 ====================
+    @staticmethod
+    def context_window(conversation_id: UUID) -> str:
+        """对话上下文窗口缓存键（值中记录窗口末尾消息 ID，按增量追加）"""
+        return f"context:window:{conversation_id}"
+
+    @staticmethod
+    def context_summary_lock(conversation_id: str) -> str:
+        """对话滚动摘要租约锁（跨 worker 同一对话只有一个摘要在执行）"""
+        return f"lock:context:summary:{conversation_id}"
+
+    # ==================== 缓存加载锁 ====================
+    @staticmethod
+    def cache_lock(key: str) -> str:
+        """缓存加载租约锁键（跨 worker 单飞）"""
+        return f"lock:cache:{key}"
+
     # ==================== 令牌黑名单相关 ====================
     @staticmethod
     def token_blacklist(token: str) -> str:
-        """令牌黑名单缓存键"""
+        """令牌黑名单缓存键（不带 jti 的旧令牌）"""
         return f"blacklist:token:{token}"
 
+    @staticmethod
+    def revoked_tokens() -> str:
+        """已吊销令牌 jti 有序集合（分数为令牌过期时间）"""
+        return "auth:revoked"
+
     # ==================== 速率限制相关 ====================
     @staticmethod
     def rate_limit(identifier: str, endpoint: str) -> str:
@@ -206,6 +302,43 @@ class CacheKeys:
         return f"ratelimit:register:{ip_address}"
 
 
+class CacheTags:
+    """
+    缓存依赖标签
+
+    写入缓存时把键登记到标签对应的 Redis Set 中，数据变更时按标签失效，
+    代价与标签下的键数量成正比，而不是整个键空间
+    """
+
+    # 所有文章列表类缓存
+    ARTICLE_LIST = "list:articles"
+
+    @staticmethod
+    def key(tag: str) -> str:
+        """标签成员集合的 Redis 键"""
+        return f"cachetag:{tag}"
+
+    @staticmethod
+    def article(article_id: UUID) -> str:
+        """单篇文章"""
+        return f"article:{article_id}"
+
+    @staticmethod
+    def user(user_id: UUID) -> str:
+        """用户（作为文章作者内嵌在文章缓存中）"""
+        return f"user:{user_id}"
+
+    @staticmethod
+    def category(category_id: UUID) -> str:
+        """分类"""
+        return f"category:{category_id}"
+
+    @staticmethod
+    def tag(tag_id: UUID) -> str:
+        """标签"""
+        return f"tag:{tag_id}"
+
+
 # 缓存TTL常量（秒）
 class CacheTTL:
     """缓存过期时间常量"""
@@ -234,6 +367,9 @@ class CacheTTL:
     # 文章缓存（30分钟）
     ARTICLE = 1800
 
+    # 文章列表缓存（5分钟，列表中的浏览量快照随之刷新）
+    ARTICLE_LIST = 300
+
     # 用户缓存（15分钟）
     USER = 900
 
@@ -247,4 +383,4 @@ class CacheTTL:
     TOKEN_BLACKLIST = None  # None表示使用令牌的剩余有效期
 
 
-__all__ = ["CacheKeys", "CacheTTL"]
+__all__ = ["CacheKeys", "CacheTags", "CacheTTL"]
@@ -5,10 +5,11 @@
 import asyncio
 import hashlib
 import time
-from typing import Any, Optional, Callable, Set
+from typing import Any, Optional, Callable
 from functools import wraps
 
-from app.services.cache_service import cache_service
+from app.services.bloom_filter_service import bloom_filter_service
+from app.services.cache_service import cache_service, cache_get_or_set
 from app.utils.logger import app_logger
 
 
@@ -18,17 +19,10 @@ class CacheProtection:
     
     提供以下防护机制：
     1. 缓存穿透防护：使用布隆过滤器和空值缓存
-    2. 缓存击穿防护：使用互斥锁
+    2. 缓存击穿防护：单飞加载（进程内共享 Future + Redis 租约锁）
     3. 缓存雪崩防护：使用随机过期时间
     """
     
-    # 布隆过滤器（简单的内存实现，生产环境建议使用 RedisBloom）
-    _bloom_filter: Set[str] = set()
-    
-    # 互斥锁字典（用于防止缓存击穿）
-    _locks: dict = {}
-    _lock_lock = asyncio.Lock()
-    
     @classmethod
     async def get_with_penetration_protection(
         cls,
@@ -58,7 +52,7 @@ class CacheProtection:
             缓存值或 None
         """
         # 1. 检查布隆过滤器（快速判断 key 是否可能存在）
-        if use_bloom_filter and not cls._bloom_filter_check(key):
+        if use_bloom_filter and not await cls._bloom_filter_check(key):
             app_logger.debug(f"Bloom filter rejected key: {key}")
             return None
         
@@ -82,7 +76,7 @@ class CacheProtection:
                 await cache_service.set(key, value, expire=expire)
                 # 添加到布隆过滤器
                 if use_bloom_filter:
-                    cls._bloom_filter_add(key)
+                    await cls._bloom_filter_add(key)
             else:
                 # 5b. 缓存空值，短时间过期（防止缓存穿透）
                 await cache_service.set(null_key, "1", expire=null_expire)
@@ -100,68 +94,38 @@ class CacheProtection:
         key: str,
         fetch_func: Callable,
         expire: int = 3600,
-        lock_timeout: int = 10,  # 锁超时时间（秒）
+        lock_timeout: int = 10,  # 保留以兼容旧调用，租约时长由 CACHE_LOCK_TIMEOUT 配置
         *args,
+        stale_ttl: int = 0,
         **kwargs
     ) -> Any:
         """
-        获取缓存值，带缓存击穿防护（使用互斥锁）
+        获取缓存值，带缓存击穿防护（单飞加载）
         
-        当缓存失效时，只有一个请求去查询数据库，其他请求等待
+        当缓存失效时，所有 worker 中只有一个请求去查询数据库，其他请求共享其结果
         
         Args:
             key: 缓存键
             fetch_func: 从数据库获取数据的函数
             expire: 缓存过期时间（秒）
-            lock_timeout: 互斥锁超时时间（秒）
+            lock_timeout: 已废弃，保留以兼容旧调用
+            stale_ttl: 过期后允许返回旧值的时间（秒），0 表示不启用
             
         Returns:
             缓存值或 None
         """
-        # 1. 检查缓存
-        cached_value = await cache_service.get(key)
-        if cached_value is not None:
-            return cached_value
-        
-        # 2. 获取互斥锁
-        lock_key = f"lock:{key}"
-        
-        async with cls._lock_lock:
-            if key not in cls._locks:
-                cls._locks[key] = asyncio.Lock()
-            lock = cls._locks[key]
-        
         try:
-            # 尝试获取锁（非阻塞）
-            if lock.locked():
-                # 如果锁已被占用，等待一段时间后重试
-                await asyncio.sleep(0.1)
-                # 再次检查缓存（可能其他线程已经设置）
-                cached_value = await cache_service.get(key)
-                if cached_value is not None:
-                    return cached_value
-            
-            # 获取锁
-            async with lock:
-                # 双重检查
-                cached_value = await cache_service.get(key)
-                if cached_value is not None:
-                    return cached_value
-                
-                # 查询数据库
-                value = await fetch_func(*args, **kwargs)
-                
-                if value is not None:
-                    await cache_service.set(key, value, expire=expire)
-                
-                return value
-                
+            return await cache_get_or_set(
+                key,
+                fetch_func,
+                expire,
+                *args,
+                stale_ttl=stale_ttl,
+                **kwargs
+            )
         except Exception as e:
             app_logger.error(f"Error in breakdown protection for key {key}: {str(e)}")
             raise
-        finally:
-            # 清理锁（可选，根据具体需求）
-            pass
     
     @classmethod
     async def get_with_full_protection(
@@ -190,11 +154,8 @@ class CacheProtection:
             缓存值或 None
         """
         # 1. 添加随机抖动防止缓存雪崩
-        if jitter:
-            import random
-            actual_expire = expire + random.randint(0, expire // 10)  # 添加 0-10% 的随机时间
-        else:
-            actual_expire = expire
+        # 添加 0-10% 的随机时间
+        actual_expire = cache_service.jittered_ttl(expire, 0.1) if jitter else expire
         
         # 2. 检查空值缓存
         null_key = f"null:{key}"
@@ -212,22 +173,18 @@ class CacheProtection:
         )
     
     @classmethod
-    def _bloom_filter_check(cls, key: str) -> bool:
+    async def _bloom_filter_check(cls, key: str) -> bool:
         """
         检查 key 是否可能在布隆过滤器中
         
-        注意：这是一个简化的内存实现，
-        生产环境建议使用 RedisBloom 模块
+        过滤器保存在 Redis bitmap 中，所有 worker 共享
         """
-        # 简单的哈希检查
-        hash_val = hashlib.md5(key.encode()).hexdigest()
-        return hash_val in cls._bloom_filter
+        return await bloom_filter_service.might_contain(key)
     
     @classmethod
-    def _bloom_filter_add(cls, key: str):
+    async def _bloom_filter_add(cls, key: str):
         """添加 key 到布隆过滤器"""
-        hash_val = hashlib.md5(key.encode()).hexdigest()
-        cls._bloom_filter.add(hash_val)
+        await bloom_filter_service.add([key])
     
     @classmethod
     async def invalidate_cache(cls, key: str, include_null: bool = True):
@@ -0,0 +1,164 @@
+"""
+缓存序列化工具
+为 CacheService 提供可插拔的序列化器，默认使用 orjson 存储 Pydantic Schema，
+无法用 JSON 无损表示的值回退到 pickle
+"""
+
+import importlib
+import pickle
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson 在 requirements.txt 中声明
+    orjson = None
+
+
+class CacheSerializer:
+    """缓存序列化器基类"""
+
+    name: str = "base"
+
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+    def can_load(self, data: bytes) -> bool:
+        """判断数据是否由当前序列化器写入"""
+        raise NotImplementedError
+
+
+class PickleSerializer(CacheSerializer):
+    """pickle 序列化器（兼容历史缓存数据）"""
+
+    name = "pickle"
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+    def can_load(self, data: bytes) -> bool:
+        # pickle 协议 2 及以上以 PROTO 操作码 0x80 开头
+        return data[:1] == b"\x80"
+
+
+class OrjsonSerializer(CacheSerializer):
+    """
+    orjson 序列化器
+
+    Pydantic 模型以 {"__schema__": "模块:类名", "data": {...}} 信封存储，读取时按类名
+    重新校验为同一 Schema；仅允许还原 app.schemas 下的模型
+    """
+
+    name = "orjson"
+    MAGIC = b"\x01OJ"
+    # 顶层为单个 Pydantic 模型时的快速路径：MAGIC_MODEL + 类路径 + b"\n" + JSON，
+    # 读取时由 pydantic-core 直接解析 JSON，省去中间 dict
+    MAGIC_MODEL = b"\x01OM"
+    SCHEMA_KEY = "__schema__"
+    ALLOWED_MODULE_PREFIX = "app.schemas."
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("orjson is not installed")
+        self._schema_cache: Dict[str, type] = {}
+
+    def _default(self, obj: Any) -> Any:
+        if isinstance(obj, BaseModel):
+            cls = type(obj)
+            return {
+                self.SCHEMA_KEY: f"{cls.__module__}:{cls.__qualname__}",
+                "data": obj.model_dump(mode="json"),
+            }
+        # 其他类型（ORM 实例、bytes 等）交由调用方回退到 pickle
+        raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+    def dumps(self, value: Any) -> bytes:
+        if isinstance(value, BaseModel):
+            cls = type(value)
+            header = f"{cls.__module__}:{cls.__qualname__}".encode()
+            return self.MAGIC_MODEL + header + b"\n" + value.model_dump_json().encode()
+        return self.MAGIC + orjson.dumps(value, default=self._default)
+
+    def loads(self, data: bytes) -> Any:
+        if data[:len(self.MAGIC_MODEL)] == self.MAGIC_MODEL:
+            header, _, payload = data[len(self.MAGIC_MODEL):].partition(b"\n")
+            schema = self._resolve_schema(header.decode())
+            if schema is None:
+                return orjson.loads(payload)
+            return schema.model_validate_json(payload)
+
+        payload = data[len(self.MAGIC):]
+        value = orjson.loads(payload)
+        # 只有包含 Schema 信封时才需要遍历还原
+        if b'"__schema__"' in payload:
+            value = self._revive(value)
+        return value
+
+    def can_load(self, data: bytes) -> bool:
+        prefix = data[:len(self.MAGIC)]
+        return prefix == self.MAGIC or prefix == self.MAGIC_MODEL
+
+    def _revive(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self._revive(item) for item in value]
+        if isinstance(value, dict):
+            schema_path = value.get(self.SCHEMA_KEY)
+            if schema_path is not None and len(value) == 2 and "data" in value:
+                schema = self._resolve_schema(schema_path)
+                if schema is not None:
+                    return schema.model_validate(value["data"])
+            return {key: self._revive(item) for key, item in value.items()}
+        return value
+
+    def _resolve_schema(self, schema_path: str) -> Optional[type]:
+        schema = self._schema_cache.get(schema_path)
+        if schema is not None:
+            return schema
+
+        module_name, _, qualname = schema_path.partition(":")
+        if not module_name.startswith(self.ALLOWED_MODULE_PREFIX):
+            return None
+
+        obj: Any = importlib.import_module(module_name)
+        for attr in qualname.split("."):
+            obj = getattr(obj, attr, None)
+            if obj is None:
+                return None
+
+        if not (isinstance(obj, type) and issubclass(obj, BaseModel)):
+            return None
+
+        self._schema_cache[schema_path] = obj
+        return obj
+
+
+_SERIALIZERS = {
+    PickleSerializer.name: PickleSerializer,
+    OrjsonSerializer.name: OrjsonSerializer,
+}
+
+
+def get_serializer(name: str) -> CacheSerializer:
+    """
+    根据名称获取序列化器实例
+
+    Args:
+        name: 序列化器名称（orjson / pickle）
+
+    Returns:
+        CacheSerializer: 序列化器实例
+    """
+    serializer_cls = _SERIALIZERS.get(name.lower())
+    if serializer_cls is None:
+        raise ValueError(f"Unknown cache serializer: {name}")
+    return serializer_cls()
+
+
+__all__ = ["CacheSerializer", "PickleSerializer", "OrjsonSerializer", "get_serializer"]
@@ -8,6 +8,7 @@ from app.models.user import User
 from app.models.comment import Comment
 from app.models.category import Category
 from app.models.tag import Tag
+from app.utils.pagination import CursorPaginationParams, CursorPaginationResult, paginate_with_cursor
 
 
 def optimize_article_query(db: Session, include_author: bool = True, include_categories: bool = True, include_tags: bool = True, include_comments: bool = False):
@@ -157,17 +158,15 @@ def get_user_article_stats_batch(db: Session, user_ids: List[str]):
     return stats_dict
 
 
-def get_articles_by_multiple_filters(
-    db: Session, 
+def _articles_by_multiple_filters_query(
+    db: Session,
     author_ids: Optional[List[str]] = None,
-    category_ids: Optional[List[str]] = None, 
+    category_ids: Optional[List[str]] = None,
     tag_ids: Optional[List[str]] = None,
     published_only: bool = True,
-    limit: int = 100,
-    offset: int = 0
 ):
     """
-    使用多个过滤条件高效查询文章
+    构建多条件文章查询（不含排序与分页）
     """
     query = optimize_article_query(db)
     
@@ -197,12 +196,58 @@ def get_articles_by_multiple_filters(
     if conditions:
         query = query.filter(and_(*conditions))
     
+    return query
+
+
+def get_articles_by_multiple_filters(
+    db: Session, 
+    author_ids: Optional[List[str]] = None,
+    category_ids: Optional[List[str]] = None, 
+    tag_ids: Optional[List[str]] = None,
+    published_only: bool = True,
+    limit: int = 100,
+    offset: int = 0
+):
+    """
+    使用多个过滤条件高效查询文章（OFFSET 分页，仅为兼容旧的 skip 参数保留）
+    """
+    query = _articles_by_multiple_filters_query(db, author_ids, category_ids, tag_ids, published_only)
+    
     # 应用排序和分页
     query = query.order_by(Article.created_at.desc()).offset(offset).limit(limit)
     
     return query.all()
 
 
+def get_articles_page_by_multiple_filters(
+    db: Session,
+    cursor_params: CursorPaginationParams,
+    author_ids: Optional[List[str]] = None,
+    category_ids: Optional[List[str]] = None,
+    tag_ids: Optional[List[str]] = None,
+    published_only: bool = True,
+) -> CursorPaginationResult:
+    """
+    使用多个过滤条件游标分页查询文章
+
+    按 (created_at, id) 倒序做 keyset 分页，对应复合索引 idx_article_published_created_id，
+    任意页的代价与第一页相同
+
+    Args:
+        db: 数据库会话
+        cursor_params: 游标分页参数
+        author_ids: 作者 ID 列表
+        category_ids: 分类 ID 列表
+        tag_ids: 标签 ID 列表
+        published_only: 是否只返回已发布文章
+
+    Returns:
+        CursorPaginationResult: 分页结果（items 为已预加载关联数据的文章 ORM）
+    """
+    query = _articles_by_multiple_filters_query(db, author_ids, category_ids, tag_ids, published_only)
+    return paginate_with_cursor(query, cursor_params, Article.created_at, tiebreaker=Article.id)
+
+
 def get_efficient_user_list(db: Session, include_article_counts: bool = False):
     """
     高效获取用户列表，可选择包含文章计数
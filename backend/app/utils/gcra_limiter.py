@@ -0,0 +1,138 @@
+"""
+分布式限流器
+基于 GCRA（通用信元速率算法）的 Redis Lua 脚本，每次检查一次往返、每个客户端只占一个键；
+余量充足的客户端一次预取多个令牌保存在进程内，后续请求无需访问 Redis
+"""
+
+import time
+from typing import Optional
+from app.utils.local_cache import LocalCache
+
+
+class RateLimitResult:
+    """
+    单次限流检查结果
+    """
+
+    __slots__ = ("allowed", "limit", "remaining", "retry_after", "reset_after")
+
+    def __init__(self, allowed: bool, limit: int, remaining: int, retry_after: float, reset_after: float):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        # 被拒绝时距离下一个可用令牌的秒数
+        self.retry_after = retry_after
+        # 距离额度完全恢复的秒数
+        self.reset_after = reset_after
+
+
+class GCRARateLimiter:
+    """
+    GCRA 限流器
+
+    Redis 中只保存理论到达时间（TAT），额度为 limit 次 / window 秒，允许一次性突发 limit 次。
+    时间取 Redis 服务器时间，各 worker 的时钟偏差不影响结果
+    """
+
+    # KEYS: 限流键；ARGV: 发放间隔(ms), 窗口(ms), 最多预取的令牌数, 突发额度(limit)
+    # 返回: {是否允许, 发放令牌数, 剩余令牌数, 重试等待(ms) 或 完全恢复时间(ms)}
+    SCRIPT = """
+local interval = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local max_grant = tonumber(ARGV[3])
+local limit = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then
+    tat = now
+end
+local available = math.floor((now + window - tat) / interval)
+if available < 1 then
+    return {0, 0, 0, math.ceil(tat + interval - window - now)}
+end
+local grant = 1
+if max_grant > 1 and (limit - available) * 4 < limit then
+    -- 只有突发额度已用不到 1/4 时才预取，一次最多取走剩余令牌的 1/4（不超过 max_grant），
+    -- 接近上限的客户端每次都由 Redis 判定
+    grant = math.max(1, math.min(max_grant, math.floor(available / 4)))
+end
+tat = tat + grant * interval
+redis.call('SET', KEYS[1], tostring(tat), 'PX', math.ceil(tat - now))
+return {1, grant, available - grant, math.ceil(tat - now)}
+"""
+
+    def __init__(self, local_batch: int = 10, max_local_entries: int = 10000):
+        """
+        Args:
+            local_batch: 单次最多预取的令牌数（1 表示不预取，每次检查都访问 Redis）
+            max_local_entries: 进程内预取令牌的最大客户端数（LRU 淘汰）
+        """
+        self.local_batch = max(local_batch, 1)
+        # 条目: [本地剩余令牌, Redis 剩余令牌, 完全恢复的单调时钟时间]
+        self.local = LocalCache(max_entries=max_local_entries, max_ttl=86400)
+        self._script = None
+        self._script_client = None
+        self.local_hits = 0
+        self.redis_checks = 0
+
+    def _get_script(self, redis):
+        # register_script 返回的对象使用 EVALSHA，脚本未缓存时自动回退 EVAL
+        if self._script is None or self._script_client is not redis:
+            self._script = redis.register_script(self.SCRIPT)
+            self._script_client = redis
+        return self._script
+
+    def _consume_local(self, key: str, limit: int) -> Optional[RateLimitResult]:
+        entry = self.local.get(key)
+        if entry is None or entry[0] <= 0:
+            return None
+        entry[0] -= 1
+        self.local_hits += 1
+        return RateLimitResult(
+            True, limit, entry[0] + entry[1], 0.0, max(entry[2] - time.monotonic(), 0.0)
+        )
+
+    async def check(self, redis, key: str, limit: int, window: int) -> RateLimitResult:
+        """
+        检查并消耗一次额度
+
+        Args:
+            redis: Redis 异步客户端
+            key: 限流键（每个客户端 + 策略一个）
+            limit: 窗口内允许的请求数
+            window: 窗口长度（秒）
+
+        Returns:
+            RateLimitResult: 检查结果
+        """
+        local_result = self._consume_local(key, limit)
+        if local_result is not None:
+            return local_result
+
+        window_ms = window * 1000
+        self.redis_checks += 1
+        allowed, granted, remaining, wait_ms = await self._get_script(redis)(
+            keys=[key], args=[window_ms / limit, window_ms, self.local_batch, limit]
+        )
+
+        if not allowed:
+            return RateLimitResult(False, limit, 0, wait_ms / 1000, wait_ms / 1000)
+
+        reset_after = wait_ms / 1000
+        if granted > 1:
+            self.local.set(key, [granted - 1, remaining, time.monotonic() + reset_after], ttl=reset_after)
+        return RateLimitResult(True, limit, remaining + granted - 1, 0.0, reset_after)
+
+    def stats(self) -> dict:
+        """本地预取命中统计"""
+        total = self.local_hits + self.redis_checks
+        return {
+            "local_hits": self.local_hits,
+            "redis_checks": self.redis_checks,
+            "local_hit_rate": self.local_hits / total if total else 0.0,
+            "local_clients": len(self.local),
+        }
+
+
+__all__ = ["RateLimitResult", "GCRARateLimiter"]
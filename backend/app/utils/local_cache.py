@@ -0,0 +1,104 @@
+"""
+进程内 L1 缓存
+有界 LRU + 按键 TTL，位于 Redis 之前，用于承接热点键的高频读取
+"""
+
+import fnmatch
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class LocalCache:
+    """
+    有界 LRU/TTL 内存缓存
+
+    缓存的对象在多个请求间共享，调用方应将其视为只读
+    """
+
+    # get() 未命中时可作为 default 传入的哨兵，用于区分缓存的 None 值
+    MISSING = object()
+
+    def __init__(self, max_entries: int = 10000, max_ttl: int = 60):
+        """
+        Args:
+            max_entries: 最大条目数，超出时淘汰最久未使用的键
+            max_ttl: 单个键在 L1 中的最长存活时间（秒），作为漏收失效消息时的兜底
+        """
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        获取缓存值，过期或不存在时返回 default
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        设置缓存值
+
+        Args:
+            key: 键
+            value: 值
+            ttl: 过期时间（秒），为空或超过 max_ttl 时使用 max_ttl
+        """
+        if ttl is None or ttl > self.max_ttl:
+            ttl = self.max_ttl
+        if ttl <= 0:
+            self._data.pop(key, None)
+            return
+
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        """删除单个键"""
+        return self._data.pop(key, self.MISSING) is not self.MISSING
+
+    def delete_pattern(self, pattern: str) -> int:
+        """按 glob 模式（与 Redis SCAN MATCH 语义一致）删除键"""
+        keys = [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """清空所有键"""
+        self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,99 @@
+"""
+有界日志环形缓冲区
+请求路径上只做一次 deque 追加；缓冲区满时覆盖最旧的记录并计数，
+达到批量阈值时唤醒后台写入任务
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+
+class LogBuffer:
+    """
+    有界环形缓冲区
+
+    只在事件循环线程中使用
+    """
+
+    def __init__(self, name: str, capacity: int, flush_threshold: int):
+        """
+        Args:
+            name: 缓冲区名称（用于日志与指标）
+            capacity: 最大记录数，超出时丢弃最旧的记录
+            flush_threshold: 积压达到该数量时立即唤醒写入任务
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.name = name
+        self.capacity = capacity
+        self.flush_threshold = max(min(flush_threshold, capacity), 1)
+        self._items: deque = deque(maxlen=capacity)
+        self._wakeup: Optional[asyncio.Event] = None
+
+        self.appended = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    def bind(self, wakeup: asyncio.Event) -> None:
+        """
+        绑定写入任务的唤醒事件
+
+        Args:
+            wakeup: 写入任务等待的事件
+        """
+        self._wakeup = wakeup
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        追加一条记录（O(1)，不做 IO）
+
+        Args:
+            record: 待写入的行
+        """
+        if len(self._items) == self.capacity:
+            # deque(maxlen) 会自动挤出最旧的一条
+            self.dropped += 1
+        self._items.append(record)
+        self.appended += 1
+        if self._wakeup is not None and len(self._items) >= self.flush_threshold:
+            self._wakeup.set()
+
+    def drain(self, limit: int) -> List[Dict[str, Any]]:
+        """
+        取出最多 limit 条最早的记录
+
+        Args:
+            limit: 最大条数
+
+        Returns:
+            List[Dict[str, Any]]: 记录列表
+        """
+        count = min(limit, len(self._items))
+        return [self._items.popleft() for _ in range(count)]
+
+    def mark_written(self, count: int) -> None:
+        """记录写入成功的条数"""
+        self.written += count
+
+    def mark_failed(self, count: int) -> None:
+        """记录写入失败（已丢弃）的条数"""
+        self.failed += count
+
+    def stats(self) -> Dict[str, Any]:
+        """缓冲区统计"""
+        return {
+            "pending": len(self._items),
+            "capacity": self.capacity,
+            "appended": self.appended,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+__all__ = ["LogBuffer"]
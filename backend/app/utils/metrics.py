@@ -0,0 +1,292 @@
+"""
+进程内指标注册表
+提供 Counter / Gauge / Histogram 三种指标，并按 Prometheus 文本格式（0.0.4）导出。
+
+指标只在事件循环线程中更新，记录一次观测只是几次字典与列表操作，
+不创建任务、不做 IO；连接池、缓存等状态类指标通过采集函数在抓取时读取
+"""
+
+import math
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Prometheus 文本格式的 Content-Type
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# 默认延迟桶（秒），与 prometheus_client 保持一致
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0,
+)
+
+LabelValues = Tuple[str, ...]
+# 采集函数返回的样本：(指标名, 类型, 说明, [(标签, 值), ...])
+Sample = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label_value(str(value))}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """指标基类"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+
+    def _label_values(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels_dict(self, values: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """
+        增加计数
+
+        Args:
+            amount: 增量（必须非负）
+            **labels: 标签值
+        """
+        if amount < 0:
+            raise ValueError("Counters can only be incremented by non-negative amounts")
+        key = self._label_values(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """读取当前值"""
+        return self._values.get(self._label_values(labels), 0.0)
+
+    def _render_samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self._labels_dict(key))} {_format_value(value)}"
+            for key, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    """可增可减的瞬时值"""
+
+    type_name = "gauge"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._label_values(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        """减少"""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        """设置为指定值"""
+        self._values[self._label_values(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    """
+    分桶直方图
+
+    每个标签组合只保存各桶计数、总和与总数，内存与观测次数无关
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(float(bound) for bound in buckets))
+        # 标签 -> [各桶计数（最后一个为 +Inf）, 总和, 总数]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        记录一次观测
+
+        Args:
+            value: 观测值（延迟使用秒）
+            **labels: 标签值
+        """
+        key = self._label_values(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            self._series[key] = series
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def snapshot(self, **labels: str) -> Optional[Tuple[List[int], float, int]]:
+        """
+        读取某个标签组合的累计桶计数、总和与总数
+
+        Returns:
+            Optional[Tuple[List[int], float, int]]: 不存在时返回 None
+        """
+        series = self._series.get(self._label_values(labels))
+        if series is None:
+            return None
+        cumulative, running = [], 0
+        for count in series[0]:
+            running += count
+            cumulative.append(running)
+        return cumulative, series[1], series[2]
+
+    def totals(self) -> Tuple[float, int]:
+        """所有标签组合的总和与总数"""
+        total_sum, total_count = 0.0, 0
+        for _, series_sum, series_count in self._series.values():
+            total_sum += series_sum
+            total_count += series_count
+        return total_sum, total_count
+
+    def _render_samples(self) -> List[str]:
+        lines: List[str] = []
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for key, (counts, series_sum, series_count) in self._series.items():
+            labels = self._labels_dict(key)
+            running = 0
+            for bound, count in zip(bounds, counts):
+                running += count
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': bound})} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(series_sum)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {series_count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    指标注册表
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"Metric {metric.name} already registered with a different definition")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """注册（或获取已注册的）计数器"""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """注册（或获取已注册的）仪表"""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """注册（或获取已注册的）直方图"""
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> Callable[[], Iterable[Sample]]:
+        """
+        注册抓取时调用的采集函数（可作为装饰器使用）
+
+        Args:
+            collector: 返回 (指标名, 类型, 说明, [(标签, 值), ...]) 序列的函数
+
+        Returns:
+            原采集函数
+        """
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        """
+        按 Prometheus 文本格式导出全部指标
+
+        Returns:
+            str: 文本格式的指标
+        """
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception as e:
+                from app.utils.logger import app_logger
+                app_logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, type_name, documentation, values in samples:
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for labels, value in values:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+__all__ = [
+    "CONTENT_TYPE_LATEST",
+    "DEFAULT_BUCKETS",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "metrics_registry",
+]
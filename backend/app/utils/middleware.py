@@ -1,82 +1,63 @@
 import uuid
-import time
-from typing import Callable
-from fastapi import Request, Response
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.exceptions import HTTPException as StarletteHTTPException
-from loguru import logger
 import traceback
+from typing import Optional
+from fastapi import Request
+from starlette.responses import Response
+from starlette.types import Message
+from loguru import logger
+from app.middleware.pipeline import PipelineStage, RequestContext
+from app.services.request_log_service import request_log_service
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging requests with request ID tracking."""
-    
-    async def dispatch(self, request: Request, call_next: Callable):
+class RequestLoggingStage(PipelineStage):
+    """Pipeline stage for request ID tracking and access logging."""
+
+    async def on_request(self, ctx: RequestContext) -> Optional[Response]:
         # Generate a unique request ID
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Log request start
-        start_time = time.time()
-        logger.info(f"Request ID: {request_id} | {request.method} {request.url.path}")
-        
-        try:
-            # Process the request
-            response = await call_next(request)
-            
-            # Calculate processing time
-            process_time = time.time() - start_time
-            
-            # Log successful response
-            logger.info(
-                f"Request ID: {request_id} | "
-                f"Status: {response.status_code} | "
-                f"Duration: {process_time:.4f}s | "
-                f"Path: {request.url.path}"
-            )
-            
-            # Add request ID to response headers
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Process-Time"] = str(process_time)
-            
-            return response
-            
-        except StarletteHTTPException as exc:
-            # Handle HTTP exceptions
-            process_time = time.time() - start_time
-            logger.warning(
-                f"Request ID: {request_id} | "
-                f"HTTP Exception: {exc.status_code} | "
-                f"Duration: {process_time:.4f}s | "
-                f"Path: {request.url.path}"
-            )
-            
-            return JSONResponse(
-                status_code=exc.status_code,
-                content={"detail": exc.detail},
-                headers={"X-Request-ID": request_id}
-            )
-        
-        except Exception as exc:
+        ctx.request_id = str(uuid.uuid4())
+        ctx.state["request_id"] = ctx.request_id
+        return None
+
+    def on_response_start(self, ctx: RequestContext, message: Message) -> None:
+        # Add request ID and time-to-headers to response headers
+        ctx.response_headers.append(("X-Request-ID", ctx.request_id))
+        ctx.response_headers.append(("X-Process-Time", str(ctx.response_time)))
+
+    def on_complete(self, ctx: RequestContext) -> None:
+        # Buffered write to request_logs (no IO on the request path)
+        request_log_service.record_request(
+            request_id=ctx.request_id,
+            method=ctx.method,
+            path=ctx.path,
+            query_string=ctx.scope.get("query_string", b"").decode("latin-1"),
+            status_code=ctx.status_code,
+            response_time=ctx.response_time,
+            duration=ctx.duration,
+            ip_address=ctx.client_host,
+            user_agent=ctx.header(b"user-agent"),
+            referer=ctx.header(b"referer"),
+            user_id=ctx.state.get("user_id"),
+        )
+
+        if ctx.exception is not None:
             # Handle unexpected exceptions
-            process_time = time.time() - start_time
             logger.error(
-                f"Request ID: {request_id} | "
-                f"Unexpected Error: {str(exc)} | "
-                f"Duration: {process_time:.4f}s | "
-                f"Path: {request.url.path} | "
-                f"Traceback: {traceback.format_exc()}"
-            )
-            
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "detail": "Internal server error",
-                    "request_id": request_id
-                },
-                headers={"X-Request-ID": request_id}
+                f"Request ID: {ctx.request_id} | "
+                f"Unexpected Error: {str(ctx.exception)} | "
+                f"Duration: {ctx.duration:.4f}s | "
+                f"Path: {ctx.path} | "
+                f"Traceback: {''.join(traceback.format_exception(ctx.exception))}"
             )
+            return
+
+        # One access log line per request
+        logger.info(
+            f"Request ID: {ctx.request_id} | "
+            f"{ctx.method} {ctx.path} | "
+            f"Status: {ctx.status_code} | "
+            f"Duration: {ctx.duration:.4f}s | "
+            f"Client: {ctx.client_host}"
+        )
 
 
 class RequestIDFilter:
@@ -97,4 +78,4 @@ def get_request_id(request: Request) -> str:
     return getattr(request.state, 'request_id', 'unknown')
 
 
-__all__ = ["RequestLoggingMiddleware", "get_request_id"]
\ No newline at end of file
+__all__ = ["RequestLoggingStage", "get_request_id"]
@@ -1,13 +1,18 @@
-from typing import TypeVar, Generic, List, Optional, Tuple
+from typing import Any, Callable, TypeVar, Generic, List, Optional, Sequence
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
+from sqlalchemy import tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 import base64
 import json
 
 
 T = TypeVar('T')
 
+# 下一页游标的响应头（列表接口保持原有响应体时使用）
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 class CursorPaginationParams(BaseModel):
     """游标分页参数"""
@@ -21,6 +26,11 @@ class CursorPaginationResult(Generic[T]):
     next_cursor: Optional[str]
     has_more: bool
 
+    def __init__(self, items: List[T], next_cursor: Optional[str], has_more: bool):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.has_more = has_more
+
 
 def encode_cursor(data: dict) -> str:
     """将游标数据编码为字符串"""
@@ -37,72 +47,198 @@ def decode_cursor(cursor_str: str) -> dict:
         return {}
 
 
+def _encode_value(value: Any) -> Any:
+    # 保留类型信息，解码后与列类型一致（避免按字符串比较时间或 UUID）
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"uuid": str(value)}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "uuid" in value:
+            return UUID(value["uuid"])
+    return value
+
+
+def encode_keyset_cursor(values: Sequence[Any]) -> str:
+    """
+    编码复合键游标
+
+    Args:
+        values: 最后一条记录的 (排序键, ID)
+
+    Returns:
+        str: URL 安全的 Base64 游标
+    """
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_keyset_cursor(cursor_str: str) -> Optional[List[Any]]:
+    """
+    解码复合键游标
+
+    Args:
+        cursor_str: 游标字符串
+
+    Returns:
+        Optional[List[Any]]: (排序键, ID)，游标无效时返回 None（从第一页开始）
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor_str.encode()).decode())
+        if not isinstance(values, list) or len(values) != 2:
+            return None
+        return [_decode_value(value) for value in values]
+    except Exception:
+        return None
+
+
+def apply_keyset(query, cursor: Optional[str], limit: int, sort_field, tiebreaker, descending: bool = True):
+    """
+    为查询追加游标条件、排序与限制
+
+    排序为 (sort_field, tiebreaker)，游标条件是同方向的行值比较
+    (sort_field, tiebreaker) < / > (游标值)，可以直接走同列序的复合索引，
+    因此任意页的代价与第一页相同
+
+    Args:
+        query: SQLAlchemy Query 或 Select
+        cursor: 游标字符串
+        limit: 每页数量（实际多取一条用于判断是否还有下一页）
+        sort_field: 排序列或表达式
+        tiebreaker: 唯一列（通常为主键），用于打破排序键相同的情况
+        descending: 是否倒序
+
+    Returns:
+        追加条件后的查询
+    """
+    if cursor:
+        cursor_values = decode_keyset_cursor(cursor)
+        if cursor_values is not None:
+            row = tuple_(sort_field, tiebreaker)
+            bound = tuple_(*cursor_values)
+            query = query.filter(row < bound if descending else row > bound)
+
+    if descending:
+        query = query.order_by(sort_field.desc(), tiebreaker.desc())
+    else:
+        query = query.order_by(sort_field.asc(), tiebreaker.asc())
+    return query.limit(limit + 1)
+
+
+def build_keyset_page(
+    rows: List[Any],
+    limit: int,
+    sort_key: Callable[[Any], Any],
+    tiebreaker_key: Callable[[Any], Any],
+    item_class=None,
+) -> CursorPaginationResult:
+    """
+    根据多取一条的结果构造分页结果
+
+    Args:
+        rows: 查询结果（最多 limit + 1 条）
+        limit: 每页数量
+        sort_key: 从记录取排序键的函数
+        tiebreaker_key: 从记录取唯一键的函数
+        item_class: 可选的Pydantic类，用于转换结果
+
+    Returns:
+        CursorPaginationResult: 分页结果
+    """
+    has_more = len(rows) > limit
+    items = rows[:limit]
+
+    next_cursor = None
+    if items and has_more:
+        last_item = items[-1]
+        next_cursor = encode_keyset_cursor([sort_key(last_item), tiebreaker_key(last_item)])
+
+    if item_class:
+        items = [item_class.model_validate(item) for item in items]
+
+    return CursorPaginationResult(items=items, next_cursor=next_cursor, has_more=has_more)
+
+
+def _attribute_getter(field) -> Callable[[Any], Any]:
+    name = field.key
+    return lambda item: getattr(item, name)
+
+
 def paginate_with_cursor(
     query,
     cursor_params: CursorPaginationParams,
-    sort_field: str,
-    item_class=None
+    sort_field,
+    item_class=None,
+    tiebreaker=None,
+    descending: bool = True,
+    sort_key: Optional[Callable[[Any], Any]] = None,
 ) -> CursorPaginationResult:
     """
-    使用游标进行分页
-    
+    使用游标（keyset）进行分页
+
+    查询本身不应再包含 ORDER BY，排序由分页函数按 (sort_field, tiebreaker) 统一追加
+
     Args:
         query: SQLAlchemy查询对象
         cursor_params: 游标分页参数
-        sort_field: 用于排序的字段名
+        sort_field: 用于排序的列（或表达式，此时需提供 sort_key）
         item_class: 可选的Pydantic类，用于转换结果
-    
+        tiebreaker: 唯一列，默认为排序列所属模型的 id
+        descending: 是否倒序
+        sort_key: 从记录取排序键的函数，默认读取 sort_field 同名属性
+
     Returns:
         CursorPaginationResult: 包含分页结果的对象
     """
-    # 应用限制，多取一项来判断是否有更多数据
-    query = query.order_by(sort_field).limit(cursor_params.limit + 1)
-    
-    # 如果有游标，应用游标条件
-    if cursor_params.cursor:
-        cursor_data = decode_cursor(cursor_params.cursor)
-        cursor_value = cursor_data.get('value')
-        
-        if cursor_value is not None:
-            # 对于时间类型的字段，需要特殊处理
-            if isinstance(cursor_value, str) and 'T' in cursor_value:
-                cursor_value = datetime.fromisoformat(cursor_value.replace('Z', '+00:00'))
-            
-            query = query.filter(sort_field > cursor_value)
-    
-    # 执行查询
-    results = query.all()
-    
-    # 检查是否还有更多数据
-    has_more = len(results) > cursor_params.limit
-    if has_more:
-        # 移除多取的一项
-        results = results[:-1]
-    
-    # 获取下一页的游标
-    next_cursor = None
-    if results and has_more:
-        last_item = results[-1]
-        # 获取排序字段的值
-        if hasattr(last_item, sort_field.name):
-            cursor_value = getattr(last_item, sort_field.name)
-        else:
-            # 如果是元组或其他类型，需要特殊处理
-            cursor_value = last_item[sort_field.name] if isinstance(last_item, tuple) else last_item
-        
-        # 构造游标数据
-        cursor_data = {
-            'field': sort_field.name,
-            'value': cursor_value
-        }
-        next_cursor = encode_cursor(cursor_data)
-    
-    # 转换结果
-    if item_class:
-        results = [item_class.model_validate(result) for result in results]
-    
-    return CursorPaginationResult(
-        items=results,
-        next_cursor=next_cursor,
-        has_more=has_more
-    )
\ No newline at end of file
+    if tiebreaker is None:
+        tiebreaker = sort_field.class_.id
+
+    query = apply_keyset(query, cursor_params.cursor, cursor_params.limit, sort_field, tiebreaker, descending)
+    return build_keyset_page(
+        query.all(),
+        cursor_params.limit,
+        sort_key or _attribute_getter(sort_field),
+        _attribute_getter(tiebreaker),
+        item_class,
+    )
+
+
+async def paginate_with_cursor_async(
+    db: AsyncSession,
+    stmt,
+    cursor_params: CursorPaginationParams,
+    sort_field,
+    item_class=None,
+    tiebreaker=None,
+    descending: bool = True,
+    sort_key: Optional[Callable[[Any], Any]] = None,
+) -> CursorPaginationResult:
+    """
+    paginate_with_cursor 的 AsyncSession 版本
+
+    Args:
+        db: 异步数据库会话
+        stmt: select() 语句（不含 ORDER BY）
+        其余参数同 paginate_with_cursor
+
+    Returns:
+        CursorPaginationResult: 包含分页结果的对象
+    """
+    if tiebreaker is None:
+        tiebreaker = sort_field.class_.id
+
+    stmt = apply_keyset(stmt, cursor_params.cursor, cursor_params.limit, sort_field, tiebreaker, descending)
+    rows = list((await db.execute(stmt)).scalars().unique().all())
+    return build_keyset_page(
+        rows,
+        cursor_params.limit,
+        sort_key or _attribute_getter(sort_field),
+        _attribute_getter(tiebreaker),
+        item_class,
+    )
@@ -0,0 +1,141 @@
+"""
+PostgreSQL 范围分区维护工具
+
+分区表都带有 DEFAULT 分区兜底写入。DEFAULT 分区一旦包含某个范围的行，
+直接 CREATE TABLE ... PARTITION OF 会失败；这里在同一事务内把这些行迁入新分区后挂载。
+每个分区单独提交，一个分区失败不影响其余分区
+"""
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.utils.logger import app_logger
+from app.utils.metrics import metrics_registry
+
+
+DEFAULT_PARTITION_ROWS = metrics_registry.gauge(
+    "db_default_partition_rows",
+    "Rows found in the DEFAULT partition of a range-partitioned table (capped sample)",
+    ("table",),
+)
+
+# 统计 DEFAULT 分区行数时最多扫描的行数
+DEFAULT_ROWS_SAMPLE_LIMIT = 10000
+
+
+async def move_default_rows_to_partition(
+    db: AsyncSession,
+    parent: str,
+    partition: str,
+    column: str,
+    lower: str,
+    upper: str,
+) -> int:
+    """
+    把 DEFAULT 分区中属于 [lower, upper) 的行迁入新建的分区并挂载（单个事务）
+
+    迁移期间锁住 DEFAULT 分区，期间落入 DEFAULT 的写入会等待事务结束
+
+    Args:
+        db: 异步数据库会话
+        parent: 分区父表
+        partition: 新分区表名
+        column: 分区键列
+        lower: 范围下界（含）
+        upper: 范围上界（不含）
+
+    Returns:
+        int: 迁移的行数
+    """
+    default = f"{parent}_default"
+    in_range = f"{column} >= '{lower}' AND {column} < '{upper}'"
+
+    await db.execute(text(f"LOCK TABLE {default} IN ACCESS EXCLUSIVE MODE"))
+    await db.execute(text(f"CREATE TABLE {partition} (LIKE {parent} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    result = await db.execute(text(f"INSERT INTO {partition} SELECT * FROM {default} WHERE {in_range}"))
+    await db.execute(text(f"DELETE FROM {default} WHERE {in_range}"))
+    await db.execute(text(
+        f"ALTER TABLE {parent} ATTACH PARTITION {partition} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    ))
+    await db.commit()
+    return result.rowcount or 0
+
+
+async def ensure_range_partition(
+    db: AsyncSession,
+    parent: str,
+    partition: str,
+    column: str,
+    lower: str,
+    upper: str,
+) -> bool:
+    """
+    创建一个范围分区并立即提交
+
+    DEFAULT 分区已有该范围的行导致创建失败时，改为迁移这些行后挂载分区
+
+    Args:
+        db: 异步数据库会话
+        parent: 分区父表
+        partition: 分区表名
+        column: 分区键列
+        lower: 范围下界（含）
+        upper: 范围上界（不含）
+
+    Returns:
+        bool: 分区是否已存在或创建成功（失败已回滚并记录日志）
+    """
+    try:
+        await db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {parent} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        ))
+        await db.commit()
+        return True
+    except Exception as e:
+        await db.rollback()
+        app_logger.warning(f"Creating partition {partition} failed, moving its rows out of {parent}_default: {e}")
+
+    try:
+        moved = await move_default_rows_to_partition(db, parent, partition, column, lower, upper)
+    except Exception as e:
+        await db.rollback()
+        app_logger.error(f"Failed to create partition {partition}: {e}")
+        return False
+
+    app_logger.warning(f"Created partition {partition} and moved {moved} rows out of {parent}_default")
+    return True
+
+
+async def check_default_partition(db: AsyncSession, parent: str) -> int:
+    """
+    检查 DEFAULT 分区是否有行并告警（写入 db_default_partition_rows 指标）
+
+    DEFAULT 分区中的行不会被按分区删除的保留策略清理，出现时说明分区创建落后于写入
+
+    Args:
+        db: 异步数据库会话
+        parent: 分区父表
+
+    Returns:
+        int: DEFAULT 分区行数（最多统计 DEFAULT_ROWS_SAMPLE_LIMIT 行）
+    """
+    default = f"{parent}_default"
+    rows = (await db.execute(text(
+        f"SELECT count(*) FROM (SELECT 1 FROM {default} LIMIT {DEFAULT_ROWS_SAMPLE_LIMIT}) AS sample"
+    ))).scalar() or 0
+    await db.commit()
+
+    DEFAULT_PARTITION_ROWS.set(rows, table=parent)
+    if rows:
+        app_logger.error(
+            f"{default} contains {rows}{'+' if rows >= DEFAULT_ROWS_SAMPLE_LIMIT else ''} rows; "
+            f"partitions are missing for part of the data"
+        )
+    return rows
+
+
+__all__ = [
+    "ensure_range_partition",
+    "move_default_rows_to_partition",
+    "check_default_partition",
+]
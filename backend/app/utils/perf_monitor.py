@@ -2,33 +2,157 @@
 
 import time
 import functools
-from typing import Callable, Any
+import psutil
+from typing import Callable, Any, Dict, Iterable, List, Optional
 from fastapi import Request, Response
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import Scope
+from app.middleware.pipeline import PipelineStage, RequestContext
 from app.utils.logger import log_performance, log_api_call, app_logger
+from app.utils.metrics import metrics_registry
 from app.services.cache_service import cache_service
+from app.core.database import engine, async_engine
 from app.core.config import settings
-import asyncio
 
-# 信号量限制并发异步日志任务数，防止资源耗尽
-MAX_CONCURRENT_TASKS = 100
-_log_task_semaphore = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
 
+# 请求指标：按路由模板（而非实际路径）聚合，避免路径参数导致标签基数爆炸
+HTTP_REQUEST_DURATION = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+HTTP_REQUESTS_IN_PROGRESS = metrics_registry.gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being processed",
+)
 
-async def _log_with_semaphore(log_func, *args, **kwargs):
-    """使用信号量包装日志任务，限制并发数"""
-    try:
-        async with _log_task_semaphore:
-            # 检查是否为异步函数
-            if asyncio.iscoroutinefunction(log_func):
-                await log_func(*args, **kwargs)
-            else:
-                # 同步函数直接调用，不使用 await
-                log_func(*args, **kwargs)
-    except Exception as e:
-        # 日志记录失败不应该影响主流程
-        app_logger.error(f"Failed to log performance metrics: {str(e)}")
+# 未匹配任何路由的请求（404 扫描等）统一归到该标签
+UNMATCHED_ROUTE = "<unmatched>"
+
+_process = psutil.Process()
+# cpu_percent(interval=None) 返回距上次调用以来的使用率，首次调用只用于建立基线
+psutil.cpu_percent(interval=None)
+_process.cpu_percent(interval=None)
+
+
+def route_template(scope: Scope) -> str:
+    """
+    获取请求匹配到的路由模板，例如 /api/v1/articles/{article_id}
+
+    Args:
+        scope: ASGI scope（路由匹配完成后调用）
+
+    Returns:
+        str: 路由模板，未匹配时返回 UNMATCHED_ROUTE
+    """
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def record_request(method: str, route: str, status_code: int, duration_seconds: float) -> None:
+    """
+    记录一次请求的延迟
+
+    Args:
+        method: HTTP 方法
+        route: 路由模板
+        status_code: 响应状态码
+        duration_seconds: 处理耗时（秒）
+    """
+    HTTP_REQUEST_DURATION.observe(duration_seconds, method=method, route=route, status=str(status_code))
+
+
+def _pool_stats(pool) -> Dict[str, int]:
+    # NullPool / StaticPool 等没有计数接口
+    if not hasattr(pool, "checkedout"):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+def get_database_pool_stats() -> Dict[str, Dict[str, int]]:
+    """
+    获取同步与异步连接池的使用情况
+
+    Returns:
+        Dict[str, Dict[str, int]]: 按连接池名称分组的 size / checked_out / checked_in / overflow
+    """
+    return {
+        "sync": _pool_stats(engine.pool),
+        "async": _pool_stats(async_engine.sync_engine.pool),
+    }
+
+
+def get_cache_hit_ratio() -> float:
+    """
+    获取缓存整体命中率（L1 命中与 L2 命中都算命中）
+
+    Returns:
+        float: 命中率，尚无读取时返回 0
+    """
+    l1_hits = cache_service.local_cache.hits if cache_service.local_cache is not None else 0
+    hits = l1_hits + cache_service.l2_hits
+    total = hits + cache_service.l2_misses
+    return hits / total if total else 0.0
+
+
+def sample_cpu_percent() -> float:
+    """
+    非阻塞地获取 CPU 使用率（距上次采样以来的平均值）
+
+    Returns:
+        float: CPU 使用率
+    """
+    return psutil.cpu_percent(interval=None)
+
+
+@metrics_registry.register_collector
+def _collect_database_pools() -> Iterable:
+    pools = get_database_pool_stats()
+    samples: List = []
+    for stat, help_text in (
+        ("size", "Configured connection pool size"),
+        ("checked_out", "Connections currently checked out"),
+        ("checked_in", "Idle connections in the pool"),
+        ("overflow", "Connections opened beyond pool size"),
+    ):
+        values = [({"pool": name}, stats[stat]) for name, stats in pools.items() if stats]
+        samples.append((f"db_pool_{stat}", "gauge", help_text, values))
+    return samples
+
+
+@metrics_registry.register_collector
+def _collect_cache() -> Iterable:
+    samples: List = [
+        ("cache_hits_total", "counter", "Cache reads served from cache",
+         [({"layer": "l2"}, cache_service.l2_hits)]),
+        ("cache_misses_total", "counter", "Cache reads that missed",
+         [({"layer": "l2"}, cache_service.l2_misses)]),
+    ]
+    if cache_service.local_cache is not None:
+        local_cache = cache_service.local_cache
+        samples[0][3].append(({"layer": "l1"}, local_cache.hits))
+        samples[1][3].append(({"layer": "l1"}, local_cache.misses))
+        samples.append(("cache_l1_entries", "gauge", "Entries in the in-process cache", [({}, len(local_cache))]))
+        samples.append(("cache_l1_evictions_total", "counter", "In-process cache LRU evictions",
+                        [({}, local_cache.evictions)]))
+    return samples
+
+
+@metrics_registry.register_collector
+def _collect_process() -> Iterable:
+    memory = _process.memory_info()
+    return [
+        ("process_cpu_percent", "gauge", "Process CPU usage since the previous scrape",
+         [({}, _process.cpu_percent(interval=None))]),
+        ("process_resident_memory_bytes", "gauge", "Resident memory size in bytes",
+         [({}, memory.rss)]),
+        ("process_uptime_seconds", "gauge", "Seconds since the process started",
+         [({}, time.time() - _process.create_time())]),
+    ]
 
 
 def monitor_api_performance(func: Callable) -> Callable:
@@ -64,86 +188,55 @@ def monitor_api_performance(func: Callable) -> Callable:
         finally:
             duration = (time.time() - start_time) * 1000  # 转换为毫秒
             
-            # 记录性能指标（使用信号量限制并发）
+            # 日志 sink 均为 enqueue=True，直接调用只是入队，无需再创建任务
             endpoint = f"{request.method} {request.url.path}" if request else func.__name__
-            asyncio.create_task(
-                _log_with_semaphore(
-                    log_performance,
-                    endpoint=endpoint,
-                    duration_ms=duration,
-                    request_id=getattr(request.state, 'request_id', None) if request else None,
-                    user_id=user_id
-                )
+            log_performance(
+                endpoint=endpoint,
+                duration_ms=duration,
+                request_id=getattr(request.state, 'request_id', None) if request else None,
+                user_id=user_id
             )
             
-            # 记录API调用（使用信号量限制并发）
             if request:
-                asyncio.create_task(
-                    _log_with_semaphore(
-                        log_api_call,
-                        endpoint=request.url.path,
-                        method=request.method,
-                        status_code=status_code,
-                        user_id=user_id,
-                        ip_address=ip_address,
-                        duration_ms=duration
-                    )
+                log_api_call(
+                    endpoint=request.url.path,
+                    method=request.method,
+                    status_code=status_code,
+                    user_id=user_id,
+                    ip_address=ip_address,
+                    duration_ms=duration
                 )
         
         return result
     return wrapper
 
 
-class PerformanceMonitoringMiddleware(BaseHTTPMiddleware):
+class PerformanceMonitoringStage(PipelineStage):
     """
-    性能监控中间件，记录每个请求的处理时间和相关信息
+    性能监控管道阶段，记录每个请求的处理时间和相关信息
+
+    延迟按路由模板写入直方图；性能日志直接入队（sink 为 enqueue=True），
+    每个请求不额外创建 asyncio 任务
     """
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
+
+    async def on_request(self, ctx: RequestContext) -> Optional[Response]:
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        return None
+
+    def on_complete(self, ctx: RequestContext) -> None:
+        HTTP_REQUESTS_IN_PROGRESS.dec()
+        record_request(ctx.method, route_template(ctx.scope), ctx.status_code, ctx.duration)
+
         # 获取用户信息
-        user_id = "anonymous"
-        if hasattr(request.state, 'current_user') and request.state.current_user:
-            user_id = str(request.state.current_user.id)
-        
-        ip_address = request.client.host if request.client else "unknown"
-        
-        try:
-            response = await call_next(request)
-        except Exception as e:
-            response = JSONResponse(
-                status_code=500,
-                content={"detail": "Internal server error"}
-            )
-            raise
-        finally:
-            duration = (time.time() - start_time) * 1000  # 转换为毫秒
-            
-            # 记录性能指标（使用信号量限制并发）
-            asyncio.create_task(
-                _log_with_semaphore(
-                    log_performance,
-                    endpoint=f"{request.method} {request.url.path}",
-                    duration_ms=duration,
-                    request_id=getattr(request.state, 'request_id', None),
-                    user_id=user_id
-                )
-            )
-            
-            # 记录API调用（使用信号量限制并发）
-            asyncio.create_task(
-                _log_with_semaphore(
-                    log_api_call,
-                    endpoint=request.url.path,
-                    method=request.method,
-                    status_code=response.status_code,
-                    user_id=user_id,
-                    ip_address=ip_address,
-                    duration_ms=duration
-                )
-            )
-        
-        return response
+        current_user = ctx.state.get("current_user")
+        user_id = str(current_user.id) if current_user else "anonymous"
+
+        log_performance(
+            endpoint=f"{ctx.method} {ctx.path}",
+            duration_ms=ctx.duration * 1000,  # 转换为毫秒
+            request_id=ctx.request_id,
+            user_id=user_id
+        )
 
 
 def track_cache_hits(func: Callable) -> Callable:
@@ -208,7 +301,6 @@ def log_slow_queries(threshold_ms: float = 1000.0):
             
             if duration > threshold_ms:
                 # 记录慢查询
-                from app.utils.logger import app_logger
                 app_logger.warning(
                     f"SLOW QUERY detected in {func.__name__}: {duration:.2f}ms\n"
                     f"Args: {args}\nKwargs: {kwargs}"
@@ -1,9 +1,19 @@
 """速率限制中间件和配置"""
+import math
+import re
+from typing import Dict, Optional, Tuple
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from fastapi import FastAPI, Request, HTTPException
+from fastapi.responses import JSONResponse
+from starlette.responses import Response
 from app.core.config import settings
+from app.core.security import verify_token
+from app.middleware.pipeline import PipelineStage, RequestContext
+from app.services.cache_service import cache_service
+from app.utils.cache_keys import CacheKeys
+from app.utils.gcra_limiter import GCRARateLimiter, RateLimitResult
 from app.utils.logger import app_logger
 
 
@@ -27,23 +37,6 @@ def add_rate_limit_middleware(app: FastAPI):
     # 注册限速器
     app.state.limiter = limiter
     app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-    
-    # 添加自定义中间件来记录限速事件
-    @app.middleware("http")
-    async def rate_limit_middleware(request: Request, call_next):
-        # 记录请求信息
-        client_ip = get_remote_address(request)
-        path = request.url.path
-        method = request.method
-        
-        app_logger.info(f"Rate limit check for IP: {client_ip}, Path: {path}, Method: {method}")
-        
-        try:
-            response = await call_next(request)
-            return response
-        except Exception as e:
-            app_logger.error(f"Rate limit middleware error: {str(e)}")
-            raise
 
 
 def get_rate_limit_for_endpoint(endpoint_name: str) -> str:
@@ -70,4 +63,130 @@ login_rate_limit = limiter.limit(get_rate_limit_for_endpoint("login"))
 register_rate_limit = limiter.limit(get_rate_limit_for_endpoint("register"))
 article_read_rate_limit = limiter.limit(get_rate_limit_for_endpoint("default"))
 article_create_rate_limit = limiter.limit(get_rate_limit_for_endpoint("article_create"))
-comment_rate_limit = limiter.limit(get_rate_limit_for_endpoint("comment"))
\ No newline at end of file
+comment_rate_limit = limiter.limit(get_rate_limit_for_endpoint("comment"))
+
+
+# 使用专用策略的路由（方法, 路径模板，不含末尾斜杠），其余路由使用全局默认限制
+ROUTE_POLICIES: Dict[Tuple[str, str], str] = {
+    ("POST", "/api/v1/auth/login"): "login",
+    ("POST", "/api/v1/auth/login-json"): "login",
+    ("POST", "/api/v1/auth/register"): "register",
+    ("POST", "/api/v1/comments"): "comment",
+    ("POST", "/api/v1/articles"): "article_create",
+}
+
+# 不参与限流的路径（健康检查、指标抓取）
+EXEMPT_PATHS = frozenset({
+    "/api/v1/monitoring/health",
+    "/api/v1/monitoring/metrics/prometheus",
+})
+
+_RATE_PATTERN = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d+)?\s*(second|minute|hour|day)s?\s*$", re.IGNORECASE)
+_UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate_limit(rate: str) -> Tuple[int, int]:
+    """
+    解析速率限制字符串，支持 "5 per minute"、"1000/hour"、"10 per 5 minutes" 等写法
+
+    Args:
+        rate: 速率限制字符串
+
+    Returns:
+        Tuple[int, int]: (请求数, 窗口秒数)
+
+    Raises:
+        ValueError: 格式无效
+    """
+    match = _RATE_PATTERN.match(rate)
+    if not match:
+        raise ValueError(f"Invalid rate limit: {rate!r}")
+    amount, multiplier, unit = match.groups()
+    return int(amount), int(multiplier or 1) * _UNIT_SECONDS[unit.lower()]
+
+
+class RateLimitStage(PipelineStage):
+    """
+    分布式限流管道阶段
+
+    按路由选择 get_rate_limit_for_endpoint 中的策略，已登录用户按用户 ID、
+    匿名用户按 IP 计数；额度保存在 Redis（GCRA），所有 worker 共享。
+    Redis 不可用时放行
+    """
+
+    def __init__(self, limiter: Optional[GCRARateLimiter] = None):
+        self.limiter = limiter or GCRARateLimiter(local_batch=settings.RATE_LIMIT_LOCAL_BATCH)
+        self._parsed: Dict[str, Tuple[int, int]] = {}
+
+    def _limit(self, rate: str) -> Tuple[int, int]:
+        parsed = self._parsed.get(rate)
+        if parsed is None:
+            parsed = self._parsed[rate] = parse_rate_limit(rate)
+        return parsed
+
+    @staticmethod
+    def identify(ctx: RequestContext) -> Tuple[str, bool]:
+        """
+        确定限流主体
+
+        Returns:
+            Tuple[str, bool]: (主体标识, 是否为已登录用户)
+        """
+        authorization = ctx.header(b"authorization")
+        if authorization and authorization[:7].lower() == "bearer ":
+            payload = verify_token(authorization[7:])
+            if payload and payload.get("sub"):
+                return f"user:{payload['sub']}", True
+        return f"ip:{ctx.client_host}", False
+
+    def policy(self, ctx: RequestContext, authenticated: bool) -> Tuple[str, str]:
+        """
+        选择请求适用的限流策略
+
+        Returns:
+            Tuple[str, str]: (策略名, 速率限制字符串)
+        """
+        name = ROUTE_POLICIES.get((ctx.method, ctx.path.rstrip("/")))
+        if name is not None:
+            return name, get_rate_limit_for_endpoint(name)
+        return "global", settings.RATE_LIMIT_AUTHENTICATED if authenticated else settings.RATE_LIMIT_DEFAULT
+
+    async def on_request(self, ctx: RequestContext) -> Optional[Response]:
+        if ctx.method == "OPTIONS" or ctx.path in EXEMPT_PATHS or cache_service.redis is None:
+            return None
+
+        identity, authenticated = self.identify(ctx)
+        if authenticated:
+            # 供访问日志记录用户 ID
+            ctx.state["user_id"] = identity[len("user:"):]
+        name, rate = self.policy(ctx, authenticated)
+        limit, window = self._limit(rate)
+
+        try:
+            result = await self.limiter.check(
+                cache_service.redis, CacheKeys.rate_limit(identity, name), limit, window
+            )
+        except Exception as e:
+            app_logger.warning(f"Rate limit check failed, allowing request: {e}")
+            return None
+
+        ctx.response_headers.extend(self.headers(result))
+        if result.allowed:
+            return None
+
+        app_logger.warning(f"Rate limit exceeded: {identity} {ctx.method} {ctx.path} (policy {name}: {rate})")
+        return JSONResponse(
+            status_code=429,
+            content={"detail": "请求过于频繁，请稍后再试"},
+            headers={"Retry-After": str(max(math.ceil(result.retry_after), 1))},
+        )
+
+    @staticmethod
+    def headers(result: RateLimitResult) -> list:
+        """限流响应头"""
+        return [
+            ("X-RateLimit-Limit", str(result.limit)),
+            ("X-RateLimit-Remaining", str(max(result.remaining, 0))),
+            ("X-RateLimit-Reset", str(math.ceil(result.reset_after))),
+        ]
+
@@ -0,0 +1,124 @@
+"""
+单飞（single-flight）请求合并工具
+同一进程内对同一键的并发加载共享一个 Future，跨 worker 通过 Redis 租约锁协调，
+用于防止热点缓存失效时的击穿
+"""
+
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SingleFlight:
+    """
+    进程内单飞
+
+    同一键同一时刻只执行一次加载，并发调用方等待同一个任务的结果；
+    任务结束后立即移除，不会像按键缓存的 Lock 字典那样无限增长
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def in_flight(self, key: str) -> bool:
+        """判断该键是否正在加载"""
+        return key in self._inflight
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行（或加入正在执行的）加载
+
+        加载在独立任务中运行，某个调用方被取消不会影响其他等待者
+
+        Args:
+            key: 合并键
+            func: 无参异步加载函数
+
+        Returns:
+            Any: 加载结果（异常会传播给所有等待者）
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+class RedisLease:
+    """
+    基于 Redis 的跨 worker 租约锁
+
+    SET NX PX 获取，到期自动释放（持有者崩溃也不会死锁）；
+    释放时校验令牌，避免删除已过期后被他人重新获取的锁
+    """
+
+    RELEASE_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then "
+        "return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
+    def __init__(self, redis, key: str, ttl: float):
+        """
+        Args:
+            redis: Redis 异步客户端
+            key: 锁键
+            ttl: 租约时长（秒）
+        """
+        self.redis = redis
+        self.key = key
+        self.ttl_ms = max(int(ttl * 1000), 1)
+        self.token = uuid.uuid4().hex
+        self.acquired = False
+
+    async def acquire(self) -> bool:
+        """
+        尝试获取租约（非阻塞）
+
+        Returns:
+            bool: 是否获取成功
+        """
+        self.acquired = bool(await self.redis.set(self.key, self.token, nx=True, px=self.ttl_ms))
+        return self.acquired
+
+    async def release(self) -> None:
+        """释放租约（仅当仍由自己持有时）"""
+        if not self.acquired:
+            return
+        self.acquired = False
+        await self.redis.eval(self.RELEASE_SCRIPT, 1, self.key, self.token)
+
+
+async def wait_for_value(
+    getter: Callable[[], Awaitable[Optional[Any]]],
+    timeout: float,
+    interval: float = 0.05,
+) -> Optional[Any]:
+    """
+    在限定时间内轮询等待其他 worker 写入的值
+
+    Args:
+        getter: 读取值的异步函数，未就绪时返回 None
+        timeout: 最长等待时间（秒）
+        interval: 初始轮询间隔（秒），按倍数退避，上限 0.5 秒
+
+    Returns:
+        Optional[Any]: 读取到的值，超时返回 None
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return None
+        await asyncio.sleep(min(interval, remaining))
+        value = await getter()
+        if value is not None:
+            return value
+        interval = min(interval * 2, 0.5)
+
+
+__all__ = ["SingleFlight", "RedisLease", "wait_for_value"]
@@ -0,0 +1,88 @@
+"""
+流式增量合并工具
+把 LLM 逐 token 产生的细碎增量合并为按时间窗口发送的帧，减少 SSE 帧数与序列化次数
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, List
+
+
+async def coalesce_deltas(source: AsyncIterator[str], window: float) -> AsyncIterator[str]:
+    """
+    按时间窗口合并文本增量
+
+    第一个增量立即发出（不增加首字延迟），之后同一窗口内到达的增量合并为一帧；
+    上游停顿时窗口到期即发出已积累的内容，不会等到下一个 token。
+    等待上游时不取消正在进行的读取，上游异步生成器不会被中途打断
+
+    Args:
+        source: 文本增量的异步迭代器
+        window: 合并窗口（秒），<= 0 时不合并
+
+    Yields:
+        str: 合并后的增量（不为空）
+    """
+    iterator = source.__aiter__()
+    if window <= 0:
+        async for delta in iterator:
+            if delta:
+                yield delta
+        return
+
+    pending: List[str] = []
+    next_item = None
+    last_emit = None
+    try:
+        while True:
+            if next_item is None:
+                next_item = asyncio.ensure_future(iterator.__anext__())
+
+            timeout = None
+            if pending:
+                timeout = max(window - (time.monotonic() - last_emit), 0)
+            done, _ = await asyncio.wait({next_item}, timeout=timeout)
+
+            if not done:
+                # 窗口到期，发出已积累的增量，继续等待同一次读取
+                yield "".join(pending)
+                pending.clear()
+                last_emit = time.monotonic()
+                continue
+
+            try:
+                delta = next_item.result()
+            except StopAsyncIteration:
+                next_item = None
+                break
+            next_item = None
+
+            if not delta:
+                continue
+            if last_emit is None:
+                yield delta
+                last_emit = time.monotonic()
+                continue
+
+            pending.append(delta)
+            if time.monotonic() - last_emit >= window:
+                yield "".join(pending)
+                pending.clear()
+                last_emit = time.monotonic()
+
+        if pending:
+            yield "".join(pending)
+    finally:
+        # 消费方提前结束（如客户端断开）时取消挂起的读取并关闭上游
+        if next_item is not None and not next_item.done():
+            next_item.cancel()
+            try:
+                await next_item
+            except (asyncio.CancelledError, StopAsyncIteration, Exception):
+                pass
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+__all__ = ["coalesce_deltas"]
@@ -0,0 +1,182 @@
+"""
+全文检索文本处理
+分词（英文单词 + 中日韩字符二元组，可选 jieba）、BM25 打分与高亮摘要
+
+索引与查询必须使用同一种分词方式，修改 SEARCH_TOKENIZER 后需要重建索引
+"""
+
+import html
+import math
+import re
+from collections import Counter
+from typing import Iterable, List, Optional
+
+try:
+    import jieba
+    JIEBA_AVAILABLE = True
+except ImportError:
+    jieba = None
+    JIEBA_AVAILABLE = False
+
+
+MAX_TERM_LENGTH = 64
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_CJK_RUN = re.compile(f"[{_CJK}]+")
+_TOKEN_RUN = re.compile(f"[a-z0-9]+|[{_CJK}]+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _cjk_terms(run: str, use_jieba: bool, for_query: bool) -> List[str]:
+    if use_jieba:
+        return [term for term in jieba.cut_for_search(run) if term.strip()]
+    if len(run) == 1:
+        return [run]
+    bigrams = [run[i:i + 2] for i in range(len(run) - 1)]
+    # 索引同时保存单字，使单字查询也能命中；查询时只用二元组，避免单字拉长倒排链
+    return bigrams if for_query else list(run) + bigrams
+
+
+def tokenize(text: Optional[str], use_jieba: bool = False, for_query: bool = False) -> List[str]:
+    """
+    分词
+
+    英文与数字按单词切分并转小写；中日韩连续字符默认切分为二元组（索引时额外包含单字），
+    use_jieba 且安装了 jieba 时改用 jieba 搜索引擎模式分词
+
+    Args:
+        text: 文本
+        use_jieba: 是否使用 jieba 分词
+        for_query: 是否为查询分词
+
+    Returns:
+        List[str]: 词项列表（保留重复，用于计算词频）
+    """
+    if not text:
+        return []
+    use_jieba = use_jieba and JIEBA_AVAILABLE
+    terms = []
+    for run in _TOKEN_RUN.findall(text.lower()):
+        if _CJK_RUN.fullmatch(run):
+            terms.extend(_cjk_terms(run, use_jieba, for_query))
+        else:
+            terms.append(run)
+    return [term[:MAX_TERM_LENGTH] for term in terms]
+
+
+def weighted_term_frequencies(fields: Iterable[tuple], use_jieba: bool = False) -> Counter:
+    """
+    按字段权重累加词频（BM25F 的简化形式）
+
+    Args:
+        fields: (文本, 权重) 列表
+        use_jieba: 是否使用 jieba 分词
+
+    Returns:
+        Counter: 词项 -> 加权词频
+    """
+    frequencies = Counter()
+    for text, weight in fields:
+        for term in tokenize(text, use_jieba):
+            frequencies[term] += weight
+    return frequencies
+
+
+def bm25_idf(total_docs: int, doc_freq: int) -> float:
+    """
+    BM25 逆文档频率（Lucene 变体，恒为正）
+
+    Args:
+        total_docs: 文档总数
+        doc_freq: 包含该词项的文档数
+
+    Returns:
+        float: IDF
+    """
+    return math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def bm25_term_score(tf: float, doc_length: float, avg_length: float, idf: float, k1: float, b: float) -> float:
+    """
+    单个词项的 BM25 得分（与检索 SQL 中的表达式一致）
+
+    Args:
+        tf: 词频
+        doc_length: 文档长度
+        avg_length: 平均文档长度
+        idf: 逆文档频率
+        k1: 词频饱和参数
+        b: 长度归一化参数
+
+    Returns:
+        float: 得分
+    """
+    norm = k1 * (1 - b + b * doc_length / avg_length)
+    return idf * tf * (k1 + 1) / (tf + norm)
+
+
+def highlight_snippet(text: Optional[str], terms: Iterable[str], length: int = 120) -> str:
+    """
+    生成高亮摘要
+
+    选取命中词项最密集的片段，HTML 转义后用 <mark> 标记命中部分（相邻或重叠的命中合并为一段）
+
+    Args:
+        text: 原文
+        terms: 查询词项
+        length: 摘要长度（字符）
+
+    Returns:
+        str: 摘要 HTML；原文为空时为空字符串
+    """
+    if not text:
+        return ""
+    text = _WHITESPACE.sub(" ", text).strip()
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        lowered = text
+
+    covered = [False] * len(text)
+    starts = []
+    for term in set(terms):
+        position = lowered.find(term)
+        while position != -1:
+            starts.append(position)
+            for i in range(position, position + len(term)):
+                covered[i] = True
+            position = lowered.find(term, position + 1)
+
+    window_start = 0
+    if starts:
+        starts.sort()
+        best, best_count, j = starts[0], 0, 0
+        for i, start in enumerate(starts):
+            while starts[j] < start - length:
+                j += 1
+            if i - j + 1 > best_count:
+                best, best_count = starts[j], i - j + 1
+        window_start = max(0, min(best - length // 4, len(text) - length))
+    window_end = min(len(text), window_start + length)
+
+    parts = ["…"] if window_start > 0 else []
+    i = window_start
+    while i < window_end:
+        j = i
+        while j < window_end and covered[j] == covered[i]:
+            j += 1
+        chunk = html.escape(text[i:j])
+        parts.append(f"<mark>{chunk}</mark>" if covered[i] else chunk)
+        i = j
+    if window_end < len(text):
+        parts.append("…")
+    return "".join(parts)
+
+
+__all__ = [
+    "JIEBA_AVAILABLE",
+    "tokenize",
+    "weighted_term_frequencies",
+    "bm25_idf",
+    "bm25_term_score",
+    "highlight_snippet",
+]
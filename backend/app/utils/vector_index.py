@@ -0,0 +1,175 @@
+"""
+进程内向量索引
+按分片键（租户 + 用户）分片的余弦相似度索引，用于没有 pgvector 的数据库（SQLite / 测试）。
+每个分片首次检索时从数据库整体加载，之后随写入增量更新；分片数量有上限，按 LRU 淘汰。
+安装 numpy 时用矩阵乘法计算相似度，否则退化为纯 Python 点积
+"""
+
+import heapq
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def format_vector(vector: Sequence[float]) -> str:
+    """
+    把向量格式化为 pgvector 文本格式 "[x1,x2,...]"
+
+    Args:
+        vector: 向量
+
+    Returns:
+        str: 文本表示
+    """
+    return "[" + ",".join(repr(float(x)) for x in vector) + "]"
+
+
+def parse_vector(value: Optional[str]) -> Optional[List[float]]:
+    """
+    解析 pgvector 文本格式的向量
+
+    Args:
+        value: 文本表示
+
+    Returns:
+        Optional[List[float]]: 向量，值为空时为 None
+    """
+    if not value:
+        return None
+    body = value.strip().strip("[]")
+    if not body:
+        return []
+    return [float(x) for x in body.split(",")]
+
+
+def dot(a: Sequence[float], b: Sequence[float]) -> float:
+    """两个向量的点积（归一化向量即余弦相似度）"""
+    return sum(x * y for x, y in zip(a, b))
+
+
+class _Shard:
+    __slots__ = ("vectors", "_ids", "_matrix")
+
+    def __init__(self):
+        self.vectors: Dict[Hashable, List[float]] = {}
+        self._ids: Optional[List[Hashable]] = None
+        self._matrix = None
+
+    def invalidate(self) -> None:
+        self._ids = None
+        self._matrix = None
+
+    def search(self, query: Sequence[float], k: int) -> List[Tuple[Hashable, float]]:
+        if not self.vectors:
+            return []
+        if np is None:
+            scores = ((item_id, dot(query, vector)) for item_id, vector in self.vectors.items())
+            return heapq.nlargest(k, scores, key=lambda item: item[1])
+
+        if self._matrix is None:
+            self._ids = list(self.vectors.keys())
+            self._matrix = np.asarray([self.vectors[item_id] for item_id in self._ids], dtype=np.float32)
+        scores = self._matrix @ np.asarray(query, dtype=np.float32)
+        k = min(k, len(self._ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._ids[i], float(scores[i])) for i in top]
+
+
+class ShardedVectorIndex:
+    """
+    按分片键隔离的向量索引（线程安全）
+    """
+
+    def __init__(self, max_shards: int = 1000):
+        """
+        Args:
+            max_shards: 最多保留的分片数，超出时淘汰最久未使用的分片
+        """
+        self.max_shards = max(max_shards, 1)
+        self._shards: "OrderedDict[Hashable, _Shard]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def has_shard(self, key: Hashable) -> bool:
+        """分片是否已加载"""
+        with self._lock:
+            return key in self._shards
+
+    def load_shard(self, key: Hashable, items: Iterable[Tuple[Hashable, Sequence[float]]]) -> None:
+        """
+        整体加载（替换）一个分片
+
+        Args:
+            key: 分片键
+            items: (ID, 向量) 列表
+        """
+        shard = _Shard()
+        shard.vectors = {item_id: list(vector) for item_id, vector in items}
+        with self._lock:
+            self._shards[key] = shard
+            self._shards.move_to_end(key)
+            while len(self._shards) > self.max_shards:
+                self._shards.popitem(last=False)
+
+    def upsert(self, key: Hashable, item_id: Hashable, vector: Sequence[float]) -> None:
+        """
+        写入或更新一个向量（分片未加载时忽略，首次检索时会从数据库加载）
+
+        Args:
+            key: 分片键
+            item_id: ID
+            vector: 向量
+        """
+        with self._lock:
+            shard = self._shards.get(key)
+            if shard is not None:
+                shard.vectors[item_id] = list(vector)
+                shard.invalidate()
+
+    def remove(self, key: Hashable, item_id: Hashable) -> None:
+        """
+        删除一个向量
+
+        Args:
+            key: 分片键
+            item_id: ID
+        """
+        with self._lock:
+            shard = self._shards.get(key)
+            if shard is not None and shard.vectors.pop(item_id, None) is not None:
+                shard.invalidate()
+
+    def drop_shard(self, key: Hashable) -> None:
+        """丢弃一个分片"""
+        with self._lock:
+            self._shards.pop(key, None)
+
+    def search(self, key: Hashable, query: Sequence[float], k: int) -> List[Tuple[Hashable, float]]:
+        """
+        在分片内检索余弦相似度最高的 k 个向量
+
+        Args:
+            key: 分片键
+            query: 归一化的查询向量
+            k: 返回数量
+
+        Returns:
+            List[Tuple[Hashable, float]]: (ID, 相似度) 按相似度降序
+        """
+        with self._lock:
+            shard = self._shards.get(key)
+            if shard is None:
+                return []
+            self._shards.move_to_end(key)
+            return shard.search(query, k)
+
+    def __len__(self) -> int:
+        return len(self._shards)
+
+
+__all__ = ["ShardedVectorIndex", "format_vector", "parse_vector", "dot"]
@@ -0,0 +1,30 @@
+"""
+回填历史记忆的内容向量
+
+为 embedding 为空的记忆批量计算向量（使用 EMBEDDING_MODEL 配置的模型，未配置时使用哈希向量）。
+可重复执行，已有向量的记忆不会被修改；更换向量模型后需先清空 embedding 列再执行
+
+用法（在 backend 目录下）:
+    python scripts/backfill_memory_embeddings.py [batch_size]
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.crud.async_memory import backfill_memory_embeddings  # noqa: E402
+from app.services.embedding_service import embedding_service  # noqa: E402
+
+
+async def main(batch_size: int) -> None:
+    print(f"向量化方式: {embedding_service.backend}")
+    async with AsyncSessionLocal() as session:
+        updated = await backfill_memory_embeddings(session, embedding_service.aembed, batch_size=batch_size)
+    print(f"已回填 {updated} 条记忆的向量")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 256))
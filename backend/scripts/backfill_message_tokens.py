@@ -0,0 +1,28 @@
+"""
+回填历史对话消息的 Token 数
+
+为 tokens 为空或 0 的消息按所用模型的分词器计算 Token 数，并重新汇总对话的 total_tokens。
+可重复执行，已有 Token 数的消息不会被修改
+
+用法（在 backend 目录下）:
+    python scripts/backfill_message_tokens.py [batch_size]
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.crud.async_conversation import backfill_message_tokens  # noqa: E402
+
+
+async def main(batch_size: int) -> None:
+    async with AsyncSessionLocal() as session:
+        updated = await backfill_message_tokens(session, batch_size=batch_size)
+    print(f"已回填 {updated} 条消息的 Token 数")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
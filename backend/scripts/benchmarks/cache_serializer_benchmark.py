@@ -0,0 +1,96 @@
+"""
+缓存序列化基准测试
+
+对比两种文章缓存方式的负载大小与（反）序列化耗时：
+- pickle: 旧实现，直接 pickle 带关联数据的 Article ORM 对象
+- orjson: 新实现，缓存 ArticleWithAuthor 响应 Schema
+
+用法（在 backend 目录下）:
+    DATABASE_URL=sqlite:///./bench.db SECRET_KEY=... python scripts/benchmarks/cache_serializer_benchmark.py
+"""
+
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.models import Article, User, Category, Tag  # noqa: E402
+from app.schemas.article import ArticleWithAuthor  # noqa: E402
+from app.utils.cache_serializer import PickleSerializer, OrjsonSerializer  # noqa: E402
+
+
+ITERATIONS = 2000
+
+
+def build_article() -> Article:
+    """构造一篇带作者、分类、标签的瞬态 ORM 文章（不访问数据库）"""
+    now = datetime.now(timezone.utc)
+    author = User(
+        id=uuid.uuid4(),
+        tenant_id=uuid.uuid4(),
+        username="benchmark_author",
+        email="author@example.com",
+        hashed_password="x" * 60,
+        full_name="Benchmark Author",
+        bio="Writes about performance. " * 10,
+        is_active=True,
+        is_superuser=False,
+        created_at=now,
+    )
+    article = Article(
+        id=uuid.uuid4(),
+        title="Benchmarking cache serialization",
+        slug="benchmarking-cache-serialization",
+        content="正文内容 Lorem ipsum dolor sit amet. " * 400,
+        excerpt="A short excerpt for the benchmark article.",
+        is_published=True,
+        published_at=now,
+        view_count=1234,
+        created_at=now,
+        updated_at=now,
+        read_time=8,
+        author_id=author.id,
+    )
+    article.author = author
+    article.categories = [
+        Category(id=uuid.uuid4(), name=f"Category {i}", slug=f"category-{i}", sort_order=i, is_active=True, created_at=now)
+        for i in range(2)
+    ]
+    article.tags = [
+        Tag(id=uuid.uuid4(), name=f"Tag {i}", slug=f"tag-{i}", created_at=now)
+        for i in range(6)
+    ]
+    return article
+
+
+def measure(label: str, serializer, value) -> None:
+    payload = serializer.dumps(value)
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        serializer.dumps(value)
+    dumps_us = (time.perf_counter() - start) / ITERATIONS * 1e6
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        serializer.loads(payload)
+    loads_us = (time.perf_counter() - start) / ITERATIONS * 1e6
+
+    print(f"{label:<28} {len(payload):>10,} B {dumps_us:>12.1f} us {loads_us:>12.1f} us")
+
+
+def main() -> None:
+    article = build_article()
+    schema = ArticleWithAuthor.model_validate(article)
+
+    print(f"{'codec / payload':<28} {'size':>12} {'dumps':>15} {'loads':>15}")
+    measure("pickle / ORM graph", PickleSerializer(), article)
+    measure("pickle / schema", PickleSerializer(), schema)
+    measure("orjson / schema", OrjsonSerializer(), schema)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+LLM HTTP 客户端连接池基准测试
+
+在本地启动一个兼容 OpenAI 接口的模拟服务器（/v1/chat/completions，支持普通与 SSE 流式响应），
+对比两种调用方式的单次调用延迟：
+- per-call client: 旧实现，每次调用新建 httpx.AsyncClient（每次都要建立 TCP 连接、加载 SSL 上下文）
+- pooled client: 新实现，DeepSeekProvider 复用自身的长连接客户端
+
+模拟服务器在回环地址上且不使用 TLS，测得的差值是下限；访问真实的远程 HTTPS 接口时，
+每次调用还要多付出 DNS、TCP 与 TLS 握手的网络往返。
+
+用法（在 backend 目录下）:
+    DATABASE_URL=sqlite:///./bench.db SECRET_KEY=... python scripts/benchmarks/llm_client_pool_benchmark.py
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import StreamingResponse  # noqa: E402
+from loguru import logger  # noqa: E402
+
+from app.llm.base import ChatCompletionRequest, ChatMessage  # noqa: E402
+from app.llm.deepseek_provider import DeepSeekProvider  # noqa: E402
+
+
+ITERATIONS = 500
+STREAM_CHUNKS = 20
+
+
+def build_mock_server() -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if not body.get("stream"):
+            return {
+                "choices": [{"message": {"role": "assistant", "content": "pong"}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+
+        async def events():
+            for _ in range(STREAM_CHUNKS):
+                yield 'data: {"choices": [{"delta": {"content": "x"}}]}\n\n'
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def start_mock_server() -> str:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    server = uvicorn.Server(uvicorn.Config(build_mock_server(), host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/v1"
+
+
+async def per_call_chat(base_url: str, payload: dict) -> None:
+    async with httpx.AsyncClient(timeout=30) as client:
+        response = await client.post(f"{base_url}/chat/completions", json=payload)
+        response.raise_for_status()
+        response.json()
+
+
+async def per_call_stream(base_url: str, payload: dict) -> None:
+    async with httpx.AsyncClient(timeout=30) as client:
+        async with client.stream("POST", f"{base_url}/chat/completions", json=payload) as response:
+            async for _ in response.aiter_lines():
+                pass
+
+
+async def timed(func) -> float:
+    for _ in range(20):
+        await func()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await func()
+    return (time.perf_counter() - start) / ITERATIONS * 1000
+
+
+async def main() -> None:
+    logger.remove()
+    base_url = start_mock_server()
+
+    messages = [{"role": "user", "content": "ping"}]
+    request = ChatCompletionRequest(messages=[ChatMessage(**m) for m in messages], model="deepseek-chat")
+    provider = DeepSeekProvider(api_key="bench", base_url=base_url, model="deepseek-chat")
+
+    async def pooled_stream():
+        async for _ in provider.stream_chat(request):
+            pass
+
+    rows = [
+        ("per-call client", await timed(lambda: per_call_chat(base_url, {"messages": messages})),
+         await timed(lambda: per_call_stream(base_url, {"messages": messages, "stream": True}))),
+        ("pooled client", await timed(lambda: provider.chat(request)), await timed(pooled_stream)),
+    ]
+    await provider.aclose()
+
+    print(f"{'client':<18} {'chat':>12} {'stream_chat':>14}")
+    for label, chat_ms, stream_ms in rows:
+        print(f"{label:<18} {chat_ms:>9.2f} ms {stream_ms:>11.2f} ms")
+    print(f"{'saved per call':<18} {rows[0][1] - rows[1][1]:>9.2f} ms {rows[0][2] - rows[1][2]:>11.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
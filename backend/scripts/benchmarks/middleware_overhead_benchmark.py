@@ -0,0 +1,172 @@
+"""
+中间件开销基准测试
+
+对比同一个空接口在两种中间件栈下的单请求开销：
+- BaseHTTPMiddleware: 旧实现，请求日志 / 大小限制 / 性能监控 / 限流日志四层 BaseHTTPMiddleware
+- pipeline: 新实现，单层纯 ASGI RequestPipelineMiddleware
+
+直接以 ASGI 方式调用应用（不经过 HTTP 客户端与服务器），并移除日志 sink，
+测得的差值即中间件本身的开销。另外测量一个 SSE 流式接口，对比首个事件到达的时间。
+
+用法（在 backend 目录下）:
+    DATABASE_URL=sqlite:///./bench.db SECRET_KEY=... python scripts/benchmarks/middleware_overhead_benchmark.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse, StreamingResponse  # noqa: E402
+from loguru import logger  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.middleware.pipeline import RequestPipelineMiddleware  # noqa: E402
+from app.middleware.request_size_limit import RequestSizeLimitStage  # noqa: E402
+from app.utils.middleware import RequestLoggingStage  # noqa: E402
+from app.utils.perf_monitor import PerformanceMonitoringStage  # noqa: E402
+
+
+ITERATIONS = 5000
+STREAM_DELAY = 0.05
+
+
+class LegacyRequestLogging(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+        start_time = time.time()
+        logger.info(f"Request ID: {request_id} | {request.method} {request.url.path}")
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logger.info(f"Request ID: {request_id} | Status: {response.status_code} | Duration: {process_time:.4f}s")
+        response.headers["X-Request-ID"] = request_id
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+class LegacyRequestSizeLimit(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        content_length = request.headers.get("content-length")
+        if content_length and int(content_length) > 10 * 1024 * 1024:
+            return JSONResponse(status_code=413, content={"detail": "too large"})
+        return await call_next(request)
+
+
+class LegacyPerformanceMonitoring(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        response = await call_next(request)
+        duration = (time.time() - start_time) * 1000
+        # 旧实现每个请求创建两个日志任务
+        asyncio.create_task(asyncio.sleep(0, result=duration))
+        asyncio.create_task(asyncio.sleep(0, result=duration))
+        return response
+
+
+class LegacyRateLimitLogging(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        logger.info(f"Rate limit check for Path: {request.url.path}, Method: {request.method}")
+        return await call_next(request)
+
+
+def build_app(legacy: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def events():
+            yield "data: first\n\n"
+            await asyncio.sleep(STREAM_DELAY)
+            yield "data: second\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    if legacy:
+        app.add_middleware(LegacyRateLimitLogging)
+        app.add_middleware(LegacyPerformanceMonitoring)
+        app.add_middleware(LegacyRequestSizeLimit)
+        app.add_middleware(LegacyRequestLogging)
+    else:
+        app.add_middleware(
+            RequestPipelineMiddleware,
+            stages=[RequestLoggingStage(), RequestSizeLimitStage(), PerformanceMonitoringStage()],
+        )
+    return app
+
+
+def make_scope(path: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 12345),
+        "server": ("bench", 80),
+    }
+
+
+async def call(app, path: str, on_body=None) -> None:
+    # 与真实服务器一致：请求体只投递一次，之后阻塞直到响应结束再报告断开
+    request_sent = False
+    response_complete = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            if on_body is not None and message.get("body"):
+                on_body()
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(make_scope(path), receive, send)
+
+
+async def measure(label: str, app) -> None:
+    # 预热（路由编译、首次导入等）
+    for _ in range(200):
+        await call(app, "/ping")
+
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await call(app, "/ping")
+    per_request_us = (time.perf_counter() - start) / ITERATIONS * 1e6
+
+    first_event = []
+    start = time.perf_counter()
+    await call(app, "/stream", on_body=lambda: first_event.append(time.perf_counter() - start))
+    first_event_ms = first_event[0] * 1000 if first_event else float("nan")
+
+    print(f"{label:<22} {per_request_us:>14.1f} us {first_event_ms:>16.1f} ms")
+
+
+async def main() -> None:
+    logger.remove()
+
+    print(f"{'middleware stack':<22} {'per request':>17} {'SSE first event':>19}")
+    await measure("BaseHTTPMiddleware x4", build_app(legacy=True))
+    await measure("pipeline (pure ASGI)", build_app(legacy=False))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,119 @@
+"""
+密码哈希线程池基准测试
+
+在进程内的 FastAPI 应用上并发发起登录（bcrypt 校验）与只读请求，对比两种实现下只读请求的延迟：
+- inline: 旧实现，在事件循环线程中直接调用 bcrypt.checkpw，每次校验期间所有请求都被阻塞
+- executor: 新实现，verify_password 在有界线程池中执行，事件循环继续处理其它请求
+
+同时演示排队上限：并发登录数超过 PASSWORD_HASH_MAX_PENDING 时，多出的请求立即得到 503。
+
+用法（在 backend 目录下）:
+    DATABASE_URL=sqlite:///./bench.db SECRET_KEY=... python scripts/benchmarks/password_hash_benchmark.py
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import bcrypt  # noqa: E402
+import httpx  # noqa: E402
+from fastapi import FastAPI, HTTPException  # noqa: E402
+from loguru import logger  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import password_executor, verify_password  # noqa: E402
+
+
+DURATION = 3.0
+CONCURRENT_LOGINS = 8
+READ_INTERVAL = 0.005
+PASSWORD = "CorrectHorse9!"
+
+
+def build_app(hashed: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/login/inline")
+    async def login_inline():
+        if not bcrypt.checkpw(PASSWORD.encode(), hashed.encode()):
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.post("/login/executor")
+    async def login_executor():
+        if not await verify_password(PASSWORD, hashed):
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.get("/read")
+    async def read():
+        return {"ok": True}
+
+    return app
+
+
+async def run_mode(client: httpx.AsyncClient, mode: str, logins: int) -> dict:
+    deadline = time.perf_counter() + DURATION
+    statuses = {}
+    read_latencies = []
+
+    async def login_loop():
+        while time.perf_counter() < deadline:
+            response = await client.post(f"/login/{mode}")
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 503:
+                await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+    async def read_loop():
+        # 计入等待事件循环调度的时间：每轮耗时减去固定的间隔，即只读请求实际感受到的延迟
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(READ_INTERVAL)
+            await client.get("/read")
+            read_latencies.append((time.perf_counter() - start - READ_INTERVAL) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(read_loop(), *(login_loop() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    read_latencies.sort()
+    return {
+        "logins": statuses.get(200, 0) / elapsed,
+        "rejected": statuses.get(503, 0),
+        "reads": len(read_latencies),
+        "p50": statistics.median(read_latencies),
+        "p99": read_latencies[max(int(len(read_latencies) * 0.99) - 1, 0)],
+    }
+
+
+async def main() -> None:
+    logger.remove()
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)).decode()
+    transport = httpx.ASGITransport(app=build_app(hashed))
+
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS}, workers={settings.PASSWORD_HASH_WORKERS}, "
+          f"max pending={settings.PASSWORD_HASH_MAX_PENDING}, {DURATION:.0f}s per run")
+    print(f"{'mode':<10} {'logins':>8} {'login/s':>9} {'503':>6} {'reads':>7} {'read p50':>11} {'read p99':>11}")
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        runs = [
+            ("inline", CONCURRENT_LOGINS),
+            ("executor", CONCURRENT_LOGINS),
+            ("executor", settings.PASSWORD_HASH_MAX_PENDING * 2),
+        ]
+        for mode, logins in runs:
+            result = await run_mode(client, mode, logins)
+            print(
+                f"{mode:<10} {logins:>8} {result['logins']:>9.1f} {result['rejected']:>6} {result['reads']:>7} "
+                f"{result['p50']:>8.2f} ms {result['p99']:>8.2f} ms"
+            )
+
+    password_executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,29 @@
+"""
+重建文章全文检索倒排索引
+
+首次部署迁移 016 或修改 SEARCH_TOKENIZER 后执行；可重复执行，每篇文章的索引整体替换
+
+用法（在 backend 目录下）:
+    python scripts/reindex_articles.py [batch_size]
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.services.search_service import article_search_service  # noqa: E402
+
+
+def main(batch_size: int) -> None:
+    db = SessionLocal()
+    try:
+        indexed = article_search_service.reindex_all(db, batch_size=batch_size)
+    finally:
+        db.close()
+    print(f"已重建 {indexed} 篇文章的检索索引")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)